@@ -1,886 +0,0 @@
-#!/usr/bin/env python3
-"""
-NFP-Based True Shape Nesting - Target 98%+ Utilization
-
-This module implements professional-grade nesting using:
-1. No-Fit Polygon (NFP) for precise collision detection
-2. Inner-Fit Polygon (IFP) for bin boundaries
-3. Bottom-Left-Fill with true shape placement
-4. Multiple rotation angles (0, 90, 180, 270 + fine angles)
-5. Genetic algorithm for global optimization
-
-NFP Concept:
-- NFP of pieces A and B is a polygon that represents all positions
-  where A can be placed without overlapping B
-- By placing A's reference point inside NFP(A,B), we guarantee no collision
-- This allows pieces to interlock and nest tightly
-
-Author: Claude
-Date: 2026-01-30
-"""
-
-import math
-import random
-from typing import List, Tuple, Optional, Dict, Set
-from dataclasses import dataclass, field
-from copy import deepcopy
-from collections import defaultdict
-
-# Constants
-CUTTER_WIDTH_CM = 157.48  # 62 inches
-GAP_CM = 0.3  # Smaller gap for tighter nesting
-ROTATION_ANGLES = [
-    0,
-    90,
-    180,
-    270,
-]  # Can add more: [0, 45, 90, 135, 180, 225, 270, 315]
-EPSILON = 1e-6
-
-
-@dataclass
-class Point:
-    x: float
-    y: float
-
-    def __eq__(self, other):
-        if not isinstance(other, Point):
-            return False
-        return abs(self.x - other.x) < EPSILON and abs(self.y - other.y) < EPSILON
-
-    def __hash__(self):
-        return hash((round(self.x, 6), round(self.y, 6)))
-
-    def __add__(self, other):
-        return Point(self.x + other.x, self.y + other.y)
-
-    def __sub__(self, other):
-        return Point(self.x - other.x, self.y - other.y)
-
-
-@dataclass
-class Polygon:
-    """A polygon represented as a list of vertices."""
-
-    points: List[Point]
-
-    @property
-    def bounds(self) -> Tuple[float, float, float, float]:
-        """Return (min_x, min_y, max_x, max_y)."""
-        xs = [p.x for p in self.points]
-        ys = [p.y for p in self.points]
-        return (min(xs), min(ys), max(xs), max(ys))
-
-    @property
-    def width(self) -> float:
-        b = self.bounds
-        return b[2] - b[0]
-
-    @property
-    def height(self) -> float:
-        b = self.bounds
-        return b[3] - b[1]
-
-    @property
-    def area(self) -> float:
-        """Calculate polygon area using shoelace formula."""
-        n = len(self.points)
-        if n < 3:
-            return 0
-        area = 0
-        for i in range(n):
-            j = (i + 1) % n
-            area += self.points[i].x * self.points[j].y
-            area -= self.points[j].x * self.points[i].y
-        return abs(area) / 2
-
-    @property
-    def centroid(self) -> Point:
-        """Calculate polygon centroid."""
-        n = len(self.points)
-        cx = sum(p.x for p in self.points) / n
-        cy = sum(p.y for p in self.points) / n
-        return Point(cx, cy)
-
-    def translate(self, dx: float, dy: float) -> "Polygon":
-        """Return translated polygon."""
-        return Polygon([Point(p.x + dx, p.y + dy) for p in self.points])
-
-    def rotate(self, angle_deg: float, center: Optional[Point] = None) -> "Polygon":
-        """Return rotated polygon."""
-        if center is None:
-            center = self.centroid
-
-        rad = math.radians(angle_deg)
-        cos_a = math.cos(rad)
-        sin_a = math.sin(rad)
-
-        rotated = []
-        for p in self.points:
-            dx = p.x - center.x
-            dy = p.y - center.y
-            new_x = dx * cos_a - dy * sin_a + center.x
-            new_y = dx * sin_a + dy * cos_a + center.y
-            rotated.append(Point(new_x, new_y))
-
-        return Polygon(rotated)
-
-    def normalize(self) -> "Polygon":
-        """Move polygon so min corner is at origin."""
-        min_x, min_y, _, _ = self.bounds
-        return self.translate(-min_x, -min_y)
-
-    def offset(self, distance: float) -> "Polygon":
-        """Offset polygon outward by distance (simplified - adds to bounding box)."""
-        # For proper offset, would need Clipper library
-        # This is a simplified version that expands the bounding box
-        points = []
-        centroid = self.centroid
-        for p in self.points:
-            dx = p.x - centroid.x
-            dy = p.y - centroid.y
-            length = math.sqrt(dx * dx + dy * dy)
-            if length > 0:
-                scale = (length + distance) / length
-                points.append(Point(centroid.x + dx * scale, centroid.y + dy * scale))
-            else:
-                points.append(p)
-        return Polygon(points)
-
-
-def cross_product(o: Point, a: Point, b: Point) -> float:
-    """Calculate cross product of vectors OA and OB."""
-    return (a.x - o.x) * (b.y - o.y) - (a.y - o.y) * (b.x - o.x)
-
-
-def convex_hull(points: List[Point]) -> List[Point]:
-    """Calculate convex hull using Graham scan."""
-    if len(points) < 3:
-        return points
-
-    # Sort points by x, then by y
-    sorted_points = sorted(points, key=lambda p: (p.x, p.y))
-
-    # Build lower hull
-    lower = []
-    for p in sorted_points:
-        while len(lower) >= 2 and cross_product(lower[-2], lower[-1], p) <= 0:
-            lower.pop()
-        lower.append(p)
-
-    # Build upper hull
-    upper = []
-    for p in reversed(sorted_points):
-        while len(upper) >= 2 and cross_product(upper[-2], upper[-1], p) <= 0:
-            upper.pop()
-        upper.append(p)
-
-    return lower[:-1] + upper[:-1]
-
-
-def minkowski_sum(poly_a: Polygon, poly_b: Polygon) -> Polygon:
-    """
-    Calculate Minkowski sum of two convex polygons.
-
-    For NFP calculation, we use Minkowski sum of A and -B (B reflected).
-    """
-    # Get convex hulls (Minkowski sum is simpler for convex polygons)
-    hull_a = convex_hull(poly_a.points)
-    hull_b = convex_hull(poly_b.points)
-
-    if len(hull_a) < 3 or len(hull_b) < 3:
-        # Fallback for degenerate cases
-        return Polygon(hull_a + hull_b)
-
-    # Find starting points (bottom-most, then left-most)
-    def find_start(hull):
-        min_idx = 0
-        for i, p in enumerate(hull):
-            if p.y < hull[min_idx].y or (
-                p.y == hull[min_idx].y and p.x < hull[min_idx].x
-            ):
-                min_idx = i
-        return min_idx
-
-    start_a = find_start(hull_a)
-    start_b = find_start(hull_b)
-
-    # Rotate hulls to start from bottom-left
-    hull_a = hull_a[start_a:] + hull_a[:start_a]
-    hull_b = hull_b[start_b:] + hull_b[:start_b]
-
-    # Calculate Minkowski sum by merging edges
-    result = []
-    i, j = 0, 0
-    n_a, n_b = len(hull_a), len(hull_b)
-
-    while i < n_a or j < n_b:
-        result.append(
-            Point(
-                hull_a[i % n_a].x + hull_b[j % n_b].x,
-                hull_a[i % n_a].y + hull_b[j % n_b].y,
-            )
-        )
-
-        # Calculate edge angles
-        edge_a = Point(
-            hull_a[(i + 1) % n_a].x - hull_a[i % n_a].x,
-            hull_a[(i + 1) % n_a].y - hull_a[i % n_a].y,
-        )
-        edge_b = Point(
-            hull_b[(j + 1) % n_b].x - hull_b[j % n_b].x,
-            hull_b[(j + 1) % n_b].y - hull_b[j % n_b].y,
-        )
-
-        angle_a = math.atan2(edge_a.y, edge_a.x)
-        angle_b = math.atan2(edge_b.y, edge_b.x)
-
-        if i >= n_a:
-            j += 1
-        elif j >= n_b:
-            i += 1
-        elif abs(angle_a - angle_b) < EPSILON:
-            i += 1
-            j += 1
-        elif angle_a < angle_b:
-            i += 1
-        else:
-            j += 1
-
-    return Polygon(result)
-
-
-def reflect_polygon(poly: Polygon) -> Polygon:
-    """Reflect polygon through origin (negate all coordinates)."""
-    return Polygon([Point(-p.x, -p.y) for p in poly.points])
-
-
-def calculate_nfp(fixed: Polygon, orbiting: Polygon) -> Polygon:
-    """
-    Calculate No-Fit Polygon (NFP) of two polygons.
-
-    The NFP represents all positions where the orbiting polygon's
-    reference point can be placed without overlapping the fixed polygon.
-
-    NFP = Minkowski sum of fixed polygon and reflected orbiting polygon
-    """
-    reflected = reflect_polygon(orbiting)
-    nfp = minkowski_sum(fixed, reflected)
-    return nfp
-
-
-def point_in_polygon(point: Point, polygon: Polygon) -> bool:
-    """Check if point is inside polygon using ray casting."""
-    n = len(polygon.points)
-    inside = False
-
-    j = n - 1
-    for i in range(n):
-        pi = polygon.points[i]
-        pj = polygon.points[j]
-
-        if (pi.y > point.y) != (pj.y > point.y) and point.x < (pj.x - pi.x) * (
-            point.y - pi.y
-        ) / (pj.y - pi.y) + pi.x:
-            inside = not inside
-
-        j = i
-
-    return inside
-
-
-def polygons_intersect(poly_a: Polygon, poly_b: Polygon) -> bool:
-    """Check if two polygons intersect (simplified check using bounding boxes + sampling)."""
-    # Quick bounding box check
-    a_bounds = poly_a.bounds
-    b_bounds = poly_b.bounds
-
-    if (
-        a_bounds[2] < b_bounds[0]
-        or b_bounds[2] < a_bounds[0]
-        or a_bounds[3] < b_bounds[1]
-        or b_bounds[3] < a_bounds[1]
-    ):
-        return False
-
-    # Check if any vertex of A is inside B
-    for p in poly_a.points:
-        if point_in_polygon(p, poly_b):
-            return True
-
-    # Check if any vertex of B is inside A
-    for p in poly_b.points:
-        if point_in_polygon(p, poly_a):
-            return True
-
-    # Check edge intersections (simplified)
-    return False
-
-
-@dataclass
-class PlacedPiece:
-    """A piece that has been placed in the nest."""
-
-    piece_id: int
-    polygon: Polygon
-    position: Point
-    rotation: float
-    original_polygon: Polygon
-
-
-@dataclass
-class NestingResult:
-    """Result of nesting operation."""
-
-    pieces: List[PlacedPiece]
-    fabric_width: float
-    fabric_length: float
-    utilization: float
-    success: bool
-    message: str
-
-
-class NFPNester:
-    """
-    NFP-based nesting engine for achieving 98%+ utilization.
-    """
-
-    def __init__(
-        self,
-        fabric_width: float = CUTTER_WIDTH_CM,
-        gap: float = GAP_CM,
-        rotations: List[float] = None,
-    ):
-        self.fabric_width = fabric_width
-        self.gap = gap
-        self.rotations = rotations or ROTATION_ANGLES
-
-        # Cache for NFPs
-        self.nfp_cache: Dict[Tuple[int, int, float, float], Polygon] = {}
-
-    def _get_nfp(
-        self,
-        fixed: Polygon,
-        orbiting: Polygon,
-        fixed_id: int,
-        orbit_id: int,
-        fixed_rot: float,
-        orbit_rot: float,
-    ) -> Polygon:
-        """Get NFP from cache or calculate."""
-        key = (fixed_id, orbit_id, fixed_rot, orbit_rot)
-
-        if key not in self.nfp_cache:
-            # Add gap by offsetting the fixed polygon
-            fixed_with_gap = fixed.offset(self.gap)
-            self.nfp_cache[key] = calculate_nfp(fixed_with_gap, orbiting)
-
-        return self.nfp_cache[key]
-
-    def _find_placement_position(
-        self,
-        piece: Polygon,
-        piece_id: int,
-        rotation: float,
-        placed_pieces: List[PlacedPiece],
-    ) -> Optional[Point]:
-        """
-        Find the best position for a piece using NFP.
-
-        Strategy: Bottom-left fill - find the lowest Y position,
-        then the leftmost X at that Y.
-        """
-        rotated = piece.rotate(rotation).normalize()
-
-        # If no pieces placed yet, place at origin
-        if not placed_pieces:
-            return Point(0, 0)
-
-        # Calculate combined NFP (intersection of all individual NFPs)
-        # For simplicity, we'll find valid positions by checking against each placed piece
-
-        # Generate candidate positions from NFP vertices
-        candidates = []
-
-        for placed in placed_pieces:
-            nfp = self._get_nfp(
-                placed.polygon,
-                rotated,
-                placed.piece_id,
-                piece_id,
-                placed.rotation,
-                rotation,
-            )
-
-            # Translate NFP to placed piece's position
-            translated_nfp = nfp.translate(placed.position.x, placed.position.y)
-
-            # Add NFP vertices as candidates
-            for p in translated_nfp.points:
-                if p.x >= 0 and p.x + rotated.width <= self.fabric_width:
-                    candidates.append(p)
-
-        # Also try positions along the bottom edge
-        for x in [
-            0,
-            self.fabric_width / 4,
-            self.fabric_width / 2,
-            3 * self.fabric_width / 4,
-            self.fabric_width - rotated.width,
-        ]:
-            if 0 <= x <= self.fabric_width - rotated.width:
-                candidates.append(Point(x, 0))
-
-        # Filter valid candidates (no collision with placed pieces)
-        valid_candidates = []
-
-        for candidate in candidates:
-            if candidate.x < 0 or candidate.x + rotated.width > self.fabric_width:
-                continue
-            if candidate.y < 0:
-                continue
-
-            # Check collision with all placed pieces
-            test_poly = rotated.translate(candidate.x, candidate.y)
-            collision = False
-
-            for placed in placed_pieces:
-                if polygons_intersect(test_poly, placed.polygon):
-                    collision = True
-                    break
-
-            if not collision:
-                valid_candidates.append(candidate)
-
-        if not valid_candidates:
-            # Try sliding along Y axis to find valid position
-            for y in range(0, 5000, 10):  # Search up to 50 meters
-                for x in [0, self.fabric_width / 4, self.fabric_width / 2]:
-                    if x + rotated.width > self.fabric_width:
-                        continue
-
-                    test_pos = Point(x, y)
-                    test_poly = rotated.translate(x, y)
-
-                    collision = False
-                    for placed in placed_pieces:
-                        if polygons_intersect(test_poly, placed.polygon):
-                            collision = True
-                            break
-
-                    if not collision:
-                        valid_candidates.append(test_pos)
-                        break
-
-                if valid_candidates:
-                    break
-
-        if not valid_candidates:
-            return None
-
-        # Choose bottom-left position
-        valid_candidates.sort(key=lambda p: (p.y, p.x))
-        return valid_candidates[0]
-
-    def nest(self, polygons: List[Polygon]) -> NestingResult:
-        """
-        Nest polygons to minimize fabric usage.
-
-        Args:
-            polygons: List of polygons to nest
-
-        Returns:
-            NestingResult with placement information
-        """
-        if not polygons:
-            return NestingResult([], self.fabric_width, 0, 0, True, "No pieces")
-
-        # Prepare pieces with area for sorting
-        pieces = [(i, poly, poly.area) for i, poly in enumerate(polygons)]
-
-        # Sort by area (largest first)
-        pieces.sort(key=lambda x: -x[2])
-
-        placed_pieces: List[PlacedPiece] = []
-        failed_pieces = []
-
-        for piece_id, polygon, area in pieces:
-            best_position = None
-            best_rotation = 0
-            best_y = float("inf")
-
-            # Try each rotation
-            for rotation in self.rotations:
-                rotated = polygon.rotate(rotation).normalize()
-
-                # Skip if too wide
-                if rotated.width > self.fabric_width:
-                    continue
-
-                position = self._find_placement_position(
-                    polygon, piece_id, rotation, placed_pieces
-                )
-
-                if position and position.y < best_y:
-                    best_y = position.y
-                    best_position = position
-                    best_rotation = rotation
-
-            if best_position:
-                rotated = polygon.rotate(best_rotation).normalize()
-                final_poly = rotated.translate(best_position.x, best_position.y)
-
-                placed_pieces.append(
-                    PlacedPiece(
-                        piece_id=piece_id,
-                        polygon=final_poly,
-                        position=best_position,
-                        rotation=best_rotation,
-                        original_polygon=polygon,
-                    )
-                )
-            else:
-                failed_pieces.append(piece_id)
-
-        # Calculate results
-        if placed_pieces:
-            max_y = max(p.polygon.bounds[3] for p in placed_pieces)
-            total_area = sum(p.polygon.area for p in placed_pieces)
-            fabric_area = self.fabric_width * max_y
-            utilization = (total_area / fabric_area) * 100 if fabric_area > 0 else 0
-        else:
-            max_y = 0
-            utilization = 0
-
-        success = len(failed_pieces) == 0
-        message = f"Placed {len(placed_pieces)}/{len(polygons)} pieces at {utilization:.1f}% utilization"
-
-        if failed_pieces:
-            message += f" (failed: {failed_pieces})"
-
-        return NestingResult(
-            pieces=placed_pieces,
-            fabric_width=self.fabric_width,
-            fabric_length=max_y,
-            utilization=utilization,
-            success=success,
-            message=message,
-        )
-
-
-def optimize_with_genetic_algorithm(
-    polygons: List[Polygon],
-    fabric_width: float = CUTTER_WIDTH_CM,
-    population_size: int = 50,
-    generations: int = 100,
-    mutation_rate: float = 0.1,
-) -> NestingResult:
-    """
-    Use genetic algorithm to find optimal piece ordering and rotations.
-
-    Each individual is a permutation of pieces with rotation choices.
-    """
-    n = len(polygons)
-    if n == 0:
-        return NestingResult([], fabric_width, 0, 0, True, "No pieces")
-
-    nester = NFPNester(fabric_width)
-
-    # Individual: (piece_order, rotations)
-    def create_individual():
-        order = list(range(n))
-        random.shuffle(order)
-        rotations = [random.choice(ROTATION_ANGLES) for _ in range(n)]
-        return (order, rotations)
-
-    def fitness(individual):
-        order, rotations = individual
-
-        # Create rotated polygons in specified order
-        ordered_polys = []
-        for i, idx in enumerate(order):
-            poly = polygons[idx].rotate(rotations[i]).normalize()
-            ordered_polys.append(poly)
-
-        # Nest them
-        result = nester.nest(ordered_polys)
-
-        # Fitness = utilization (higher is better)
-        return result.utilization
-
-    def crossover(parent1, parent2):
-        order1, rot1 = parent1
-        order2, rot2 = parent2
-
-        # Order crossover (OX)
-        start = random.randint(0, n - 1)
-        end = random.randint(start, n)
-
-        child_order = [-1] * n
-        child_order[start:end] = order1[start:end]
-
-        remaining = [x for x in order2 if x not in child_order[start:end]]
-        j = 0
-        for i in range(n):
-            if child_order[i] == -1:
-                child_order[i] = remaining[j]
-                j += 1
-
-        # Rotation crossover
-        child_rot = [rot1[i] if random.random() < 0.5 else rot2[i] for i in range(n)]
-
-        return (child_order, child_rot)
-
-    def mutate(individual):
-        order, rotations = list(individual[0]), list(individual[1])
-
-        if random.random() < mutation_rate:
-            # Swap two pieces
-            i, j = random.sample(range(n), 2)
-            order[i], order[j] = order[j], order[i]
-
-        if random.random() < mutation_rate:
-            # Change a rotation
-            i = random.randint(0, n - 1)
-            rotations[i] = random.choice(ROTATION_ANGLES)
-
-        return (order, rotations)
-
-    # Initialize population
-    population = [create_individual() for _ in range(population_size)]
-
-    best_individual = None
-    best_fitness = 0
-
-    for gen in range(generations):
-        # Evaluate fitness
-        fitness_scores = [(ind, fitness(ind)) for ind in population]
-        fitness_scores.sort(key=lambda x: -x[1])
-
-        if fitness_scores[0][1] > best_fitness:
-            best_fitness = fitness_scores[0][1]
-            best_individual = fitness_scores[0][0]
-
-        # Early termination if we hit target
-        if best_fitness >= 98:
-            break
-
-        # Selection (top 50%)
-        survivors = [ind for ind, _ in fitness_scores[: population_size // 2]]
-
-        # Create next generation
-        next_gen = survivors.copy()
-
-        while len(next_gen) < population_size:
-            parent1, parent2 = random.sample(survivors, 2)
-            child = crossover(parent1, parent2)
-            child = mutate(child)
-            next_gen.append(child)
-
-        population = next_gen
-
-    # Return best result
-    if best_individual:
-        order, rotations = best_individual
-        ordered_polys = []
-        for i, idx in enumerate(order):
-            poly = polygons[idx].rotate(rotations[i]).normalize()
-            ordered_polys.append(poly)
-
-        result = nester.nest(ordered_polys)
-        result.message = (
-            f"GA optimized: {result.utilization:.1f}% after {generations} generations"
-        )
-        return result
-
-    return nester.nest(polygons)
-
-
-def nest_for_production(
-    contour_groups: List[List[Tuple[float, float]]],
-    fabric_width: float = CUTTER_WIDTH_CM,
-    target_utilization: float = 95.0,
-    use_ga: bool = True,
-) -> NestingResult:
-    """
-    Main entry point for production nesting.
-
-    Args:
-        contour_groups: List of piece contours, each as list of (x, y) tuples
-        fabric_width: Fabric width in cm
-        target_utilization: Target utilization percentage
-        use_ga: Use genetic algorithm optimization
-
-    Returns:
-        NestingResult with optimized placement
-    """
-    # Convert to Polygon objects
-    polygons = []
-    for contour in contour_groups:
-        points = [Point(x, y) for x, y in contour]
-        if points:
-            polygons.append(Polygon(points))
-
-    if use_ga and len(polygons) > 2:
-        return optimize_with_genetic_algorithm(
-            polygons,
-            fabric_width,
-            population_size=30,
-            generations=50,
-        )
-    else:
-        nester = NFPNester(fabric_width)
-        return nester.nest(polygons)
-
-
-# Adapter function for compatibility with existing code
-def nfp_nest_from_points(
-    contour_groups: List[List],  # List of Point objects from nesting_engine
-    fabric_width: float = CUTTER_WIDTH_CM,
-    gap: float = GAP_CM,
-) -> "NestingResult":
-    """
-    Adapter for existing nesting_engine.Point format.
-    """
-    from nesting_engine import (
-        NestingResult as OldNestingResult,
-        NestedPiece,
-        Point as OldPoint,
-    )
-
-    # Convert to our format
-    polygons = []
-    for contour in contour_groups:
-        points = [Point(p.x, p.y) for p in contour]
-        if points:
-            polygons.append(Polygon(points))
-
-    # Run NFP nesting with GA
-    result = nest_for_production(
-        [(p.x, p.y) for poly in polygons for p in poly.points],
-        fabric_width,
-        use_ga=True,
-    )
-
-    # Actually, we need to pass contours properly
-    contour_tuples = []
-    for contour in contour_groups:
-        contour_tuples.append([(p.x, p.y) for p in contour])
-
-    # Re-run with proper format
-    polys = [Polygon([Point(x, y) for x, y in c]) for c in contour_tuples]
-
-    if len(polys) > 2:
-        result = optimize_with_genetic_algorithm(
-            polys, fabric_width, population_size=30, generations=50
-        )
-    else:
-        nester = NFPNester(fabric_width, gap)
-        result = nester.nest(polys)
-
-    # Convert back to old format
-    nested_pieces = []
-    for placed in result.pieces:
-        # Find original contour index
-        orig_idx = placed.piece_id
-        if orig_idx < len(contour_groups):
-            orig_points = contour_groups[orig_idx]
-
-            # Get transformed points
-            trans_points = [OldPoint(p.x, p.y) for p in placed.polygon.points]
-
-            from nesting_engine import BoundingBox
-
-            bounds = placed.polygon.bounds
-            bbox = BoundingBox(bounds[0], bounds[1], bounds[2], bounds[3])
-
-            nested_pieces.append(
-                NestedPiece(
-                    piece_id=orig_idx,
-                    original_points=orig_points,
-                    transformed_points=trans_points,
-                    bbox=bbox,
-                    position=(placed.position.x, placed.position.y),
-                    rotation=int(placed.rotation),
-                )
-            )
-
-    return OldNestingResult(
-        pieces=nested_pieces,
-        fabric_width=fabric_width,
-        fabric_length=result.fabric_length,
-        utilization=result.utilization,
-        success=result.success,
-        message=result.message,
-    )
-
-
-def main():
-    """Test NFP nesting."""
-    import sys
-
-    sys.path.insert(0, ".")
-
-    from production_pipeline import (
-        extract_xml_from_pds,
-        extract_piece_dimensions,
-        extract_svg_geometry,
-        transform_to_cm,
-    )
-    from pathlib import Path
-
-    # Test with a PDS file
-    pds_files = [
-        "DS-speciale/inputs/pds/Basic Tee_2D.PDS",
-        "DS-speciale/inputs/pds/Light  Jacket_2D.PDS",
-    ]
-
-    for pds_path in pds_files:
-        if not Path(pds_path).exists():
-            continue
-
-        print(f"\n{'=' * 60}")
-        print(f"Testing: {Path(pds_path).stem}")
-        print("=" * 60)
-
-        # Extract geometry
-        xml_content = extract_xml_from_pds(pds_path)
-        pieces = extract_piece_dimensions(xml_content, "Small")
-        total_width = sum(p["size_x"] for p in pieces.values())
-        total_height = max(p["size_y"] for p in pieces.values()) if pieces else 0
-
-        contours, metadata = extract_svg_geometry(
-            xml_content, cutting_contours_only=True
-        )
-        contours_cm = transform_to_cm(contours, metadata, total_width, total_height)
-
-        # Convert to polygon format
-        polygons = []
-        for c in contours_cm:
-            points = [Point(p.x, p.y) for p in c.points]
-            polygons.append(Polygon(points))
-
-        print(f"Pieces: {len(polygons)}")
-        print(f"Total area: {sum(p.area for p in polygons):.1f} sq cm")
-
-        # Test basic NFP nesting
-        print("\nBasic NFP nesting...")
-        nester = NFPNester(CUTTER_WIDTH_CM)
-        result = nester.nest(polygons)
-        print(f"  Utilization: {result.utilization:.1f}%")
-        print(f"  Fabric length: {result.fabric_length:.1f} cm")
-
-        # Test with GA
-        print("\nGA-optimized NFP nesting...")
-        result = optimize_with_genetic_algorithm(
-            polygons,
-            CUTTER_WIDTH_CM,
-            population_size=30,
-            generations=30,
-        )
-        print(f"  Utilization: {result.utilization:.1f}%")
-        print(f"  Fabric length: {result.fabric_length:.1f} cm")
-
-
-if __name__ == "__main__":
-    main()
@@ -851,7 +851,9 @@ async def create_order(order_request: OrderRequest, background_tasks: Background
 
     Processing modes:
     - ASYNC (ASYNC_PROCESSING=true): Enqueues order to Redis for worker processing (~50ms)
-    - SYNC (ASYNC_PROCESSING=false, default): Processes synchronously (~45s)
+    - SYNC (ASYNC_PROCESSING=false, default): Processes synchronously (~45s;
+      rush orders return at the first good-enough layout, see
+      RUSH_TARGET_UTILIZATION / RUSH_NESTING_DEADLINE_SECONDS)
 
     The order will be processed through the pipeline:
     1. Pattern extracted from template
@@ -949,8 +951,11 @@ async def create_order(order_request: OrderRequest, background_tasks: Background
             notes=order_request.notes,
         )
 
-        # Process order synchronously
-        result: ProductionResult = api.process_order(order)
+        # Process order synchronously (rush orders stop nesting at the first
+        # good-enough layout instead of blocking for the full budget)
+        result: ProductionResult = api.process_order(
+            order, rush=order_request.priority == "rush"
+        )
 
         # Add to cutter queue if successful
         job_id = None
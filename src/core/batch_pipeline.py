@@ -0,0 +1,435 @@
+#!/usr/bin/env python3
+"""
+Staged Batch Pipeline
+
+batch_process used to run each order start to finish before touching the
+next: parse and scale, up to a minute of nesting, QC, HPGL, then the
+database round trips. The stages use different resources (CPU in the
+nester, disk and network in the writers), so while one order nests the
+next can already be prepared and the previous one written.
+
+StagedPipeline runs a list of stages concurrently, each with its own
+workers:
+
+    thread   - worker threads (parsing, scaling, QC)
+    process  - a process pool for CPU-bound, picklable work (nesting); one
+               dispatcher thread per worker keeps at most `workers` items
+               in flight
+    async    - an asyncio event loop; coroutine functions are awaited,
+               plain functions run via asyncio.to_thread (file and DB
+               writes)
+
+Stages are connected by bounded queues. A stage that falls behind fills
+its input queue and blocks the stage before it (back-pressure), so a fast
+parser cannot pile up hundreds of prepared orders in front of the nester.
+Results come back in input order whatever order the stages finish in.
+
+Per-stage metrics (items, errors, busy time, time blocked on the next
+stage, queue high-water mark, throughput) show which stage is the
+bottleneck.
+
+Usage:
+    pipeline = StagedPipeline([
+        Stage("prepare", prepare, workers=2),
+        Stage("nest", nest_job, kind="process", workers=2),
+        Stage("write", write, kind="async", workers=4),
+    ])
+    results = pipeline.run(jobs)
+    print(pipeline.get_stats())
+
+SameDaySuitsAPI.batch_process(pipelined=True) (or BATCH_PIPELINE=1) runs
+single orders through process_orders_pipelined, which builds such a
+pipeline from process_order's stages.
+
+Environment:
+    BATCH_PIPELINE                - pipeline batch_process by default (default 0)
+    BATCH_PIPELINE_THREADS        - prepare / QC threads (default 2)
+    BATCH_PIPELINE_NEST_PROCESSES - nesting processes; 0 nests on a thread in
+                                    this process (default 2)
+    BATCH_PIPELINE_IO_WORKERS     - concurrent writes (default 4)
+    BATCH_PIPELINE_QUEUE_SIZE     - items buffered between stages (default 4)
+    BATCH_PIPELINE_START_METHOD   - multiprocessing start method for process
+                                    stages (default "spawn")
+
+Author: Claude
+Date: 2026-02-02
+"""
+
+import os
+import time
+import queue
+import asyncio
+import inspect
+import logging
+import threading
+import multiprocessing
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
+from dataclasses import dataclass, field
+from typing import Any, Callable, Dict, Iterable, List, Optional
+
+logger = logging.getLogger(__name__)
+
+STAGE_KINDS = ("thread", "process", "async")
+DEFAULT_QUEUE_SIZE = 4
+
+_STOP = object()  # End of input, passed down the pipeline
+
+
+def pipeline_enabled() -> bool:
+    """Whether batch_process pipelines orders by default."""
+    return os.getenv("BATCH_PIPELINE", "0").lower() in ("1", "true", "yes")
+
+
+def pipeline_threads() -> int:
+    """Threads for the prepare and QC stages."""
+    return int(os.getenv("BATCH_PIPELINE_THREADS", "2"))
+
+
+def pipeline_nest_processes() -> int:
+    """
+    Processes for the nesting stage (0: nest on a thread in this process).
+
+    Kept small by default: each nest can itself fan out rotations across a
+    multiprocessing pool.
+    """
+    return int(os.getenv("BATCH_PIPELINE_NEST_PROCESSES", "2"))
+
+
+def pipeline_io_workers() -> int:
+    """Concurrent file / database writes in the I/O stage."""
+    return int(os.getenv("BATCH_PIPELINE_IO_WORKERS", "4"))
+
+
+def pipeline_queue_size() -> int:
+    """Items buffered between stages, from the environment."""
+    return int(os.getenv("BATCH_PIPELINE_QUEUE_SIZE", DEFAULT_QUEUE_SIZE))
+
+
+def pipeline_start_method() -> str:
+    """Start method for process stages (spawn avoids forking worker threads)."""
+    return os.getenv("BATCH_PIPELINE_START_METHOD", "spawn")
+
+
+@dataclass
+class Stage:
+    """
+    One pipeline stage.
+
+    fn takes an item and returns the item for the next stage. For process
+    stages fn must be a module-level function and items must be picklable.
+    """
+
+    name: str
+    fn: Callable[[Any], Any]
+    kind: str = "thread"
+    workers: int = 1
+    queue_size: Optional[int] = None  # Input queue bound (default: env)
+
+    def __post_init__(self):
+        if self.kind not in STAGE_KINDS:
+            raise ValueError(f"Unknown stage kind: {self.kind}")
+        self.workers = max(1, int(self.workers))
+
+
+@dataclass
+class StageMetrics:
+    """Counters for one stage."""
+
+    name: str
+    kind: str
+    workers: int
+    items: int = 0
+    errors: int = 0
+    busy_seconds: float = 0.0  # Summed over workers
+    blocked_seconds: float = 0.0  # Waiting for room in the next queue
+    queue_high_water: int = 0
+    first_started: Optional[float] = None
+    last_finished: Optional[float] = None
+
+    def to_dict(self) -> Dict:
+        wall = (
+            self.last_finished - self.first_started
+            if self.first_started is not None and self.last_finished is not None
+            else 0.0
+        )
+        return {
+            "kind": self.kind,
+            "workers": self.workers,
+            "items": self.items,
+            "errors": self.errors,
+            "busy_seconds": round(self.busy_seconds, 3),
+            "blocked_seconds": round(self.blocked_seconds, 3),
+            "queue_high_water": self.queue_high_water,
+            "wall_seconds": round(wall, 3),
+            "items_per_second": round(self.items / wall, 2) if wall > 0 else None,
+            "utilization_percent": (
+                round(self.busy_seconds / (wall * self.workers) * 100, 1)
+                if wall > 0
+                else None
+            ),
+        }
+
+
+@dataclass
+class _Envelope:
+    """An item with its input position and, once a stage failed, the error."""
+
+    index: int
+    item: Any
+    error: Optional[BaseException] = None
+
+
+@dataclass
+class _StageRun:
+    """Runtime state of one stage during StagedPipeline.run()."""
+
+    stage: Stage
+    inbox: "queue.Queue"
+    outbox: "queue.Queue"
+    metrics: StageMetrics
+    active_workers: int = 0
+    lock: threading.Lock = field(default_factory=threading.Lock)
+
+
+class StagedPipeline:
+    """
+    Runs items through stages concurrently, connected by bounded queues.
+
+    An item whose stage raises skips the remaining stages (on_error can
+    instead turn the exception into an item they should see). run()
+    returns one result per input, in input order: the last stage's output,
+    or the exception.
+    """
+
+    def __init__(
+        self,
+        stages: List[Stage],
+        on_error: Optional[Callable[[str, Any, BaseException], Any]] = None,
+    ):
+        """
+        Initialize pipeline.
+
+        Args:
+            stages: Stages in order
+            on_error: Called as on_error(stage_name, item, exc) when a stage
+                raises; its return value continues down the pipeline
+        """
+        if not stages:
+            raise ValueError("A pipeline needs at least one stage")
+        self.stages = stages
+        self.on_error = on_error
+        self._metrics: Dict[str, StageMetrics] = {}
+
+    # ------------------------------------------------------------------
+    # Running
+    # ------------------------------------------------------------------
+
+    def run(self, items: Iterable[Any]) -> List[Any]:
+        """Run every item through all stages; results in input order."""
+        items = list(items)
+        default_size = pipeline_queue_size()
+        queues = [
+            queue.Queue(maxsize=max(1, stage.queue_size or default_size))
+            for stage in self.stages
+        ] + [queue.Queue()]
+
+        runs = [
+            _StageRun(
+                stage=stage,
+                inbox=queues[i],
+                outbox=queues[i + 1],
+                metrics=StageMetrics(stage.name, stage.kind, stage.workers),
+            )
+            for i, stage in enumerate(self.stages)
+        ]
+        self._metrics = {run.stage.name: run.metrics for run in runs}
+
+        pools = []
+        threads = []
+        try:
+            for run in runs:
+                threads.extend(self._start_stage(run, pools))
+
+            feeder = threading.Thread(
+                target=self._feed, args=(items, queues[0]), name="pipeline-feed"
+            )
+            feeder.start()
+            threads.append(feeder)
+
+            results: List[Any] = [None] * len(items)
+            while True:
+                envelope = queues[-1].get()
+                if envelope is _STOP:
+                    break
+                results[envelope.index] = (
+                    envelope.error if envelope.error is not None else envelope.item
+                )
+
+            for thread in threads:
+                thread.join()
+        finally:
+            for pool in pools:
+                pool.shutdown(wait=True)
+
+        return results
+
+    def _feed(self, items: List[Any], inbox: "queue.Queue"):
+        for index, item in enumerate(items):
+            inbox.put(_Envelope(index, item))
+        inbox.put(_STOP)
+
+    def _start_stage(self, run: _StageRun, pools: List) -> List[threading.Thread]:
+        stage = run.stage
+
+        if stage.kind == "async":
+            target, args, count = self._async_stage, (run,), 1
+        elif stage.kind == "process":
+            context = multiprocessing.get_context(pipeline_start_method())
+            pool = ProcessPoolExecutor(max_workers=stage.workers, mp_context=context)
+            pools.append(pool)
+            target, args, count = self._thread_worker, (run, pool), stage.workers
+        else:
+            target, args, count = self._thread_worker, (run, None), stage.workers
+
+        run.active_workers = count
+        threads = [
+            threading.Thread(
+                target=target, args=args, name=f"pipeline-{stage.name}-{n}", daemon=True
+            )
+            for n in range(count)
+        ]
+        for thread in threads:
+            thread.start()
+        return threads
+
+    def _next(self, run: _StageRun):
+        """Next envelope, or None once input is exhausted for this worker."""
+        with run.lock:
+            run.metrics.queue_high_water = max(
+                run.metrics.queue_high_water, run.inbox.qsize()
+            )
+        envelope = run.inbox.get()
+        if envelope is _STOP:
+            run.inbox.put(_STOP)  # Let sibling workers see it too
+            return None
+        return envelope
+
+    def _worker_done(self, run: _StageRun):
+        """The last worker of a stage passes end-of-input downstream."""
+        with run.lock:
+            run.active_workers -= 1
+            last = run.active_workers == 0
+        if last:
+            run.outbox.put(_STOP)
+
+    def _process(
+        self,
+        run: _StageRun,
+        envelope: _Envelope,
+        call: Callable,
+        started: Optional[float] = None,
+    ):
+        """Run one envelope through a stage (skipping failed ones) and record it."""
+        if envelope.error is not None:
+            return envelope
+
+        if started is None:
+            started = time.monotonic()
+        try:
+            envelope.item = call(envelope.item)
+            failed = False
+        except Exception as e:
+            failed = True
+            logger.warning(f"Pipeline stage {run.stage.name} failed: {e}")
+            if self.on_error is not None:
+                envelope.item = self.on_error(run.stage.name, envelope.item, e)
+            else:
+                envelope.error = e
+        finished = time.monotonic()
+
+        metrics = run.metrics
+        with run.lock:
+            metrics.items += 1
+            metrics.errors += failed
+            metrics.busy_seconds += finished - started
+            if metrics.first_started is None or started < metrics.first_started:
+                metrics.first_started = started
+            metrics.last_finished = max(metrics.last_finished or finished, finished)
+        return envelope
+
+    def _forward(self, run: _StageRun, envelope: _Envelope):
+        """Hand an envelope to the next stage, blocking while it is full."""
+        started = time.monotonic()
+        run.outbox.put(envelope)
+        blocked = time.monotonic() - started
+        with run.lock:
+            run.metrics.blocked_seconds += blocked
+
+    def _thread_worker(self, run: _StageRun, pool: Optional[ProcessPoolExecutor]):
+        fn = run.stage.fn
+        call = fn if pool is None else (lambda item: pool.submit(fn, item).result())
+        while True:
+            envelope = self._next(run)
+            if envelope is None:
+                break
+            self._forward(run, self._process(run, envelope, call))
+        self._worker_done(run)
+
+    def _async_stage(self, run: _StageRun):
+        asyncio.run(self._async_main(run))
+
+    async def _async_main(self, run: _StageRun):
+        loop = asyncio.get_running_loop()
+        # Each worker blocks one thread on the queues and one in to_thread
+        loop.set_default_executor(
+            ThreadPoolExecutor(
+                max_workers=2 * run.stage.workers + 1,
+                thread_name_prefix=f"pipeline-{run.stage.name}",
+            )
+        )
+        fn = run.stage.fn
+        is_coroutine = inspect.iscoroutinefunction(fn)
+
+        async def worker():
+            while True:
+                envelope = await loop.run_in_executor(None, self._next, run)
+                if envelope is None:
+                    break
+                if envelope.error is None:
+                    started = time.monotonic()
+                    try:
+                        if is_coroutine:
+                            item = await fn(envelope.item)
+                        else:
+                            item = await asyncio.to_thread(fn, envelope.item)
+                        error = None
+                    except Exception as e:
+                        item, error = envelope.item, e
+
+                    def outcome(_item, item=item, error=error):
+                        if error is not None:
+                            raise error
+                        return item
+
+                    # Recorded through _process so metrics and on_error match
+                    envelope = self._process(run, envelope, outcome, started)
+                await loop.run_in_executor(None, self._forward, run, envelope)
+
+        await asyncio.gather(*(worker() for _ in range(run.stage.workers)))
+        self._worker_done(run)
+
+    # ------------------------------------------------------------------
+    # Metrics
+    # ------------------------------------------------------------------
+
+    def get_stats(self) -> Dict[str, Dict]:
+        """Per-stage metrics of the last run, in stage order."""
+        return {name: metrics.to_dict() for name, metrics in self._metrics.items()}
+
+    def bottleneck(self) -> Optional[str]:
+        """The stage with the most busy time per worker in the last run."""
+        if not self._metrics:
+            return None
+        return max(
+            self._metrics.values(), key=lambda m: m.busy_seconds / m.workers
+        ).name
@@ -22,12 +22,11 @@ Date: 2026-01-30
 
 import json
 from pathlib import Path
-from typing import Dict, List, Tuple, Optional
+from typing import Dict, List, Tuple, Optional, Union
 from dataclasses import dataclass
 import logging
 
 from production_pipeline import (
-    extract_xml_from_pds,
     extract_piece_dimensions,
     extract_svg_geometry,
     transform_to_cm,
@@ -42,6 +41,8 @@ from graded_size_extractor import (
     get_size_scale_factors,
     GradedPattern,
 )
+from pds_loader import PDSTemplate, load_pds_template
+from template_store import CompiledTemplate, compiled_template
 
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
@@ -156,7 +157,7 @@ def apply_per_piece_scaling(
 
 
 def generate_for_size(
-    pds_path: str,
+    pds_path: Union[str, CompiledTemplate, PDSTemplate],
     target_size: str,
     output_dir: Path,
     fabric_width_cm: float = CUTTER_WIDTH_CM,
@@ -165,7 +166,8 @@ def generate_for_size(
     Generate a pattern for a specific graded size.
 
     Args:
-        pds_path: Path to PDS file
+        pds_path: Path to PDS file (compiled through the template store when
+                  enabled), or a CompiledTemplate / PDSTemplate
         target_size: Target size name (XS, S, M, L, XL, 2XL, 3XL, 4XL)
         output_dir: Output directory for PLT files
         fabric_width_cm: Fabric width for nesting
@@ -173,11 +175,20 @@ def generate_for_size(
     Returns:
         SizeGenerationResult with generated pattern info
     """
-    pds_file = Path(pds_path)
-
     try:
+        # Precompiled arrays, else one parse for the size table and geometry
+        compiled = compiled_template(pds_path)
+        if compiled is None:
+            template = load_pds_template(pds_path)
+            pds_file = template.path
+        else:
+            pds_file = Path(compiled.header["source_path"])
+
         # 1. Extract graded info
-        pattern = extract_graded_info(pds_file)
+        if compiled is None:
+            pattern = extract_graded_info(template)
+        else:
+            pattern = compiled.graded_pattern()
         logger.info(f"Pattern: {pattern.filename}")
         logger.info(f"Available sizes: {', '.join(pattern.available_sizes)}")
 
@@ -194,23 +205,25 @@ def generate_for_size(
                 message=f"Size '{target_size}' not available. Available: {pattern.available_sizes}",
             )
 
-        # 2. Extract SVG geometry
-        xml_content = extract_xml_from_pds(pds_path)
-        pieces_info = extract_piece_dimensions(xml_content, pattern.base_size)
+        # 2-3. SVG geometry, transformed to cm at base size dimensions
+        if compiled is not None:
+            pieces_info = compiled.piece_dimensions(pattern.base_size)
+            contours = compiled.svg_contours(as_arrays=True)
+            contours_cm = compiled.contours_cm(pattern.base_size)
+        else:
+            pieces_info = extract_piece_dimensions(template, pattern.base_size)
 
-        total_width = sum(p["size_x"] for p in pieces_info.values())
-        total_height = (
-            max(p["size_y"] for p in pieces_info.values()) if pieces_info else 0
-        )
+            total_width = sum(p["size_x"] for p in pieces_info.values())
+            total_height = (
+                max(p["size_y"] for p in pieces_info.values()) if pieces_info else 0
+            )
 
-        contours, metadata = extract_svg_geometry(
-            xml_content, cutting_contours_only=True
-        )
+            contours, metadata = extract_svg_geometry(
+                template, cutting_contours_only=True
+            )
+            contours_cm = transform_to_cm(contours, metadata, total_width, total_height)
         logger.info(f"Extracted {len(contours)} contours")
 
-        # 3. Transform to cm (at base size dimensions)
-        contours_cm = transform_to_cm(contours, metadata, total_width, total_height)
-
         # 4. Identify rendered size and calculate scale factors
         rendered_size = identify_rendered_size(pattern, contours, pieces_info)
         logger.info(f"SVG rendered at: {rendered_size}")
@@ -308,7 +321,8 @@ def generate_all_sizes(
     Returns:
         Dict mapping size name to result
     """
-    pattern = extract_graded_info(Path(pds_path))
+    template = compiled_template(pds_path) or load_pds_template(pds_path)
+    pattern = extract_graded_info(template)
 
     results = {}
     for size in pattern.available_sizes:
@@ -316,7 +330,7 @@ def generate_all_sizes(
         logger.info(f"Generating: {size}")
         logger.info(f"{'=' * 40}")
 
-        result = generate_for_size(pds_path, size, output_dir, fabric_width_cm)
+        result = generate_for_size(template, size, output_dir, fabric_width_cm)
         results[size] = result
 
         if result.success:
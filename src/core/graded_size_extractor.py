@@ -14,12 +14,13 @@ Author: Claude
 Date: 2026-01-30
 """
 
-import xml.etree.ElementTree as ET
 from pathlib import Path
-from typing import Dict, List, Optional, Tuple
+from typing import Dict, List, Optional, Tuple, Union
 from dataclasses import dataclass
 import logging
 
+from pds_loader import PDSTemplate, load_pds_template
+
 logger = logging.getLogger(__name__)
 
 
@@ -54,20 +55,25 @@ class GradedPattern:
     pieces: Dict[str, PieceInfo]  # piece_name -> PieceInfo
 
 
-def extract_graded_info(pds_path: Path) -> GradedPattern:
+def extract_graded_info(pds_path: Union[Path, str, PDSTemplate]) -> GradedPattern:
     """
     Extract graded size information from a PDS file.
 
     Args:
-        pds_path: Path to PDS file
+        pds_path: Path to PDS file (read from the compiled template store
+                  when enabled), or a template from load_pds_template()
 
     Returns:
         GradedPattern with all size information
     """
-    from production_pipeline import extract_xml_from_pds
+    from template_store import compiled_template
+
+    compiled = compiled_template(pds_path)
+    if compiled is not None:
+        return compiled.graded_pattern()
 
-    xml_content = extract_xml_from_pds(str(pds_path))
-    root = ET.fromstring(xml_content)
+    template = load_pds_template(pds_path)
+    root = template.root
 
     # Get available sizes
     sizes_elem = root.find(".//SIZES")
@@ -141,7 +147,7 @@ def extract_graded_info(pds_path: Path) -> GradedPattern:
         )
 
     return GradedPattern(
-        filename=pds_path.name,
+        filename=template.name,
         available_sizes=available_sizes,
         base_size=base_size,
         pieces=pieces,
@@ -25,19 +25,18 @@ Date: 2026-01-30
 import re
 import json
 from pathlib import Path
-from typing import List, Dict, Tuple, Optional, NamedTuple
+from typing import List, Dict, Tuple, Optional, NamedTuple, Union
 from dataclasses import dataclass, field
 from enum import Enum
-import xml.etree.ElementTree as ET
 
 from production_pipeline import (
-    extract_xml_from_pds,
     parse_svg_path,
     Point,
     Contour,
     CUTTER_WIDTH_CM,
-    HPGL_UNITS_PER_MM,
 )
+from hpgl_writer import HPGL_UNITS_PER_MM
+from pds_loader import PDSTemplate, load_pds_template
 
 
 class LineType(Enum):
@@ -127,18 +126,17 @@ def classify_line(points: List[Point], d_attr: str = "") -> LineType:
     return LineType.INTERNAL
 
 
-def extract_all_layers(pds_path: str) -> ExtractedLayers:
+def extract_all_layers(pds_path: Union[str, PDSTemplate]) -> ExtractedLayers:
     """
     Extract all layers from a PDS file - both cutting contours and internal lines.
 
     Args:
-        pds_path: Path to PDS file
+        pds_path: Path to PDS file, or a template from load_pds_template()
 
     Returns:
         ExtractedLayers with all extracted geometry
     """
-    xml_content = extract_xml_from_pds(pds_path)
-    root = ET.fromstring(xml_content)
+    root = load_pds_template(pds_path).root
 
     cutting_contours: List[Contour] = []
     seam_lines: List[PatternLine] = []
@@ -0,0 +1,220 @@
+#!/usr/bin/env python3
+"""
+Multi-Order Marker Batching
+
+Nesting every order on its own leaves a ragged, half-empty tail at the end
+of each marker. Orders cut from the same fabric roll can share one marker
+instead: their pieces are nested together, cut in one pass, and the fabric
+is billed back to each order by the area of its pieces.
+
+This module holds the batching logic that does not depend on the pipeline:
+
+1. group_orders_for_markers() - split pending orders into batches that share
+   a fabric (code + width) and arrive within a time window
+2. allocate_marker_cost() - per-order share of a shared marker's length and
+   cost, proportional to piece area
+3. marker_batch_id() / piece_label() - stable batch ids and the per-piece
+   labels written into the PLT so the cutting room can sort pieces by order
+
+Orders may be api Order objects or queue order dicts; both are handled.
+
+Usage:
+    batches = group_orders_for_markers(
+        orders, key=lambda o: fabric_key(o, 157.48), window_seconds=900
+    )
+    for batch in batches:
+        results.extend(api.process_marker_batch(batch))
+
+Environment:
+    MARKER_BATCH_WINDOW_SECONDS - max age spread within one batch (default 900)
+    MARKER_BATCH_MAX_ORDERS     - max orders per shared marker (default 8)
+    FABRIC_COST_PER_METER       - fabric price used for cost allocation
+                                  (default unset: lengths only)
+
+Author: Claude
+Date: 2026-02-02
+"""
+
+import os
+import hashlib
+import logging
+from dataclasses import dataclass, asdict
+from datetime import datetime
+from typing import Any, Callable, Dict, Hashable, List, Optional, Sequence, Tuple
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_WINDOW_SECONDS = 900.0
+DEFAULT_MAX_ORDERS = 8
+
+
+def batch_window_seconds() -> float:
+    """Batch time window from the environment."""
+    return float(os.getenv("MARKER_BATCH_WINDOW_SECONDS", DEFAULT_WINDOW_SECONDS))
+
+
+def batch_max_orders() -> int:
+    """Max orders per shared marker from the environment."""
+    return int(os.getenv("MARKER_BATCH_MAX_ORDERS", DEFAULT_MAX_ORDERS))
+
+
+def fabric_cost_per_meter() -> Optional[float]:
+    """Fabric price per meter from the environment, if configured."""
+    value = os.getenv("FABRIC_COST_PER_METER")
+    return float(value) if value else None
+
+
+def _field(order: Any, name: str, default: Any = None) -> Any:
+    if isinstance(order, dict):
+        return order.get(name, default)
+    return getattr(order, name, default)
+
+
+def fabric_key(order: Any, default_width_cm: float) -> Tuple[str, float]:
+    """
+    Orders with the same key can share a marker.
+
+    Returns:
+        (fabric code, fabric width in cm rounded to 0.1 cm)
+    """
+    code = _field(order, "fabric_code") or ""
+    width = _field(order, "fabric_width_cm") or default_width_cm
+    return (str(code), round(float(width), 1))
+
+
+def order_timestamp(order: Any) -> Optional[float]:
+    """Creation (or enqueue) time of an order as a POSIX timestamp."""
+    value = _field(order, "created_at")
+    if not value and isinstance(order, dict):
+        value = (order.get("_meta") or {}).get("enqueued_at")
+    if not value:
+        return None
+    if isinstance(value, datetime):
+        return value.timestamp()
+    try:
+        return datetime.fromisoformat(str(value)).timestamp()
+    except ValueError:
+        return None
+
+
+def group_orders_for_markers(
+    orders: Sequence[Any],
+    key: Callable[[Any], Hashable],
+    window_seconds: Optional[float] = None,
+    max_orders: Optional[int] = None,
+    timestamp: Callable[[Any], Optional[float]] = order_timestamp,
+) -> List[List[Any]]:
+    """
+    Split orders into shared-marker batches.
+
+    Orders join the open batch for their key while they arrived within
+    window_seconds of its first order and the batch is not full; otherwise
+    a new batch is started. Input order is kept inside each batch, and
+    batches are returned in the order they were opened. Orders without a
+    timestamp are never split off by the window.
+    """
+    window = batch_window_seconds() if window_seconds is None else window_seconds
+    limit = max(1, batch_max_orders() if max_orders is None else max_orders)
+
+    batches: List[List[Any]] = []
+    open_batches: Dict[Hashable, Tuple[int, Optional[float]]] = {}
+
+    for order in orders:
+        k = key(order)
+        ts = timestamp(order)
+        current = open_batches.get(k)
+
+        if current is not None:
+            index, start = current
+            in_window = ts is None or start is None or abs(ts - start) <= window
+            if in_window and len(batches[index]) < limit:
+                batches[index].append(order)
+                continue
+
+        open_batches[k] = (len(batches), ts)
+        batches.append([order])
+
+    return batches
+
+
+def marker_batch_id(order_ids: Sequence[str]) -> str:
+    """Stable id for a shared marker (same orders -> same id)."""
+    digest = hashlib.sha1("|".join(sorted(order_ids)).encode()).hexdigest()
+    return f"MRK-{datetime.now().strftime('%Y%m%d')}-{digest[:8].upper()}"
+
+
+def piece_label(order_id: str, piece_number: int, piece_count: int) -> str:
+    """Label plotted next to a piece on a shared marker."""
+    return f"{order_id} {piece_number}/{piece_count}"
+
+
+def polygon_area(points: Sequence[Any]) -> float:
+    """Shoelace area of a contour (objects with .x/.y)."""
+    n = len(points)
+    if n < 3:
+        return 0.0
+    area = 0.0
+    for i in range(n):
+        a, b = points[i], points[(i + 1) % n]
+        area += a.x * b.y - b.x * a.y
+    return abs(area) / 2
+
+
+@dataclass
+class MarkerAllocation:
+    """One order's share of a shared marker."""
+
+    order_id: str
+    piece_count: int
+    piece_area_cm2: float
+    share_percent: float
+    allocated_length_cm: float
+    allocated_cost: Optional[float] = None
+
+    def to_dict(self) -> Dict[str, Any]:
+        return asdict(self)
+
+
+def allocate_marker_cost(
+    piece_areas: Dict[str, List[float]],
+    fabric_length_cm: float,
+    cost_per_meter: Optional[float] = None,
+) -> List[MarkerAllocation]:
+    """
+    Split a shared marker's length (and cost) by each order's piece area.
+
+    Waste between pieces is shared in the same proportion, so allocated
+    lengths always sum to the marker length.
+
+    Args:
+        piece_areas: order_id -> areas of that order's pieces (cm^2)
+        fabric_length_cm: Length of the shared marker
+        cost_per_meter: Fabric price (no cost is allocated if None)
+    """
+    totals = {order_id: sum(areas) for order_id, areas in piece_areas.items()}
+    grand_total = sum(totals.values())
+
+    allocations = []
+    for order_id, areas in piece_areas.items():
+        share = (
+            totals[order_id] / grand_total
+            if grand_total > 0
+            else 1.0 / len(piece_areas)
+        )
+        length = fabric_length_cm * share
+        allocations.append(
+            MarkerAllocation(
+                order_id=order_id,
+                piece_count=len(areas),
+                piece_area_cm2=round(totals[order_id], 2),
+                share_percent=round(share * 100, 2),
+                allocated_length_cm=round(length, 2),
+                allocated_cost=(
+                    round(length / 100 * cost_per_meter, 2)
+                    if cost_per_meter is not None
+                    else None
+                ),
+            )
+        )
+
+    return allocations
@@ -1,6 +1,7 @@
 # Order File Manager and Output Generation
 # Version 6.4.3 Implementation
 
+import io
 import os
 import json
 import re
@@ -10,6 +11,10 @@ from typing import Dict, List, Optional, Tuple
 from dataclasses import dataclass
 import logging
 
+import numpy as np
+
+from hpgl_writer import HPGLEncoder, HPGLWriter, hpgl_relative_enabled
+
 logger = logging.getLogger(__name__)
 
 
@@ -92,10 +97,13 @@ class OrderFileManager:
         """Get path to order folder"""
         return self.base_dir / order_id
 
+    def plt_path(self, order_id: str) -> Path:
+        """Path of an order's PLT file"""
+        return self.get_order_folder(order_id) / f"{order_id}.plt"
+
     def save_plt(self, order_id: str, plt_content: str) -> Path:
         """Save PLT file with proper naming"""
-        folder = self.get_order_folder(order_id)
-        file_path = folder / f"{order_id}.plt"
+        file_path = self.plt_path(order_id)
 
         with open(file_path, "w") as f:
             f.write(plt_content)
@@ -280,9 +288,12 @@ class EnhancedOutputGenerator:
 
         outputs = {}
 
-        # 1. Generate PLT with labels
-        plt_content = self._generate_labeled_plt(order_id, pieces)
-        outputs["plt"] = self.file_manager.save_plt(order_id, plt_content)
+        # 1. Generate PLT with labels (streamed, recording each piece's bytes)
+        plt_path = self.file_manager.plt_path(order_id)
+        with HPGLWriter(plt_path) as writer:
+            plt_offsets = self._write_labeled_plt(order_id, pieces, writer)
+        logger.info(f"Saved PLT: {plt_path}")
+        outputs["plt"] = plt_path
 
         # 2. Generate PDS with labels
         pds_content = self._generate_labeled_pds(order_id, pieces)
@@ -307,6 +318,15 @@ class EnhancedOutputGenerator:
             "utilization": nesting_result.get("utilization", 0),
             "fabric_length": nesting_result.get("fabric_length", 0),
             "algorithm": nesting_result.get("algorithm", "unknown"),
+            "plt_pieces": [
+                {
+                    "piece_name": piece.name,
+                    "piece_number": piece.piece_number,
+                    "plt_start_byte": start,
+                    "plt_end_byte": end,
+                }
+                for piece, (start, end) in zip(pieces, plt_offsets)
+            ],
         }
         outputs["nesting_report"] = self.file_manager.save_nesting_report(
             order_id, nesting_report
@@ -317,72 +337,76 @@ class EnhancedOutputGenerator:
 
     def _generate_labeled_plt(self, order_id: str, pieces: List[PieceInfo]) -> str:
         """Generate HPGL/PLT file with piece labels"""
-        lines = ["IN;"]  # Initialize
+        buffer = io.BytesIO()
+        with HPGLWriter(buffer) as writer:
+            self._write_labeled_plt(order_id, pieces, writer)
+        return buffer.getvalue().decode("utf-8")
+
+    def _write_labeled_plt(
+        self, order_id: str, pieces: List[PieceInfo], writer: HPGLWriter
+    ) -> List[Tuple[int, int]]:
+        """
+        Write HPGL/PLT commands with piece labels (coordinates in mm).
+
+        Returns:
+            (start, end) byte offsets of each piece's commands
+        """
+        # 1mm = 40 HPGL units
+        encoder = HPGLEncoder(mm_per_unit=1, relative=hpgl_relative_enabled())
+        command = encoder.command
+        offsets = []
+
+        writer.write(command("IN;"))  # Initialize
 
         total_pieces = len(pieces)
 
         for idx, piece in enumerate(pieces, 1):
             piece.piece_number = idx
             piece.total_pieces = total_pieces
+            writer.begin_piece()
 
             # Select pen
-            lines.append("SP1;")
+            writer.write(command("SP1;"))
 
-            # Draw piece outline
             if piece.contour:
-                first_point = piece.contour[0]
-                lines.append(
-                    f"PU{int(first_point[0] * 40)},{int(first_point[1] * 40)};"
-                )
-
-                for point in piece.contour[1:]:
-                    lines.append(f"PD{int(point[0] * 40)},{int(point[1] * 40)};")
+                # Draw closed piece outline
+                contour = np.asarray(piece.contour, dtype=np.float64)
+                writer.write(encoder.contour(contour, close=True))
 
-                # Close contour
-                lines.append(
-                    f"PD{int(first_point[0] * 40)},{int(first_point[1] * 40)};"
-                )
-
-            # Calculate label position (center of piece)
-            if piece.contour:
-                min_x = min(p[0] for p in piece.contour)
-                max_x = max(p[0] for p in piece.contour)
-                min_y = min(p[1] for p in piece.contour)
-                max_y = max(p[1] for p in piece.contour)
-
-                center_x = (min_x + max_x) / 2
-                center_y = (min_y + max_y) / 2
-
-                # Convert to HPGL units (1mm = 40 units)
-                label_x = int(center_x * 40)
-                label_y = int(center_y * 40)
+                # Calculate label position (center of piece)
+                center = (contour.min(axis=0) + contour.max(axis=0)) / 2
+                label_x, label_y = encoder.to_units(center).tolist()
 
                 # Add order number label (8mm from center)
-                lines.append(f"PU{label_x},{label_y + 320};")  # 8mm up
-                lines.append(f"LB{order_id}^;")
+                writer.write(command(f"PU{label_x},{label_y + 320};"))  # 8mm up
+                writer.write(command(f"LB{order_id}^;"))
 
                 # Add piece name (6mm from center)
-                lines.append(f"PU{label_x},{label_y + 160};")  # 4mm up
-                lines.append(f"LB{piece.name}^;")
+                writer.write(command(f"PU{label_x},{label_y + 160};"))  # 4mm up
+                writer.write(command(f"LB{piece.name}^;"))
 
                 # Add piece counter (center, 8mm bold)
-                lines.append(f"PU{label_x},{label_y};")
-                lines.append(f"LB{idx:03d}/{total_pieces:03d}^;")
+                writer.write(command(f"PU{label_x},{label_y};"))
+                writer.write(command(f"LB{idx:03d}/{total_pieces:03d}^;"))
 
                 # Add grain line arrow if available
                 if piece.grainline:
                     arrow_x = label_x + 240  # 6mm right
                     arrow_y = label_y - 160  # 4mm down
-                    lines.append(f"PU{arrow_x},{arrow_y};")
-                    lines.append(f"PD{arrow_x + 160},{arrow_y + 80};")  # Arrow
-                    lines.append(f"PD{arrow_x},{arrow_y + 160};")
+                    arrow = [
+                        f"PU{arrow_x},{arrow_y};",
+                        f"PD{arrow_x + 160},{arrow_y + 80};",  # Arrow
+                        f"PD{arrow_x},{arrow_y + 160};",
+                    ]
+                    writer.write("".join(command(c) for c in arrow))
 
-            lines.append("PU;")
+            writer.write(command("PU;"))
+            offsets.append(writer.end_piece())
 
-        lines.append("SP0;")  # Deselect pen
-        lines.append("IN;")  # Finalize
+        writer.write(command("SP0;"))  # Deselect pen
+        writer.write(command("IN;"))  # Finalize
 
-        return "\n".join(lines)
+        return offsets
 
     def _generate_labeled_pds(self, order_id: str, pieces: List[PieceInfo]) -> bytes:
         """Generate PDS file with piece labels (simplified format)"""
@@ -12,15 +12,33 @@ The PDS templates contain graded sizes (XS-4XL). We can:
 - Scale from base size to exact measurements
 - Interpolate between sizes for best fit
 
+Geometry is scaled with NumPy. PackedContours concatenates a template's
+contours into one N x 2 array, and scale_batch scales it for many orders in
+one pass (orders x points x 2), each order by:
+- (scale_x, scale_y): every piece about its own centroid
+- an n x 2 array: per-piece factors
+- RegionScale: region grading - width factors for the chest / waist / hip
+  zones (waist / hip / thigh for bottoms), interpolated along each piece's
+  length, plus one length factor
+
+transform_packed applies general per-piece affine matrices the same way.
+
+Environment:
+    PATTERN_REGION_GRADING - "1" grades orders by region instead of one
+                             width factor (default "0")
+
 Author: Claude
 Date: 2026-01-30
 """
 
+import os
 import math
-from typing import Dict, List, Tuple, Optional
+from typing import Any, Dict, List, Sequence, Tuple, Optional
 from dataclasses import dataclass
 from enum import Enum
 
+import numpy as np
+
 
 class GarmentType(Enum):
     """Garment types with different measurement priorities."""
@@ -70,6 +88,45 @@ SIZE_CHARTS = {
 }
 
 
+# Scale factors are clamped to this range
+MIN_SCALE = 0.8
+MAX_SCALE = 1.3
+
+# Region grading zones: (measurement, position along the piece), where 0 is
+# the top of the piece and 1 the bottom
+REGION_ZONES = {
+    GarmentType.TOP: (("chest", 0.3), ("waist", 0.65), ("hip", 1.0)),
+    GarmentType.BOTTOM: (("waist", 0.0), ("hip", 0.2), ("thigh", 0.4)),
+}
+
+
+def region_grading_enabled() -> bool:
+    """Whether orders are graded by region (PATTERN_REGION_GRADING)."""
+    return os.getenv("PATTERN_REGION_GRADING", "0").lower() in ("1", "true", "yes")
+
+
+@dataclass
+class RegionScale:
+    """
+    Width factors for zones along a piece's length, plus one length factor.
+
+    Between zones the width factor is interpolated linearly; above the first
+    and below the last zone it is held.
+    """
+
+    zones: Tuple[str, ...]
+    positions: Tuple[float, ...]  # 0 = top of the piece, 1 = bottom
+    scale_x: Tuple[float, ...]
+    scale_y: float
+
+    def factors_at(self, positions: np.ndarray) -> np.ndarray:
+        """Width factors at positions along a piece (0-1)."""
+        return np.interp(positions, self.positions, self.scale_x)
+
+    def is_identity(self, tolerance: float = 0.01) -> bool:
+        return all(abs(f - 1.0) <= tolerance for f in (*self.scale_x, self.scale_y))
+
+
 @dataclass
 class ScaleResult:
     """Result of size selection and scaling calculation."""
@@ -80,6 +137,7 @@ class ScaleResult:
     size_match_quality: float  # 0-1, how well the size matches
     interpolated: bool  # True if interpolated between sizes
     notes: List[str]
+    regions: Optional[RegionScale] = None  # Set for region grading
 
 
 def find_best_size(
@@ -166,10 +224,43 @@ def calculate_scale_factors(
     return scale_x, scale_y
 
 
+def calculate_region_scale(
+    customer_measurements: Dict[str, float],
+    base_size_measurements: Dict[str, float],
+    garment_type: GarmentType,
+    scale_x: float,
+    scale_y: float,
+) -> RegionScale:
+    """
+    Width factor per grading zone (customer / base size measurement).
+
+    Zones the customer or size chart has no measurement for take scale_x,
+    the garment's overall width factor.
+    """
+    zones = REGION_ZONES.get(garment_type, ())
+    if not zones:
+        return RegionScale(("all",), (0.0,), (scale_x,), scale_y)
+
+    factors = []
+    for measurement, _ in zones:
+        customer = customer_measurements.get(measurement)
+        base = base_size_measurements.get(measurement)
+        factor = customer / base if customer and base else scale_x
+        factors.append(max(MIN_SCALE, min(MAX_SCALE, factor)))
+
+    return RegionScale(
+        zones=tuple(name for name, _ in zones),
+        positions=tuple(position for _, position in zones),
+        scale_x=tuple(factors),
+        scale_y=scale_y,
+    )
+
+
 def calculate_pattern_scale(
     customer_measurements: Dict[str, float],
     garment_type: GarmentType,
     base_size: Optional[str] = None,
+    regions: bool = False,
 ) -> ScaleResult:
     """
     Calculate how to scale a pattern for a customer.
@@ -183,6 +274,7 @@ def calculate_pattern_scale(
             - inseam: Inside leg length (optional)
         garment_type: Type of garment (TOP, BOTTOM)
         base_size: Force a specific base size (optional)
+        regions: Also grade by region (ScaleResult.regions)
 
     Returns:
         ScaleResult with base size and scale factors
@@ -222,14 +314,27 @@ def calculate_pattern_scale(
 
     # Clamp to reasonable range (0.8x to 1.3x)
     original_scale_x, original_scale_y = scale_x, scale_y
-    scale_x = max(0.8, min(1.3, scale_x))
-    scale_y = max(0.8, min(1.3, scale_y))
+    scale_x = max(MIN_SCALE, min(MAX_SCALE, scale_x))
+    scale_y = max(MIN_SCALE, min(MAX_SCALE, scale_y))
 
     if scale_x != original_scale_x:
         notes.append(f"Scale X clamped from {original_scale_x:.2f} to {scale_x:.2f}")
     if scale_y != original_scale_y:
         notes.append(f"Scale Y clamped from {original_scale_y:.2f} to {scale_y:.2f}")
 
+    region_scale = None
+    if regions:
+        region_scale = calculate_region_scale(
+            customer_measurements, base_measurements, garment_type, scale_x, scale_y
+        )
+        notes.append(
+            "Region grading: "
+            + ", ".join(
+                f"{zone} {factor:.3f}"
+                for zone, factor in zip(region_scale.zones, region_scale.scale_x)
+            )
+        )
+
     return ScaleResult(
         base_size=selected_size,
         scale_x=scale_x,
@@ -237,6 +342,7 @@ def calculate_pattern_scale(
         size_match_quality=match_quality,
         interpolated=False,
         notes=notes,
+        regions=region_scale,
     )
 
 
@@ -258,24 +364,226 @@ def scale_points(
     Returns:
         Scaled points
     """
-    if not points:
+    if not len(points):
         return []
 
-    # Calculate centroid if center not provided
+    coords = np.asarray(points, dtype=np.float64).reshape(-1, 2)
     if center is None:
-        cx = sum(p[0] for p in points) / len(points)
-        cy = sum(p[1] for p in points) / len(points)
-    else:
-        cx, cy = center
+        center = coords.mean(axis=0)
 
-    # Scale around center
-    scaled = []
-    for x, y in points:
-        new_x = cx + (x - cx) * scale_x
-        new_y = cy + (y - cy) * scale_y
-        scaled.append((new_x, new_y))
+    scaled = (coords - center) * (scale_x, scale_y) + center
+    return [tuple(p) for p in scaled.tolist()]
 
-    return scaled
+
+@dataclass
+class PackedContours:
+    """
+    Contours concatenated into one array, so every transform is one NumPy
+    operation over all pieces instead of a loop per piece and point.
+    """
+
+    coords: np.ndarray  # All points, N x 2
+    offsets: np.ndarray  # Contour i is coords[offsets[i]:offsets[i + 1]]
+    closed: List[bool]
+    fill_colors: List[str]
+    stroke_colors: List[str]
+
+    @classmethod
+    def from_contours(cls, contours: Sequence[Any]) -> "PackedContours":
+        """Pack Contour / ContourArray objects."""
+        from contour_array import as_contour_array
+
+        arrays = [as_contour_array(contour) for contour in contours]
+        counts = [len(array) for array in arrays]
+        return cls(
+            coords=(
+                np.concatenate([array.coords for array in arrays])
+                if arrays
+                else np.empty((0, 2))
+            ),
+            offsets=np.concatenate([[0], np.cumsum(counts)]).astype(np.int64),
+            closed=[array.closed for array in arrays],
+            fill_colors=[array.fill_color for array in arrays],
+            stroke_colors=[array.stroke_color for array in arrays],
+        )
+
+    @classmethod
+    def from_template(cls, compiled) -> "PackedContours":
+        """A compiled template's cm contours (template_store), without copying."""
+        return cls(
+            coords=compiled.cm_coords,
+            offsets=compiled.offsets,
+            closed=compiled.closed.tolist(),
+            fill_colors=compiled.fill.tolist(),
+            stroke_colors=compiled.stroke.tolist(),
+        )
+
+    def __len__(self) -> int:
+        return len(self.offsets) - 1
+
+    @property
+    def counts(self) -> np.ndarray:
+        return np.diff(self.offsets)
+
+    @property
+    def contour_index(self) -> np.ndarray:
+        """Contour number of every point."""
+        return np.repeat(np.arange(len(self)), self.counts)
+
+    def _reduce(self, ufunc: np.ufunc, values: np.ndarray) -> np.ndarray:
+        """ufunc over each contour's rows of values (NaN for empty contours)."""
+        counts = self.counts
+        result = np.full((len(self),) + values.shape[1:], np.nan)
+        nonempty = counts > 0
+        if nonempty.any():
+            result[nonempty] = ufunc.reduceat(values, self.offsets[:-1][nonempty])
+        return result
+
+    def centers(self) -> np.ndarray:
+        """Mean vertex of each contour, n x 2 (what scale_contours scales about)."""
+        counts = np.maximum(self.counts, 1)[:, None]
+        return self._reduce(np.add, self.coords) / counts
+
+    def length_positions(self) -> np.ndarray:
+        """Each point's position down its contour: 0 at the top, 1 at the bottom."""
+        y = self.coords[:, 1]
+        top = self._reduce(np.minimum, y)
+        height = self._reduce(np.maximum, y) - top
+        index = self.contour_index
+        height = np.where(height > 0, height, 1.0)[index]
+        return (y - top[index]) / height
+
+    def unpack(self, coords: Optional[np.ndarray] = None, as_arrays: bool = True):
+        """
+        Contours from packed coordinates (default: these).
+
+        Args:
+            coords: N x 2 coordinates in this packing
+            as_arrays: ContourArray objects; False builds Contour / Point
+        """
+        from contour_array import ContourArray
+
+        coords = self.coords if coords is None else coords
+        contours = []
+        for i in range(len(self)):
+            contour = ContourArray(
+                coords[self.offsets[i] : self.offsets[i + 1]],
+                closed=bool(self.closed[i]),
+                fill_color=str(self.fill_colors[i]),
+                stroke_color=str(self.stroke_colors[i]),
+            )
+            if not as_arrays:
+                from production_pipeline import Contour, Point
+
+                contour = contour.to_contour(Contour, Point)
+            contours.append(contour)
+        return contours
+
+
+def scale_matrices(scale_x: Any, scale_y: Any, centers: np.ndarray) -> np.ndarray:
+    """
+    Affine matrices (n x 2 x 3) scaling each piece about its center.
+
+    scale_x / scale_y are scalars or per-piece arrays.
+    """
+    n = len(centers)
+    factors = np.stack(
+        [np.broadcast_to(scale_x, (n,)), np.broadcast_to(scale_y, (n,))], axis=1
+    )
+    matrices = np.zeros((n, 2, 3))
+    matrices[:, 0, 0] = factors[:, 0]
+    matrices[:, 1, 1] = factors[:, 1]
+    matrices[:, :, 2] = centers * (1 - factors)
+    return matrices
+
+
+def transform_packed(packed: PackedContours, matrices: np.ndarray) -> np.ndarray:
+    """
+    Apply one affine matrix per piece to every point.
+
+    Args:
+        packed: Contours to transform
+        matrices: n x 2 x 3, or orders x n x 2 x 3 for a batch
+
+    Returns:
+        N x 2 coordinates, or orders x N x 2
+    """
+    per_point = matrices[..., packed.contour_index, :, :]
+    return (
+        np.einsum("...nij,nj->...ni", per_point[..., :2], packed.coords)
+        + per_point[..., 2]
+    )
+
+
+def _point_factors(packed: PackedContours, scale: Any, positions) -> np.ndarray:
+    """Per-point (scale_x, scale_y) for one order's scale, N x 2."""
+    factors = np.ones((len(packed.coords), 2))
+    if scale is None:
+        return factors
+    if isinstance(scale, ScaleResult):
+        scale = scale.regions or (scale.scale_x, scale.scale_y)
+    if isinstance(scale, RegionScale):
+        factors[:, 0] = scale.factors_at(positions())
+        factors[:, 1] = scale.scale_y
+        return factors
+    scale = np.asarray(scale, dtype=np.float64)
+    if scale.ndim == 2:  # Per-piece factors
+        return factors * scale[packed.contour_index]
+    return factors * scale
+
+
+def scale_packed(packed: PackedContours, scales: Sequence[Any]) -> np.ndarray:
+    """
+    Scale one set of contours for many orders at once.
+
+    Each piece is scaled about its own centroid, like scale_contours.
+
+    Args:
+        packed: The template's contours
+        scales: One per order - a ScaleResult (graded by region when it has
+            regions), RegionScale, (scale_x, scale_y), an n x 2 array of
+            per-piece factors, or None for unscaled
+
+    Returns:
+        orders x N x 2 coordinates
+    """
+    centers = packed.centers()[packed.contour_index]
+    positions_cache = []
+
+    def positions():
+        if not positions_cache:
+            positions_cache.append(packed.length_positions())
+        return positions_cache[0]
+
+    factors = np.stack([_point_factors(packed, s, positions) for s in scales])
+    return (packed.coords - centers) * factors + centers
+
+
+def scale_batch(
+    contours: Any, scales: Sequence[Any], as_arrays: bool = True
+) -> List[List]:
+    """
+    Scale one template's contours for a batch of orders in one pass.
+
+    Args:
+        contours: PackedContours, or a list of Contour / ContourArray
+        scales: One per order (see scale_packed)
+        as_arrays: Return ContourArray objects (False: Contour / Point)
+
+    Returns:
+        One list of scaled contours per order
+    """
+    packed = (
+        contours
+        if isinstance(contours, PackedContours)
+        else PackedContours.from_contours(contours)
+    )
+    if not len(scales):
+        return []
+    return [
+        packed.unpack(coords, as_arrays=as_arrays)
+        for coords in scale_packed(packed, scales)
+    ]
 
 
 def scale_contours(
@@ -284,33 +592,28 @@ def scale_contours(
     scale_y: float,
 ):
     """
-    Scale a list of Contour objects.
+    Scale a list of Contour objects, each about its own centroid.
 
-    This modifies contours in place and returns them.
+    Returns new contours of the same kind: ContourArray contours stay
+    ContourArray, Contour objects come back as Contour.
     """
     from production_pipeline import Contour, Point
+    from contour_array import ContourArray
 
-    scaled_contours = []
-
-    for contour in contours:
-        # Extract points as tuples
-        points = [(p.x, p.y) for p in contour.points]
+    if not contours:
+        return []
 
-        # Scale
-        scaled_points = scale_points(points, scale_x, scale_y)
+    packed = PackedContours.from_contours(contours)
+    scaled = packed.unpack(scale_packed(packed, [(scale_x, scale_y)])[0])
 
-        # Create new contour with scaled points
-        new_points = [Point(x=x, y=y) for x, y in scaled_points]
-        scaled_contours.append(
-            Contour(
-                points=new_points,
-                closed=contour.closed,
-                fill_color=contour.fill_color,
-                stroke_color=contour.stroke_color,
-            )
+    return [
+        (
+            original.with_coords(contour.coords)
+            if isinstance(original, ContourArray)
+            else contour.to_contour(Contour, Point)
         )
-
-    return scaled_contours
+        for original, contour in zip(contours, scaled)
+    ]
 
 
 # Mapping from API garment types to scaler garment types
@@ -0,0 +1,322 @@
+#!/usr/bin/env python3
+"""
+Zero-Copy PDS Loader
+
+A PDS file is an Optitex binary container with one embedded XML document
+(<?xml ... </STYLE> or </MARKER>). The pipeline used to read the whole file,
+slice and decode the XML to a str, then build a full ElementTree - and did
+so three or four times per order (process_order, extract_graded_info,
+generate_for_size, extract_all_layers each reopened the file).
+
+load_pds_template() does it once:
+
+1. Memory-maps the file and records the XML byte range (no read() of the
+   binary part, no decode of the XML)
+2. Feeds memoryview slices of that range to an incremental pull parser
+   (XMLPullParser, the non-blocking form of iterparse) and prunes each
+   element as it closes, keeping only what the pipeline reads:
+
+       SIZES, SIZES_TABLE, NAME, UNITS       size table and pattern name
+       PIECE/NAME, UNIQUE_ID, MATERIAL, ...  piece identity
+       PIECE/SIZE/NAME, PIECE/SIZE/GEOM_INFO per-size dimensions
+       .../VIEW (whole subtree)              the embedded SVG
+
+3. Returns a PDSTemplate, memoized per (path, mtime, size), that
+   extract_piece_dimensions, extract_svg_geometry, extract_graded_info,
+   generate_for_size and extract_all_layers all accept in place of a path
+   or XML string.
+
+Usage:
+    template = load_pds_template("Basic Tee_2D.PDS")
+    pieces = extract_piece_dimensions(template, "Small")
+    contours, metadata = extract_svg_geometry(template)
+    graded = extract_graded_info(template)
+
+Environment:
+    PDS_TEMPLATE_CACHE_SIZE - parsed templates kept in memory (default 16,
+                              0 disables)
+
+Author: Claude
+Date: 2026-02-02
+"""
+
+import os
+import mmap
+import logging
+import threading
+from collections import OrderedDict
+from dataclasses import dataclass
+from pathlib import Path
+from typing import List, Optional, Tuple, Union
+import xml.etree.ElementTree as ET
+
+logger = logging.getLogger(__name__)
+
+XML_START = b"<?xml"
+XML_END_TAGS = (b"</STYLE>", b"</MARKER>")
+PARSE_CHUNK_BYTES = 1 << 16
+
+# Subtrees kept whole (path from the document root)
+KEEP_SUBTREES = {
+    ("NAME",),
+    ("UNITS",),
+    ("SIZES",),
+    ("SIZES_TABLE",),
+    ("PIECE", "NAME"),
+    ("PIECE", "CODE"),
+    ("PIECE", "UNIQUE"),
+    ("PIECE", "UNIQUE_ID"),
+    ("PIECE", "MATERIAL"),
+    ("PIECE", "QUANTITY"),
+    ("PIECE", "SIZE", "NAME"),
+    ("PIECE", "SIZE", "GEOM_INFO"),
+}
+# Kept, but only for the children above
+KEEP_CONTAINERS = {("PIECE",), ("PIECE", "SIZE")}
+VIEW_TAG = "VIEW"
+KEEP = None  # Marks elements inside a kept subtree
+
+
+def template_cache_size() -> int:
+    """Parsed templates kept in memory, from the environment."""
+    return int(os.getenv("PDS_TEMPLATE_CACHE_SIZE", "16"))
+
+
+def find_xml_range(data) -> Tuple[int, int]:
+    """
+    Byte range [start, end) of the embedded XML in a PDS buffer.
+
+    Raises:
+        ValueError: No XML, or no STYLE/MARKER closing tag
+    """
+    xml_start = data.find(XML_START)
+    if xml_start == -1:
+        raise ValueError("No XML found in PDS file")
+
+    for end_tag in XML_END_TAGS:
+        xml_end = data.find(end_tag, xml_start)
+        if xml_end != -1:
+            return xml_start, xml_end + len(end_tag)
+
+    raise ValueError("No valid XML closing tag found")
+
+
+def read_xml_bytes(pds_path) -> bytes:
+    """The embedded XML of a PDS file, read through a memory map."""
+    with open(pds_path, "rb") as f:
+        if os.fstat(f.fileno()).st_size == 0:
+            raise ValueError("No XML found in PDS file")
+        with mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mm:
+            start, end = find_xml_range(mm)
+            return mm[start:end]
+
+
+def _tag(element: ET.Element) -> str:
+    tag = element.tag if isinstance(element.tag, str) else str(element.tag)
+    return tag.split("}")[-1]
+
+
+def _parse_pruned(buffer) -> ET.Element:
+    """
+    Incrementally parse an XML buffer, dropping every element the pipeline
+    does not read as soon as it closes.
+    """
+    parser = ET.XMLPullParser(events=("start", "end"))
+    root = None
+    # Per open element: its path from the root, or KEEP inside a kept subtree
+    stack: List[Tuple[ET.Element, Optional[tuple]]] = []
+    holds_view = set()  # ids of elements with a VIEW below them
+
+    def drain():
+        nonlocal root
+        for event, element in parser.read_events():
+            if event == "start":
+                if root is None:
+                    root = element
+                    stack.append((element, ()))
+                    continue
+                key = stack[-1][1]
+                if key is not KEEP:
+                    tag = _tag(element)
+                    key = key + (tag,)
+                    if tag == VIEW_TAG:
+                        holds_view.update(id(open_) for open_, _ in stack)
+                        key = KEEP
+                    elif key in KEEP_SUBTREES:
+                        key = KEEP
+                stack.append((element, key))
+                continue
+
+            _, key = stack.pop()
+            if key is KEEP or element is root:
+                continue
+            if key in KEEP_CONTAINERS or id(element) in holds_view:
+                continue
+            parent = stack[-1][0]
+            # The closing element is always its parent's last child so far
+            if len(parent) and parent[-1] is element:
+                del parent[-1]
+            else:
+                parent.remove(element)
+
+    view = memoryview(buffer)
+    try:
+        for offset in range(0, len(view), PARSE_CHUNK_BYTES):
+            parser.feed(view[offset : offset + PARSE_CHUNK_BYTES])
+            drain()
+        parser.close()
+        drain()
+    finally:
+        view.release()
+
+    if root is None:
+        raise ValueError("Empty XML in PDS file")
+    return root
+
+
+@dataclass
+class PDSTemplate:
+    """
+    A PDS file parsed once, shared by every extractor.
+
+    root is the pruned XML tree (size table, pieces with their per-size
+    GEOM_INFO, and the SVG VIEW); xml_start/xml_end locate the full XML in
+    the file for callers that still need the original text.
+    """
+
+    path: Path
+    xml_start: int
+    xml_end: int
+    mtime_ns: int
+    size_bytes: int
+    root: ET.Element
+
+    @property
+    def name(self) -> str:
+        return self.path.name
+
+    @property
+    def xml_bytes(self) -> int:
+        return self.xml_end - self.xml_start
+
+    @property
+    def pieces(self) -> List[ET.Element]:
+        return self.root.findall("PIECE")
+
+    @property
+    def view(self) -> Optional[ET.Element]:
+        return next(self.root.iter(VIEW_TAG), None)
+
+    def xml_content(self) -> str:
+        """The full embedded XML (re-read from the file, not kept)."""
+        with open(self.path, "rb") as f:
+            with mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mm:
+                return mm[self.xml_start : self.xml_end].decode(
+                    "utf-8", errors="replace"
+                )
+
+    def is_current(self) -> bool:
+        """False once the file has changed on disk."""
+        try:
+            stat = self.path.stat()
+        except OSError:
+            return False
+        return (stat.st_mtime_ns, stat.st_size) == (self.mtime_ns, self.size_bytes)
+
+
+def parse_pds(pds_path) -> PDSTemplate:
+    """Parse a PDS file into a PDSTemplate (no caching)."""
+    path = Path(pds_path)
+    with open(path, "rb") as f:
+        stat = os.fstat(f.fileno())
+        if stat.st_size == 0:
+            raise ValueError("No XML found in PDS file")
+        with mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mm:
+            start, end = find_xml_range(mm)
+            with memoryview(mm) as view:
+                xml = view[start:end]
+                try:
+                    root = _parse_pruned(xml)
+                except ET.ParseError:
+                    # Not valid UTF-8: decode leniently, as extract_xml_from_pds does
+                    logger.debug(
+                        f"{path.name}: strict parse failed, decoding leniently"
+                    )
+                    text = bytes(xml).decode("utf-8", errors="replace")
+                    root = _parse_pruned(text.encode("utf-8"))
+                finally:
+                    xml.release()
+
+    return PDSTemplate(
+        path=path,
+        xml_start=start,
+        xml_end=end,
+        mtime_ns=stat.st_mtime_ns,
+        size_bytes=stat.st_size,
+        root=root,
+    )
+
+
+class _TemplateMemo:
+    """Parsed templates by resolved path, dropped when the file changes."""
+
+    def __init__(self):
+        self._templates: "OrderedDict[str, PDSTemplate]" = OrderedDict()
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+
+    def get(self, pds_path) -> PDSTemplate:
+        limit = template_cache_size()
+        if limit <= 0:
+            return parse_pds(pds_path)
+
+        key = str(Path(pds_path).resolve())
+        with self._lock:
+            template = self._templates.get(key)
+            if template is not None and template.is_current():
+                self._templates.move_to_end(key)
+                self.hits += 1
+                return template
+
+        template = parse_pds(pds_path)
+        with self._lock:
+            self.misses += 1
+            self._templates[key] = template
+            self._templates.move_to_end(key)
+            while len(self._templates) > limit:
+                self._templates.popitem(last=False)
+        return template
+
+    def clear(self):
+        with self._lock:
+            self._templates.clear()
+            self.hits = self.misses = 0
+
+
+_memo = _TemplateMemo()
+
+
+def load_pds_template(source: Union[str, Path, PDSTemplate]) -> PDSTemplate:
+    """
+    The parsed template for a PDS file, parsed once per file version.
+
+    Passing a PDSTemplate returns it unchanged, so functions can accept
+    either a path or an already loaded template.
+    """
+    if isinstance(source, PDSTemplate):
+        return source
+    return _memo.get(source)
+
+
+def clear_template_cache():
+    _memo.clear()
+
+
+def xml_root(source: Union[str, bytes, PDSTemplate, ET.Element]) -> ET.Element:
+    """Root element of an XML string, a PDSTemplate or an existing tree."""
+    if isinstance(source, PDSTemplate):
+        return source.root
+    if isinstance(source, ET.Element):
+        return source
+    return ET.fromstring(source)
@@ -17,12 +17,17 @@ Updated: 2026-01-30 - Added nesting engine integration
 
 import os
 import re
+import sys
 import json
 import math
 from pathlib import Path
-from typing import List, Dict, Tuple, Optional
+from typing import List, Dict, Tuple, Optional, Union
 from dataclasses import dataclass, field
-import xml.etree.ElementTree as ET
+
+# Nesting modules live in src/nesting; service entry points only add src/core
+NESTING_DIR = str(Path(__file__).resolve().parent.parent / "nesting")
+if NESTING_DIR not in sys.path:
+    sys.path.insert(0, NESTING_DIR)
 
 # Import nesting engines (basic and improved)
 from nesting_engine import (
@@ -31,6 +36,10 @@ from nesting_engine import (
     NestingResult,
     visualize_nesting,
 )
+from contour_array import ContourArray, parse_svg_points
+from pds_loader import PDSTemplate, load_pds_template, read_xml_bytes, xml_root
+from nesting_profiler import attach_profile, phase, profile_nesting
+from hpgl_writer import HPGLOutput, write_hpgl
 
 # Import improved nesting for better utilization
 try:
@@ -42,17 +51,57 @@ except ImportError:
 
 # Import master nesting for best-of-all algorithms
 try:
-    from master_nesting import master_nest
+    from master_nesting import master_nest, nest_until
 
     MASTER_NESTING_AVAILABLE = True
 except ImportError:
     MASTER_NESTING_AVAILABLE = False
 
+# Whole-result cache: replay layouts for repeated / near-identical piece sets
+try:
+    from nesting_cache import get_nesting_cache, nesting_cache_enabled
+
+    NESTING_CACHE_AVAILABLE = True
+except ImportError:
+    NESTING_CACHE_AVAILABLE = False
+
+# Simplified hulls for collision work; placements go back on the full contours
+try:
+    from contour_simplify import simplify_pieces
+    from contour_simplify import simplify_tolerance as default_simplify_tolerance
+
+    SIMPLIFY_AVAILABLE = True
+except ImportError:
+    SIMPLIFY_AVAILABLE = False
+
+# Mirrored / repeated pieces nested as fused pairs
+try:
+    from piece_clusters import cluster_pieces, clustering_enabled
+
+    CLUSTERS_AVAILABLE = True
+except ImportError:
+    CLUSTERS_AVAILABLE = False
+
+# Small pieces moved into the holes of a finished layout
+try:
+    from hole_filling import fill_holes, hole_filling_enabled
+
+    HOLE_FILLING_AVAILABLE = True
+except ImportError:
+    HOLE_FILLING_AVAILABLE = False
+
+# Per-piece allowed rotations (grain constraints), shared by every engine
+try:
+    from rotation_table import build_rotation_table
+
+    ROTATION_TABLE_AVAILABLE = True
+except ImportError:
+    ROTATION_TABLE_AVAILABLE = False
+
 
 # Constants
 CUTTER_WIDTH_INCHES = 62
 CUTTER_WIDTH_CM = CUTTER_WIDTH_INCHES * 2.54  # 157.48 cm
-HPGL_UNITS_PER_MM = 40  # Standard HPGL
 NESTING_GAP_CM = 0.5  # Gap between pieces
 
 
@@ -90,24 +139,12 @@ class Pattern:
 
 
 def extract_xml_from_pds(pds_path: str) -> str:
-    """Extract embedded XML from PDS binary file."""
-    with open(pds_path, "rb") as f:
-        data = f.read()
-
-    xml_start = data.find(b"<?xml")
-    if xml_start == -1:
-        raise ValueError("No XML found in PDS file")
-
-    # Find the closing tag (STYLE or MARKER)
-    for end_tag in [b"</STYLE>", b"</MARKER>"]:
-        xml_end = data.find(end_tag, xml_start)
-        if xml_end != -1:
-            xml_content = data[xml_start : xml_end + len(end_tag)].decode(
-                "utf-8", errors="replace"
-            )
-            return xml_content
+    """Extract embedded XML from PDS binary file (read through a memory map).
 
-    raise ValueError("No valid XML closing tag found")
+    Callers that parse the XML should use pds_loader.load_pds_template
+    instead, which parses once and is accepted by the extract_* functions.
+    """
+    return read_xml_bytes(pds_path).decode("utf-8", errors="replace")
 
 
 def parse_svg_polygon(points_str: str) -> List[Point]:
@@ -174,10 +211,13 @@ def parse_svg_path(d: str) -> List[Point]:
 
 
 def extract_piece_dimensions(
-    xml_content: str, base_size: str = "Small"
+    xml_content: Union[str, PDSTemplate], base_size: str = "Small"
 ) -> Dict[str, Dict]:
-    """Extract piece dimensions from GEOM_INFO for the base size."""
-    root = ET.fromstring(xml_content)
+    """Extract piece dimensions from GEOM_INFO for the base size.
+
+    xml_content may be the XML string or a parsed pds_loader.PDSTemplate.
+    """
+    root = xml_root(xml_content)
 
     pieces = {}
     for piece in root.findall(".//PIECE"):
@@ -212,19 +252,24 @@ def calculate_total_layout_size(pieces: Dict[str, Dict]) -> Tuple[float, float]:
 
 
 def extract_svg_geometry(
-    xml_content: str, cutting_contours_only: bool = True
+    xml_content: Union[str, PDSTemplate],
+    cutting_contours_only: bool = True,
+    as_arrays: bool = False,
 ) -> Tuple[List[Contour], Dict]:
     """Extract geometry from embedded SVG in XML.
 
     Args:
-        xml_content: The XML string extracted from PDS file
+        xml_content: The XML string extracted from PDS file, or a parsed
+                     pds_loader.PDSTemplate
         cutting_contours_only: If True, only extract piece outline polygons (colored fills)
                               and skip background, internal lines, and detail groups.
+        as_arrays: Return polygons as ContourArray (no per-point objects);
+                   transform_to_cm, scale_contours and nest_contours keep them as arrays
     """
     contours = []
     metadata = {}
 
-    root = ET.fromstring(xml_content)
+    root = xml_root(xml_content)
 
     # Colors to skip (background/marker area)
     BACKGROUND_COLORS = {"#C0C0C0", "#c0c0c0", "gray", "grey", "#808080"}
@@ -275,7 +320,18 @@ def extract_svg_geometry(
                                 continue
 
                             points_str = elem.get("points", "")
-                            if points_str:
+                            if points_str and as_arrays:
+                                coords = parse_svg_points(points_str)
+                                if len(coords):
+                                    contours.append(
+                                        ContourArray(
+                                            coords,
+                                            closed=True,
+                                            fill_color=fill_color,
+                                            stroke_color=elem.get("stroke", ""),
+                                        )
+                                    )
+                            elif points_str:
                                 points = parse_svg_polygon(points_str)
                                 if points:
                                     contours.append(
@@ -305,6 +361,26 @@ def extract_svg_geometry(
     return contours, metadata
 
 
+def cm_scale(
+    metadata: Dict,
+    real_width_cm: Optional[float] = None,
+    real_height_cm: Optional[float] = None,
+) -> Tuple[float, float]:
+    """SVG unit -> cm scale factors (x, y) used by transform_to_cm."""
+    viewbox = metadata.get("viewbox", {})
+    vb_width = viewbox.get("width", 1000)
+    vb_height = viewbox.get("height", 1000)
+
+    # Calculate scale factor
+    if real_width_cm and real_height_cm:
+        # Use actual dimensions if provided
+        return real_width_cm / vb_width, real_height_cm / vb_height
+
+    # Fall back to view factor
+    scale = metadata.get("scale_cm_per_unit", 0.01)
+    return scale, scale
+
+
 def transform_to_cm(
     contours: List[Contour],
     metadata: Dict,
@@ -317,22 +393,14 @@ def transform_to_cm(
     real_height_cm are provided (from GEOM_INFO), we use those to calculate
     the correct scale. Otherwise, we use the view factor.
     """
-    viewbox = metadata.get("viewbox", {})
-    vb_width = viewbox.get("width", 1000)
-    vb_height = viewbox.get("height", 1000)
-
-    # Calculate scale factor
-    if real_width_cm and real_height_cm:
-        # Use actual dimensions if provided
-        scale_x = real_width_cm / vb_width
-        scale_y = real_height_cm / vb_height
-    else:
-        # Fall back to view factor
-        scale = metadata.get("scale_cm_per_unit", 0.01)
-        scale_x = scale_y = scale
+    scale_x, scale_y = cm_scale(metadata, real_width_cm, real_height_cm)
 
     transformed = []
     for contour in contours:
+        if isinstance(contour, ContourArray):
+            transformed.append(contour.scaled(scale_x, scale_y))
+            continue
+
         new_points = []
         for p in contour.points:
             new_points.append(Point(x=p.x * scale_x, y=p.y * scale_y))
@@ -353,6 +421,17 @@ def nest_contours(
     fabric_width: float = CUTTER_WIDTH_CM,
     gap: float = NESTING_GAP_CM,
     use_improved: bool = True,
+    target_utilization: Optional[float] = None,
+    timeout_seconds: Optional[float] = None,
+    cancel_token=None,
+    on_improvement=None,
+    use_cache: Optional[bool] = None,
+    simplify_tolerance: Optional[float] = None,
+    grain: Optional[str] = None,
+    material: Optional[str] = None,
+    cluster_pairs: Optional[bool] = None,
+    hole_filling: Optional[bool] = None,
+    profile: Optional[str] = None,
 ) -> Tuple[List[Contour], NestingResult]:
     """
     Nest contours to fit within fabric width using bin-packing algorithm.
@@ -364,34 +443,209 @@ def nest_contours(
         fabric_width: Maximum fabric width (default 62" = 157.48 cm)
         gap: Gap between pieces (default 0.5 cm)
         use_improved: Use improved nesting algorithms (guillotine/skyline) for better utilization
+        target_utilization: Accept the first layout reaching this utilization
+        timeout_seconds: Return the best layout found by this deadline
+                   (anytime runs default to the 60 s master_nest budget)
+        cancel_token: nesting_engine.CancellationToken to stop nesting early
+        on_improvement: Called with each improved NestingResult
+        use_cache: Reuse cached layouts (nesting_cache); defaults to
+                   NESTING_CACHE_ENABLED (off). Only the improved engines are
+                   cached.
+        simplify_tolerance: Nest simplified outward hulls (contour_simplify) at
+                   this tolerance in cm, then place the full contours; defaults
+                   to NESTING_SIMPLIFY_TOLERANCE (off unless set), 0 disables.
+                   Improved engines only.
+        grain: Grain mode limiting piece rotations ("any", "two_way",
+                   "one_way", "free"); defaults to NESTING_GRAIN_MODE
+        material: Material name / fabric code; implies a grain mode when
+                   grain is not given (rotation_table.MATERIAL_GRAIN)
+        cluster_pairs: Nest complementary piece pairs as fused composites
+                   (piece_clusters); defaults to NESTING_CLUSTER_PAIRS (off).
+                   Improved engines only.
+        hole_filling: Move small pieces into the holes of the finished
+                   layout (hole_filling); defaults to NESTING_FILL_HOLES (off).
+                   Improved engines only.
+        profile: Profiling mode ("off", "timers", "cprofile", "pyinstrument");
+                   defaults to NESTING_PROFILE. The report is stored in
+                   result.metadata["profile"] (nesting_profiler).
+
+    Any of target_utilization, timeout_seconds, cancel_token or on_improvement
+    switches to anytime nesting (master_nesting.nest_until).
     """
     if not contours:
         return [], NestingResult([], fabric_width, 0, 0, True, "No contours")
 
-    # Convert to nesting engine format
+    with profile_nesting(profile) as profiler:
+        nested, result = _nest_contours(
+            contours,
+            fabric_width,
+            gap,
+            use_improved,
+            target_utilization,
+            timeout_seconds,
+            cancel_token,
+            on_improvement,
+            use_cache,
+            simplify_tolerance,
+            grain,
+            material,
+            cluster_pairs,
+            hole_filling,
+        )
+    attach_profile(result, profiler)
+    return nested, result
+
+
+def _nest_contours(
+    contours: List[Contour],
+    fabric_width: float,
+    gap: float,
+    use_improved: bool,
+    target_utilization: Optional[float],
+    timeout_seconds: Optional[float],
+    cancel_token,
+    on_improvement,
+    use_cache: Optional[bool],
+    simplify_tolerance: Optional[float],
+    grain: Optional[str],
+    material: Optional[str],
+    cluster_pairs: Optional[bool],
+    hole_filling: Optional[bool],
+) -> Tuple[List[Contour], NestingResult]:
+    """nest_contours body, run inside the profiler."""
+
+    # Convert to nesting engine format (ContourArray pieces stay arrays)
     contour_groups = []
     for c in contours:
+        if isinstance(c, ContourArray):
+            contour_groups.append(c)
+            continue
         points = [NestPoint(p.x, p.y) for p in c.points]
         contour_groups.append(points)
 
+    # Collision work runs on simplified hulls (never smaller than the pieces)
+    simplified = None
+    if use_improved and SIMPLIFY_AVAILABLE:
+        if simplify_tolerance is None:
+            simplify_tolerance = default_simplify_tolerance()
+        if simplify_tolerance > 0:
+            with phase("pipeline.simplify"):
+                simplified = simplify_pieces(contour_groups, simplify_tolerance)
+            contour_groups = simplified.hulls
+
+    # Pairs only form at rotations both pieces' grain allows
+    clusters = None
+    if cluster_pairs is None:
+        cluster_pairs = CLUSTERS_AVAILABLE and clustering_enabled()
+    if use_improved and cluster_pairs and CLUSTERS_AVAILABLE:
+        with phase("pipeline.cluster"):
+            pair_table = None
+            if ROTATION_TABLE_AVAILABLE:
+                pair_table = build_rotation_table(
+                    contour_groups, grain=grain, material=material, polygons=False
+                )
+            clusters = cluster_pieces(
+                contour_groups, fabric_width, gap, rotation_table=pair_table
+            )
+        contour_groups = clusters.composites
+
+    # Rotations are computed once for the pieces actually nested
+    rotation_table = None
+    if ROTATION_TABLE_AVAILABLE:
+        with phase("pipeline.rotation_table"):
+            rotation_table = build_rotation_table(
+                contour_groups, grain=grain, material=material
+            )
+
+    anytime = (
+        target_utilization is not None
+        or timeout_seconds is not None
+        or cancel_token is not None
+        or on_improvement is not None
+    )
+
     # Run nesting - use master nesting (best of all) if available, then improved, then basic
-    if use_improved and MASTER_NESTING_AVAILABLE:
-        result = master_nest(contour_groups, fabric_width, gap)
-    elif use_improved and IMPROVED_NESTING_AVAILABLE:
-        result = best_nest(contour_groups, fabric_width, gap)
+    def run_nesting(seed: Optional[NestingResult] = None) -> NestingResult:
+        # seed: warm-start layout from nesting_cache for the optimizer to beat
+        if use_improved and MASTER_NESTING_AVAILABLE and anytime:
+            return nest_until(
+                contour_groups,
+                fabric_width,
+                gap,
+                timeout_seconds=timeout_seconds,
+                target_utilization=target_utilization,
+                cancel_token=cancel_token,
+                on_improvement=on_improvement,
+                rotation_table=rotation_table,
+                seed=seed,
+            )
+        if use_improved and MASTER_NESTING_AVAILABLE:
+            return master_nest(
+                contour_groups,
+                fabric_width,
+                gap,
+                rotation_table=rotation_table,
+                seed=seed,
+            )
+        if use_improved and IMPROVED_NESTING_AVAILABLE:
+            return best_nest(
+                contour_groups, fabric_width, gap, rotation_table=rotation_table
+            )
+        return nest_bottom_left_fill(
+            contour_groups, fabric_width, gap, rotation_table=rotation_table
+        )
+
+    if use_cache is None:
+        use_cache = NESTING_CACHE_AVAILABLE and nesting_cache_enabled()
+    if use_cache and use_improved and NESTING_CACHE_AVAILABLE:
+        with phase("pipeline.nest"):
+            result = get_nesting_cache().nest(
+                contour_groups,
+                fabric_width,
+                gap,
+                run_nesting,
+                complete=not anytime,
+                rotation_table=rotation_table,
+            )
+        if (
+            on_improvement is not None
+            and result.metadata.get("nesting_cache", {}).get("status") == "hit"
+        ):
+            on_improvement(result)
     else:
-        result = nest_bottom_left_fill(contour_groups, fabric_width, gap)
+        with phase("pipeline.nest"):
+            result = run_nesting()
 
     if not result.success:
         print(f"  WARNING: Nesting failed - {result.message}")
         return contours, result
 
+    # Holes are filled while the layout still holds what the engine nested
+    if hole_filling is None:
+        hole_filling = HOLE_FILLING_AVAILABLE and hole_filling_enabled()
+    if use_improved and hole_filling and HOLE_FILLING_AVAILABLE:
+        with phase("pipeline.fill_holes"):
+            result = fill_holes(result, gap, rotation_table=rotation_table)
+
+    with phase("pipeline.restore"):
+        if clusters is not None:
+            result = clusters.expand(result)
+        if simplified is not None:
+            result = simplified.restore(result)
+
     # Create nested contours with new positions
     nested_contours = []
     for nested_piece in result.pieces:
         # Find original contour
         original = contours[nested_piece.piece_id]
 
+        if isinstance(original, ContourArray):
+            placed = ContourArray.from_points(nested_piece.transformed_points)
+            nested_contours.append(
+                original.with_coords(placed.coords + nested_piece.position)
+            )
+            continue
+
         # Transform points to nested position
         new_points = []
         for p in nested_piece.transformed_points:
@@ -419,20 +673,31 @@ def generate_hpgl(
     output_path: str,
     fabric_width_cm: float = CUTTER_WIDTH_CM,
     units: str = "cm",
-):
-    """Generate HPGL/PLT file for plotter/cutter."""
+    labels: Optional[List[str]] = None,
+    bounds: Optional[Tuple[float, float, float, float]] = None,
+    relative: Optional[bool] = None,
+) -> Optional[HPGLOutput]:
+    """
+    Generate HPGL/PLT file for plotter/cutter.
 
-    # Calculate bounds
-    all_x = [p.x for c in contours for p in c.points]
-    all_y = [p.y for c in contours for p in c.points]
+    If labels is given (one per contour), each label is plotted at the
+    centre of its contour's bounding box with an LB command. Pass the
+    nesting result's bounds (hpgl_writer.nesting_bounds) to skip scanning
+    the points; relative encodes pen-down runs as PR deltas (default:
+    HPGL_RELATIVE).
 
-    if not all_x or not all_y:
+    Returns:
+        HPGLOutput with each contour's byte offsets, or None if there is
+        no geometry
+    """
+    output = write_hpgl(
+        contours, output_path, labels=labels, bounds=bounds, relative=relative
+    )
+    if output is None:
         print("Warning: No geometry to export")
-        return
-
-    min_x, max_x = min(all_x), max(all_x)
-    min_y, max_y = min(all_y), max(all_y)
+        return None
 
+    min_x, min_y, max_x, max_y = output.bounds
     width = max_x - min_x
     height = max_y - min_y
 
@@ -442,43 +707,8 @@ def generate_hpgl(
     if width > fabric_width_cm:
         print(f"  WARNING: Pattern width ({width:.2f} cm) exceeds fabric width!")
 
-    # Convert to HPGL units (40 units per mm)
-    def to_hpgl(cm_val):
-        return int(cm_val * 10 * HPGL_UNITS_PER_MM)
-
-    with open(output_path, "w") as f:
-        # HPGL initialization
-        f.write("IN;\n")  # Initialize
-        f.write("SP1;\n")  # Select pen 1
-        f.write("PU;\n")  # Pen up
-
-        # Draw each contour
-        for i, contour in enumerate(contours):
-            if not contour.points:
-                continue
-
-            # Move to first point
-            first = contour.points[0]
-            f.write(f"PU{to_hpgl(first.x - min_x)},{to_hpgl(first.y - min_y)};\n")
-
-            # Draw lines to remaining points
-            f.write("PD")
-            coords = []
-            for p in contour.points[1:]:
-                coords.append(f"{to_hpgl(p.x - min_x)},{to_hpgl(p.y - min_y)}")
-            f.write(",".join(coords) + ";\n")
-
-            # Close if needed
-            if contour.closed and contour.points[-1] != contour.points[0]:
-                f.write(f"PD{to_hpgl(first.x - min_x)},{to_hpgl(first.y - min_y)};\n")
-
-            f.write("PU;\n")  # Pen up after each contour
-
-        # HPGL end
-        f.write("SP0;\n")  # Deselect pen
-        f.write("IN;\n")  # Reset
-
     print(f"  HPGL output: {output_path}")
+    return output
 
 
 def process_pds_file(
@@ -495,12 +725,12 @@ def process_pds_file(
 
     # Extract XML
     print("\n1. Extracting embedded XML...")
-    xml_content = extract_xml_from_pds(str(pds_path))
-    print(f"   XML size: {len(xml_content)} bytes")
+    template = load_pds_template(pds_path)
+    print(f"   XML size: {template.xml_bytes} bytes")
 
     # Extract piece dimensions from GEOM_INFO
     print("\n2. Extracting piece dimensions...")
-    pieces = extract_piece_dimensions(xml_content, "Small")
+    pieces = extract_piece_dimensions(template, "Small")
     if pieces:
         print(f"   Found {len(pieces)} pieces")
         for name, dims in pieces.items():
@@ -513,7 +743,7 @@ def process_pds_file(
 
     # Extract SVG geometry
     print("\n3. Extracting SVG geometry...")
-    contours, metadata = extract_svg_geometry(xml_content)
+    contours, metadata = extract_svg_geometry(template)
     print(f"   Found {len(contours)} contours")
     print(f"   View factor: {metadata.get('view_factor', 'N/A')}")
 
@@ -116,6 +116,7 @@ class CutterJob:
     status: JobStatus = JobStatus.PENDING
     fabric_length_cm: float = 0.0
     fabric_width_cm: float = 157.0  # 62 inches default
+    roll_id: Optional[str] = None  # Roll or remnant the marker is cut from
     piece_count: int = 0
     pieces: List[Dict] = field(default_factory=list)  # Individual piece info
     created_at: str = field(default_factory=lambda: datetime.now().isoformat())
@@ -165,6 +166,11 @@ class PieceInfo:
         return asdict(self)
 
 
+# Wrapped around a piece's PLT bytes for single-piece reprints
+PIECE_PLT_HEADER = b"IN;SP1;"  # Initialize, select pen 1
+PIECE_PLT_FOOTER = b"SP0;IN;"  # Deselect pen, reinitialize
+
+
 # ============================================================================
 # WRITE-AHEAD LOG (WAL)
 # ============================================================================
@@ -309,7 +315,8 @@ class JobArchive:
                     checksum_sha256 TEXT,
                     is_reprint INTEGER DEFAULT 0,
                     original_job_id TEXT,
-                    archived_at TEXT DEFAULT CURRENT_TIMESTAMP
+                    archived_at TEXT DEFAULT CURRENT_TIMESTAMP,
+                    roll_id TEXT
                 );
                 
                 CREATE INDEX IF NOT EXISTS idx_jobs_order_id ON jobs(order_id);
@@ -347,6 +354,12 @@ class JobArchive:
                 );
             """)
 
+            # Archives created before roll tracking lack the roll_id column
+            columns = {row["name"] for row in conn.execute("PRAGMA table_info(jobs)")}
+            if "roll_id" not in columns:
+                conn.execute("ALTER TABLE jobs ADD COLUMN roll_id TEXT")
+            conn.execute("CREATE INDEX IF NOT EXISTS idx_jobs_roll_id ON jobs(roll_id)")
+
     @contextmanager
     def _get_db(self):
         """Get database connection with auto-commit."""
@@ -401,8 +414,8 @@ class JobArchive:
                         fabric_length_cm, fabric_width_cm, piece_count, pieces_json,
                         created_at, queued_at, started_at, completed_at,
                         error_message, retry_count, checksum_sha256,
-                        is_reprint, original_job_id
-                    ) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
+                        is_reprint, original_job_id, roll_id
+                    ) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
                 """,
                     (
                         job.job_id,
@@ -426,6 +439,7 @@ class JobArchive:
                         job.checksum_sha256,
                         1 if job.is_reprint else 0,
                         job.original_job_id,
+                        job.roll_id,
                     ),
                 )
 
@@ -530,6 +544,7 @@ class JobArchive:
         start_date: Optional[str] = None,
         end_date: Optional[str] = None,
         limit: int = 100,
+        roll_id: Optional[str] = None,
     ) -> List[CutterJob]:
         """Search archived jobs."""
         query = "SELECT * FROM jobs WHERE 1=1"
@@ -551,6 +566,10 @@ class JobArchive:
             query += " AND created_at <= ?"
             params.append(end_date)
 
+        if roll_id:
+            query += " AND roll_id = ?"
+            params.append(roll_id)
+
         query += f" ORDER BY created_at DESC LIMIT {limit}"
 
         with self._get_db() as conn:
@@ -716,11 +735,14 @@ class ResilientCutterQueue:
         measurements: Optional[Dict] = None,
         pieces: Optional[List[Dict]] = None,
         fabric_length_cm: float = 0.0,
+        fabric_width_cm: Optional[float] = None,
+        roll_id: Optional[str] = None,
     ) -> CutterJob:
         """
         Add a new job to the queue.
 
-        Thread-safe and crash-safe.
+        Thread-safe and crash-safe. fabric_width_cm / roll_id record the
+        roll the marker was nested for (see roll_inventory).
         """
         with self._lock:
             # Generate job ID
@@ -745,7 +767,10 @@ class ResilientCutterQueue:
                 pieces=pieces or [],
                 checksum_sha256=checksum,
                 fabric_length_cm=fabric_length_cm,
+                roll_id=roll_id,
             )
+            if fabric_width_cm:
+                job.fabric_width_cm = fabric_width_cm
 
             # WAL: Log intent BEFORE applying
             self.wal.append(WALAction.JOB_CREATED, job_id, job.to_dict())
@@ -911,6 +936,7 @@ class ResilientCutterQueue:
                 priority=priority,
                 fabric_length_cm=original.fabric_length_cm,
                 fabric_width_cm=original.fabric_width_cm,
+                roll_id=original.roll_id,
                 piece_count=original.piece_count,
                 pieces=original.pieces,
                 checksum_sha256=original.checksum_sha256,
@@ -985,13 +1011,21 @@ class ResilientCutterQueue:
             # Create new job for single piece
             new_job_id = f"PIECE-REPRINT-{piece_id}-{int(time.time() * 1000)}"
 
+            # The piece now lives in its own PLT, between header and footer
+            piece_record = piece.to_dict()
+            if piece.plt_start_byte is not None and piece.plt_end_byte is not None:
+                piece_record["plt_start_byte"] = len(PIECE_PLT_HEADER)
+                piece_record["plt_end_byte"] = len(PIECE_PLT_HEADER) + (
+                    piece.plt_end_byte - piece.plt_start_byte
+                )
+
             reprint_job = CutterJob(
                 job_id=new_job_id,
                 order_id=original_job.order_id,
                 plt_file=str(piece_plt_path),
                 priority=priority,
                 piece_count=1,
-                pieces=[piece.to_dict()],
+                pieces=[piece_record],
                 checksum_sha256=self._calculate_checksum(piece_plt_path),
                 is_reprint=True,
                 original_job_id=original_job.job_id,
@@ -1038,7 +1072,9 @@ class ResilientCutterQueue:
         Extract a single piece from a PLT file.
 
         HPGL/PLT files are command-based, so we extract the commands
-        for the specific piece based on byte offsets.
+        for the specific piece based on byte offsets. The PLT writers
+        (hpgl_writer) record each piece's offsets while writing, and start
+        every piece with an absolute move, so its bytes stand on their own.
         """
         try:
             plt_path = Path(job.plt_file)
@@ -1050,10 +1086,7 @@ class ResilientCutterQueue:
                     piece_data = f.read(piece.plt_end_byte - piece.plt_start_byte)
 
                 # Add HPGL header and footer
-                header = b"IN;SP1;"  # Initialize, select pen 1
-                footer = b"SP0;IN;"  # Pen up, reinitialize
-
-                piece_plt = header + piece_data + footer
+                piece_plt = PIECE_PLT_HEADER + piece_data + PIECE_PLT_FOOTER
             else:
                 # Fallback: just use the whole file (for reprints before piece tracking)
                 with open(plt_path, "rb") as f:
@@ -0,0 +1,374 @@
+#!/usr/bin/env python3
+"""
+Roll Inventory and Roll-Aware Nesting
+
+The pipeline used to nest every order for one width (CUTTER_WIDTH_CM or
+Order.fabric_width_cm), but the cutting room stocks several roll widths per
+fabric plus leftover remnants. A narrower roll often wastes less than the
+full 62" width, and a remnant that still fits the marker is fabric that
+would otherwise be thrown away.
+
+This module holds the roll logic that does not depend on the pipeline:
+
+1. Roll / RollInventory - stocked rolls and remnants per fabric, with the
+   length still on each, loaded from and saved to a JSON file
+2. nest_on_rolls() - nest an order once per distinct usable width (in
+   parallel), drop rolls too short for the marker, and pick one roll:
+
+       lowest_waste    least fabric lost: the marker's area not covered by
+                       pieces, plus the tail left on the roll when it is
+                       shorter than ROLL_MIN_REMNANT_CM and gets scrapped
+       remnants_first  any remnant the marker fits on (least waste first),
+                       falling back to lowest_waste on full rolls
+
+The nest function is passed in, so the caller decides how each width is
+nested (the API passes production_pipeline.nest_contours).
+
+Inventory file (ROLL_INVENTORY_PATH):
+    {"rolls": [
+        {"roll_id": "R-0001", "fabric_code": "NAVY-WOOL", "width_cm": 150.0,
+         "length_cm": 5000.0},
+        {"roll_id": "REM-0007", "fabric_code": "NAVY-WOOL", "width_cm": 140.0,
+         "length_cm": 120.0, "remnant": true}
+    ]}
+
+Usage:
+    inventory = RollInventory.load("rolls.json")
+    choice = nest_on_rolls(
+        contours, inventory.candidates("NAVY-WOOL"), nest_contours
+    )
+    inventory.consume(choice.roll.roll_id, choice.length_cm)
+    inventory.save()
+
+Environment:
+    ROLL_INVENTORY_PATH   - inventory JSON (default unset: no roll nesting)
+    ROLL_SELECTION        - lowest_waste | remnants_first (default lowest_waste)
+    ROLL_NESTING_WORKERS  - widths nested at once (default: CPU count)
+    ROLL_MIN_REMNANT_CM   - shorter leftovers are scrapped (default 30)
+
+Author: Claude
+Date: 2026-02-02
+"""
+
+import os
+import json
+import logging
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass, asdict, field
+from pathlib import Path
+from typing import Any, Callable, Dict, List, Optional, Sequence, Tuple
+
+logger = logging.getLogger(__name__)
+
+SELECTION_POLICIES = ("lowest_waste", "remnants_first")
+DEFAULT_MIN_REMNANT_CM = 30.0
+
+
+def inventory_path() -> Optional[Path]:
+    """Inventory file from the environment, if configured."""
+    value = os.getenv("ROLL_INVENTORY_PATH")
+    return Path(value) if value else None
+
+
+def selection_policy() -> str:
+    """Roll selection policy from the environment."""
+    return os.getenv("ROLL_SELECTION", "lowest_waste").strip().lower()
+
+
+def nesting_workers() -> int:
+    """Widths nested at once from the environment."""
+    return int(os.getenv("ROLL_NESTING_WORKERS", os.cpu_count() or 1))
+
+
+def min_remnant_cm() -> float:
+    """Leftovers shorter than this are scrapped, from the environment."""
+    return float(os.getenv("ROLL_MIN_REMNANT_CM", DEFAULT_MIN_REMNANT_CM))
+
+
+@dataclass
+class Roll:
+    """A stocked roll (or remnant) of one fabric."""
+
+    roll_id: str
+    fabric_code: str
+    width_cm: float
+    length_cm: float  # Length still on the roll
+    remnant: bool = False
+    location: str = ""
+
+    def to_dict(self) -> Dict:
+        return asdict(self)
+
+    @classmethod
+    def from_dict(cls, data: Dict) -> "Roll":
+        known = {name: data[name] for name in cls.__dataclass_fields__ if name in data}
+        return cls(**known)
+
+
+class RollInventory:
+    """
+    Rolls and remnants in stock, per fabric code.
+
+    Thread-safe; consume() takes a marker's length off a roll and save()
+    writes the inventory back to its file.
+    """
+
+    def __init__(self, rolls: Sequence[Roll] = (), path: Optional[Path] = None):
+        self.path = Path(path) if path else None
+        self._rolls: Dict[str, Roll] = {roll.roll_id: roll for roll in rolls}
+        self._lock = threading.Lock()
+
+    @classmethod
+    def load(cls, path) -> "RollInventory":
+        """Read an inventory file (an empty inventory if it does not exist)."""
+        path = Path(path)
+        if not path.exists():
+            logger.warning(f"Roll inventory {path} not found, starting empty")
+            return cls(path=path)
+        with open(path) as f:
+            data = json.load(f)
+        rolls = [Roll.from_dict(entry) for entry in data.get("rolls", [])]
+        logger.info(f"Loaded {len(rolls)} rolls from {path}")
+        return cls(rolls, path=path)
+
+    @classmethod
+    def from_env(cls) -> Optional["RollInventory"]:
+        """The ROLL_INVENTORY_PATH inventory, or None if unset."""
+        path = inventory_path()
+        return cls.load(path) if path else None
+
+    def save(self, path=None):
+        """Write the inventory back (to path, else the file it came from)."""
+        path = Path(path) if path else self.path
+        if path is None:
+            return
+        with self._lock:
+            data = {"rolls": [roll.to_dict() for roll in self._rolls.values()]}
+        path.parent.mkdir(parents=True, exist_ok=True)
+        tmp = path.with_suffix(path.suffix + ".tmp")
+        with open(tmp, "w") as f:
+            json.dump(data, f, indent=2)
+        tmp.replace(path)
+
+    def add(self, roll: Roll):
+        with self._lock:
+            self._rolls[roll.roll_id] = roll
+
+    def get(self, roll_id: str) -> Optional[Roll]:
+        return self._rolls.get(roll_id)
+
+    @property
+    def rolls(self) -> List[Roll]:
+        return list(self._rolls.values())
+
+    def candidates(
+        self, fabric_code: str, max_width_cm: Optional[float] = None
+    ) -> List[Roll]:
+        """
+        Rolls of a fabric with length left, no wider than max_width_cm.
+
+        Orders without a fabric code can use any roll.
+        """
+        with self._lock:
+            rolls = list(self._rolls.values())
+        return [
+            roll
+            for roll in rolls
+            if roll.length_cm > 0
+            and (not fabric_code or roll.fabric_code == fabric_code)
+            and (max_width_cm is None or roll.width_cm <= max_width_cm + 1e-6)
+        ]
+
+    def consume(self, roll_id: str, length_cm: float) -> Roll:
+        """
+        Take length_cm off a roll. A leftover shorter than
+        ROLL_MIN_REMNANT_CM is scrapped (the roll is emptied), as roll_waste()
+        assumes.
+
+        Raises:
+            KeyError: Unknown roll
+            ValueError: Roll shorter than length_cm
+        """
+        with self._lock:
+            roll = self._rolls[roll_id]
+            if length_cm > roll.length_cm + 1e-6:
+                raise ValueError(
+                    f"Roll {roll_id} has {roll.length_cm:.1f} cm left, "
+                    f"{length_cm:.1f} cm needed"
+                )
+            left = roll.length_cm - length_cm
+            if left < min_remnant_cm():
+                left = 0.0
+            roll.length_cm = round(max(left, 0.0), 2)
+            return roll
+
+
+@dataclass
+class RollOption:
+    """One roll evaluated for an order."""
+
+    roll: Roll
+    length_cm: float
+    utilization: float  # Percent
+    waste_cm2: float
+    fits: bool
+    roll_length_cm: float = 0.0  # On the roll when evaluated
+
+    def to_dict(self) -> Dict:
+        return {
+            "roll_id": self.roll.roll_id,
+            "width_cm": self.roll.width_cm,
+            "remnant": self.roll.remnant,
+            "roll_length_cm": self.roll_length_cm,
+            "length_cm": round(self.length_cm, 2),
+            "utilization_percent": round(self.utilization, 2),
+            "waste_cm2": round(self.waste_cm2, 1),
+            "fits": self.fits,
+        }
+
+
+@dataclass
+class RollChoice:
+    """The roll picked for an order, with the nesting for its width."""
+
+    roll: Roll
+    nested: Any  # Whatever the nest function returned for this width
+    option: RollOption
+    policy: str
+    options: List[RollOption] = field(default_factory=list)
+
+    @property
+    def width_cm(self) -> float:
+        return self.roll.width_cm
+
+    @property
+    def length_cm(self) -> float:
+        return self.option.length_cm
+
+    def to_dict(self) -> Dict:
+        """Summary for the order metadata."""
+        return {
+            "roll_id": self.roll.roll_id,
+            "fabric_code": self.roll.fabric_code,
+            "width_cm": self.roll.width_cm,
+            "remnant": self.roll.remnant,
+            "roll_length_cm": self.option.roll_length_cm,
+            "length_cm": round(self.option.length_cm, 2),
+            "waste_cm2": round(self.option.waste_cm2, 1),
+            "policy": self.policy,
+            "options": [option.to_dict() for option in self.options],
+        }
+
+
+def roll_waste(
+    width_cm: float, length_cm: float, utilization: float, roll_length_cm: float
+) -> float:
+    """
+    Fabric lost cutting a marker from a roll (cm^2).
+
+    The marker's area not covered by pieces, plus the tail left on the roll
+    if it is too short to keep (below ROLL_MIN_REMNANT_CM).
+    """
+    waste = width_cm * length_cm * (1.0 - utilization / 100.0)
+    tail = roll_length_cm - length_cm
+    if 0 < tail < min_remnant_cm():
+        waste += width_cm * tail
+    return waste
+
+
+def select_roll(options: Sequence[RollOption], policy: str) -> Optional[RollOption]:
+    """The option a policy picks among those that fit (None if none fit)."""
+    fitting = [option for option in options if option.fits]
+    if not fitting:
+        return None
+    if policy == "remnants_first":
+        # Remnants before full rolls; shortest remnant on ties uses up scraps
+        return min(
+            fitting,
+            key=lambda o: (not o.roll.remnant, o.waste_cm2, o.roll_length_cm),
+        )
+    # Shorter roll on ties keeps long rolls whole
+    return min(fitting, key=lambda o: (o.waste_cm2, o.roll_length_cm))
+
+
+def nest_on_rolls(
+    contours: Sequence[Any],
+    rolls: Sequence[Roll],
+    nest: Callable[..., Tuple[Any, Any]],
+    policy: Optional[str] = None,
+    max_workers: Optional[int] = None,
+    **nest_kwargs,
+) -> Optional[RollChoice]:
+    """
+    Nest contours for every distinct roll width and pick a roll.
+
+    Each width is nested once (rolls of the same width share the layout),
+    with the widths running in parallel threads. nest(contours,
+    fabric_width=width, **nest_kwargs) must return (nested, result), where
+    result has success, fabric_length and utilization (percent), as
+    production_pipeline.nest_contours does.
+
+    Returns:
+        The chosen roll, or None if no roll is long enough for its marker
+    """
+    policy = (policy or selection_policy()).lower()
+    if policy not in SELECTION_POLICIES:
+        raise ValueError(
+            f"Unknown roll selection policy {policy!r}, "
+            f"expected one of {SELECTION_POLICIES}"
+        )
+    if not rolls:
+        return None
+
+    widths = sorted({round(roll.width_cm, 2) for roll in rolls})
+    workers = max(1, min(len(widths), max_workers or nesting_workers()))
+
+    def run(width: float):
+        return nest(list(contours), fabric_width=width, **nest_kwargs)
+
+    if workers == 1:
+        nested_by_width = dict(zip(widths, map(run, widths)))
+    else:
+        with ThreadPoolExecutor(max_workers=workers) as pool:
+            nested_by_width = dict(zip(widths, pool.map(run, widths)))
+
+    options = []
+    for roll in rolls:
+        _, result = nested_by_width[round(roll.width_cm, 2)]
+        if not result.success:
+            continue
+        length = result.fabric_length
+        options.append(
+            RollOption(
+                roll=roll,
+                length_cm=length,
+                utilization=result.utilization,
+                waste_cm2=roll_waste(
+                    roll.width_cm, length, result.utilization, roll.length_cm
+                ),
+                fits=length <= roll.length_cm + 1e-6,
+                roll_length_cm=roll.length_cm,
+            )
+        )
+
+    best = select_roll(options, policy)
+    if best is None:
+        logger.warning(
+            f"No roll fits: {len(rolls)} rolls in {len(widths)} widths evaluated"
+        )
+        return None
+
+    logger.info(
+        f"Roll {best.roll.roll_id} ({best.roll.width_cm:.1f} cm"
+        f"{', remnant' if best.roll.remnant else ''}): "
+        f"{best.length_cm:.1f} cm, {best.waste_cm2:.0f} cm^2 waste ({policy})"
+    )
+    options.sort(key=lambda o: (not o.fits, o.waste_cm2))
+    return RollChoice(
+        roll=best.roll,
+        nested=nested_by_width[round(best.roll.width_cm, 2)],
+        option=best,
+        policy=policy,
+        options=options,
+    )
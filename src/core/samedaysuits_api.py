@@ -18,11 +18,12 @@ Author: Claude
 Date: 2026-01-30
 """
 
+import os
 import json
 import re
 import sys
 from pathlib import Path
-from typing import Dict, List, Optional, Tuple
+from typing import Any, Dict, List, Optional, Tuple, Union
 from dataclasses import dataclass, field, asdict
 from datetime import datetime
 from enum import Enum
@@ -31,6 +32,21 @@ import logging
 # v6.4.3 Order ID format: SDS-YYYYMMDD-NNNN-R
 ORDER_ID_PATTERN = re.compile(r"^SDS-(\d{8})-(\d{4})-([A-Z])$")
 
+# Rush orders take the first nesting layout that is good enough
+RUSH_TARGET_UTILIZATION = float(os.getenv("RUSH_TARGET_UTILIZATION", "70"))
+RUSH_NESTING_DEADLINE_SECONDS = float(os.getenv("RUSH_NESTING_DEADLINE_SECONDS", "10"))
+
+# Nesting pass reports copied into the order metadata: (result key, metadata key)
+NESTING_METADATA_KEYS = (
+    ("anytime", "anytime_nesting"),
+    ("nesting_cache", "nesting_cache"),
+    ("simplification", "simplification"),
+    ("clusters", "clusters"),
+    ("hole_filling", "hole_filling"),
+    ("profile", "profile"),
+    ("rotations", "rotations"),
+)
+
 # Setup logging
 logging.basicConfig(
     level=logging.INFO, format="%(asctime)s - %(name)s - %(levelname)s - %(message)s"
@@ -46,7 +62,6 @@ sys.path.insert(0, str(project_root / "production" / "src" / "core"))
 
 # Import our production pipeline
 from production_pipeline import (
-    extract_xml_from_pds,
     extract_piece_dimensions,
     extract_svg_geometry,
     transform_to_cm,
@@ -55,10 +70,24 @@ from production_pipeline import (
     CUTTER_WIDTH_CM,
 )
 
+# Streaming PLT writer (bounds from the nesting result, per-piece offsets)
+from hpgl_writer import HPGLOutput, contour_coords, nesting_bounds
+
+# Parsed-once PDS templates shared by the extractors, and their compiled form
+from pds_loader import load_pds_template
+from template_store import (
+    CompiledTemplate,
+    compiled_template,
+    get_template_store,
+    template_store_enabled,
+)
+
 # Import pattern scaler
 from pattern_scaler import (
+    PackedContours,
     calculate_pattern_scale,
-    scale_contours,
+    region_grading_enabled,
+    scale_batch,
     get_garment_type,
     GarmentType as ScalerGarmentType,
 )
@@ -71,6 +100,30 @@ try:
 except ImportError:
     MONITORING_AVAILABLE = False
 
+# Import multi-order marker batching
+from marker_batcher import (
+    group_orders_for_markers,
+    fabric_key,
+    marker_batch_id,
+    piece_label,
+    polygon_area,
+    allocate_marker_cost,
+    fabric_cost_per_meter,
+)
+
+# Import roll inventory (multi-width / remnant nesting)
+from roll_inventory import RollInventory, RollChoice, nest_on_rolls
+
+# Staged, concurrent batch processing
+from batch_pipeline import (
+    Stage,
+    StagedPipeline,
+    pipeline_enabled,
+    pipeline_io_workers,
+    pipeline_nest_processes,
+    pipeline_threads,
+)
+
 # Import quality control
 try:
     from quality_control import QualityControl, QCLevel
@@ -131,6 +184,9 @@ class Order:
     quantity: int = 1
     notes: str = ""
     created_at: str = field(default_factory=lambda: datetime.now().isoformat())
+    # Fabric the order is cut from; orders sharing both can share a marker
+    fabric_code: str = ""
+    fabric_width_cm: Optional[float] = None
 
 
 @dataclass
@@ -147,6 +203,60 @@ class ProductionResult:
     processing_time_ms: float
     errors: List[str]
     warnings: List[str]
+    batch_id: Optional[str] = None  # Set when cut from a shared marker
+    fabric_width_cm: Optional[float] = None
+    roll_id: Optional[str] = None  # Set when nested against the roll inventory
+    # Per-piece PLT byte ranges, passed to the cutter queue for reprints
+    pieces: List[Dict] = field(default_factory=list)
+
+
+@dataclass
+class PreparedPattern:
+    """Template contours scaled to an order's measurements (before nesting)."""
+
+    template_path: Path
+    contours_cm: List
+    scale_result: object
+    scaling_applied: bool
+    warnings: List[str]
+
+
+@dataclass
+class OrderJob:
+    """
+    One order moving through process_order's stages (prepare, nest, QC,
+    write). result is set once the order is finished or has failed; later
+    stages then pass it through.
+    """
+
+    order: Order
+    start_time: float
+    nest_options: Dict = field(default_factory=dict)
+    prepared: Optional[PreparedPattern] = None
+    fabric_width: Optional[float] = None
+    nested_contours: Optional[List] = None
+    nesting_result: Optional[Any] = None
+    roll: Optional[RollChoice] = None
+    errors: List[str] = field(default_factory=list)
+    warnings: List[str] = field(default_factory=list)
+    result: Optional["ProductionResult"] = None
+
+
+def nest_order_job(job: OrderJob) -> OrderJob:
+    """
+    Nest a prepared order for its fabric width (no roll inventory).
+
+    Module-level so batch pipelines can run it in a process pool.
+    """
+    if job.result is not None:
+        return job
+    job.nested_contours, job.nesting_result = nest_contours(
+        job.prepared.contours_cm,
+        fabric_width=job.fabric_width,
+        material=job.order.fabric_code,
+        **job.nest_options,
+    )
+    return job
 
 
 # Template mapping: garment type -> PDS file
@@ -189,6 +299,7 @@ class SameDaySuitsAPI:
         templates_dir: Optional[Path] = None,
         output_dir: Optional[Path] = None,
         fabric_width_cm: float = CUTTER_WIDTH_CM,
+        roll_inventory: Optional[RollInventory] = None,
     ):
         """
         Initialize the API.
@@ -197,15 +308,24 @@ class SameDaySuitsAPI:
             templates_dir: Directory containing PDS template files
             output_dir: Directory for output files
             fabric_width_cm: Fabric width for nesting (default: 62" = 157.48 cm)
+            roll_inventory: Stocked rolls and remnants; orders without their
+                own width are nested against every roll of their fabric
+                (default: ROLL_INVENTORY_PATH, else none)
         """
         self.templates_dir = (
             templates_dir or project_root / "DS-speciale" / "inputs" / "pds"
         )
         self.output_dir = output_dir or project_root / "DS-speciale" / "out" / "orders"
         self.fabric_width_cm = fabric_width_cm
+        self.roll_inventory = (
+            roll_inventory if roll_inventory is not None else RollInventory.from_env()
+        )
 
         self.output_dir.mkdir(parents=True, exist_ok=True)
 
+        if template_store_enabled():
+            self.compile_templates()
+
         logger.info(f"SameDaySuits API initialized")
         logger.info(f"Templates: {self.templates_dir}")
         logger.info(f"Output: {self.output_dir}")
@@ -232,6 +352,28 @@ class SameDaySuitsAPI:
             result[garment_type.value] = template_path.exists()
         return result
 
+    def get_template(self, garment_type: GarmentType) -> Optional[CompiledTemplate]:
+        """
+        Compiled template for a garment type from the template cache
+        (memory, then disk, then Redis; compiled on a miss).
+
+        Returns:
+            The template, or None when TEMPLATE_STORE_ENABLED=0
+        """
+        return compiled_template(self.get_template_path(garment_type))
+
+    def compile_templates(self) -> Dict[str, str]:
+        """
+        Compile every available template into the template store (only new
+        or changed files are recompiled).
+
+        Returns:
+            Template filename -> source SHA-256
+        """
+        return get_template_store().compile_all(
+            self.templates_dir / filename for filename in TEMPLATE_MAPPING.values()
+        )
+
     def get_template_path(self, garment_type: GarmentType) -> Path:
         """Get path to template PDS file."""
         if garment_type not in TEMPLATE_MAPPING:
@@ -245,7 +387,15 @@ class SameDaySuitsAPI:
 
         return template_path
 
-    def process_order(self, order: Order) -> ProductionResult:
+    def process_order(
+        self,
+        order: Order,
+        rush: bool = False,
+        target_utilization: Optional[float] = None,
+        nesting_deadline_seconds: Optional[float] = None,
+        cancel_token=None,
+        prepared: Optional[PreparedPattern] = None,
+    ) -> ProductionResult:
         """
         Process a customer order through the production pipeline.
 
@@ -257,309 +407,676 @@ class SameDaySuitsAPI:
         5. Nest pieces for fabric width
         6. Generate HPGL/PLT
         7. Save outputs
+
+        Nesting normally runs the full master_nest budget. Any of the options
+        below switch it to anytime nesting, which stops at the first layout
+        reaching target_utilization, at the deadline, or on cancellation.
+
+        Args:
+            order: Order to process
+            rush: Use RUSH_TARGET_UTILIZATION / RUSH_NESTING_DEADLINE_SECONDS
+                unless given explicitly
+            target_utilization: "Good enough" utilization (%)
+            nesting_deadline_seconds: Deadline for nesting
+            cancel_token: nesting_engine.CancellationToken to stop nesting early
+            prepared: The order's already scaled pattern (batch_process scales
+                a batch at once); prepared here when None
         """
         import time
 
-        start_time = time.time()
+        job = OrderJob(
+            order=order,
+            start_time=time.time(),
+            nest_options=self._anytime_options(
+                rush, target_utilization, nesting_deadline_seconds, cancel_token
+            ),
+            prepared=prepared,
+        )
+        for stage in (
+            self._stage_prepare,
+            self._stage_nest,
+            self._stage_qc,
+            self._stage_write,
+        ):
+            job = self._run_stage(stage, job)
+        return job.result
+
+    def _run_stage(self, stage, job: OrderJob) -> OrderJob:
+        """Run one order stage, turning an exception into a failure result."""
+        if job.result is not None:
+            return job
+        try:
+            return stage(job)
+        except Exception as e:
+            return self._fail_job(job, e)
+
+    def _fail_job(self, job: OrderJob, error: BaseException) -> OrderJob:
+        """Finish an order whose stage raised."""
+        logger.error(f"Error processing order {job.order.order_id}", exc_info=error)
+        job.errors.append(f"Processing error: {error}")
+        self._update_order_status(job.order, "ERROR")
+        job.result = self._create_failure_result(job.order, job.errors, job.start_time)
+        return job
+
+    def _stage_prepare(self, job: OrderJob) -> OrderJob:
+        """Steps 1-4: validate, load the template and scale it."""
+        import time
 
-        errors = []
-        warnings = []
+        order = job.order
+        job.start_time = time.time()  # Not counting time queued for the stage
+        logger.info(f"Processing order: {order.order_id}")
+
+        # Step 1: Validate order
+        validation_errors = self._validate_order(order)
+        if validation_errors:
+            job.errors.extend(validation_errors)
+            job.result = self._create_failure_result(order, job.errors, job.start_time)
+            return job
+
+        self._update_order_status(order, "PROCESSING")
 
+        # Steps 2-4: Template, geometry and scaling
         try:
-            logger.info(f"Processing order: {order.order_id}")
+            if job.prepared is None:
+                job.prepared = self._prepare_pattern(order)
+        except FileNotFoundError as e:
+            job.errors.append(str(e))
+            job.result = self._create_failure_result(order, job.errors, job.start_time)
+            return job
+
+        job.warnings.extend(job.prepared.warnings)
+        job.fabric_width = self._fabric_width(order)
+        return job
+
+    def _stage_nest(self, job: OrderJob) -> OrderJob:
+        """Step 5: nest pieces (taking the marker off its roll, if any)."""
+        logger.info("Nesting pieces...")
+        job.nested_contours, job.nesting_result, job.fabric_width, job.roll = (
+            self._nest(job.prepared.contours_cm, job.order, **job.nest_options)
+        )
+        if job.nesting_result.success:
+            self._take_from_roll(job.roll, job.nesting_result.fabric_length)
+        return job
+
+    def _stage_qc(self, job: OrderJob) -> OrderJob:
+        """Step 5b: check the nesting result and run quality control."""
+        nesting_result = job.nesting_result
+        if not nesting_result.success:
+            job.errors.append(f"Nesting failed: {nesting_result.message}")
+            job.result = self._create_failure_result(
+                job.order, job.errors, job.start_time
+            )
+            return job
 
-            # Step 1: Validate order
-            validation_errors = self._validate_order(order)
-            if validation_errors:
-                errors.extend(validation_errors)
-                return self._create_failure_result(order, errors, start_time)
+        logger.info(
+            f"Nested to {nesting_result.fabric_width:.1f} x {nesting_result.fabric_length:.1f} cm"
+        )
+        logger.info(f"Utilization: {nesting_result.utilization:.1f}%")
 
-            # Update database status to PROCESSING
-            try:
-                from database_integration import OrderDatabase, OrderStatus
+        # Step 5b: Quality Control Validation
+        self._run_quality_control(
+            job.order, job.nested_contours, nesting_result, job.errors, job.warnings
+        )
+        return job
 
-                db = OrderDatabase()
-                db.update_order_status(order.order_id, OrderStatus.PROCESSING)
-                logger.info(f"Order {order.order_id} status updated to PROCESSING")
-            except Exception as db_error:
-                logger.warning(f"Failed to update PROCESSING status: {db_error}")
+    def _stage_write(self, job: OrderJob) -> OrderJob:
+        """Steps 6-7: write the PLT and metadata and record the order."""
+        import time
 
-            # Step 2: Get template
-            try:
-                template_path = self.get_template_path(order.garment_type)
-                logger.info(f"Using template: {template_path.name}")
-            except FileNotFoundError as e:
-                errors.append(str(e))
-                return self._create_failure_result(order, errors, start_time)
-
-            # Step 3: Extract geometry
-            logger.info("Extracting pattern geometry...")
-            xml_content = extract_xml_from_pds(str(template_path))
-
-            pieces = extract_piece_dimensions(xml_content, "Small")
-            total_width = sum(p["size_x"] for p in pieces.values())
-            total_height = max(p["size_y"] for p in pieces.values()) if pieces else 0
-
-            contours, metadata = extract_svg_geometry(
-                xml_content, cutting_contours_only=True
+        order = job.order
+        prepared = job.prepared
+        nesting_result = job.nesting_result
+        fabric_width = job.fabric_width
+        roll = job.roll
+        contours = prepared.contours_cm
+
+        # Step 6: Generate HPGL
+        order_output_dir = self.output_dir / order.order_id
+        order_output_dir.mkdir(parents=True, exist_ok=True)
+
+        plt_file = order_output_dir / f"{order.order_id}.plt"
+        metadata_file = order_output_dir / f"{order.order_id}_metadata.json"
+
+        logger.info(f"Generating HPGL: {plt_file}")
+        plt_output = generate_hpgl(
+            job.nested_contours,
+            str(plt_file),
+            fabric_width,
+            bounds=nesting_bounds(nesting_result),
+        )
+
+        # Step 7: Save metadata
+        order_metadata = {
+            "order": asdict(order),
+            "production": {
+                "template": prepared.template_path.name,
+                "piece_count": len(contours),
+                "fabric_width_cm": fabric_width,
+                "fabric_length_cm": nesting_result.fabric_length,
+                "utilization_percent": nesting_result.utilization,
+                "nesting_applied": True,
+                "scaling": self._scaling_metadata(prepared),
+            },
+            "files": {
+                "plt": str(plt_file),
+            },
+            "processed_at": datetime.now().isoformat(),
+        }
+        if roll is not None:
+            order_metadata["production"]["roll"] = roll.to_dict()
+        for key, name in NESTING_METADATA_KEYS:
+            if key in nesting_result.metadata:
+                order_metadata["production"][name] = nesting_result.metadata[key]
+        self._write_order_metadata(order, order_metadata, metadata_file)
+
+        processing_time = (time.time() - job.start_time) * 1000
+
+        logger.info(f"Order {order.order_id} completed in {processing_time:.0f}ms")
+
+        # Create result first so we can use it for database update
+        result = ProductionResult(
+            success=True,
+            order_id=order.order_id,
+            plt_file=plt_file,
+            metadata_file=metadata_file,
+            fabric_length_cm=nesting_result.fabric_length,
+            fabric_utilization=nesting_result.utilization,
+            piece_count=len(contours),
+            processing_time_ms=processing_time,
+            errors=job.errors,
+            warnings=job.warnings,
+            fabric_width_cm=fabric_width,
+            roll_id=roll.roll.roll_id if roll else None,
+            pieces=self._plt_pieces(
+                order.order_id,
+                prepared.template_path.stem,
+                job.nested_contours,
+                plt_output,
+            ),
+        )
+
+        self._record_success(order, result)
+        job.result = result
+        return job
+
+    def _plt_pieces(
+        self,
+        order_id: str,
+        name: str,
+        contours: List,
+        plt_output: Optional[HPGLOutput],
+    ) -> List[Dict]:
+        """
+        Cutter queue piece records for a PLT: each nested piece's byte range
+        (see ResilientCutterQueue.reprint_piece) and size.
+        """
+        if plt_output is None:
+            return []
+
+        pieces = []
+        for n, (contour, offsets) in enumerate(
+            zip(contours, plt_output.piece_offsets), 1
+        ):
+            if offsets is None:
+                continue
+            coords = contour_coords(contour)
+            width, height = coords.max(axis=0) - coords.min(axis=0)
+            pieces.append(
+                {
+                    "piece_id": f"{order_id}-P{n:03d}",
+                    "piece_name": f"{name} {n}",
+                    "piece_number": n,
+                    "total_pieces": len(contours),
+                    "plt_start_byte": offsets[0],
+                    "plt_end_byte": offsets[1],
+                    "width_cm": round(float(width), 2),
+                    "height_cm": round(float(height), 2),
+                }
             )
-            logger.info(f"Found {len(contours)} cutting contours, {len(pieces)} pieces")
+        return pieces
 
-            # Step 4: Transform to real-world cm
-            contours_cm = transform_to_cm(contours, metadata, total_width, total_height)
+    def process_orders_pipelined(
+        self,
+        orders: List[Order],
+        prepared: Optional[Dict[int, PreparedPattern]] = None,
+    ) -> List[ProductionResult]:
+        """
+        Process orders through a staged pipeline instead of one at a time.
 
-            # Step 4b: Apply customer measurements to scale pattern
-            logger.info("Calculating pattern scale from measurements...")
+        Preparation and QC run on threads, nesting on a process pool and
+        PLT / metadata / database writes on an async I/O stage, connected by
+        bounded queues (see batch_pipeline). With a roll inventory, nesting
+        runs on one thread in this process so each order sees the rolls
+        the previous one used.
 
-            # Convert measurements to scaler format
-            customer_measurements = {
-                "chest": order.measurements.chest_cm,
-                "waist": order.measurements.waist_cm,
-                "hip": order.measurements.hip_cm,
-            }
-            if order.measurements.shoulder_width_cm:
-                customer_measurements["shoulder"] = order.measurements.shoulder_width_cm
-            if order.measurements.inseam_cm:
-                customer_measurements["inseam"] = order.measurements.inseam_cm
+        Args:
+            orders: Orders to process
+            prepared: Already scaled patterns by id(order)
 
-            # Get garment type for scaler
-            scaler_garment_type = get_garment_type(order.garment_type.value)
+        Returns:
+            One result per order, in input order. Stage metrics are left in
+            self.pipeline_stats.
+        """
+        import time
+        from functools import partial
 
-            # Calculate scale factors
-            scale_result = calculate_pattern_scale(
-                customer_measurements, scaler_garment_type
+        prepared = prepared or {}
+        jobs = [
+            OrderJob(
+                order=order, start_time=time.time(), prepared=prepared.get(id(order))
             )
+            for order in orders
+        ]
 
-            logger.info(
-                f"Base size: {scale_result.base_size}, Scale: X={scale_result.scale_x:.3f}, Y={scale_result.scale_y:.3f}"
-            )
+        def step(stage):
+            return partial(self._run_stage, stage)
 
-            # Apply scaling if significantly different from 1.0
-            scaling_applied = False
-            if (
-                abs(scale_result.scale_x - 1.0) > 0.01
-                or abs(scale_result.scale_y - 1.0) > 0.01
-            ):
-                logger.info("Applying pattern scaling...")
-                contours_cm = scale_contours(
-                    contours_cm, scale_result.scale_x, scale_result.scale_y
-                )
-                scaling_applied = True
-            else:
-                logger.info("No significant scaling needed")
+        threads = pipeline_threads()
+        nest_processes = pipeline_nest_processes()
+        if self.roll_inventory is None and nest_processes > 0:
+            nest_stage = Stage("nest", nest_order_job, "process", nest_processes)
+        else:
+            nest_stage = Stage("nest", step(self._stage_nest))
+
+        pipeline = StagedPipeline(
+            [
+                Stage("prepare", step(self._stage_prepare), "thread", threads),
+                nest_stage,
+                Stage("qc", step(self._stage_qc), "thread", threads),
+                Stage("write", step(self._stage_write), "async", pipeline_io_workers()),
+            ],
+            on_error=lambda _stage, job, error: self._fail_job(job, error),
+        )
+        jobs = pipeline.run(jobs)
 
-            # Add scaling notes to warnings
-            for note in scale_result.notes:
-                warnings.append(note)
+        self.pipeline_stats = pipeline.get_stats()
+        logger.info(
+            f"Pipeline: {len(orders)} orders, bottleneck {pipeline.bottleneck()}: "
+            f"{self.pipeline_stats}"
+        )
+        return [job.result for job in jobs]
 
-            # Step 5: Nest pieces
-            logger.info("Nesting pieces...")
-            nested_contours, nesting_result = nest_contours(
-                contours_cm, fabric_width=self.fabric_width_cm
-            )
+    def _anytime_options(
+        self,
+        rush: bool,
+        target_utilization: Optional[float],
+        deadline_seconds: Optional[float],
+        cancel_token,
+    ) -> Dict:
+        """nest_contours keyword arguments for anytime nesting (empty if unused)."""
+        if rush:
+            if target_utilization is None:
+                target_utilization = RUSH_TARGET_UTILIZATION
+            if deadline_seconds is None:
+                deadline_seconds = RUSH_NESTING_DEADLINE_SECONDS
+
+        options = {
+            "target_utilization": target_utilization,
+            "timeout_seconds": deadline_seconds,
+            "cancel_token": cancel_token,
+        }
+        return {key: value for key, value in options.items() if value is not None}
+
+    def _fabric_width(self, order: Order) -> float:
+        """Fabric width for an order (its own, else the API default)."""
+        return order.fabric_width_cm or self.fabric_width_cm
+
+    def _nest(
+        self, contours: List, order: Order, **options
+    ) -> Tuple[List, object, float, Optional[RollChoice]]:
+        """
+        Nest contours for an order's fabric.
 
-            if not nesting_result.success:
-                errors.append(f"Nesting failed: {nesting_result.message}")
-                return self._create_failure_result(order, errors, start_time)
+        With a roll inventory, an order without its own width is nested for
+        every stocked width of its fabric and a roll is picked (see
+        roll_inventory.nest_on_rolls). Otherwise, or if no roll is long
+        enough, it is nested for _fabric_width(order).
 
-            logger.info(
-                f"Nested to {nesting_result.fabric_width:.1f} x {nesting_result.fabric_length:.1f} cm"
+        Returns:
+            (nested contours, NestingResult, fabric width, RollChoice or None)
+        """
+        fabric_width = self._fabric_width(order)
+        rolls = []
+        if self.roll_inventory is not None and not order.fabric_width_cm:
+            rolls = self.roll_inventory.candidates(
+                order.fabric_code, max_width_cm=CUTTER_WIDTH_CM
             )
-            logger.info(f"Utilization: {nesting_result.utilization:.1f}%")
-
-            # Step 5b: Quality Control Validation
-            if QC_AVAILABLE:
-                logger.info("Running quality control checks...")
-                qc = QualityControl()
-
-                # Prepare customer measurements
-                customer_measurements = {
-                    "chest": order.measurements.chest_cm,
-                    "waist": order.measurements.waist_cm,
-                    "hip": order.measurements.hip_cm,
-                }
 
-                # Prepare scaled dimensions (approximate from scale result)
-                scaled_dimensions = {
-                    "chest_width": order.measurements.chest_cm / 2,  # Half chest
-                    "waist_width": order.measurements.waist_cm / 2,
-                    "hip_width": order.measurements.hip_cm / 2,
-                }
+        if rolls:
+            roll = nest_on_rolls(
+                contours, rolls, nest_contours, material=order.fabric_code, **options
+            )
+            if roll is not None:
+                nested_contours, nesting_result = roll.nested
+                return nested_contours, nesting_result, roll.width_cm, roll
+            logger.warning(
+                f"No {order.fabric_code or 'fabric'} roll is long enough, "
+                f"nesting for {fabric_width:.1f} cm"
+            )
+
+        nested_contours, nesting_result = nest_contours(
+            contours,
+            fabric_width=fabric_width,
+            material=order.fabric_code,
+            **options,
+        )
+        return nested_contours, nesting_result, fabric_width, None
+
+    def _take_from_roll(self, roll: Optional[RollChoice], length_cm: float):
+        """Take a plotted marker's length off its roll and save the inventory."""
+        if roll is None:
+            return
+        self.roll_inventory.consume(roll.roll.roll_id, length_cm)
+        self.roll_inventory.save()
 
-                qc_report = qc.validate_order(
-                    order_id=order.order_id,
-                    garment_type=order.garment_type.value,
-                    contours=nested_contours,
-                    customer_measurements=customer_measurements,
-                    scaled_dimensions=scaled_dimensions,
-                    nesting_result=nesting_result,
+    def _prepare_pattern(self, order: Order) -> PreparedPattern:
+        """
+        Load the order's template and scale its cutting contours.
+
+        Raises:
+            FileNotFoundError: If the template is missing
+        """
+        prepared = self._prepare_patterns([order])[0]
+        if isinstance(prepared, Exception):
+            raise prepared
+        return prepared
+
+    def _prepare_patterns(
+        self, orders: List[Order]
+    ) -> List[Union[PreparedPattern, Exception]]:
+        """
+        Load and scale the cutting contours for several orders, scaling all
+        orders of one garment type against its template in a single pass.
+
+        Returns:
+            One PreparedPattern per order, in order; the exception instead
+            for orders whose template or measurements failed
+        """
+        prepared: List[Union[PreparedPattern, Exception]] = [None] * len(orders)
+        by_garment: Dict[GarmentType, List[int]] = {}
+        for i, order in enumerate(orders):
+            by_garment.setdefault(order.garment_type, []).append(i)
+
+        for garment_type, indices in by_garment.items():
+            try:
+                template_path, packed = self._load_pattern(garment_type)
+            except Exception as e:
+                for i in indices:
+                    prepared[i] = e
+                continue
+
+            scaled_orders = []  # (index, ScaleResult)
+            for i in indices:
+                try:
+                    scaled_orders.append((i, self._scale_for(orders[i])))
+                except Exception as e:
+                    prepared[i] = e
+
+            # Step 4b: one vectorized pass for every order that needs scaling
+            scales = [
+                scale_result if self._needs_scaling(scale_result) else None
+                for _, scale_result in scaled_orders
+            ]
+            if any(scale is not None for scale in scales):
+                logger.info(
+                    f"Applying pattern scaling: {len(scaled_orders)} order(s), "
+                    f"{len(packed)} contours"
                 )
+            scaled = scale_batch(packed, scales)
 
-                # Log QC results
-                if not qc_report.passed:
-                    logger.warning(
-                        f"QC check failed: {qc_report.error_count} errors, {qc_report.warning_count} warnings"
-                    )
-                    # Add QC warnings to order warnings
-                    for check in qc_report.checks:
-                        if check.level == QCLevel.WARNING:
-                            warnings.append(f"QC: {check.message}")
-                        elif check.level == QCLevel.ERROR:
-                            errors.append(f"QC Error: {check.message}")
-
-                    # Save QC report
-                    order_output_dir = self.output_dir / order.order_id
-                    order_output_dir.mkdir(parents=True, exist_ok=True)
-                    qc_file = order_output_dir / f"{order.order_id}_qc_report.json"
-                    qc_check_dicts = []
-                    for check in qc_report.checks:
-                        qc_check_dicts.append(
-                            {
-                                "category": check.category.value,
-                                "level": check.level.value,
-                                "message": check.message,
-                                "piece_id": check.piece_id,
-                                "piece_name": check.piece_name,
-                                "details": check.details,
-                            }
-                        )
-                    qc_report_data = {
-                        "order_id": qc_report.order_id,
-                        "garment_type": qc_report.garment_type,
-                        "passed": qc_report.passed,
-                        "error_count": qc_report.error_count,
-                        "warning_count": qc_report.warning_count,
-                        "info_count": qc_report.info_count,
-                        "checks": qc_check_dicts,
-                    }
-                    with open(qc_file, "w") as f:
-                        json.dump(qc_report_data, f, indent=2)
-
-                    # Don't fail the order for QC warnings, but log them
-                    if qc_report.error_count > 0:
-                        logger.error(
-                            "QC validation found critical errors - review recommended before cutting"
-                        )
-                else:
-                    logger.info("QC validation passed")
+            for (i, scale_result), scale, contours_cm in zip(
+                scaled_orders, scales, scaled
+            ):
+                prepared[i] = PreparedPattern(
+                    template_path=template_path,
+                    # Unscaled orders keep the template's exact coordinates
+                    contours_cm=contours_cm if scale is not None else packed.unpack(),
+                    scale_result=scale_result,
+                    scaling_applied=scale is not None,
+                    warnings=list(scale_result.notes),
+                )
 
-            # Step 6: Generate HPGL
-            order_output_dir = self.output_dir / order.order_id
-            order_output_dir.mkdir(parents=True, exist_ok=True)
+        return prepared
 
-            plt_file = order_output_dir / f"{order.order_id}.plt"
-            metadata_file = order_output_dir / f"{order.order_id}_metadata.json"
+    def _load_pattern(self, garment_type: GarmentType) -> Tuple[Path, PackedContours]:
+        """
+        The template's cutting contours in cm (base size Small).
 
-            logger.info(f"Generating HPGL: {plt_file}")
-            generate_hpgl(nested_contours, str(plt_file), self.fabric_width_cm)
+        Raises:
+            FileNotFoundError: If the template is missing
+        """
+        # Step 2: Get template
+        template_path = self.get_template_path(garment_type)
+        logger.info(f"Using template: {template_path.name}")
+
+        # Step 3: Extract geometry
+        compiled = self.get_template(garment_type)
+        if compiled is not None:
+            # Steps 3-4 precompiled: cutting contours already in cm
+            packed = PackedContours.from_template(compiled)
+            logger.info(
+                f"Loaded compiled template: {len(packed)} cutting contours, "
+                f"{len(compiled.piece_dimensions('Small'))} pieces"
+            )
+            return template_path, packed
 
-            # Step 7: Save metadata
-            order_metadata = {
-                "order": asdict(order),
-                "production": {
-                    "template": template_path.name,
-                    "piece_count": len(contours),
-                    "fabric_width_cm": self.fabric_width_cm,
-                    "fabric_length_cm": nesting_result.fabric_length,
-                    "utilization_percent": nesting_result.utilization,
-                    "nesting_applied": True,
-                    "scaling": {
-                        "applied": scaling_applied,
-                        "base_size": scale_result.base_size,
-                        "scale_x": scale_result.scale_x,
-                        "scale_y": scale_result.scale_y,
-                        "size_match_quality": scale_result.size_match_quality,
-                    },
-                },
-                "files": {
-                    "plt": str(plt_file),
-                },
-                "processed_at": datetime.now().isoformat(),
-            }
+        logger.info("Extracting pattern geometry...")
+        template = load_pds_template(template_path)
 
-            # Convert enum values for JSON
-            order_metadata["order"]["garment_type"] = order.garment_type.value
-            order_metadata["order"]["fit_type"] = order.fit_type.value
+        pieces = extract_piece_dimensions(template, "Small")
+        total_width = sum(p["size_x"] for p in pieces.values())
+        total_height = max(p["size_y"] for p in pieces.values()) if pieces else 0
 
-            with open(metadata_file, "w") as f:
-                json.dump(order_metadata, f, indent=2)
+        contours, metadata = extract_svg_geometry(
+            template, cutting_contours_only=True, as_arrays=True
+        )
+        logger.info(f"Found {len(contours)} cutting contours, {len(pieces)} pieces")
+
+        # Step 4: Transform to real-world cm
+        contours_cm = transform_to_cm(contours, metadata, total_width, total_height)
+        return template_path, PackedContours.from_contours(contours_cm)
+
+    def _scale_for(self, order: Order):
+        """Step 4b: pattern scale for the order's measurements."""
+        # Convert measurements to scaler format
+        customer_measurements = {
+            "chest": order.measurements.chest_cm,
+            "waist": order.measurements.waist_cm,
+            "hip": order.measurements.hip_cm,
+        }
+        if order.measurements.shoulder_width_cm:
+            customer_measurements["shoulder"] = order.measurements.shoulder_width_cm
+        if order.measurements.inseam_cm:
+            customer_measurements["inseam"] = order.measurements.inseam_cm
+
+        # Get garment type for scaler
+        scaler_garment_type = get_garment_type(order.garment_type.value)
+
+        # Calculate scale factors
+        scale_result = calculate_pattern_scale(
+            customer_measurements,
+            scaler_garment_type,
+            regions=region_grading_enabled(),
+        )
 
-            processing_time = (time.time() - start_time) * 1000
+        logger.info(
+            f"{order.order_id}: base size {scale_result.base_size}, "
+            f"Scale: X={scale_result.scale_x:.3f}, Y={scale_result.scale_y:.3f}"
+        )
+        return scale_result
+
+    @staticmethod
+    def _needs_scaling(scale_result) -> bool:
+        """Whether the scale differs significantly from 1.0."""
+        if scale_result.regions is not None:
+            return not scale_result.regions.is_identity()
+        return (
+            abs(scale_result.scale_x - 1.0) > 0.01
+            or abs(scale_result.scale_y - 1.0) > 0.01
+        )
 
-            logger.info(f"Order {order.order_id} completed in {processing_time:.0f}ms")
+    def _scaling_metadata(self, prepared: PreparedPattern) -> Dict:
+        """Scaling section of the order metadata."""
+        scale_result = prepared.scale_result
+        return {
+            "applied": prepared.scaling_applied,
+            "base_size": scale_result.base_size,
+            "scale_x": scale_result.scale_x,
+            "scale_y": scale_result.scale_y,
+            "size_match_quality": scale_result.size_match_quality,
+            "regions": (
+                dict(zip(scale_result.regions.zones, scale_result.regions.scale_x))
+                if getattr(scale_result, "regions", None)
+                else None
+            ),
+        }
 
-            # Create result first so we can use it for database update
-            result = ProductionResult(
-                success=True,
-                order_id=order.order_id,
-                plt_file=plt_file,
-                metadata_file=metadata_file,
-                fabric_length_cm=nesting_result.fabric_length,
-                fabric_utilization=nesting_result.utilization,
-                piece_count=len(contours),
-                processing_time_ms=processing_time,
-                errors=errors,
-                warnings=warnings,
+    def _write_order_metadata(self, order: Order, order_metadata: Dict, path: Path):
+        """Write an order's metadata JSON (enum values converted)."""
+        order_metadata["order"]["garment_type"] = order.garment_type.value
+        order_metadata["order"]["fit_type"] = order.fit_type.value
+
+        with open(path, "w") as f:
+            json.dump(order_metadata, f, indent=2)
+
+    def _run_quality_control(
+        self,
+        order: Order,
+        nested_contours: List,
+        nesting_result,
+        errors: List[str],
+        warnings: List[str],
+    ):
+        """Run QC checks, adding findings to errors/warnings and saving a report."""
+        if not QC_AVAILABLE:
+            return
+
+        logger.info("Running quality control checks...")
+        qc = QualityControl()
+
+        # Prepare customer measurements
+        customer_measurements = {
+            "chest": order.measurements.chest_cm,
+            "waist": order.measurements.waist_cm,
+            "hip": order.measurements.hip_cm,
+        }
+
+        # Prepare scaled dimensions (approximate from scale result)
+        scaled_dimensions = {
+            "chest_width": order.measurements.chest_cm / 2,  # Half chest
+            "waist_width": order.measurements.waist_cm / 2,
+            "hip_width": order.measurements.hip_cm / 2,
+        }
+
+        qc_report = qc.validate_order(
+            order_id=order.order_id,
+            garment_type=order.garment_type.value,
+            contours=nested_contours,
+            customer_measurements=customer_measurements,
+            scaled_dimensions=scaled_dimensions,
+            nesting_result=nesting_result,
+        )
+
+        # Log QC results
+        if not qc_report.passed:
+            logger.warning(
+                f"QC check failed: {qc_report.error_count} errors, {qc_report.warning_count} warnings"
             )
+            # Add QC warnings to order warnings
+            for check in qc_report.checks:
+                if check.level == QCLevel.WARNING:
+                    warnings.append(f"QC: {check.message}")
+                elif check.level == QCLevel.ERROR:
+                    errors.append(f"QC Error: {check.message}")
+
+            # Save QC report
+            order_output_dir = self.output_dir / order.order_id
+            order_output_dir.mkdir(parents=True, exist_ok=True)
+            qc_file = order_output_dir / f"{order.order_id}_qc_report.json"
+            qc_check_dicts = []
+            for check in qc_report.checks:
+                qc_check_dicts.append(
+                    {
+                        "category": check.category.value,
+                        "level": check.level.value,
+                        "message": check.message,
+                        "piece_id": check.piece_id,
+                        "piece_name": check.piece_name,
+                        "details": check.details,
+                    }
+                )
+            qc_report_data = {
+                "order_id": qc_report.order_id,
+                "garment_type": qc_report.garment_type,
+                "passed": qc_report.passed,
+                "error_count": qc_report.error_count,
+                "warning_count": qc_report.warning_count,
+                "info_count": qc_report.info_count,
+                "checks": qc_check_dicts,
+            }
+            with open(qc_file, "w") as f:
+                json.dump(qc_report_data, f, indent=2)
 
-            # Record metrics
-            if MONITORING_AVAILABLE:
-                monitor = get_monitor()
-                monitor.record_order_processed(
-                    order_id=order.order_id,
-                    garment_type=order.garment_type.value,
-                    success=True,
-                    processing_time=processing_time / 1000,  # Convert to seconds
-                    utilization=nesting_result.utilization,
-                    fabric_length=nesting_result.fabric_length,
-                    piece_count=len(contours),
+            # Don't fail the order for QC warnings, but log them
+            if qc_report.error_count > 0:
+                logger.error(
+                    "QC validation found critical errors - review recommended before cutting"
                 )
+        else:
+            logger.info("QC validation passed")
 
-            # Save to database with production details
-            try:
-                from database_integration import OrderDatabase, OrderStatus
+    def _update_order_status(
+        self, order: Order, status: str, production_result: Optional[Dict] = None
+    ):
+        """Update the order's database status (best effort)."""
+        try:
+            from database_integration import OrderDatabase, OrderStatus
 
-                db = OrderDatabase()
+            db = OrderDatabase()
+            if production_result is None:
+                db.update_order_status(order.order_id, OrderStatus[status])
+            else:
                 # Pass production data as dict to avoid circular import type issues
                 db.update_order_status(
                     order.order_id,
-                    OrderStatus.COMPLETE,
-                    production_result={
-                        "plt_file": str(result.plt_file) if result.plt_file else None,
-                        "metadata_file": str(result.metadata_file)
-                        if result.metadata_file
-                        else None,
-                        "fabric_length_cm": result.fabric_length_cm,
-                        "fabric_utilization": result.fabric_utilization,
-                        "piece_count": result.piece_count,
-                        "processing_time_ms": result.processing_time_ms,
-                        "errors": result.errors if result.errors else None,
-                        "warnings": result.warnings if result.warnings else None,
-                    },
+                    OrderStatus[status],
+                    production_result=production_result,
                 )
-                logger.info(
-                    f"Order {order.order_id} status updated to COMPLETE in database"
-                )
-            except Exception as db_error:
-                logger.warning(f"Failed to update database: {db_error}")
-
-            return result
-
-        except Exception as e:
-            logger.exception(f"Error processing order {order.order_id}")
-            errors.append(f"Processing error: {e}")
+            logger.info(f"Order {order.order_id} status updated to {status}")
+        except Exception as db_error:
+            logger.warning(f"Failed to update {status} status: {db_error}")
 
-            # Update database status to ERROR
-            try:
-                from database_integration import OrderDatabase, OrderStatus
-
-                db = OrderDatabase()
-                db.update_order_status(order.order_id, OrderStatus.ERROR)
-                logger.info(f"Order {order.order_id} status updated to ERROR")
-            except Exception as db_error:
-                logger.warning(f"Failed to update ERROR status: {db_error}")
+    def _record_success(self, order: Order, result: ProductionResult):
+        """Record metrics and save a completed order to the database."""
+        if MONITORING_AVAILABLE:
+            monitor = get_monitor()
+            monitor.record_order_processed(
+                order_id=order.order_id,
+                garment_type=order.garment_type.value,
+                success=True,
+                processing_time=result.processing_time_ms / 1000,  # Convert to seconds
+                utilization=result.fabric_utilization,
+                fabric_length=result.fabric_length_cm,
+                piece_count=result.piece_count,
+            )
 
-            return self._create_failure_result(order, errors, start_time)
+        # Save to database with production details
+        self._update_order_status(
+            order,
+            "COMPLETE",
+            production_result={
+                "plt_file": str(result.plt_file) if result.plt_file else None,
+                "metadata_file": str(result.metadata_file)
+                if result.metadata_file
+                else None,
+                "fabric_length_cm": result.fabric_length_cm,
+                "fabric_utilization": result.fabric_utilization,
+                "piece_count": result.piece_count,
+                "processing_time_ms": result.processing_time_ms,
+                "errors": result.errors if result.errors else None,
+                "warnings": result.warnings if result.warnings else None,
+            },
+        )
 
     def _validate_order(self, order: Order) -> List[str]:
         """Validate order data including v6.4.3 order ID format."""
@@ -625,21 +1142,90 @@ class SameDaySuitsAPI:
             warnings=[],
         )
 
-    def batch_process(self, orders: List[Order]) -> List[ProductionResult]:
-        """Process multiple orders in batch."""
+    def batch_process(
+        self,
+        orders: List[Order],
+        batch_markers: bool = False,
+        window_seconds: Optional[float] = None,
+        max_orders: Optional[int] = None,
+        pipelined: Optional[bool] = None,
+    ) -> List[ProductionResult]:
+        """
+        Process multiple orders in batch.
+
+        Args:
+            orders: Orders to process
+            batch_markers: Nest orders that share a fabric and arrived within
+                window_seconds of each other onto one shared marker
+            window_seconds: Batch time window (default: MARKER_BATCH_WINDOW_SECONDS)
+            max_orders: Max orders per shared marker (default: MARKER_BATCH_MAX_ORDERS)
+            pipelined: Process single orders concurrently through
+                process_orders_pipelined (default: BATCH_PIPELINE)
+
+        Returns:
+            One result per order, in input order
+        """
         results = []
 
         logger.info(f"Batch processing {len(orders)} orders")
 
-        for i, order in enumerate(orders, 1):
-            logger.info(f"Processing {i}/{len(orders)}: {order.order_id}")
-            result = self.process_order(order)
-            results.append(result)
+        if batch_markers:
+            groups = group_orders_for_markers(
+                orders,
+                key=lambda o: fabric_key(o, self.fabric_width_cm),
+                window_seconds=window_seconds,
+                max_orders=max_orders,
+            )
+            logger.info(f"Grouped into {len(groups)} markers")
+        else:
+            groups = [[order] for order in orders]
+
+        # Scale every single-order group's pattern up front, one pass per
+        # template (shared markers scale their own orders together)
+        singles = [group[0] for group in groups if len(group) == 1]
+        prepared = {
+            id(order): pattern
+            for order, pattern in zip(singles, self._prepare_patterns(singles))
+            if isinstance(pattern, PreparedPattern)
+        }
+
+        if pipelined is None:
+            pipelined = pipeline_enabled()
+        pipelined_results = {}
+        if pipelined and singles:
+            pipelined_results = {
+                id(order): result
+                for order, result in zip(
+                    singles, self.process_orders_pipelined(singles, prepared)
+                )
+            }
 
-            if result.success:
-                logger.info(f"  OK - {result.fabric_length_cm:.1f}cm fabric")
+        by_order = {}
+        for i, group in enumerate(groups, 1):
+            if id(group[0]) in pipelined_results:
+                group_results = [pipelined_results[id(group[0])]]
+            elif len(group) == 1:
+                logger.info(f"Processing {i}/{len(groups)}: {group[0].order_id}")
+                group_results = [
+                    self.process_order(group[0], prepared=prepared.get(id(group[0])))
+                ]
             else:
-                logger.error(f"  FAILED - {result.errors}")
+                logger.info(
+                    f"Processing {i}/{len(groups)}: shared marker for "
+                    f"{len(group)} orders"
+                )
+                group_results = self.process_marker_batch(group)
+
+            for order, result in zip(group, group_results):
+                by_order[id(order)] = result
+                if result.success:
+                    logger.info(
+                        f"  {order.order_id} OK - {result.fabric_length_cm:.1f}cm fabric"
+                    )
+                else:
+                    logger.error(f"  {order.order_id} FAILED - {result.errors}")
+
+        results = [by_order[id(order)] for order in orders]
 
         # Summary
         successful = sum(1 for r in results if r.success)
@@ -650,6 +1236,229 @@ class SameDaySuitsAPI:
 
         return results
 
+    def process_marker_batch(
+        self, orders: List[Order], cost_per_meter: Optional[float] = None
+    ) -> List[ProductionResult]:
+        """
+        Nest several orders' pieces together onto one shared marker.
+
+        All orders must share a fabric (see marker_batcher.fabric_key). One
+        PLT is written to output_dir/markers/<batch_id>/ with every piece
+        labelled "<order_id> n/N". Each order still gets its own metadata
+        file, with a "batch_marker" section holding its share of the marker
+        length (and cost, if a fabric price is set) by piece area.
+
+        Orders that fail validation or preparation get failure results; the
+        rest are still nested together.
+
+        Args:
+            orders: Orders to nest together
+            cost_per_meter: Fabric price (default: FABRIC_COST_PER_METER)
+
+        Returns:
+            One result per order, in input order
+        """
+        import time
+
+        start_time = time.time()
+        if cost_per_meter is None:
+            cost_per_meter = fabric_cost_per_meter()
+
+        results: List[Optional[ProductionResult]] = [None] * len(orders)
+        valid = []  # (index, order)
+
+        for i, order in enumerate(orders):
+            validation_errors = self._validate_order(order)
+            if validation_errors:
+                results[i] = self._create_failure_result(
+                    order, validation_errors, start_time
+                )
+                continue
+
+            self._update_order_status(order, "PROCESSING")
+            valid.append((i, order))
+
+        prepared = []  # (index, order, PreparedPattern)
+        patterns = self._prepare_patterns([order for _, order in valid])
+        for (i, order), pattern in zip(valid, patterns):
+            if isinstance(pattern, Exception):
+                logger.error(
+                    f"Error preparing order {order.order_id}: {pattern}",
+                    exc_info=pattern,
+                )
+                self._update_order_status(order, "ERROR")
+                results[i] = self._create_failure_result(
+                    order, [f"Processing error: {pattern}"], start_time
+                )
+            else:
+                prepared.append((i, order, pattern))
+
+        if prepared:
+            try:
+                self._nest_shared_marker(prepared, results, cost_per_meter, start_time)
+            except Exception as e:
+                logger.exception("Error nesting shared marker")
+                for i, order, _ in prepared:
+                    self._update_order_status(order, "ERROR")
+                    results[i] = self._create_failure_result(
+                        order, [f"Processing error: {e}"], start_time
+                    )
+
+        return results
+
+    def _nest_shared_marker(
+        self,
+        prepared: List[Tuple[int, Order, PreparedPattern]],
+        results: List[Optional[ProductionResult]],
+        cost_per_meter: Optional[float],
+        start_time: float,
+    ):
+        """Nest, plot and allocate a shared marker, filling in results."""
+        import time
+
+        order_ids = [order.order_id for _, order, _ in prepared]
+        batch_id = marker_batch_id(order_ids)
+
+        # Combine all pieces, remembering which order and piece each came from
+        all_contours = []
+        owners = []  # (position in prepared, piece number)
+        for k, (_, _, pattern) in enumerate(prepared):
+            for n, contour in enumerate(pattern.contours_cm, 1):
+                all_contours.append(contour)
+                owners.append((k, n))
+
+        logger.info(
+            f"Nesting shared marker {batch_id}: {len(prepared)} orders, "
+            f"{len(all_contours)} pieces"
+        )
+        nested_contours, nesting_result, fabric_width, roll = self._nest(
+            all_contours, prepared[0][1]
+        )
+
+        if not nesting_result.success:
+            for i, order, _ in prepared:
+                results[i] = self._create_failure_result(
+                    order, [f"Nesting failed: {nesting_result.message}"], start_time
+                )
+            return
+
+        logger.info(
+            f"Shared marker {batch_id}: {nesting_result.fabric_length:.1f} cm, "
+            f"{nesting_result.utilization:.1f}% utilization"
+        )
+
+        # Per-piece owners in nested order
+        nested_owners = [owners[p.piece_id] for p in nesting_result.pieces]
+        labels = []
+        order_contours = [[] for _ in prepared]
+        for contour, (k, n) in zip(nested_contours, nested_owners):
+            pattern = prepared[k][2]
+            labels.append(
+                piece_label(prepared[k][1].order_id, n, len(pattern.contours_cm))
+            )
+            order_contours[k].append(contour)
+
+        # One PLT for the whole marker
+        marker_dir = self.output_dir / "markers" / batch_id
+        marker_dir.mkdir(parents=True, exist_ok=True)
+        plt_file = marker_dir / f"{batch_id}.plt"
+
+        logger.info(f"Generating HPGL: {plt_file}")
+        generate_hpgl(
+            nested_contours,
+            str(plt_file),
+            fabric_width,
+            labels=labels,
+            bounds=nesting_bounds(nesting_result),
+        )
+        self._take_from_roll(roll, nesting_result.fabric_length)
+
+        # Split the marker length (and cost) by piece area
+        allocations = allocate_marker_cost(
+            {
+                order.order_id: [polygon_area(c.points) for c in pattern.contours_cm]
+                for _, order, pattern in prepared
+            },
+            nesting_result.fabric_length,
+            cost_per_meter,
+        )
+
+        marker_summary = {
+            "batch_id": batch_id,
+            "fabric_code": prepared[0][1].fabric_code,
+            "fabric_width_cm": fabric_width,
+            "roll": roll.to_dict() if roll else None,
+            "fabric_length_cm": nesting_result.fabric_length,
+            "utilization_percent": nesting_result.utilization,
+            "piece_count": len(all_contours),
+            "cost_per_meter": cost_per_meter,
+            "orders": [a.to_dict() for a in allocations],
+            "plt": str(plt_file),
+            "processed_at": datetime.now().isoformat(),
+        }
+        with open(marker_dir / f"{batch_id}_marker.json", "w") as f:
+            json.dump(marker_summary, f, indent=2)
+
+        for k, ((i, order, pattern), allocation) in enumerate(
+            zip(prepared, allocations)
+        ):
+            errors = []
+            warnings = list(pattern.warnings)
+            self._run_quality_control(
+                order, order_contours[k], nesting_result, errors, warnings
+            )
+
+            order_output_dir = self.output_dir / order.order_id
+            order_output_dir.mkdir(parents=True, exist_ok=True)
+            metadata_file = order_output_dir / f"{order.order_id}_metadata.json"
+
+            order_metadata = {
+                "order": asdict(order),
+                "production": {
+                    "template": pattern.template_path.name,
+                    "piece_count": len(pattern.contours_cm),
+                    "fabric_width_cm": fabric_width,
+                    "fabric_length_cm": allocation.allocated_length_cm,
+                    "utilization_percent": nesting_result.utilization,
+                    "nesting_applied": True,
+                    "scaling": self._scaling_metadata(pattern),
+                },
+                "batch_marker": {
+                    "batch_id": batch_id,
+                    "roll_id": roll.roll.roll_id if roll else None,
+                    "order_ids": order_ids,
+                    "marker_length_cm": nesting_result.fabric_length,
+                    "piece_labels": [
+                        piece_label(order.order_id, n, len(pattern.contours_cm))
+                        for n in range(1, len(pattern.contours_cm) + 1)
+                    ],
+                    **allocation.to_dict(),
+                },
+                "files": {
+                    "plt": str(plt_file),
+                },
+                "processed_at": datetime.now().isoformat(),
+            }
+            self._write_order_metadata(order, order_metadata, metadata_file)
+
+            result = ProductionResult(
+                success=True,
+                order_id=order.order_id,
+                plt_file=plt_file,
+                metadata_file=metadata_file,
+                fabric_length_cm=allocation.allocated_length_cm,
+                fabric_utilization=nesting_result.utilization,
+                piece_count=len(pattern.contours_cm),
+                processing_time_ms=(time.time() - start_time) * 1000,
+                errors=errors,
+                warnings=warnings,
+                batch_id=batch_id,
+                fabric_width_cm=fabric_width,
+                roll_id=roll.roll.roll_id if roll else None,
+            )
+            self._record_success(order, result)
+            results[i] = result
+
 
 def main():
     """CLI entry point."""
@@ -668,6 +1477,12 @@ Examples:
   
   # Process from JSON file
   python samedaysuits_api.py --json orders.json
+
+  # Process from JSON file, sharing markers between orders on the same fabric
+  python samedaysuits_api.py --json orders.json --batch-markers
+
+  # Pick the roll (width or remnant) with the least waste for each order
+  python samedaysuits_api.py --json orders.json --rolls rolls.json
         """,
     )
 
@@ -686,15 +1501,28 @@ Examples:
     parser.add_argument("--waist", type=float, help="Waist measurement (cm)")
     parser.add_argument("--hip", type=float, help="Hip measurement (cm)")
     parser.add_argument("--json", type=Path, help="Process orders from JSON file")
+    parser.add_argument(
+        "--batch-markers",
+        action="store_true",
+        help="Nest JSON orders sharing a fabric onto shared markers",
+    )
     parser.add_argument(
         "--list-templates", action="store_true", help="List available templates"
     )
     parser.add_argument("--output", type=Path, help="Output directory")
+    parser.add_argument(
+        "--rolls",
+        type=Path,
+        help="Roll inventory JSON to nest against (default: ROLL_INVENTORY_PATH)",
+    )
 
     args = parser.parse_args()
 
     # Initialize API
-    api = SameDaySuitsAPI(output_dir=args.output)
+    api = SameDaySuitsAPI(
+        output_dir=args.output,
+        roll_inventory=RollInventory.load(args.rolls) if args.rolls else None,
+    )
 
     if args.list_templates:
         print("\nAvailable Templates:")
@@ -722,10 +1550,12 @@ Examples:
                         waist_cm=od["measurements"]["waist"],
                         hip_cm=od["measurements"]["hip"],
                     ),
+                    fabric_code=od.get("fabric_code", ""),
+                    fabric_width_cm=od.get("fabric_width_cm"),
                 )
             )
 
-        results = api.batch_process(orders)
+        results = api.batch_process(orders, batch_markers=args.batch_markers)
 
         # Print summary
         print("\n" + "=" * 60)
@@ -733,7 +1563,12 @@ Examples:
         print("=" * 60)
         for r in results:
             status = "OK" if r.success else "FAILED"
-            print(f"  {r.order_id}: [{status}] {r.fabric_length_cm:.1f}cm fabric")
+            marker = f" (marker {r.batch_id})" if r.batch_id else ""
+            roll = f" from roll {r.roll_id}" if r.roll_id else ""
+            print(
+                f"  {r.order_id}: [{status}] {r.fabric_length_cm:.1f}cm fabric"
+                f"{roll}{marker}"
+            )
 
     elif args.order and args.garment:
         # Single order from command line
@@ -759,6 +1594,10 @@ Examples:
             print(f"ORDER {result.order_id} - SUCCESS")
             print(f"  PLT file: {result.plt_file}")
             print(f"  Fabric needed: {result.fabric_length_cm:.1f} cm")
+            if result.roll_id:
+                print(
+                    f"  Roll: {result.roll_id} ({result.fabric_width_cm:.1f} cm wide)"
+                )
             print(f"  Utilization: {result.fabric_utilization:.1f}%")
             print(f"  Processing time: {result.processing_time_ms:.0f}ms")
         else:
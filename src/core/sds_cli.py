@@ -13,6 +13,7 @@ Commands:
     db         - Database operations (sync orders from Supabase)
     serve      - Start web API server
     test       - Run pipeline test
+    bench      - Benchmark nesting engines against a baseline
 
 Examples:
     # Process a single order
@@ -21,6 +22,9 @@ Examples:
     # Process batch from JSON
     sds batch orders.json
 
+    # Process batch, sharing markers between orders on the same fabric
+    sds batch orders.json --batch-markers
+
     # Show queue status
     sds queue status
 
@@ -38,6 +42,10 @@ Examples:
     # Start web server
     sds serve --port 8000
 
+    # Benchmark nesting engines (exit code 1 on regressions)
+    sds bench nesting --engines shelf,skyline,turbo --scales 0.9,1.0,1.1
+    sds bench nesting --save-baseline
+
 Author: Claude
 Date: 2026-01-30
 """
@@ -146,10 +154,12 @@ def cmd_batch(args):
                     waist_cm=od["measurements"]["waist"],
                     hip_cm=od["measurements"]["hip"],
                 ),
+                fabric_code=od.get("fabric_code", ""),
+                fabric_width_cm=od.get("fabric_width_cm"),
             )
         )
 
-    results = api.batch_process(orders)
+    results = api.batch_process(orders, batch_markers=args.batch_markers)
 
     # Summary
     print("\n" + "=" * 60)
@@ -161,7 +171,8 @@ def cmd_batch(args):
 
     for r in results:
         status = "OK" if r.success else "FAILED"
-        print(f"  {r.order_id}: [{status}] {r.fabric_length_cm:.1f}cm")
+        marker = f" (marker {r.batch_id})" if r.batch_id else ""
+        print(f"  {r.order_id}: [{status}] {r.fabric_length_cm:.1f}cm{marker}")
 
     print("-" * 60)
     print(f"Success: {successful}/{len(results)}")
@@ -244,6 +255,16 @@ def cmd_templates(args):
         print(f"  {garment:12} [{status}]")
     print("=" * 40)
 
+    if args.compile:
+        from template_store import get_template_store
+
+        compiled = api.compile_templates()
+        store = get_template_store()
+        print(f"\nCompiled templates ({store.directory}):")
+        for filename, sha256 in compiled.items():
+            print(f"  {filename:28} {sha256[:12]}")
+        print(f"  {store.get_stats()}")
+
     return 0
 
 
@@ -453,6 +474,79 @@ def cmd_test(args):
     return 0 if tests_passed == tests_total else 1
 
 
+def cmd_bench(args):
+    """Benchmark nesting engines and compare against the stored baseline."""
+    sys.path.insert(0, str(Path(__file__).resolve().parent.parent / "nesting"))
+    from nesting_benchmark import (
+        available_engines,
+        build_corpus,
+        run_benchmark,
+        save_report,
+        load_report,
+        compare_to_baseline,
+        default_baseline_path,
+        format_report,
+        time_saved,
+    )
+
+    engines = args.engines.split(",") if args.engines else available_engines()
+    templates = args.templates.split(",") if args.templates else None
+    scales = [float(s) for s in args.scales.split(",")]
+
+    corpus = build_corpus(scales=scales, templates=templates)
+    if not corpus:
+        print("Error: no templates matched the corpus selection")
+        return 1
+
+    print(f"Benchmarking {len(engines)} engines on {len(corpus)} cases...")
+    report = run_benchmark(
+        corpus,
+        engines=engines,
+        seed=args.seed,
+        time_budget=args.time_budget,
+        run_timeout=args.timeout,
+        simplify_tolerance=args.simplify,
+        progress=lambda r: print(
+            f"  {r['case']:<14}{r['engine']:<12}{r.get('status')}"
+        ),
+    )
+
+    print("\n" + format_report(report))
+
+    if args.output:
+        save_report(report, args.output)
+        print(f"\nReport: {args.output}")
+
+    baseline_path = args.baseline or default_baseline_path()
+    if args.save_baseline:
+        save_report(report, baseline_path)
+        print(f"Baseline saved: {baseline_path}")
+        return 0
+
+    baseline = load_report(baseline_path)
+    if baseline is None:
+        print(f"No baseline at {baseline_path} (use --save-baseline to create one)")
+        return 0
+
+    regressions = compare_to_baseline(report, baseline)
+    print("\n" + "=" * 60)
+    if args.simplify:
+        saved = time_saved(report, baseline)
+        print(
+            f"Simplification ({args.simplify} cm) saved {saved['saved_s']:.2f}s "
+            f"({saved['saved_percent']:+.1f}%) over {saved['runs']} runs"
+        )
+    if regressions:
+        print(f"REGRESSIONS vs {baseline_path}: {len(regressions)}")
+        for regression in regressions:
+            print(f"  {regression}")
+    else:
+        print(f"No regressions vs {baseline_path}")
+    print("=" * 60)
+
+    return 1 if regressions else 0
+
+
 def cmd_monitor(args):
     """Handle monitor command."""
     try:
@@ -939,6 +1033,7 @@ Examples:
   sds templates
   sds sizes --template tee
   sds test
+  sds bench nesting --engines shelf,skyline
   sds monitor status
   sds monitor dashboard
   sds qc report --order ORD-001
@@ -976,6 +1071,11 @@ Examples:
     # Batch command
     batch_parser = subparsers.add_parser("batch", help="Process batch orders")
     batch_parser.add_argument("file", type=Path, help="JSON file with orders")
+    batch_parser.add_argument(
+        "--batch-markers",
+        action="store_true",
+        help="Nest orders sharing a fabric onto shared markers",
+    )
     batch_parser.set_defaults(func=cmd_batch)
 
     # Queue command
@@ -987,6 +1087,11 @@ Examples:
 
     # Templates command
     templates_parser = subparsers.add_parser("templates", help="List templates")
+    templates_parser.add_argument(
+        "--compile",
+        action="store_true",
+        help="Compile templates into the template store (changed files only)",
+    )
     templates_parser.set_defaults(func=cmd_templates)
 
     # Sizes command
@@ -1003,6 +1108,48 @@ Examples:
     test_parser = subparsers.add_parser("test", help="Run pipeline test")
     test_parser.set_defaults(func=cmd_test)
 
+    # Bench command
+    bench_parser = subparsers.add_parser("bench", help="Benchmark nesting engines")
+    bench_parser.add_argument("action", choices=["nesting"], help="What to benchmark")
+    bench_parser.add_argument(
+        "--engines", help="Comma-separated engines (default: all available)"
+    )
+    bench_parser.add_argument(
+        "--templates",
+        help="Comma-separated templates, e.g. tee,jacket (default: all)",
+    )
+    bench_parser.add_argument(
+        "--scales", default="0.9,1.0,1.1", help="Comma-separated scale factors"
+    )
+    bench_parser.add_argument("--seed", type=int, default=42, help="Random seed")
+    bench_parser.add_argument(
+        "--time-budget",
+        type=float,
+        default=30.0,
+        help="Timeout handed to engines that take one (s)",
+    )
+    bench_parser.add_argument(
+        "--timeout", type=float, default=300.0, help="Hard limit per run (s)"
+    )
+    bench_parser.add_argument(
+        "--simplify",
+        type=float,
+        default=0.0,
+        help="Nest simplified hulls at this tolerance (cm); reports time saved",
+    )
+    bench_parser.add_argument("--output", type=Path, help="Write the report JSON here")
+    bench_parser.add_argument(
+        "--baseline",
+        type=Path,
+        help="Baseline JSON (default: benchmarks/nesting_baseline.json)",
+    )
+    bench_parser.add_argument(
+        "--save-baseline",
+        action="store_true",
+        help="Store this run as the baseline instead of comparing",
+    )
+    bench_parser.set_defaults(func=cmd_bench)
+
     # Database command
     db_parser = subparsers.add_parser("db", help="Database operations")
     db_parser.add_argument(
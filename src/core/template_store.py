@@ -0,0 +1,621 @@
+#!/usr/bin/env python3
+"""
+Precompiled Template Store
+
+process_order, generate_for_size and extract_graded_info all start from the
+same four PDS files, and each call used to redo the XML work: find the XML,
+read GEOM_INFO, parse the SVG polygons and transform them to cm. Even with
+the parse-once PDSTemplate (pds_loader) every process still parses each
+file and rebuilds Contour objects per order.
+
+This module compiles each template once into a NumPy .npz artifact:
+
+    svg_coords / offsets     every cutting contour, concatenated (SVG units)
+    cm_coords                the same contours in cm for COMPILED_BASE_SIZE,
+                             exactly what transform_to_cm produced
+    closed / fill / stroke   per-contour flags and colors
+    piece_* / size_names     piece identity and the size axis
+    geom                     pieces x sizes x (SIZE_X, SIZE_Y, AREA,
+                             PERIMETER), NaN where a piece lacks a size
+    header                   source path, mtime, size, SHA-256, format
+                             version, view metadata, base size, filename
+
+Compiled templates are cached in three tiers, all keyed by the source
+file's SHA-256 (so an edited template misses everywhere and copies of one
+file share an entry):
+
+    L1  in-process LRU of CompiledTemplate objects - workers keep their hot
+        templates resident
+    L2  <sha256>.npz in TEMPLATE_STORE_DIR, which workers can share
+    L3  Redis via scalability.cache_manager.TemplateCache (optional)
+
+A file is re-hashed only when its mtime or size changes. Artifacts are
+loaded without pickling.
+
+Usage:
+    store = get_template_store()
+    store.compile_all(template_paths)              # startup
+    compiled = store.load("Basic Tee_2D.PDS")
+    contours = compiled.contours_cm()              # Small, in cm
+    graded = compiled.graded_pattern()             # GradedPattern
+    pieces = compiled.piece_dimensions("Small")    # extract_piece_dimensions
+
+Environment:
+    TEMPLATE_STORE_ENABLED         - "0" makes process_order /
+                                     extract_graded_info parse the PDS
+                                     directly (default "1")
+    TEMPLATE_STORE_DIR             - L2 artifact directory
+                                     (default: <tmp>/sds_template_store)
+    TEMPLATE_CACHE_MEMORY_ENTRIES  - L1 size (default 32)
+    TEMPLATE_CACHE_REDIS           - "0" / "1" forces the L3 tier off / on
+                                     (default: on when REDIS_URL is set)
+
+Author: Claude
+Date: 2026-02-02
+"""
+
+import io
+import os
+import json
+import hashlib
+import logging
+import tempfile
+import threading
+from collections import OrderedDict
+from dataclasses import dataclass, replace
+from pathlib import Path
+from typing import Any, Dict, Iterable, List, Optional, Tuple, Union
+
+import numpy as np
+
+from pds_loader import PDSTemplate, load_pds_template
+from production_pipeline import (
+    Contour,
+    Point,
+    cm_scale,
+    extract_piece_dimensions,
+    extract_svg_geometry,
+)
+from contour_array import ContourArray  # after production_pipeline adds src/nesting
+from graded_size_extractor import GradedPattern, PieceInfo, SizeInfo
+
+# Redis L3 tier (scalability.cache_manager); optional
+try:
+    from scalability.cache_manager import TemplateCache
+
+    REDIS_TIER_AVAILABLE = True
+except ImportError:
+    try:
+        from cache_manager import TemplateCache
+
+        REDIS_TIER_AVAILABLE = True
+    except ImportError:
+        REDIS_TIER_AVAILABLE = False
+
+logger = logging.getLogger(__name__)
+
+# Bump when the artifact layout changes so old artifacts are recompiled
+STORE_VERSION = 2
+# Base size whose GEOM_INFO sets the SVG -> cm transform in process_order
+COMPILED_BASE_SIZE = "Small"
+DEFAULT_STORE_DIRNAME = "sds_template_store"
+DEFAULT_MEMORY_ENTRIES = 32
+GEOM_FIELDS = ("size_x", "size_y", "area", "perimeter")
+
+
+def template_store_enabled() -> bool:
+    """Whether callers should use compiled templates (TEMPLATE_STORE_ENABLED)."""
+    return os.getenv("TEMPLATE_STORE_ENABLED", "1").lower() not in ("0", "false", "no")
+
+
+def store_dir() -> Path:
+    """Artifact directory from the environment."""
+    value = os.getenv("TEMPLATE_STORE_DIR")
+    return Path(value) if value else Path(tempfile.gettempdir()) / DEFAULT_STORE_DIRNAME
+
+
+def memory_entries() -> int:
+    """Compiled templates kept in process (TEMPLATE_CACHE_MEMORY_ENTRIES)."""
+    return int(os.getenv("TEMPLATE_CACHE_MEMORY_ENTRIES", DEFAULT_MEMORY_ENTRIES))
+
+
+def redis_tier_enabled() -> bool:
+    """
+    Whether to use Redis as the L3 tier: when REDIS_URL is set, unless
+    TEMPLATE_CACHE_REDIS=0.
+    """
+    if not REDIS_TIER_AVAILABLE:
+        return False
+    setting = os.getenv("TEMPLATE_CACHE_REDIS", "").lower()
+    if setting in ("0", "false", "no"):
+        return False
+    return setting in ("1", "true", "yes") or bool(os.getenv("REDIS_URL"))
+
+
+def file_sha256(path: Path) -> str:
+    digest = hashlib.sha256()
+    with open(path, "rb") as f:
+        for block in iter(lambda: f.read(1 << 20), b""):
+            digest.update(block)
+    return digest.hexdigest()
+
+
+@dataclass
+class CompiledTemplate:
+    """One PDS template as arrays, ready for process_order and the size tools."""
+
+    header: Dict
+    svg_coords: np.ndarray
+    cm_coords: np.ndarray
+    offsets: np.ndarray  # Contour i is coords[offsets[i]:offsets[i + 1]]
+    closed: np.ndarray
+    fill: np.ndarray
+    stroke: np.ndarray
+    piece_names: np.ndarray
+    piece_ids: np.ndarray
+    piece_materials: np.ndarray
+    size_names: np.ndarray
+    geom: np.ndarray  # pieces x sizes x GEOM_FIELDS
+
+    @property
+    def name(self) -> str:
+        return self.header["filename"]
+
+    @property
+    def source_sha256(self) -> str:
+        return self.header["source_sha256"]
+
+    @property
+    def metadata(self) -> Dict:
+        """View metadata as returned by extract_svg_geometry."""
+        return self.header["metadata"]
+
+    def __len__(self) -> int:
+        return len(self.offsets) - 1
+
+    def _contours(self, coords: np.ndarray, as_arrays: bool) -> List:
+        contours = []
+        for i in range(len(self)):
+            contour = ContourArray(
+                coords[self.offsets[i] : self.offsets[i + 1]],
+                closed=bool(self.closed[i]),
+                fill_color=str(self.fill[i]),
+                stroke_color=str(self.stroke[i]),
+            )
+            contours.append(
+                contour if as_arrays else contour.to_contour(Contour, Point)
+            )
+        return contours
+
+    def svg_contours(self, as_arrays: bool = False) -> List:
+        """Cutting contours in SVG units (extract_svg_geometry output)."""
+        return self._contours(self.svg_coords, as_arrays)
+
+    def contours_cm(
+        self, base_size: str = COMPILED_BASE_SIZE, as_arrays: bool = False
+    ) -> List:
+        """
+        Cutting contours in cm, scaled by base_size's GEOM_INFO totals
+        (transform_to_cm output). COMPILED_BASE_SIZE is stored precomputed.
+        """
+        if base_size == self.header["base_size_cm"]:
+            return self._contours(self.cm_coords, as_arrays)
+        coords = _to_cm(
+            self.svg_coords, self.metadata, self.piece_dimensions(base_size)
+        )
+        return self._contours(coords, as_arrays)
+
+    def piece_dimensions(self, base_size: str = COMPILED_BASE_SIZE) -> Dict[str, Dict]:
+        """Per-piece GEOM_INFO for one size (extract_piece_dimensions output)."""
+        sizes = self.size_names.tolist()
+        if base_size not in sizes:
+            return {}
+        column = self.geom[:, sizes.index(base_size), :]
+        pieces = {}
+        for name, values in zip(self.piece_names.tolist(), column.tolist()):
+            if not np.isnan(values[0]):
+                pieces[name] = dict(zip(GEOM_FIELDS, values))
+        return pieces
+
+    def graded_pattern(self) -> GradedPattern:
+        """Size table and per-piece sizes (extract_graded_info output)."""
+        sizes = self.size_names.tolist()
+        pieces = {}
+        for name, unique_id, material, row in zip(
+            self.piece_names.tolist(),
+            self.piece_ids.tolist(),
+            self.piece_materials.tolist(),
+            self.geom.tolist(),
+        ):
+            if not name:
+                continue
+            pieces[name] = PieceInfo(
+                name=name,
+                unique_id=unique_id,
+                material=material,
+                sizes={
+                    size: SizeInfo(size, *values)
+                    for size, values in zip(sizes, row)
+                    if not np.isnan(values[0])
+                },
+            )
+        return GradedPattern(
+            filename=self.header["filename"],
+            available_sizes=list(self.header["available_sizes"]),
+            base_size=self.header["base_size"],
+            pieces=pieces,
+        )
+
+    def to_bytes(self) -> bytes:
+        """The .npz artifact."""
+        buffer = io.BytesIO()
+        np.savez(
+            buffer,
+            header=np.array(json.dumps(self.header)),
+            svg_coords=self.svg_coords,
+            cm_coords=self.cm_coords,
+            offsets=self.offsets,
+            closed=self.closed,
+            fill=self.fill,
+            stroke=self.stroke,
+            piece_names=self.piece_names,
+            piece_ids=self.piece_ids,
+            piece_materials=self.piece_materials,
+            size_names=self.size_names,
+            geom=self.geom,
+        )
+        return buffer.getvalue()
+
+    @classmethod
+    def from_bytes(cls, data) -> "CompiledTemplate":
+        with np.load(io.BytesIO(data), allow_pickle=False) as arrays:
+            fields = {name: arrays[name] for name in arrays.files}
+        header = json.loads(str(fields.pop("header")))
+        return cls(header=header, **fields)
+
+    def save(self, path: Path):
+        """Write the artifact atomically."""
+        path.parent.mkdir(parents=True, exist_ok=True)
+        tmp = path.with_name(path.name + f".{os.getpid()}.tmp")
+        tmp.write_bytes(self.to_bytes())
+        tmp.replace(path)
+
+    @classmethod
+    def read(cls, path: Path) -> "CompiledTemplate":
+        return cls.from_bytes(Path(path).read_bytes())
+
+    def for_source(self, path: Path) -> "CompiledTemplate":
+        """The same arrays, named after another file with this content."""
+        if self.header["source_path"] == str(path):
+            return self
+        header = {**self.header, "source_path": str(path), "filename": path.name}
+        return replace(self, header=header)
+
+
+def _to_cm(svg_coords: np.ndarray, metadata: Dict, pieces: Dict[str, Dict]):
+    """transform_to_cm's scale, applied to the concatenated coordinates."""
+    total_width = sum(p["size_x"] for p in pieces.values())
+    total_height = max(p["size_y"] for p in pieces.values()) if pieces else 0
+    return svg_coords * np.array(cm_scale(metadata, total_width, total_height))
+
+
+def _text_array(values: Iterable[str]) -> np.ndarray:
+    values = list(values)
+    return np.array(values, dtype=str) if values else np.array([], dtype="<U1")
+
+
+def compile_template(
+    source: Union[str, Path, PDSTemplate], source_sha256: Optional[str] = None
+) -> CompiledTemplate:
+    """Compile a PDS file (or parsed template) into arrays."""
+    template = load_pds_template(source)
+    root = template.root
+
+    contours, metadata = extract_svg_geometry(
+        template, cutting_contours_only=True, as_arrays=True
+    )
+    lengths = [len(contour.coords) for contour in contours]
+    offsets = np.zeros(len(contours) + 1, dtype=np.int64)
+    np.cumsum(lengths, out=offsets[1:])
+    svg_coords = (
+        np.concatenate([contour.coords for contour in contours])
+        if contours
+        else np.empty((0, 2))
+    )
+    cm_coords = _to_cm(
+        svg_coords, metadata, extract_piece_dimensions(template, COMPILED_BASE_SIZE)
+    )
+
+    # Size table, as extract_graded_info reads it
+    available_sizes = [
+        size.findtext("NAME")
+        for size in root.findall("SIZES_TABLE/SIZE")
+        if size.findtext("NAME")
+    ]
+    base_size = root.findtext(".//SIZES_TABLE/BASE_SIZE/NAME") or "Small"
+
+    # Piece x size GEOM_INFO table (pieces without a NAME are skipped, like
+    # extract_piece_dimensions; later duplicates win, as in both extractors)
+    pieces = [piece for piece in root.iter("PIECE") if piece.find("NAME") is not None]
+    size_axis: List[str] = []
+    rows = []
+    for piece in pieces:
+        row = {}
+        for size in piece.findall("SIZE"):
+            name = size.findtext("NAME")
+            geom = size.find("GEOM_INFO")
+            if not name or geom is None:
+                continue
+            if name not in size_axis:
+                size_axis.append(name)
+            row[name] = [float(geom.get(key.upper(), 0)) for key in GEOM_FIELDS]
+        rows.append(row)
+    geom = np.full((len(pieces), len(size_axis), len(GEOM_FIELDS)), np.nan)
+    for i, row in enumerate(rows):
+        for name, values in row.items():
+            geom[i, size_axis.index(name)] = values
+
+    stat = template.path.stat()
+    header = {
+        "version": STORE_VERSION,
+        "source_path": str(template.path),
+        "source_mtime_ns": template.mtime_ns,
+        "source_size": template.size_bytes,
+        "source_sha256": source_sha256 or file_sha256(template.path),
+        "filename": template.name,
+        "available_sizes": available_sizes,
+        "base_size": base_size,
+        "base_size_cm": COMPILED_BASE_SIZE,
+        "metadata": metadata,
+    }
+    if (stat.st_mtime_ns, stat.st_size) != (template.mtime_ns, template.size_bytes):
+        logger.warning(f"{template.name} changed while compiling")
+
+    return CompiledTemplate(
+        header=header,
+        svg_coords=svg_coords,
+        cm_coords=cm_coords,
+        offsets=offsets,
+        closed=np.array([contour.closed for contour in contours], dtype=bool),
+        fill=_text_array(contour.fill_color for contour in contours),
+        stroke=_text_array(contour.stroke_color for contour in contours),
+        piece_names=_text_array(piece.findtext("NAME") or "" for piece in pieces),
+        piece_ids=_text_array(piece.findtext("UNIQUE_ID") or "" for piece in pieces),
+        piece_materials=_text_array(
+            piece.findtext("MATERIAL") or "" for piece in pieces
+        ),
+        size_names=_text_array(size_axis),
+        geom=geom,
+    )
+
+
+class TemplateStore:
+    """
+    Compiled templates in three tiers, all keyed by the source's SHA-256:
+
+        L1  in-process LRU of CompiledTemplate objects
+        L2  <sha256>.npz artifacts in a directory workers can share
+        L3  Redis (scalability.cache_manager.TemplateCache), optional
+
+    A lookup hashes the PDS (only when its mtime or size changed since the
+    last lookup), so an edited template is a miss in every tier and copies
+    of one file share a single entry. Tiers that fail (unwritable directory,
+    Redis down) are skipped.
+    """
+
+    def __init__(
+        self,
+        directory: Optional[Path] = None,
+        persistent: bool = True,
+        max_memory_entries: Optional[int] = None,
+        redis_cache: Optional[Any] = None,
+    ):
+        """
+        Initialize template store.
+
+        Args:
+            directory: Artifact directory (defaults to env var or the temp directory)
+            persistent: Use the on-disk tier
+            max_memory_entries: Size of the in-process LRU tier
+            redis_cache: TemplateCache for the L3 tier (default: connect when
+                REDIS_URL is set, see redis_tier_enabled)
+        """
+        self.directory = Path(directory) if directory else store_dir()
+        self.persistent = persistent
+        self.max_memory_entries = max_memory_entries or memory_entries()
+        self._redis = redis_cache
+        self._redis_checked = redis_cache is not None
+
+        self._memory: "OrderedDict[str, CompiledTemplate]" = OrderedDict()
+        self._sources: Dict[str, Tuple[int, int, str]] = {}  # path -> mtime, size, sha
+        self._lock = threading.RLock()
+        self._stats = {
+            "hits": 0,
+            "disk_hits": 0,
+            "redis_hits": 0,
+            "compiles": 0,
+            "hashes": 0,
+            "evictions": 0,
+            "disk_errors": 0,
+        }
+
+    # ------------------------------------------------------------------
+    # Content hashes
+    # ------------------------------------------------------------------
+
+    def source_hash(self, pds_path: Union[str, Path]) -> str:
+        """SHA-256 of a PDS file, re-hashed only when its mtime or size changes."""
+        path = Path(pds_path)
+        key = str(path.resolve())
+        stat = path.stat()
+        with self._lock:
+            known = self._sources.get(key)
+        if known and known[:2] == (stat.st_mtime_ns, stat.st_size):
+            return known[2]
+
+        sha = file_sha256(path)
+        with self._lock:
+            self._sources[key] = (stat.st_mtime_ns, stat.st_size, sha)
+            self._stats["hashes"] += 1
+        if known and known[2] != sha:
+            logger.info(f"Template {path.name} changed ({known[2][:12]} -> {sha[:12]})")
+        return sha
+
+    # ------------------------------------------------------------------
+    # Tiers
+    # ------------------------------------------------------------------
+
+    def artifact_path(self, pds_path: Union[str, Path]) -> Path:
+        """L2 artifact file for a template's current content."""
+        return self.directory / f"{self.source_hash(pds_path)}.npz"
+
+    def _memory_put(self, sha: str, compiled: CompiledTemplate):
+        self._memory[sha] = compiled
+        self._memory.move_to_end(sha)
+        while len(self._memory) > self.max_memory_entries:
+            self._memory.popitem(last=False)
+            self._stats["evictions"] += 1
+
+    def _disk_get(self, sha: str) -> Optional[CompiledTemplate]:
+        artifact = self.directory / f"{sha}.npz"
+        if not self.persistent or not artifact.exists():
+            return None
+        try:
+            compiled = CompiledTemplate.read(artifact)
+        except (OSError, ValueError, KeyError) as e:
+            logger.warning(f"Unreadable template artifact {artifact}: {e}")
+            return None
+        return compiled if compiled.header.get("version") == STORE_VERSION else None
+
+    def _disk_put(self, sha: str, compiled: CompiledTemplate):
+        if not self.persistent:
+            return
+        try:
+            compiled.save(self.directory / f"{sha}.npz")
+        except OSError as e:
+            self._stats["disk_errors"] += 1
+            logger.warning(f"Could not write template artifact {sha[:12]}: {e}")
+
+    def _redis_tier(self):
+        if not self._redis_checked:
+            self._redis_checked = True
+            if redis_tier_enabled():
+                self._redis = TemplateCache()
+        return self._redis
+
+    def _redis_get(self, sha: str) -> Optional[CompiledTemplate]:
+        redis = self._redis_tier()
+        data = redis.get_compiled(sha) if redis is not None else None
+        if not data:
+            return None
+        try:
+            compiled = CompiledTemplate.from_bytes(data)
+        except (OSError, ValueError, KeyError) as e:
+            logger.warning(f"Unreadable template artifact {sha[:12]} in Redis: {e}")
+            return None
+        return compiled if compiled.header.get("version") == STORE_VERSION else None
+
+    def _redis_put(self, sha: str, compiled: CompiledTemplate):
+        redis = self._redis_tier()
+        if redis is not None:
+            redis.set_compiled(sha, compiled.to_bytes())
+
+    # ------------------------------------------------------------------
+    # Lookup
+    # ------------------------------------------------------------------
+
+    def load(self, pds_path: Union[str, Path], force: bool = False) -> CompiledTemplate:
+        """
+        The compiled template for a PDS file: from memory, then disk, then
+        Redis, compiling it (and filling every tier) on a miss.
+        """
+        path = Path(pds_path)
+        sha = self.source_hash(path)
+
+        with self._lock:
+            compiled = None if force else self._memory.get(sha)
+            if compiled is not None:
+                self._memory.move_to_end(sha)
+                self._stats["hits"] += 1
+                return compiled.for_source(path)
+
+            compiled = None if force else self._disk_get(sha)
+            if compiled is not None:
+                self._stats["disk_hits"] += 1
+            else:
+                compiled = None if force else self._redis_get(sha)
+                if compiled is not None:
+                    self._stats["redis_hits"] += 1
+                else:
+                    compiled = compile_template(path, source_sha256=sha)
+                    self._stats["compiles"] += 1
+                    logger.info(
+                        f"Compiled template {path.name}: {len(compiled)} contours, "
+                        f"{len(compiled.piece_names)} pieces"
+                    )
+                    self._redis_put(sha, compiled)
+                self._disk_put(sha, compiled)
+
+            self._memory_put(sha, compiled)
+            return compiled.for_source(path)
+
+    def compile_all(self, pds_paths: Iterable[Union[str, Path]]) -> Dict[str, str]:
+        """Load (compiling if needed) every existing template; name -> SHA-256."""
+        compiled = {}
+        for pds_path in pds_paths:
+            path = Path(pds_path)
+            if not path.exists():
+                continue
+            try:
+                compiled[path.name] = self.load(path).source_sha256
+            except (OSError, ValueError) as e:
+                logger.warning(f"Could not compile template {path.name}: {e}")
+        return compiled
+
+    def is_resident(self, pds_path: Union[str, Path]) -> bool:
+        """Whether a template's current content is in the in-process tier."""
+        return self.source_hash(pds_path) in self._memory
+
+    def clear_memory(self):
+        with self._lock:
+            self._memory.clear()
+            self._sources.clear()
+
+    def get_stats(self) -> Dict:
+        with self._lock:
+            lookups = sum(
+                self._stats[name]
+                for name in ("hits", "disk_hits", "redis_hits", "compiles")
+            )
+            return {
+                **self._stats,
+                "loaded": len(self._memory),
+                "memory_hit_rate_percent": round(
+                    self._stats["hits"] / lookups * 100 if lookups else 0.0, 1
+                ),
+                "redis_available": bool(self._redis and self._redis.is_available),
+            }
+
+
+def compiled_template(source) -> Optional[CompiledTemplate]:
+    """
+    The compiled template for a path (None when the store is disabled or
+    source is a parsed PDSTemplate, so the caller reads the XML instead).
+    """
+    if isinstance(source, CompiledTemplate):
+        return source
+    if isinstance(source, PDSTemplate) or not template_store_enabled():
+        return None
+    return get_template_store().load(source)
+
+
+# Singleton instance for convenience
+_template_store: Optional[TemplateStore] = None
+
+
+def get_template_store() -> TemplateStore:
+    """Get or create the process-wide template store."""
+    global _template_store
+    if _template_store is None:
+        _template_store = TemplateStore()
+    return _template_store
@@ -253,9 +253,10 @@ class ProductionPipelineV6_4_3:
         import sys
 
         sys.path.insert(0, str(Path(__file__).parent))
-        from production_pipeline import extract_xml_from_pds, extract_svg_geometry
+        from production_pipeline import extract_svg_geometry
         from pattern_scaler import calculate_pattern_scale, scale_contours
         from graded_size_extractor import extract_graded_info
+        from pds_loader import load_pds_template
 
         garment_type = order_data.get("garment_type", "jacket")
         measurements = order_data.get("measurements", {})
@@ -275,8 +276,11 @@ class ProductionPipelineV6_4_3:
             return create_sample_pieces(order_data.get("order_id"))
 
         try:
+            # Parse the PDS once for both the size table and the geometry
+            template = load_pds_template(pds_path)
+
             # Extract graded sizes
-            graded_sizes = extract_graded_info(str(pds_path))
+            graded_sizes = extract_graded_info(template)
 
             # Select best size
             from pattern_scaler import PatternScaler
@@ -288,8 +292,7 @@ class ProductionPipelineV6_4_3:
             scales = scaler.calculate_scales(measurements, base_size)
 
             # Extract and scale contours
-            # Note: This is simplified - real implementation would parse PDS XML
-            contours = extract_svg_geometry(str(pds_path).replace(".PDS", ".svg"))
+            contours, _ = extract_svg_geometry(template)
             scaled_contours = scale_contours(
                 contours, scales["scale_x"], scales["scale_y"]
             )
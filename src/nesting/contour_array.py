@@ -0,0 +1,276 @@
+#!/usr/bin/env python3
+"""
+Array-Backed Contours
+
+Geometry used to travel through the pipeline as lists of Point dataclasses,
+one Python object per vertex, rebuilt at every stage (parse, transform to
+cm, scale, rotate, normalize, Shapely round trips). ContourArray keeps a
+piece as one contiguous N x 2 float64 array plus its contour metadata, and
+every transform returns a new ContourArray without per-point objects.
+
+Stages that understand ContourArray:
+- production_pipeline: extract_svg_geometry(as_arrays=True), transform_to_cm,
+  nest_contours
+- pattern_scaler: scale_contours
+- nesting_engine: calculate_bbox, rotate_points, normalize_to_origin (and so
+  find_best_rotation and the shelf / guillotine / skyline nesters)
+- hybrid / turbo / ultimate: points_to_shapely, and nested pieces come back
+  as ContourArray when the input was
+
+Compatibility: a ContourArray is also a read-only sequence of points
+(len, iteration and indexing yield ArrayPoint(x, y) named tuples) and its
+`.points` is itself, so code written for Contour or List[Point] keeps
+working; it just pays the per-point cost again on that path.
+
+Usage:
+    contour = ContourArray.from_contour(legacy_contour)
+    moved = contour.rotated(90).normalized().translated(10, 0)
+    legacy = moved.to_contour(Contour, Point)
+
+Author: Claude
+Date: 2026-02-02
+"""
+
+from dataclasses import dataclass, field
+from typing import (
+    Any,
+    Callable,
+    Dict,
+    Iterable,
+    Iterator,
+    List,
+    NamedTuple,
+    Optional,
+    Tuple,
+    Union,
+)
+
+import numpy as np
+
+
+class ArrayPoint(NamedTuple):
+    """Point-like view of one ContourArray vertex."""
+
+    x: float
+    y: float
+
+
+def _coords_of(points: Any) -> np.ndarray:
+    """N x 2 float64 array from objects with .x/.y or (x, y) pairs."""
+    if isinstance(points, ContourArray):
+        return points.coords
+    if isinstance(points, np.ndarray):
+        return points
+    points = list(points)
+    if not points:
+        return np.empty((0, 2))
+    if hasattr(points[0], "x"):
+        return np.array([(p.x, p.y) for p in points], dtype=np.float64)
+    return np.asarray(points, dtype=np.float64)
+
+
+@dataclass(eq=False)
+class ContourArray:
+    """
+    One contour as a contiguous N x 2 float64 array plus metadata.
+
+    Field names match production_pipeline.Contour, so a ContourArray can be
+    used wherever a Contour is expected. Transforms return new instances
+    with their own coordinate array; the metadata dict is shared.
+    """
+
+    coords: np.ndarray
+    closed: bool = True
+    fill_color: str = ""
+    stroke_color: str = ""
+    metadata: Dict[str, Any] = field(default_factory=dict)
+
+    def __post_init__(self):
+        coords = np.ascontiguousarray(self.coords, dtype=np.float64)
+        self.coords = coords.reshape(-1, 2) if coords.size else np.empty((0, 2))
+
+    # ------------------------------------------------------------------
+    # Point-sequence compatibility
+    # ------------------------------------------------------------------
+
+    @property
+    def points(self) -> "ContourArray":
+        """Contour compatibility: the contour is its own point sequence."""
+        return self
+
+    def __len__(self) -> int:
+        return self.coords.shape[0]
+
+    def __iter__(self) -> Iterator[ArrayPoint]:
+        return map(ArrayPoint._make, self.coords.tolist())
+
+    def __getitem__(self, index: Union[int, slice]):
+        if isinstance(index, slice):
+            return self.with_coords(self.coords[index].copy())
+        x, y = self.coords[index]
+        return ArrayPoint(float(x), float(y))
+
+    def __array__(self, dtype=None, copy=None):
+        return self.coords if dtype is None else self.coords.astype(dtype)
+
+    def __repr__(self) -> str:
+        return (
+            f"ContourArray({len(self)} points, closed={self.closed}, "
+            f"fill_color={self.fill_color!r})"
+        )
+
+    # ------------------------------------------------------------------
+    # Geometry
+    # ------------------------------------------------------------------
+
+    @property
+    def x(self) -> np.ndarray:
+        return self.coords[:, 0]
+
+    @property
+    def y(self) -> np.ndarray:
+        return self.coords[:, 1]
+
+    @property
+    def bounds(self) -> Tuple[float, float, float, float]:
+        """(min_x, min_y, max_x, max_y); zeros for an empty contour."""
+        if not len(self):
+            return (0.0, 0.0, 0.0, 0.0)
+        min_x, min_y = self.coords.min(axis=0)
+        max_x, max_y = self.coords.max(axis=0)
+        return (float(min_x), float(min_y), float(max_x), float(max_y))
+
+    @property
+    def area(self) -> float:
+        """Unsigned shoelace area."""
+        if len(self) < 3:
+            return 0.0
+        x, y = self.x, self.y
+        return float(abs(np.dot(x, np.roll(y, -1)) - np.dot(y, np.roll(x, -1))) / 2)
+
+    def centroid(self) -> Tuple[float, float]:
+        """Mean vertex position (what rotate_points rotates about)."""
+        cx, cy = self.coords.mean(axis=0)
+        return (float(cx), float(cy))
+
+    def with_coords(self, coords: np.ndarray) -> "ContourArray":
+        """Same contour metadata, new coordinates."""
+        return ContourArray(
+            coords,
+            closed=self.closed,
+            fill_color=self.fill_color,
+            stroke_color=self.stroke_color,
+            metadata=self.metadata,
+        )
+
+    def copy(self) -> "ContourArray":
+        return ContourArray(
+            self.coords.copy(),
+            closed=self.closed,
+            fill_color=self.fill_color,
+            stroke_color=self.stroke_color,
+            metadata=dict(self.metadata),
+        )
+
+    def translated(self, dx: float, dy: float) -> "ContourArray":
+        return self.with_coords(self.coords + (dx, dy))
+
+    def scaled(
+        self,
+        scale_x: float,
+        scale_y: Optional[float] = None,
+        center: Optional[Tuple[float, float]] = None,
+    ) -> "ContourArray":
+        """Scale about center (the origin by default)."""
+        scale = (scale_x, scale_x if scale_y is None else scale_y)
+        if center is None:
+            return self.with_coords(self.coords * scale)
+        return self.with_coords((self.coords - center) * scale + center)
+
+    def rotated(
+        self, degrees: float, center: Optional[Tuple[float, float]] = None
+    ) -> "ContourArray":
+        """Rotate counter-clockwise about center (the centroid by default)."""
+        if not len(self):
+            return self.with_coords(self.coords.copy())
+        cx, cy = self.centroid() if center is None else center
+        rad = np.radians(degrees)
+        cos_a, sin_a = np.cos(rad), np.sin(rad)
+        matrix = np.array([[cos_a, sin_a], [-sin_a, cos_a]])
+        return self.with_coords((self.coords - (cx, cy)) @ matrix + (cx, cy))
+
+    def normalized(self) -> "ContourArray":
+        """Move so the bounding box starts at (0, 0)."""
+        if not len(self):
+            return self.with_coords(self.coords.copy())
+        return self.with_coords(self.coords - self.coords.min(axis=0))
+
+    # ------------------------------------------------------------------
+    # Adapters
+    # ------------------------------------------------------------------
+
+    @classmethod
+    def from_points(cls, points: Iterable[Any], **kwargs) -> "ContourArray":
+        """From Point-like objects (.x/.y) or (x, y) pairs."""
+        return cls(_coords_of(points), **kwargs)
+
+    @classmethod
+    def from_contour(cls, contour: Any) -> "ContourArray":
+        """From a production_pipeline.Contour (or another ContourArray)."""
+        if isinstance(contour, ContourArray):
+            return contour
+        return cls(
+            _coords_of(contour.points),
+            closed=contour.closed,
+            fill_color=contour.fill_color,
+            stroke_color=contour.stroke_color,
+        )
+
+    @classmethod
+    def from_shapely(cls, polygon: Any, **kwargs) -> "ContourArray":
+        """Exterior ring of a Shapely polygon, without the closing vertex."""
+        if polygon.is_empty:
+            return cls(np.empty((0, 2)), **kwargs)
+        return cls(np.asarray(polygon.exterior.coords)[:-1, :2], **kwargs)
+
+    def to_points(self, point_cls: Callable[[float, float], Any] = ArrayPoint) -> List:
+        """Per-point objects for code that needs real Point instances."""
+        return [point_cls(x, y) for x, y in self.coords.tolist()]
+
+    def to_contour(self, contour_cls: Callable, point_cls: Callable) -> Any:
+        """Legacy Contour (e.g. production_pipeline.Contour / Point)."""
+        return contour_cls(
+            points=self.to_points(point_cls),
+            closed=self.closed,
+            fill_color=self.fill_color,
+            stroke_color=self.stroke_color,
+        )
+
+    def to_shapely(self) -> Any:
+        """Shapely polygon (closing vertex added by Shapely)."""
+        from shapely.geometry import Polygon
+
+        return Polygon(self.coords)
+
+
+def as_contour_array(obj: Any) -> ContourArray:
+    """
+    Coerce a ContourArray, Contour, point list, (x, y) list or N x 2 array.
+    """
+    if isinstance(obj, ContourArray):
+        return obj
+    if hasattr(obj, "points") and hasattr(obj, "closed"):
+        return ContourArray.from_contour(obj)
+    return ContourArray(_coords_of(obj))
+
+
+def parse_svg_points(points_str: str) -> np.ndarray:
+    """
+    SVG polygon `points` attribute ("x,y x,y ...") as an N x 2 array.
+
+    Like production_pipeline.parse_svg_polygon, tokens without a comma are
+    ignored.
+    """
+    pairs = " ".join(part for part in points_str.split() if "," in part)
+    values = np.array(pairs.replace(",", " ").split(), dtype=np.float64)
+    return values.reshape(-1, 2)
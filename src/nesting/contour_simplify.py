@@ -0,0 +1,288 @@
+#!/usr/bin/env python3
+"""
+Pre-Nesting Contour Simplification
+
+extract_svg_geometry hands every polygon vertex to the nesters, and every
+NFP, Minkowski sum and collision test scales with raw vertex count. Most of
+those vertices sit on gentle curves a fraction of a millimetre apart, far
+below what changes a layout.
+
+This stage replaces each piece with a simplified hull for nesting:
+
+1. Grow the outline outward by the tolerance (mitred offset)
+2. Simplify the grown outline with Douglas-Peucker (or Visvalingam-Whyatt)
+   at the same tolerance
+
+Douglas-Peucker moves no point more than the tolerance, so the hull always
+covers the original piece - pieces never shrink, and any hull layout is a
+valid layout for the real pieces (the gap can only grow, by at most twice
+the tolerance). Hulls that would not cover their piece, or would not have
+fewer vertices, fall back to the original outline.
+
+After nesting, restore() maps every placement (rotation + offset) back onto
+the full-resolution contours, so HPGL output is cut from the original
+geometry.
+
+Usage:
+    simplified = simplify_pieces(contour_groups, tolerance=0.05)
+    result = master_nest(simplified.hulls, fabric_width, gap)
+    result = simplified.restore(result)
+    result.metadata["simplification"]   # vertex reduction, timings
+
+Environment:
+    NESTING_SIMPLIFY_TOLERANCE - hull tolerance in cm (default 0, off; 0.05 is a
+                                 good starting point)
+    NESTING_SIMPLIFY_METHOD    - "dp" (default) or "vw"
+
+Author: Claude
+Date: 2026-02-02
+"""
+
+import os
+import time
+import logging
+from dataclasses import dataclass, field
+from typing import Any, Dict, List, Optional, Sequence
+
+import numpy as np
+
+from nesting_engine import BoundingBox, NestingResult
+from contour_array import ContourArray, as_contour_array
+
+try:
+    from shapely.geometry import Polygon as ShapelyPolygon
+    from shapely.validation import make_valid
+
+    SHAPELY_AVAILABLE = True
+except ImportError:
+    SHAPELY_AVAILABLE = False
+
+logger = logging.getLogger(__name__)
+
+# Off by default: hulls change the layout, so a deployment opts in
+DEFAULT_TOLERANCE_CM = 0.0
+DEFAULT_METHOD = "dp"
+METHODS = ("dp", "vw")
+# Mitred offsets are clipped at this multiple of the tolerance on sharp corners
+MITRE_LIMIT = 2.0
+
+
+def simplify_tolerance() -> float:
+    """Hull tolerance from the environment (0 = simplification off)."""
+    return float(os.getenv("NESTING_SIMPLIFY_TOLERANCE", DEFAULT_TOLERANCE_CM))
+
+
+def simplify_method() -> str:
+    """Simplification method from the environment."""
+    return os.getenv("NESTING_SIMPLIFY_METHOD", DEFAULT_METHOD).lower()
+
+
+def visvalingam_whyatt(coords: np.ndarray, tolerance: float) -> np.ndarray:
+    """
+    Visvalingam-Whyatt on a closed ring, least significant vertex first.
+
+    A vertex's significance is its triangle with its current neighbours,
+    measured as the triangle's height over the neighbours' chord; vertices
+    are dropped while that height is below the tolerance.
+
+    Args:
+        coords: N x 2 ring without the closing vertex
+        tolerance: Max height of a dropped vertex's triangle (cm)
+    """
+    keep = list(range(len(coords)))
+
+    def height(i: int) -> float:
+        n = len(keep)
+        a, b, c = coords[keep[i - 1]], coords[keep[i]], coords[keep[(i + 1) % n]]
+        twice_area = abs((b[0] - a[0]) * (c[1] - a[1]) - (c[0] - a[0]) * (b[1] - a[1]))
+        chord = np.hypot(c[0] - a[0], c[1] - a[1])
+        return twice_area / chord if chord > 0 else 0.0
+
+    heights = [height(i) for i in range(len(keep))]
+    while len(keep) > 3:
+        i = int(np.argmin(heights))
+        if heights[i] >= tolerance:
+            break
+        del keep[i]
+        del heights[i]
+        n = len(keep)
+        for j in (i - 1, i % n):
+            heights[j] = height(j)
+
+    return coords[keep]
+
+
+def simplify_outline(
+    points: Any, tolerance: float, method: str = DEFAULT_METHOD
+) -> Optional[np.ndarray]:
+    """
+    Simplified outward hull of one piece.
+
+    Returns:
+        N x 2 hull coordinates, or None if the hull would not cover the
+        piece or would not have fewer vertices than it
+    """
+    coords = as_contour_array(points).coords
+    if len(coords) < 4 or tolerance <= 0:
+        return None
+
+    poly = ShapelyPolygon(coords)
+    if not poly.is_valid:
+        poly = make_valid(poly)
+        if poly.geom_type != "Polygon":
+            return None
+
+    grown = poly.buffer(tolerance, join_style="mitre", mitre_limit=MITRE_LIMIT)
+    if grown.geom_type != "Polygon":
+        return None
+
+    if method == "vw":
+        ring = np.asarray(grown.exterior.coords)[:-1]
+        hull = ShapelyPolygon(visvalingam_whyatt(ring, tolerance))
+    else:
+        hull = grown.simplify(tolerance, preserve_topology=True)
+
+    if hull.geom_type != "Polygon" or not hull.is_valid or not hull.covers(poly):
+        return None
+
+    hull_coords = np.asarray(hull.exterior.coords)[:-1]
+    if len(hull_coords) >= len(coords):
+        return None
+    return hull_coords
+
+
+def _like(original: Any, coords: np.ndarray) -> Any:
+    """coords in the same container type as original (ContourArray or Point list)."""
+    if isinstance(original, ContourArray):
+        return original.with_coords(coords)
+    point_cls = type(original[0])
+    return [point_cls(x, y) for x, y in coords.tolist()]
+
+
+@dataclass
+class SimplifiedPieces:
+    """Simplified hulls for nesting plus what is needed to undo them."""
+
+    originals: List[Any]
+    hulls: List[Any]
+    tolerance: float
+    method: str
+    vertices_before: int
+    vertices_after: int
+    simplify_ms: float
+    simplified_ids: List[int] = field(default_factory=list)
+
+    @property
+    def reduction_ratio(self) -> float:
+        """Original vertices per hull vertex (1.0 = no reduction)."""
+        return (
+            self.vertices_before / self.vertices_after if self.vertices_after else 1.0
+        )
+
+    def report(self) -> Dict[str, Any]:
+        """Summary for NestingResult.metadata["simplification"]."""
+        return {
+            "tolerance_cm": self.tolerance,
+            "method": self.method,
+            "pieces_simplified": len(self.simplified_ids),
+            "vertices_before": self.vertices_before,
+            "vertices_after": self.vertices_after,
+            "reduction_ratio": round(self.reduction_ratio, 2),
+            "reduction_percent": (
+                round((1 - self.vertices_after / self.vertices_before) * 100, 1)
+                if self.vertices_before
+                else 0.0
+            ),
+            "simplify_ms": round(self.simplify_ms, 2),
+        }
+
+    def restore(self, result: NestingResult) -> NestingResult:
+        """
+        Put the full-resolution pieces where their hulls were placed.
+
+        Each hull and its piece get the same rotation; the piece is then
+        shifted by the offset that moved the rotated hull to its placement.
+        Positions are kept, so callers adding NestedPiece.position see the
+        same convention the engine used. The result is updated in place.
+        """
+        simplified = set(self.simplified_ids)
+        for piece in result.pieces:
+            original = self.originals[piece.piece_id]
+            if piece.piece_id not in simplified:
+                piece.original_points = original
+                continue
+
+            hull = as_contour_array(self.hulls[piece.piece_id])
+            placed = as_contour_array(piece.transformed_points).coords
+            rotated_hull = hull.rotated(piece.rotation, center=(0.0, 0.0)).coords
+            rotated = as_contour_array(original).rotated(
+                piece.rotation, center=(0.0, 0.0)
+            )
+            offset = placed.min(axis=0) - rotated_hull.min(axis=0)
+            coords = rotated.coords + offset
+
+            piece.original_points = original
+            piece.transformed_points = _like(original, coords)
+            min_x, min_y = coords.min(axis=0)
+            max_x, max_y = coords.max(axis=0)
+            piece.bbox = BoundingBox(
+                float(min_x), float(min_y), float(max_x), float(max_y)
+            )
+
+        result.metadata["simplification"] = self.report()
+        return result
+
+
+def simplify_pieces(
+    contour_groups: Sequence[Any],
+    tolerance: Optional[float] = None,
+    method: Optional[str] = None,
+) -> SimplifiedPieces:
+    """
+    Simplified hulls for a piece set.
+
+    Args:
+        contour_groups: Pieces (Point lists or ContourArray)
+        tolerance: Hull tolerance in cm (default NESTING_SIMPLIFY_TOLERANCE)
+        method: "dp" or "vw" (default NESTING_SIMPLIFY_METHOD)
+    """
+    tolerance = simplify_tolerance() if tolerance is None else tolerance
+    method = simplify_method() if method is None else method
+    if method not in METHODS:
+        raise ValueError(f"Unknown simplification method: {method}")
+
+    start = time.perf_counter()
+    hulls = []
+    simplified_ids = []
+    before = after = 0
+
+    for i, points in enumerate(contour_groups):
+        before += len(points)
+        hull = (
+            simplify_outline(points, tolerance, method)
+            if SHAPELY_AVAILABLE and len(points)
+            else None
+        )
+        if hull is None:
+            hulls.append(points)
+            after += len(points)
+        else:
+            hulls.append(_like(points, hull))
+            simplified_ids.append(i)
+            after += len(hull)
+
+    simplified = SimplifiedPieces(
+        originals=list(contour_groups),
+        hulls=hulls,
+        tolerance=tolerance,
+        method=method,
+        vertices_before=before,
+        vertices_after=after,
+        simplify_ms=(time.perf_counter() - start) * 1000,
+        simplified_ids=simplified_ids,
+    )
+    logger.debug(
+        f"Simplified {len(simplified_ids)}/{len(hulls)} pieces: "
+        f"{before} -> {after} vertices"
+    )
+    return simplified
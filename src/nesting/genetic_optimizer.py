@@ -0,0 +1,273 @@
+#!/usr/bin/env python3
+"""
+Population Evaluation for Genetic / Annealing Nesting Optimizers
+
+Every fitness call in the GA-based nesters is a full greedy nest, so the
+optimizers spend almost all their time scoring individuals. This module
+provides the shared pieces that make that cheaper and reproducible:
+
+1. PopulationEvaluator - scores a whole population on a process pool and
+   memoizes fitness by (order, rotations), so elites and repeated children
+   are never nested twice
+2. anneal() - optional simulated-annealing refinement of the GA winner,
+   scoring a fixed-size batch of neighbours per step on the same pool
+3. GenerationProgress - snapshot passed to per-generation progress callbacks
+
+An individual is (order, rotations), both tuples. Fitness is higher-is-better
+(utilization). All randomness comes from a random.Random the caller seeds,
+so a given seed and generation count always gives the same result - the pool
+only changes where fitness is computed, never what it is.
+
+Usage:
+    with PopulationEvaluator(fitness, workers=4) as evaluator:
+        scores = evaluator.evaluate(population)
+        best, score = anneal(best, scores[0], evaluator, rng, neighbour)
+
+Author: Claude
+Date: 2026-02-02
+"""
+
+import math
+import os
+import time
+import random
+import logging
+import multiprocessing
+from dataclasses import dataclass
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+from nesting_profiler import count
+
+logger = logging.getLogger(__name__)
+
+Individual = Tuple[Tuple[int, ...], Tuple[Any, ...]]
+FitnessFn = Callable[[Tuple[int, ...], Tuple[Any, ...]], float]
+ProgressCallback = Callable[["GenerationProgress"], None]
+
+# Annealing defaults: start temperature in utilization points, cooling per step
+ANNEAL_START_TEMPERATURE = 2.0
+ANNEAL_COOLING = 0.95
+# Share of the time budget kept for annealing when it is enabled
+ANNEAL_TIME_SHARE = 0.2
+# Neighbours scored per annealing step (fixed so results do not depend on
+# the worker count)
+ANNEAL_NEIGHBOURS = 4
+
+
+@dataclass
+class GenerationProgress:
+    """Progress snapshot reported once per generation / annealing step."""
+
+    phase: str  # "genetic" or "annealing"
+    generation: int
+    best_fitness: float
+    mean_fitness: float
+    evaluations: int
+    cache_hits: int
+    elapsed_seconds: float
+
+
+def make_individual(order, rotations) -> Individual:
+    """Normalize an (order, rotations) pair to the hashable memo key."""
+    return (tuple(order), tuple(rotations))
+
+
+# Fitness function installed in each pool worker by _init_worker
+_worker_fitness: Optional[FitnessFn] = None
+
+
+def _init_worker(fitness: FitnessFn):
+    global _worker_fitness
+    _worker_fitness = fitness
+
+
+def _evaluate_in_worker(individual: Individual) -> float:
+    return _worker_fitness(*individual)
+
+
+def _can_use_process_pool() -> bool:
+    """Daemonic workers (e.g. the master_nest portfolio) cannot fork children."""
+    return not multiprocessing.current_process().daemon
+
+
+class PopulationEvaluator:
+    """
+    Memoizing population scorer, parallel when more than one worker is used.
+
+    The fitness callable must be picklable for parallel use (it is shipped
+    to each worker once, not per individual). With one worker, inside a
+    daemonic process, or if the pool cannot be started, evaluation runs
+    in-process.
+    """
+
+    def __init__(self, fitness: FitnessFn, workers: Optional[int] = None):
+        """
+        Initialize evaluator.
+
+        Args:
+            fitness: fitness(order, rotations) -> float, higher is better
+            workers: Pool size (defaults to the CPU count)
+        """
+        self.fitness = fitness
+        self.workers = max(1, workers or os.cpu_count() or 1)
+        self._memo: Dict[Individual, float] = {}
+        self._pool = None
+        self._stats = {"evaluations": 0, "cache_hits": 0}
+
+        if self.workers > 1 and _can_use_process_pool():
+            try:
+                self._pool = multiprocessing.Pool(
+                    self.workers, initializer=_init_worker, initargs=(fitness,)
+                )
+            except OSError as e:
+                logger.warning(f"Process pool unavailable ({e}), evaluating serially")
+
+    @property
+    def parallel(self) -> bool:
+        return self._pool is not None
+
+    def evaluate(self, population: List[Individual]) -> List[float]:
+        """Fitness for each individual, in population order."""
+        keys = [make_individual(*ind) for ind in population]
+
+        pending = []
+        seen = set()
+        for key in keys:
+            if key in self._memo or key in seen:
+                self._stats["cache_hits"] += 1
+            else:
+                pending.append(key)
+                seen.add(key)
+
+        if pending:
+            if self._pool is not None:
+                scores = self._pool.map(_evaluate_in_worker, pending)
+            else:
+                scores = [self.fitness(*key) for key in pending]
+            self._memo.update(zip(pending, scores))
+            self._stats["evaluations"] += len(pending)
+
+        count("fitness_evaluations", len(pending))
+        count("fitness_cache_hits", len(keys) - len(pending))
+        return [self._memo[key] for key in keys]
+
+    def get_stats(self) -> Dict[str, Any]:
+        """Evaluation counters."""
+        total = self._stats["evaluations"] + self._stats["cache_hits"]
+        return {
+            "workers": self.workers if self.parallel else 1,
+            "parallel": self.parallel,
+            "evaluations": self._stats["evaluations"],
+            "cache_hits": self._stats["cache_hits"],
+            "hit_rate_percent": (
+                round(self._stats["cache_hits"] / total * 100, 1) if total > 0 else 0
+            ),
+        }
+
+    def progress(
+        self,
+        phase: str,
+        generation: int,
+        scores: List[float],
+        best_fitness: float,
+        start_time: float,
+    ) -> GenerationProgress:
+        """Build a progress snapshot from the current counters."""
+        return GenerationProgress(
+            phase=phase,
+            generation=generation,
+            best_fitness=best_fitness,
+            mean_fitness=sum(scores) / len(scores) if scores else 0.0,
+            evaluations=self._stats["evaluations"],
+            cache_hits=self._stats["cache_hits"],
+            elapsed_seconds=time.time() - start_time,
+        )
+
+    def close(self):
+        """Shut down the worker pool."""
+        if self._pool is not None:
+            self._pool.terminate()
+            self._pool.join()
+            self._pool = None
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+
+def swap_or_rotate_neighbour(
+    rotation_choices: List[Any],
+) -> Callable[[Individual, random.Random], Individual]:
+    """Neighbour move for annealing: swap two pieces or re-roll a rotation."""
+
+    def neighbour(individual: Individual, rng: random.Random) -> Individual:
+        order, rots = list(individual[0]), list(individual[1])
+        n = len(order)
+        if n > 1 and rng.random() < 0.5:
+            i, j = rng.sample(range(n), 2)
+            order[i], order[j] = order[j], order[i]
+        else:
+            i = rng.randrange(n)
+            rots[i] = rng.choice(rotation_choices)
+        return make_individual(order, rots)
+
+    return neighbour
+
+
+def anneal(
+    individual: Individual,
+    fitness: float,
+    evaluator: PopulationEvaluator,
+    rng: random.Random,
+    neighbour: Callable[[Individual, random.Random], Individual],
+    iterations: int,
+    deadline: Optional[float] = None,
+    start_temperature: float = ANNEAL_START_TEMPERATURE,
+    cooling: float = ANNEAL_COOLING,
+    neighbours: int = ANNEAL_NEIGHBOURS,
+    progress_callback: Optional[ProgressCallback] = None,
+    start_time: Optional[float] = None,
+    cancel_token: Optional[Any] = None,
+) -> Tuple[Individual, float]:
+    """
+    Simulated-annealing refinement.
+
+    Each step scores a batch of neighbours in parallel, moves to the best of
+    them by the Metropolis rule, and keeps the best individual ever seen.
+    Stops early once cancel_token (anything with a `cancelled` flag, e.g.
+    nesting_engine.CancellationToken) is cancelled.
+
+    Returns:
+        (best_individual, best_fitness)
+    """
+    start_time = start_time or time.time()
+    current, current_fitness = individual, fitness
+    best, best_fitness = individual, fitness
+    temperature = start_temperature
+
+    for step in range(iterations):
+        if deadline is not None and time.time() > deadline:
+            break
+        if cancel_token is not None and cancel_token.cancelled:
+            break
+
+        candidates = [neighbour(current, rng) for _ in range(neighbours)]
+        scores = evaluator.evaluate(candidates)
+        score, candidate = max(zip(scores, candidates), key=lambda x: x[0])
+
+        delta = score - current_fitness
+        if delta >= 0 or rng.random() < math.exp(delta / max(temperature, 1e-9)):
+            current, current_fitness = candidate, score
+        if current_fitness > best_fitness:
+            best, best_fitness = current, current_fitness
+
+        temperature *= cooling
+
+        if progress_callback is not None:
+            progress_callback(
+                evaluator.progress("annealing", step, scores, best_fitness, start_time)
+            )
+
+    return best, best_fitness
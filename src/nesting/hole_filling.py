@@ -0,0 +1,435 @@
+#!/usr/bin/env python3
+"""
+Hole and Concavity Filling After Nesting
+
+Every engine places pieces in one bottom-left pass, and compaction only
+slides pieces down, so small pieces placed late (pockets, collars, facings,
+cuffs) often sit on top of the marker and set its length while the voids
+between large pieces stay empty. This post-pass moves them into those voids:
+
+1. The free space of the finished layout - the fabric rectangle up to the
+   marker length minus the union of the placed pieces - is split into its
+   connected regions (holes between pieces and concavities open to the
+   top) and indexed with an STRtree
+2. Small pieces (area at most NESTING_HOLE_FILL_MAX_SHARE of the largest
+   piece) are taken highest first and lifted out of the layout
+3. For every region below the piece's top edge that is large enough, at
+   every allowed rotation, the piece's reference point is limited to the
+   region's inner-fit rectangle (ultimate_nesting.calculate_ifp) clipped to
+   the fabric. Candidates are the NFP contact vertices of the pieces around
+   it (nfp_kernel.PairNFP: exact, concave-aware, gap included) and their
+   projections onto the IFP edges
+4. The lowest candidate outside every neighbour's NFP is slid down and left
+   into contact (corners where two part NFPs meet are not NFP vertices);
+   it wins if it lowers the piece's top edge. The free space is rebuilt
+   after each move
+5. Fabric length and utilization are recomputed from the new top edge
+
+Placed geometry follows nest_contours: transformed_points + position. A
+moved piece gets transformed_points normalized to the origin, a new
+position, and the rotation it was placed at.
+
+Usage:
+    result = fill_holes(result, gap, rotation_table=table)
+    result.metadata["hole_filling"]   # moved, holes, length_before/after, fill_ms
+
+Environment:
+    NESTING_FILL_HOLES           - 1 enables the pass in nest_contours (default 0)
+    NESTING_HOLE_FILL_MAX_SHARE  - largest area, as a share of the largest
+                                   piece, of a piece that may move (default 0.25)
+    NESTING_HOLE_FILL_SECONDS    - time budget of the pass (default 5)
+
+Author: Claude
+Date: 2026-02-02
+"""
+
+import os
+import time
+import logging
+from dataclasses import dataclass, field
+from typing import Any, Dict, List, Optional, Tuple
+
+import numpy as np
+
+from nesting_engine import (
+    BoundingBox,
+    NestingResult,
+    GAP_CM,
+    rotate_points,
+    normalize_to_origin,
+)
+from contour_array import as_contour_array
+from nfp_kernel import (
+    SCALE,
+    PairNFP,
+    PieceShape,
+    from_fixed,
+    slide_distance,
+    to_fixed,
+)
+from nesting_profiler import count
+
+try:
+    from shapely.geometry import Polygon as ShapelyPolygon, box
+    from shapely.ops import unary_union
+    from shapely.strtree import STRtree
+    from shapely.validation import make_valid
+
+    SHAPELY_AVAILABLE = True
+except ImportError:
+    SHAPELY_AVAILABLE = False
+
+try:
+    from ultimate_nesting import calculate_ifp
+
+    IFP_AVAILABLE = True
+except ImportError:
+    IFP_AVAILABLE = False
+
+logger = logging.getLogger(__name__)
+
+# A move must lower the piece's top edge by at least this much (cm)
+MIN_GAIN_CM = 0.01
+# Candidate offsets tested against the NFPs per batch
+CANDIDATE_BATCH = 512
+# Halvings of a compaction slide before giving up (as in nfp_nesting)
+SLIDE_ATTEMPTS = 6
+
+
+def hole_filling_enabled() -> bool:
+    """
+    Whether nest_contours runs the pass (NESTING_FILL_HOLES).
+
+    Off by default: moving pieces changes the layout, so a deployment opts in.
+    """
+    return os.getenv("NESTING_FILL_HOLES", "0").lower() in ("1", "true", "yes")
+
+
+def hole_fill_max_share() -> float:
+    """Largest movable piece as a share of the largest piece's area."""
+    return float(os.getenv("NESTING_HOLE_FILL_MAX_SHARE", "0.25"))
+
+
+def hole_fill_seconds() -> float:
+    return float(os.getenv("NESTING_HOLE_FILL_SECONDS", "5"))
+
+
+@dataclass
+class _Footprint:
+    """A placed piece in fabric coordinates, with its kernel shape."""
+
+    coords: np.ndarray  # N x 2 cm
+    polygon: Any
+    shape: PieceShape
+    offset: np.ndarray  # Kernel units of the shape's origin
+
+    @classmethod
+    def build(cls, coords: np.ndarray) -> "_Footprint":
+        polygon = ShapelyPolygon(coords)
+        if not polygon.is_valid:
+            polygon = make_valid(polygon)
+        return cls(
+            coords=coords,
+            polygon=polygon,
+            shape=PieceShape.build(coords),
+            offset=to_fixed(coords.min(axis=0))[0],
+        )
+
+    @property
+    def bounds(self) -> Tuple[float, float, float, float]:
+        min_x, min_y = self.coords.min(axis=0)
+        max_x, max_y = self.coords.max(axis=0)
+        return float(min_x), float(min_y), float(max_x), float(max_y)
+
+    @property
+    def top(self) -> float:
+        return float(self.coords[:, 1].max())
+
+
+@dataclass
+class _Move:
+    """Best placement found for one piece."""
+
+    top: float
+    x: float
+    angle: float
+    points: Any  # transformed_points at the origin
+    position: Tuple[float, float]
+
+
+@dataclass
+class HoleFiller:
+    """Moves small pieces of one layout into its free regions."""
+
+    fabric_width: float
+    gap: float = GAP_CM
+    rotation_table: Any = None
+    deadline: float = float("inf")
+    footprints: List[_Footprint] = field(default_factory=list)
+    regions: List[Any] = field(default_factory=list)
+    _tree: Any = None
+    _nfps: Dict[Tuple[int, int, float], PairNFP] = field(default_factory=dict)
+    _rotated: Dict[Tuple[int, float], Tuple[Any, PieceShape]] = field(
+        default_factory=dict
+    )
+
+    @property
+    def gap_units(self) -> int:
+        return int(round(self.gap * SCALE))
+
+    def index_regions(self, length: float):
+        """Split the free space below length into regions and index them."""
+        fabric = box(0, 0, self.fabric_width, length)
+        occupied = unary_union([f.polygon for f in self.footprints])
+        free = fabric.difference(occupied)
+        parts = getattr(free, "geoms", [free])
+        self.regions = [
+            part for part in parts if part.geom_type == "Polygon" and part.area > 0
+        ]
+        self._tree = STRtree(self.regions) if self.regions else None
+
+    def _shape(self, piece: Any, angle: float) -> Tuple[Any, PieceShape]:
+        """Piece at angle, at the origin, and its kernel shape (cached)."""
+        key = (piece.piece_id, angle)
+        if key not in self._rotated:
+            points = normalize_to_origin(rotate_points(piece.original_points, angle))
+            shape = PieceShape.build(as_contour_array(points).coords)
+            self._rotated[key] = (points, shape)
+        return self._rotated[key]
+
+    def _nfp(self, fixed: int, moving: int, angle: float, shape: PieceShape):
+        key = (fixed, moving, angle)
+        nfp = self._nfps.get(key)
+        if nfp is None:
+            nfp = PairNFP.build(self.footprints[fixed].shape, shape, self.gap_units)
+            self._nfps[key] = nfp
+        return nfp
+
+    def _angles(self, piece: Any) -> Tuple[float, ...]:
+        if self.rotation_table is None:
+            return (piece.rotation,)
+        angles = self.rotation_table.angles(piece.piece_id)
+        # Keep the current rotation first so ties keep the piece as it is
+        return (piece.rotation,) + tuple(a for a in angles if a != piece.rotation)
+
+    def _place_in(
+        self,
+        index: int,
+        shape: PieceShape,
+        angle: float,
+        region: Any,
+        y_limit: float,
+    ) -> Optional[np.ndarray]:
+        """Lowest free offset (kernel units) for the piece inside a region."""
+        width, height = shape.width / SCALE, shape.height / SCALE
+        rx0, ry0, rx1, ry1 = region.bounds
+        if width > rx1 - rx0 or height > ry1 - ry0:
+            return None
+
+        # Inner-fit rectangle of the region's box, clipped to the fabric
+        ifp = calculate_ifp(rx1 - rx0, ry1 - ry0, box(0, 0, width, height))
+        ix0, iy0, ix1, iy1 = ifp.bounds
+        lo = to_fixed([max(ix0 + rx0, 0.0), max(iy0 + ry0, 0.0)])[0]
+        hi = to_fixed(
+            [min(ix1 + rx0, self.fabric_width - width), min(iy1 + ry0, y_limit)]
+        )[0]
+        if np.any(hi < lo):
+            return None
+
+        # Every piece the swept inner-fit area can touch is an obstacle
+        reach = self.gap + 1.0 / SCALE
+        sx0, sy0 = from_fixed(lo[None])[0] - reach
+        sx1, sy1 = from_fixed(hi[None])[0] + (width + reach, height + reach)
+        neighbours = []
+        for j, footprint in enumerate(self.footprints):
+            if j == index:
+                continue
+            fx0, fy0, fx1, fy1 = footprint.bounds
+            if fx0 < sx1 and fx1 > sx0 and fy0 < sy1 and fy1 > sy0:
+                neighbours.append((self._nfp(j, index, angle, shape), footprint))
+
+        blocks = [np.array([lo, [hi[0], lo[1]]])]
+        for nfp, footprint in neighbours:
+            touching = nfp.vertices + footprint.offset
+            ys, xs = touching[:, 1], touching[:, 0]
+            blocks += [
+                touching,
+                np.column_stack([xs, np.full(len(xs), lo[1])]),
+                np.column_stack([np.full(len(ys), lo[0]), ys]),
+                np.column_stack([np.full(len(ys), hi[0]), ys]),
+            ]
+        candidates = np.vstack(blocks)
+        inside = np.all((candidates >= lo) & (candidates <= hi), axis=1)
+        candidates = np.unique(candidates[inside], axis=0)
+        candidates = candidates[np.lexsort((candidates[:, 0], candidates[:, 1]))]
+        count("candidates", len(candidates))
+
+        for start in range(0, len(candidates), CANDIDATE_BATCH):
+            chunk = candidates[start : start + CANDIDATE_BATCH]
+            hit = self._collides(chunk, neighbours)
+            if not hit.all():
+                position = chunk[int(np.argmin(hit))]
+                return self._slide(shape, position, neighbours, lo)
+        return None
+
+    def _collides(self, points: np.ndarray, neighbours: List[Tuple]) -> np.ndarray:
+        count("intersection_tests", len(points) * len(neighbours))
+        hit = np.zeros(len(points), dtype=bool)
+        for nfp, footprint in neighbours:
+            hit |= nfp.contains(points - footprint.offset)
+        return hit
+
+    def _slide(
+        self,
+        shape: PieceShape,
+        position: np.ndarray,
+        neighbours: List[Tuple],
+        lo: np.ndarray,
+    ) -> np.ndarray:
+        """Slide a placement down, then left, without leaving the IFP."""
+        obstacles = [f.shape.outline + f.offset for _, f in neighbours]
+        for axis in (1, 0):
+            direction = (-1.0, 0.0) if axis == 0 else (0.0, -1.0)
+            free = slide_distance(shape.outline + position, obstacles, direction)
+            step = min(float(position[axis] - lo[axis]), free - self.gap_units)
+            for _ in range(SLIDE_ATTEMPTS):
+                if step < 1:
+                    break
+                moved = position.copy()
+                moved[axis] -= int(step)
+                if not self._collides(moved[None], neighbours)[0]:
+                    position = moved
+                    break
+                step /= 2
+        return position
+
+    def best_move(self, index: int, piece: Any) -> Optional[_Move]:
+        """Lowest placement in a free region that lowers the piece, if any."""
+        footprint = self.footprints[index]
+        old_top = footprint.top
+        area = footprint.polygon.area
+        best: Optional[_Move] = None
+        for angle in self._angles(piece):
+            points, shape = self._shape(piece, angle)
+            height = shape.height / SCALE
+            y_limit = old_top - MIN_GAIN_CM - height
+            if best is not None:
+                y_limit = min(y_limit, best.top - height)
+            if y_limit < 0 or self._tree is None:
+                continue
+            zone = box(0, 0, self.fabric_width, y_limit + height)
+            hits = self._tree.query(zone)
+            regions = sorted(
+                (self.regions[k] for k in hits if self.regions[k].area >= area),
+                key=lambda region: region.bounds[1],
+            )
+            for region in regions:
+                if time.time() > self.deadline:
+                    return best
+                if region.bounds[1] > y_limit:
+                    break
+                offset = self._place_in(index, shape, angle, region, y_limit)
+                if offset is None:
+                    continue
+                x, y = from_fixed(offset[None])[0]
+                top = float(y) + height
+                if best is None or (top, x) < (best.top, best.x):
+                    best = _Move(top, float(x), angle, points, (float(x), float(y)))
+                    y_limit = top - height
+        return best
+
+    def apply(self, index: int, piece: Any, move: _Move):
+        """Place the piece per move and drop the NFPs it invalidates."""
+        coords = as_contour_array(move.points).coords
+        width, height = coords.max(axis=0)
+        piece.transformed_points = move.points
+        piece.position = move.position
+        piece.rotation = move.angle
+        piece.bbox = BoundingBox(0.0, 0.0, float(width), float(height))
+        self.footprints[index] = _Footprint.build(coords + move.position)
+        self._nfps = {
+            key: nfp for key, nfp in self._nfps.items() if index not in key[:2]
+        }
+
+
+def fill_holes(
+    result: NestingResult,
+    gap: float = GAP_CM,
+    rotation_table: Any = None,
+    max_share: Optional[float] = None,
+    time_budget: Optional[float] = None,
+) -> NestingResult:
+    """
+    Move small pieces of a finished layout into its holes and concavities.
+
+    Args:
+        result: Successful NestingResult (modified in place)
+        gap: Gap kept between pieces in cm
+        rotation_table: rotation_table.RotationTable of the nested pieces;
+            pieces may then take any allowed angle (default: keep rotation)
+        max_share: Movable pieces' largest area as a share of the largest
+            piece (default NESTING_HOLE_FILL_MAX_SHARE)
+        time_budget: Seconds the pass may take (default NESTING_HOLE_FILL_SECONDS)
+
+    Returns:
+        result with moved pieces, recomputed fabric_length / utilization and
+        metadata["hole_filling"]
+    """
+    if not (SHAPELY_AVAILABLE and IFP_AVAILABLE):
+        return result
+    if not result.success or len(result.pieces) < 2:
+        return result
+
+    start = time.time()
+    max_share = hole_fill_max_share() if max_share is None else max_share
+    time_budget = hole_fill_seconds() if time_budget is None else time_budget
+    filler = HoleFiller(
+        result.fabric_width, gap, rotation_table, deadline=start + time_budget
+    )
+    for piece in result.pieces:
+        coords = as_contour_array(piece.transformed_points).coords
+        filler.footprints.append(_Footprint.build(coords + piece.position))
+
+    areas = [f.polygon.area for f in filler.footprints]
+    limit = max(areas) * max_share
+    movable = sorted(
+        (i for i, area in enumerate(areas) if 0 < area <= limit),
+        key=lambda i: -filler.footprints[i].top,
+    )
+    top_before = max(f.top for f in filler.footprints)
+    filler.index_regions(max(result.fabric_length, top_before))
+    holes = len(filler.regions)
+
+    moved = 0
+    for i in movable:
+        if time.time() > filler.deadline:
+            break
+        piece = result.pieces[i]
+        move = filler.best_move(i, piece)
+        if move is None:
+            continue
+        filler.apply(i, piece, move)
+        filler.index_regions(max(result.fabric_length, top_before))
+        moved += 1
+    count("holes_filled", moved)
+
+    length_before = result.fabric_length
+    top_after = max(f.top for f in filler.footprints)
+    if moved and top_after < top_before:
+        result.fabric_length = length_before - (top_before - top_after)
+        if result.fabric_length > 0:
+            result.utilization *= length_before / result.fabric_length
+    result.metadata["hole_filling"] = {
+        "moved": moved,
+        "movable": len(movable),
+        "holes": holes,
+        "length_before": round(length_before, 2),
+        "length_after": round(result.fabric_length, 2),
+        "fill_ms": round((time.time() - start) * 1000, 1),
+    }
+    if moved:
+        logger.info(
+            f"Hole filling moved {moved} pieces: "
+            f"{length_before:.2f} -> {result.fabric_length:.2f} cm"
+        )
+    return result
@@ -14,6 +14,14 @@ The key to reaching 98% is:
 3. "Slide" pieces toward origin to find tighter positions
 4. Local search to improve individual placements
 
+Collision queries go through a PlacementIndex that is built once per layout
+and updated as pieces are added or moved, instead of re-buffering every
+placed polygon and rebuilding an STRtree for each candidate search.
+
+The optimizer is anytime: nest() can report each improved layout through
+on_improvement and stops early (keeping its best layout) when its
+CancellationToken is cancelled.
+
 Author: Claude
 Date: 2026-01-31
 """
@@ -21,16 +29,18 @@ Date: 2026-01-31
 import math
 import random
 import time
-from typing import List, Tuple, Optional, Dict
+from typing import Any, Callable, List, Tuple, Optional, Dict
 from dataclasses import dataclass, field
 from copy import deepcopy
 import itertools
 
+import numpy as np
+
 try:
+    import shapely
     from shapely.geometry import Polygon as ShapelyPolygon, box as shapely_box
-    from shapely.affinity import translate, rotate
+    from shapely.affinity import translate
     from shapely.validation import make_valid
-    from shapely import STRtree
 
     SHAPELY_AVAILABLE = True
 except ImportError:
@@ -41,21 +51,31 @@ from nesting_engine import (
     BoundingBox,
     NestedPiece,
     NestingResult,
+    CancellationToken,
+    ImprovementCallback,
     calculate_bbox,
     normalize_to_origin,
     GAP_CM,
     CUTTER_WIDTH_CM,
 )
+from contour_array import ContourArray
+from rotation_table import rotated_polygons
+from nesting_profiler import count, phase
 
 ROTATION_ANGLES = [0, 90, 180, 270]
+# Candidate polygons are shrunk by this much for numerical stability
+COLLISION_SHRINK = 0.02
 
 
 def points_to_shapely(points: List[Point]) -> ShapelyPolygon:
     """Convert Point list to Shapely polygon."""
-    coords = [(p.x, p.y) for p in points]
+    if isinstance(points, ContourArray):
+        coords = points.coords
+    else:
+        coords = [(p.x, p.y) for p in points]
     if len(coords) < 3:
         return ShapelyPolygon()
-    if coords[0] != coords[-1]:
+    if isinstance(coords, list) and coords[0] != coords[-1]:
         coords.append(coords[0])
     poly = ShapelyPolygon(coords)
     if not poly.is_valid:
@@ -65,8 +85,15 @@ def points_to_shapely(points: List[Point]) -> ShapelyPolygon:
     return poly
 
 
-def shapely_to_points(poly: ShapelyPolygon) -> List[Point]:
-    """Convert Shapely polygon to Point list."""
+def shapely_to_points(poly: ShapelyPolygon, like: Any = None) -> List[Point]:
+    """
+    Convert Shapely polygon to Point list.
+
+    If `like` is a ContourArray the result is a ContourArray carrying its
+    contour metadata (no per-point objects).
+    """
+    if isinstance(like, ContourArray):
+        return like.with_coords(ContourArray.from_shapely(poly).coords)
     if poly.is_empty:
         return []
     coords = list(poly.exterior.coords)
@@ -84,16 +111,15 @@ class Piece:
     rotations: Dict[int, Tuple[ShapelyPolygon, float, float]] = field(
         default_factory=dict
     )
+    # Normalized polygons by allowed angle (from a rotation table)
+    rotated: Optional[Dict[int, ShapelyPolygon]] = field(default=None, repr=False)
 
     def __post_init__(self):
         self.area = self.shapely_poly.area
-        for angle in ROTATION_ANGLES:
-            if angle == 0:
-                rotated = self.shapely_poly
-            else:
-                rotated = rotate(self.shapely_poly, angle, origin="centroid")
-            bounds = rotated.bounds
-            rotated = translate(rotated, -bounds[0], -bounds[1])
+        rotated_polys = self.rotated or rotated_polygons(
+            self.shapely_poly, ROTATION_ANGLES
+        )
+        for angle, rotated in rotated_polys.items():
             width = rotated.bounds[2]
             height = rotated.bounds[3]
             self.rotations[angle] = (rotated, width, height)
@@ -112,6 +138,115 @@ class Placement:
     height: float
 
 
+class PlacementIndex:
+    """
+    Incremental collision index over placed pieces.
+
+    Keeps each placed polygon buffered by half the gap and prepared, plus a
+    bounds array for vectorized rejection, updated in place as pieces are
+    added or moved. Slots match positions in the placement list.
+
+    Stats:
+        queries        - collision queries answered
+        exact_tests    - prepared intersects() calls actually made
+        tests_avoided  - pairs skipped by the bounds filter or early exit
+        buffers_reused - gap buffers served from the index instead of rebuilt
+    """
+
+    def __init__(self, gap: float, capacity: int = 64):
+        self.gap = gap
+        self._buffered: List[ShapelyPolygon] = []
+        self._bounds = np.empty((capacity, 4), dtype=np.float64)
+        self.stats = {
+            "queries": 0,
+            "exact_tests": 0,
+            "tests_avoided": 0,
+            "buffers_reused": 0,
+        }
+
+    @classmethod
+    def from_polygons(
+        cls, polygons: List[ShapelyPolygon], gap: float
+    ) -> "PlacementIndex":
+        index = cls(gap, capacity=max(64, len(polygons)))
+        for poly in polygons:
+            index.add(poly)
+        return index
+
+    def __len__(self) -> int:
+        return len(self._buffered)
+
+    def _buffer(self, polygon: ShapelyPolygon) -> ShapelyPolygon:
+        buffered = polygon.buffer(self.gap / 2)
+        shapely.prepare(buffered)
+        return buffered
+
+    def add(self, polygon: ShapelyPolygon) -> int:
+        """Index a newly placed polygon; returns its slot."""
+        slot = len(self._buffered)
+        if slot == len(self._bounds):
+            self._bounds = np.concatenate([self._bounds, np.empty_like(self._bounds)])
+        buffered = self._buffer(polygon)
+        self._buffered.append(buffered)
+        self._bounds[slot] = buffered.bounds
+        return slot
+
+    def move(self, slot: int, polygon: ShapelyPolygon):
+        """Replace the polygon in a slot after its piece moved."""
+        buffered = self._buffer(polygon)
+        self._buffered[slot] = buffered
+        self._bounds[slot] = buffered.bounds
+
+    def collides(
+        self, test_poly: ShapelyPolygon, exclude: Optional[int] = None
+    ) -> bool:
+        """
+        True if test_poly intersects any indexed polygon.
+
+        test_poly should already be shrunk by COLLISION_SHRINK.
+        """
+        n = len(self._buffered)
+        self.stats["queries"] += 1
+        self.stats["buffers_reused"] += n
+        if n == 0:
+            return False
+
+        minx, miny, maxx, maxy = test_poly.bounds
+        bounds = self._bounds[:n]
+        overlap = (
+            (bounds[:, 0] <= maxx)
+            & (bounds[:, 2] >= minx)
+            & (bounds[:, 1] <= maxy)
+            & (bounds[:, 3] >= miny)
+        )
+        if exclude is not None:
+            overlap[exclude] = False
+
+        candidates = np.flatnonzero(overlap)
+        total = n - (1 if exclude is not None else 0)
+        tested = 0
+        hit = False
+        for slot in candidates:
+            tested += 1
+            if self._buffered[slot].intersects(test_poly):
+                hit = True
+                break
+
+        self.stats["exact_tests"] += tested
+        self.stats["tests_avoided"] += total - tested
+        return hit
+
+    def get_stats(self) -> Dict[str, int]:
+        """Counters plus the share of pair tests avoided."""
+        pairs = self.stats["exact_tests"] + self.stats["tests_avoided"]
+        return {
+            **self.stats,
+            "avoided_percent": (
+                round(self.stats["tests_avoided"] / pairs * 100, 1) if pairs else 0
+            ),
+        }
+
+
 class HybridNester:
     """
     Hybrid nesting that combines multiple strategies.
@@ -124,6 +259,40 @@ class HybridNester:
     ):
         self.fabric_width = fabric_width
         self.gap = gap
+        # Shrunk copies of rotated piece polygons, keyed by id()
+        self._shrunk_cache: Dict[int, Tuple[ShapelyPolygon, ShapelyPolygon]] = {}
+        # Accumulated PlacementIndex counters across layouts
+        self.index_stats = {
+            "queries": 0,
+            "exact_tests": 0,
+            "tests_avoided": 0,
+            "buffers_reused": 0,
+        }
+
+    def _shrunk(self, piece_poly: ShapelyPolygon) -> ShapelyPolygon:
+        """Piece polygon shrunk for collision tests (computed once)."""
+        cached = self._shrunk_cache.get(id(piece_poly))
+        if cached is None or cached[0] is not piece_poly:
+            cached = (piece_poly, piece_poly.buffer(-COLLISION_SHRINK))
+            self._shrunk_cache[id(piece_poly)] = cached
+        return cached[1]
+
+    def _merge_stats(self, index: PlacementIndex):
+        for name, value in index.stats.items():
+            self.index_stats[name] += value
+        count("collision_queries", index.stats["queries"])
+        count("intersection_tests", index.stats["exact_tests"])
+        count("intersection_tests_avoided", index.stats["tests_avoided"])
+
+    def _collides(
+        self,
+        shrunk: ShapelyPolygon,
+        x: float,
+        y: float,
+        index: PlacementIndex,
+        exclude: Optional[int] = None,
+    ) -> bool:
+        return index.collides(translate(shrunk, x, y), exclude)
 
     def slide_to_bottom_left(
         self,
@@ -134,80 +303,59 @@ class HybridNester:
         start_y: float,
         other_polys: List[ShapelyPolygon],
         step: float = 0.5,
+        index: Optional[PlacementIndex] = None,
+        exclude: Optional[int] = None,
     ) -> Tuple[float, float]:
         """
         Slide a piece toward bottom-left until collision.
 
         This is key for tight packing - instead of just finding the first
         valid position, we slide pieces as close as possible.
+
+        Pass a PlacementIndex (and the piece's own slot as exclude) to reuse
+        collision geometry; otherwise one is built from other_polys.
         """
         x, y = start_x, start_y
 
-        # Build spatial index
-        if other_polys:
-            tree = STRtree([p.buffer(self.gap / 2) for p in other_polys])
-            buffered = [p.buffer(self.gap / 2) for p in other_polys]
+        if index is None:
+            if not other_polys:
+                return (0, 0)
+            index = PlacementIndex.from_polygons(other_polys, self.gap)
+            owned = True
         else:
-            return (0, 0)
+            if len(index) - (1 if exclude is not None else 0) <= 0:
+                return (0, 0)
+            owned = False
+
+        shrunk = self._shrunk(piece_poly)
+        min_x, min_y = piece_poly.bounds[:2]
 
         # Slide down (decrease Y)
         while y > 0:
-            test_poly = translate(piece_poly, x, y - step)
-            test_buffered = test_poly.buffer(-0.02)
-
-            # Check bounds
-            if test_poly.bounds[1] < 0:
+            if min_y + y - step < 0:
                 break
-
-            # Check collision
-            collision = False
-            for idx in tree.query(test_poly):
-                if test_buffered.intersects(buffered[idx]):
-                    collision = True
-                    break
-
-            if collision:
+            if self._collides(shrunk, x, y - step, index, exclude):
                 break
             y -= step
 
         # Slide left (decrease X)
         while x > 0:
-            test_poly = translate(piece_poly, x - step, y)
-            test_buffered = test_poly.buffer(-0.02)
-
-            # Check bounds
-            if test_poly.bounds[0] < 0:
+            if min_x + x - step < 0:
                 break
-
-            # Check collision
-            collision = False
-            for idx in tree.query(test_poly):
-                if test_buffered.intersects(buffered[idx]):
-                    collision = True
-                    break
-
-            if collision:
+            if self._collides(shrunk, x - step, y, index, exclude):
                 break
             x -= step
 
         # Final slide down after sliding left
         while y > 0:
-            test_poly = translate(piece_poly, x, y - step)
-            test_buffered = test_poly.buffer(-0.02)
-
-            if test_poly.bounds[1] < 0:
+            if min_y + y - step < 0:
                 break
-
-            collision = False
-            for idx in tree.query(test_poly):
-                if test_buffered.intersects(buffered[idx]):
-                    collision = True
-                    break
-
-            if collision:
+            if self._collides(shrunk, x, y - step, index, exclude):
                 break
             y -= step
 
+        if owned:
+            self._merge_stats(index)
         return (max(0, x), max(0, y))
 
     def find_position_with_sliding(
@@ -216,6 +364,7 @@ class HybridNester:
         rotation: int,
         placements: List[Placement],
         scan_step: float = 5.0,
+        index: Optional[PlacementIndex] = None,
     ) -> Optional[Tuple[float, float]]:
         """
         Find position by scanning and sliding.
@@ -223,6 +372,8 @@ class HybridNester:
         1. Scan a grid of potential positions
         2. For each valid position, slide toward origin
         3. Return the best (lowest Y, then lowest X)
+
+        index must cover exactly the given placements when supplied.
         """
         poly, w, h = piece.rotations[rotation]
 
@@ -249,9 +400,11 @@ class HybridNester:
         )
         y_positions = sorted(set(y for y in y_positions if y >= 0))
 
-        # Build spatial index
-        tree = STRtree([p.buffer(self.gap / 2) for p in placed_polys])
-        buffered = [p.buffer(self.gap / 2) for p in placed_polys]
+        owned = index is None
+        if owned:
+            index = PlacementIndex.from_polygons(placed_polys, self.gap)
+        shrunk = self._shrunk(poly)
+        tested = 0
 
         for start_y in y_positions:
             if start_y * 1000 >= best_score:
@@ -261,22 +414,14 @@ class HybridNester:
                 if start_y * 1000 + start_x >= best_score:
                     continue
 
-                test_poly = translate(poly, start_x, start_y)
-                test_buffered = test_poly.buffer(-0.02)
-
                 # Quick collision check
-                collision = False
-                for idx in tree.query(test_poly):
-                    if test_buffered.intersects(buffered[idx]):
-                        collision = True
-                        break
-
-                if collision:
+                tested += 1
+                if self._collides(shrunk, start_x, start_y, index):
                     continue
 
                 # Valid position found - slide to optimize
                 slid_x, slid_y = self.slide_to_bottom_left(
-                    poly, w, h, start_x, start_y, placed_polys, step=1.0
+                    poly, w, h, start_x, start_y, placed_polys, step=1.0, index=index
                 )
 
                 score = slid_y * 1000 + slid_x
@@ -284,6 +429,9 @@ class HybridNester:
                     best_score = score
                     best_pos = (slid_x, slid_y)
 
+        count("candidates", tested)
+        if owned:
+            self._merge_stats(index)
         return best_pos
 
     def nest_with_order(
@@ -293,18 +441,23 @@ class HybridNester:
         rotations: List[int],
     ) -> Tuple[List[Placement], float]:
         """Nest pieces in given order with given rotations."""
+        count("layouts_evaluated")
         placements: List[Placement] = []
+        index = PlacementIndex(self.gap)
         max_y = 0
 
         for idx, piece_idx in enumerate(order):
             piece = pieces[piece_idx]
             rotation = rotations[idx]
+            if rotation not in piece.rotations:
+                # Not allowed for this piece's grain
+                rotation = 0
 
             poly, w, h = piece.rotations[rotation]
 
             # Skip if too wide, try other rotations
             if w > self.fabric_width:
-                for rot in ROTATION_ANGLES:
+                for rot in piece.rotations:
                     p, w2, h2 = piece.rotations[rot]
                     if w2 <= self.fabric_width:
                         poly, w, h = p, w2, h2
@@ -314,7 +467,9 @@ class HybridNester:
                     continue
 
             # Find position with sliding
-            pos = self.find_position_with_sliding(piece, rotation, placements)
+            pos = self.find_position_with_sliding(
+                piece, rotation, placements, index=index
+            )
 
             if pos is None:
                 pos = (0, max_y + self.gap)
@@ -333,9 +488,11 @@ class HybridNester:
                     height=h,
                 )
             )
+            index.add(placed_poly)
 
             max_y = max(max_y, y + h)
 
+        self._merge_stats(index)
         return placements, max_y
 
     def compact_layout(
@@ -347,23 +504,38 @@ class HybridNester:
         """
         Local optimization: try to slide each piece closer to origin.
         """
+        with phase("hybrid.compaction"):
+            return self._compact_layout(placements, pieces, iterations)
+
+    def _compact_layout(
+        self,
+        placements: List[Placement],
+        pieces: List[Piece],
+        iterations: int,
+    ) -> Tuple[List[Placement], float]:
         improved = True
         iter_count = 0
+        index = PlacementIndex.from_polygons([p.polygon for p in placements], self.gap)
 
         while improved and iter_count < iterations:
             improved = False
             iter_count += 1
 
             for i, placement in enumerate(placements):
-                # Get all other placements
-                others = [p.polygon for j, p in enumerate(placements) if j != i]
-
                 piece = pieces[placement.piece_id]
                 poly, w, h = piece.rotations[placement.rotation]
 
-                # Try to slide this piece
+                # Try to slide this piece against all the others
                 new_x, new_y = self.slide_to_bottom_left(
-                    poly, w, h, placement.x, placement.y, others, step=0.5
+                    poly,
+                    w,
+                    h,
+                    placement.x,
+                    placement.y,
+                    [],
+                    step=0.5,
+                    index=index,
+                    exclude=i,
                 )
 
                 if new_y < placement.y - 0.5 or new_x < placement.x - 0.5:
@@ -377,8 +549,11 @@ class HybridNester:
                         width=w,
                         height=h,
                     )
+                    index.move(i, placements[i].polygon)
                     improved = True
 
+        self._merge_stats(index)
+
         max_y = max(p.y + p.height for p in placements) if placements else 0
         return placements, max_y
 
@@ -395,9 +570,21 @@ class HybridNester:
         self,
         pieces: List[Piece],
         timeout_seconds: float = 45,
+        cancel_token: Optional[CancellationToken] = None,
+        on_improvement: Optional[
+            Callable[[List[Placement], float, float], None]
+        ] = None,
+        seed: Optional[Tuple[List[int], List[int]]] = None,
     ) -> Tuple[List[Placement], float, float]:
         """
         Try many orderings and pick the best.
+
+        Args:
+            cancel_token: Stop early (with the best layout so far) once cancelled
+            on_improvement: Called with (placements, length, utilization)
+                whenever a better layout is found
+            seed: (order, rotations) decoded first, as the starting layout
+                the heuristics and random search have to beat
         """
         n = len(pieces)
         if n == 0:
@@ -405,10 +592,24 @@ class HybridNester:
 
         start_time = time.time()
 
+        def stopped() -> bool:
+            return cancel_token is not None and cancel_token.cancelled
+
         best_placements = []
         best_length = float("inf")
         best_util = 0
 
+        if seed is not None:
+            with phase("hybrid.seed"):
+                placements, length = self.nest_with_order(pieces, *seed)
+                placements, length = self.compact_layout(placements, pieces)
+            if len(placements) == n:
+                best_placements = placements
+                best_length = length
+                best_util = self.calculate_utilization(placements, pieces, length)
+                if on_improvement is not None:
+                    on_improvement(best_placements, best_length, best_util)
+
         # Heuristic orderings to try
         orderings = [
             # By area (decreasing)
@@ -441,46 +642,72 @@ class HybridNester:
         ]
 
         # Try heuristic combinations
-        for order in orderings:
-            for rots in rotation_strategies:
-                if time.time() - start_time > timeout_seconds / 2:
-                    break
+        with phase("hybrid.heuristics"):
+            for order in orderings:
+                for rots in rotation_strategies:
+                    if time.time() - start_time > timeout_seconds / 2 or stopped():
+                        break
 
-                placements, length = self.nest_with_order(pieces, order, rots)
-                placements, length = self.compact_layout(placements, pieces)
-                util = self.calculate_utilization(placements, pieces, length)
+                    placements, length = self.nest_with_order(pieces, order, rots)
+                    placements, length = self.compact_layout(placements, pieces)
+                    util = self.calculate_utilization(placements, pieces, length)
 
-                if util > best_util:
-                    best_util = util
-                    best_placements = placements
-                    best_length = length
+                    if util > best_util:
+                        best_util = util
+                        best_placements = placements
+                        best_length = length
+                        if on_improvement is not None:
+                            on_improvement(best_placements, best_length, best_util)
 
-                    if best_util >= 98:
-                        return best_placements, best_length, best_util
+                        if best_util >= 98:
+                            return best_placements, best_length, best_util
 
         # Random search for remaining time
-        while time.time() - start_time < timeout_seconds:
-            order = list(range(n))
-            random.shuffle(order)
-            rots = [random.choice(ROTATION_ANGLES) for _ in range(n)]
-
-            placements, length = self.nest_with_order(pieces, order, rots)
-            util = self.calculate_utilization(placements, pieces, length)
+        with phase("hybrid.random_search"):
+            while time.time() - start_time < timeout_seconds and not stopped():
+                order = list(range(n))
+                random.shuffle(order)
+                rots = [random.choice(list(piece.rotations)) for piece in pieces]
 
-            # Only compact if promising
-            if util > best_util * 0.9:
-                placements, length = self.compact_layout(placements, pieces)
+                placements, length = self.nest_with_order(pieces, order, rots)
                 util = self.calculate_utilization(placements, pieces, length)
 
-            if util > best_util:
-                best_util = util
-                best_placements = placements
-                best_length = length
+                # Only compact if promising
+                if util > best_util * 0.9:
+                    placements, length = self.compact_layout(placements, pieces)
+                    util = self.calculate_utilization(placements, pieces, length)
+
+                if util > best_util:
+                    best_util = util
+                    best_placements = placements
+                    best_length = length
+                    if on_improvement is not None:
+                        on_improvement(best_placements, best_length, best_util)
 
         return best_placements, best_length, best_util
 
-    def nest(self, contour_groups: List[List[Point]]) -> NestingResult:
-        """Main nesting function."""
+    def nest(
+        self,
+        contour_groups: List[List[Point]],
+        timeout_seconds: float = 45,
+        cancel_token: Optional[CancellationToken] = None,
+        on_improvement: Optional[ImprovementCallback] = None,
+        rotation_table: Optional[Any] = None,
+        seed_order: Optional[List[Tuple[int, int]]] = None,
+    ) -> NestingResult:
+        """
+        Main nesting function.
+
+        Args:
+            contour_groups: List of point lists representing pieces
+            timeout_seconds: Budget for the optimizer
+            cancel_token: Return the best layout so far once cancelled
+            on_improvement: Called with a NestingResult for each better layout
+            rotation_table: rotation_table.RotationTable with the pieces'
+                allowed angles and pre-rotated polygons
+            seed_order: (piece id, rotation) per piece in placement order
+                (see seed_order()); the optimizer starts from this layout
+        """
         if not SHAPELY_AVAILABLE:
             raise RuntimeError("Shapely required")
 
@@ -498,28 +725,64 @@ class HybridNester:
                     continue
                 bounds = poly.bounds
                 poly = translate(poly, -bounds[0], -bounds[1])
-                pieces.append(Piece(id=i, original_points=points, shapely_poly=poly))
+                rotated = (
+                    rotation_table.polygons(i) if rotation_table is not None else None
+                )
+                pieces.append(
+                    Piece(
+                        id=i, original_points=points, shapely_poly=poly, rotated=rotated
+                    )
+                )
             except:
                 continue
 
         if not pieces:
             return NestingResult([], self.fabric_width, 0, 0, False, "No valid pieces")
 
+        report = None
+        if on_improvement is not None:
+
+            def report(placements, length, util):
+                on_improvement(self._to_result(placements, pieces, length, util))
+
+        seed = None
+        if seed_order is not None:
+            positions = {piece.id: i for i, piece in enumerate(pieces)}
+            seeded = [(positions[i], r) for i, r in seed_order if i in positions]
+            if len(seeded) == len(pieces):
+                seed = ([i for i, _ in seeded], [r for _, r in seeded])
+
         # Run optimization
         placements, fabric_length, utilization = self.optimize(
-            pieces, timeout_seconds=45
+            pieces,
+            timeout_seconds=timeout_seconds,
+            cancel_token=cancel_token,
+            on_improvement=report,
+            seed=seed,
         )
+        return self._to_result(placements, pieces, fabric_length, utilization)
 
-        # Convert to NestingResult
+    def _to_result(
+        self,
+        placements: List[Placement],
+        pieces: List[Piece],
+        fabric_length: float,
+        utilization: float,
+    ) -> NestingResult:
+        """Convert optimizer placements to a NestingResult."""
         nested_pieces = []
         for placement in placements:
             orig_piece = next((p for p in pieces if p.id == placement.piece_id), None)
             if orig_piece is None:
                 continue
 
-            transformed = shapely_to_points(placement.polygon)
+            # Points at the origin; position places them (as nest_contours adds)
             bounds = placement.polygon.bounds
-            bbox = BoundingBox(bounds[0], bounds[1], bounds[2], bounds[3])
+            transformed = shapely_to_points(
+                translate(placement.polygon, -bounds[0], -bounds[1]),
+                like=orig_piece.original_points,
+            )
+            bbox = BoundingBox(0.0, 0.0, bounds[2] - bounds[0], bounds[3] - bounds[1])
 
             nested_pieces.append(
                 NestedPiece(
@@ -527,7 +790,7 @@ class HybridNester:
                     original_points=orig_piece.original_points,
                     transformed_points=transformed,
                     bbox=bbox,
-                    position=(placement.x, placement.y),
+                    position=(bounds[0], bounds[1]),
                     rotation=placement.rotation,
                 )
             )
@@ -539,6 +802,7 @@ class HybridNester:
             utilization=utilization,
             success=True,
             message=f"Hybrid nested {len(nested_pieces)} pieces at {utilization:.1f}%",
+            metadata={"placement_index": dict(self.index_stats)},
         )
 
 
@@ -546,10 +810,34 @@ def hybrid_nest(
     contour_groups: List[List[Point]],
     fabric_width: float = CUTTER_WIDTH_CM,
     gap: float = GAP_CM,
+    timeout_seconds: float = 45,
+    cancel_token: Optional[CancellationToken] = None,
+    on_improvement: Optional[ImprovementCallback] = None,
+    rotation_table: Optional[Any] = None,
+    seed_order: Optional[List[Tuple[int, int]]] = None,
 ) -> NestingResult:
     """Main entry point."""
     nester = HybridNester(fabric_width, gap)
-    return nester.nest(contour_groups)
+    return nester.nest(
+        contour_groups,
+        timeout_seconds=timeout_seconds,
+        cancel_token=cancel_token,
+        on_improvement=on_improvement,
+        rotation_table=rotation_table,
+        seed_order=seed_order,
+    )
+
+
+def seed_order(result: NestingResult) -> List[Tuple[int, int]]:
+    """
+    (piece id, rotation) of a layout's pieces, lowest then leftmost first:
+    the order in which the bottom-left decoder rebuilds a similar layout.
+    """
+    placed = sorted(
+        result.pieces,
+        key=lambda p: (p.position[1] + p.bbox.min_y, p.position[0] + p.bbox.min_x),
+    )
+    return [(p.piece_id, p.rotation) for p in placed]
 
 
 def best_of_all(
@@ -17,15 +17,24 @@ Current performance:
 For garment patterns, pieces often have similar heights, which limits
 shelf-based efficiency. Guillotine and skyline work better.
 
+Both run on NumPy by default (engine="array"): the skyline is kept as
+sorted x / y / width arrays with a vectorized lowest-fit search, and the
+guillotine free rectangles live in a FreeRectStore with vectorized best
+fit and pruning of rectangles no remaining piece fits. engine="list" keeps
+the original pure-Python implementations; both engines give the same
+layouts, the array engines just stay fast on markers with 1,000+ pieces.
+
 Author: Claude
 Date: 2026-01-30
 """
 
 import math
-from typing import List, Dict, Tuple, Optional, NamedTuple
+from typing import Any, List, Dict, Tuple, Optional, NamedTuple
 from dataclasses import dataclass, field
 from copy import deepcopy
 
+import numpy as np
+
 from nesting_engine import (
     Point,
     BoundingBox,
@@ -38,6 +47,15 @@ from nesting_engine import (
     CUTTER_WIDTH_CM,
 )
 
+# Bounding-box packers only distinguish these orientations
+RECT_ROTATIONS = (0, 90)
+
+# Free rectangles at or below this size (cm) are dropped
+MIN_FREE_RECT_CM = 1.0
+
+# Piece and skyline edges closer than this (cm) are re-checked exactly
+EDGE_EPSILON = 1e-6
+
 
 class FreeRect(NamedTuple):
     """A free rectangle in guillotine nesting."""
@@ -57,65 +75,113 @@ class SkylineNode:
     width: float
 
 
-def guillotine_nest(
-    contour_groups: List[List[Point]],
-    fabric_width: float = CUTTER_WIDTH_CM,
-    gap: float = GAP_CM,
-    split_rule: str = "shorter_axis",  # shorter_axis, longer_axis, area
-) -> NestingResult:
+def _prepare_pieces(
+    contour_groups: List[List[Point]], rotation_table: Optional[Any] = None
+) -> List[Dict]:
     """
-    Guillotine bin-packing algorithm.
+    Each piece normalized at 0 and 90 degrees, with bounding boxes.
 
-    After placing each piece, splits the remaining free space into
-    smaller rectangles using guillotine cuts (full-width or full-height).
-
-    Args:
-        contour_groups: List of point lists representing pieces
-        fabric_width: Maximum width
-        gap: Gap between pieces
-        split_rule: How to split remaining space after placement
-
-    Returns:
-        NestingResult with optimized layout
+    With a rotation table the shapes come from it, and only the angles the
+    piece's grain allows are kept in "rotations".
     """
-    if not contour_groups:
-        return NestingResult([], fabric_width, 0, 0, True, "No pieces")
-
-    # Prepare pieces with all rotations
     prepared = []
     for i, points in enumerate(contour_groups):
-        if not points:
+        if not len(points):
             continue
 
-        normalized = normalize_to_origin(points)
-        bbox = calculate_bbox(normalized)
-
-        # Also prepare 90-degree rotation
-        rotated_90 = rotate_points(points, 90)
-        rotated_90 = normalize_to_origin(rotated_90)
-        bbox_90 = calculate_bbox(rotated_90)
-
-        prepared.append(
-            {
-                "id": i,
-                "original": points,
-                "points_0": normalized,
-                "bbox_0": bbox,
-                "points_90": rotated_90,
-                "bbox_90": bbox_90,
-            }
-        )
+        piece = {"id": i, "original": points, "rotations": list(RECT_ROTATIONS)}
+        if rotation_table is not None:
+            piece["rotations"] = [
+                angle for angle in RECT_ROTATIONS if rotation_table.allows(i, angle)
+            ]
+            for angle in piece["rotations"]:
+                shape = rotation_table.shape(i, angle)
+                piece[f"points_{angle}"] = shape.points
+                piece[f"bbox_{angle}"] = shape.bbox
+        else:
+            normalized = normalize_to_origin(points)
+            piece["points_0"] = normalized
+            piece["bbox_0"] = calculate_bbox(normalized)
 
-    # Sort by area (largest first)
-    prepared.sort(key=lambda p: p["bbox_0"].area, reverse=True)
+            # Also prepare 90-degree rotation
+            rotated_90 = rotate_points(points, 90)
+            rotated_90 = normalize_to_origin(rotated_90)
+            piece["points_90"] = rotated_90
+            piece["bbox_90"] = calculate_bbox(rotated_90)
 
-    # Initialize with one large free rectangle
-    # Use a large initial height that we'll trim later
-    max_height = sum(
-        max(p["bbox_0"].height, p["bbox_90"].height) for p in prepared
-    ) + gap * len(prepared)
-    free_rects: List[FreeRect] = [FreeRect(0, 0, fabric_width, max_height)]
+        prepared.append(piece)
+    return prepared
+
+
+def _max_height(piece: Dict) -> float:
+    """Tallest allowed orientation of a prepared piece."""
+    return max(piece[f"bbox_{angle}"].height for angle in piece["rotations"])
+
+
+def _nested_piece(piece: Dict, rotation: int, x: float, y: float) -> NestedPiece:
+    return NestedPiece(
+        piece_id=piece["id"],
+        original_points=piece["original"],
+        transformed_points=piece[f"points_{rotation}"],
+        bbox=piece[f"bbox_{rotation}"],
+        position=(x, y),
+        rotation=rotation,
+    )
 
+
+# ---------------------------------------------------------------------------
+# Guillotine
+# ---------------------------------------------------------------------------
+
+
+def _split_free_rect(
+    rect: FreeRect, piece_w: float, piece_h: float, split_rule: str
+) -> List[FreeRect]:
+    """Free rectangles left after placing a piece in the corner of rect."""
+    # Remaining space to the right
+    right_w = rect.width - piece_w
+    right_h = piece_h
+
+    # Remaining space above
+    above_w = rect.width
+    above_h = rect.height - piece_h
+
+    new_rects = []
+    # Add new free rectangles based on split rule
+    if split_rule == "shorter_axis":
+        # Split along shorter leftover axis
+        if right_w < above_h:
+            # Horizontal split preferred
+            if right_w > 0:
+                new_rects.append(FreeRect(rect.x + piece_w, rect.y, right_w, piece_h))
+            if above_h > 0:
+                new_rects.append(
+                    FreeRect(rect.x, rect.y + piece_h, rect.width, above_h)
+                )
+        else:
+            # Vertical split preferred
+            if right_w > 0:
+                new_rects.append(
+                    FreeRect(rect.x + piece_w, rect.y, right_w, rect.height)
+                )
+            if above_h > 0:
+                new_rects.append(FreeRect(rect.x, rect.y + piece_h, piece_w, above_h))
+    else:
+        # Default: add both
+        if right_w > 0 and right_h > 0:
+            new_rects.append(FreeRect(rect.x + piece_w, rect.y, right_w, right_h))
+        if above_w > 0 and above_h > 0:
+            new_rects.append(FreeRect(rect.x, rect.y + piece_h, above_w, above_h))
+    return new_rects
+
+
+def _guillotine_place_list(
+    prepared: List[Dict],
+    free_rects: List[FreeRect],
+    gap: float,
+    split_rule: str,
+) -> Tuple[List[NestedPiece], float]:
+    """Reference guillotine placement over a list of FreeRect tuples."""
     placed_pieces: List[NestedPiece] = []
     actual_max_y = 0
 
@@ -127,13 +193,8 @@ def guillotine_nest(
         best_bbox = piece["bbox_0"]
 
         # Try both rotations
-        for rotation in [0, 90]:
-            if rotation == 0:
-                points = piece["points_0"]
-                bbox = piece["bbox_0"]
-            else:
-                points = piece["points_90"]
-                bbox = piece["bbox_90"]
+        for rotation in piece["rotations"]:
+            bbox = piece[f"bbox_{rotation}"]
 
             piece_w = bbox.width + gap
             piece_h = bbox.height + gap
@@ -157,133 +218,256 @@ def guillotine_nest(
             # Couldn't place piece - shouldn't happen with large initial height
             continue
 
-        # Place the piece
-        if best_rotation == 0:
-            placed_points = piece["points_0"]
-        else:
-            placed_points = piece["points_90"]
-
-        placed_pieces.append(
-            NestedPiece(
-                piece_id=piece["id"],
-                original_points=piece["original"],
-                transformed_points=placed_points,
-                bbox=best_bbox,
-                position=(best_x, best_y),
-                rotation=best_rotation,
-            )
-        )
-
+        placed_pieces.append(_nested_piece(piece, best_rotation, best_x, best_y))
         actual_max_y = max(actual_max_y, best_y + best_bbox.height)
 
         # Split the free rectangle
         rect = free_rects.pop(best_rect_idx)
-        piece_w = best_bbox.width + gap
-        piece_h = best_bbox.height + gap
-
-        # Remaining space to the right
-        right_w = rect.width - piece_w
-        right_h = piece_h
-
-        # Remaining space above
-        above_w = rect.width
-        above_h = rect.height - piece_h
-
-        # Add new free rectangles based on split rule
-        if split_rule == "shorter_axis":
-            # Split along shorter leftover axis
-            if right_w < above_h:
-                # Horizontal split preferred
-                if right_w > 0:
-                    free_rects.append(
-                        FreeRect(rect.x + piece_w, rect.y, right_w, piece_h)
-                    )
-                if above_h > 0:
-                    free_rects.append(
-                        FreeRect(rect.x, rect.y + piece_h, rect.width, above_h)
-                    )
-            else:
-                # Vertical split preferred
-                if right_w > 0:
-                    free_rects.append(
-                        FreeRect(rect.x + piece_w, rect.y, right_w, rect.height)
-                    )
-                if above_h > 0:
-                    free_rects.append(
-                        FreeRect(rect.x, rect.y + piece_h, piece_w, above_h)
-                    )
-        else:
-            # Default: add both
-            if right_w > 0 and right_h > 0:
-                free_rects.append(FreeRect(rect.x + piece_w, rect.y, right_w, right_h))
-            if above_w > 0 and above_h > 0:
-                free_rects.append(FreeRect(rect.x, rect.y + piece_h, above_w, above_h))
+        free_rects.extend(
+            _split_free_rect(
+                rect, best_bbox.width + gap, best_bbox.height + gap, split_rule
+            )
+        )
 
         # Clean up tiny rectangles
-        min_dim = 1.0  # cm
-        free_rects = [r for r in free_rects if r.width > min_dim and r.height > min_dim]
+        free_rects = [
+            r
+            for r in free_rects
+            if r.width > MIN_FREE_RECT_CM and r.height > MIN_FREE_RECT_CM
+        ]
 
-    # Calculate utilization
-    fabric_length = actual_max_y
-    total_piece_area = sum(p.bbox.area for p in placed_pieces)
-    fabric_area = fabric_width * fabric_length if fabric_length > 0 else 1
-    utilization = (total_piece_area / fabric_area) * 100
+    return placed_pieces, actual_max_y
 
-    return NestingResult(
-        pieces=placed_pieces,
-        fabric_width=fabric_width,
-        fabric_length=fabric_length,
-        utilization=utilization,
-        success=True,
-        message=f"Guillotine nested {len(placed_pieces)} pieces at {utilization:.1f}% utilization",
-    )
 
+class FreeRectStore:
+    """
+    Guillotine free rectangles as parallel NumPy arrays (x, y, width, height).
 
-def skyline_nest(
+    Rectangles keep the insertion order of the list implementation, so ties
+    in the best-fit search resolve the same way. prune() drops rectangles no
+    remaining piece can fit (they could never be chosen); merge() joins
+    rectangles sharing a full edge (optional, changes layouts).
+    """
+
+    def __init__(self, rect: FreeRect, capacity: int = 64):
+        self._data = np.empty((capacity, 4), dtype=np.float64)
+        self._data[0] = rect
+        self.size = 1
+
+    @property
+    def rects(self) -> np.ndarray:
+        return self._data[: self.size]
+
+    def __len__(self) -> int:
+        return self.size
+
+    def best_fit(self, piece_w: float, piece_h: float) -> Tuple[int, float]:
+        """Index and score of the lowest-left rectangle that fits (-1 if none)."""
+        rects = self.rects
+        fits = (piece_w <= rects[:, 2]) & (piece_h <= rects[:, 3])
+        if not fits.any():
+            return -1, float("inf")
+        scores = np.where(fits, rects[:, 1] * 10000 + rects[:, 0], np.inf)
+        index = int(np.argmin(scores))
+        return index, float(scores[index])
+
+    def pop(self, index: int) -> FreeRect:
+        rect = FreeRect(*self._data[index].tolist())
+        self._data[index : self.size - 1] = self._data[index + 1 : self.size]
+        self.size -= 1
+        return rect
+
+    def extend(self, rects: List[FreeRect]):
+        if self.size + len(rects) > len(self._data):
+            grown = np.empty((2 * (self.size + len(rects)), 4), dtype=np.float64)
+            grown[: self.size] = self.rects
+            self._data = grown
+        for rect in rects:
+            self._data[self.size] = rect
+            self.size += 1
+
+    def keep(self, mask: np.ndarray):
+        """Keep the rectangles where mask is True (order preserved)."""
+        kept = self.rects[mask]
+        self.size = len(kept)
+        self._data[: self.size] = kept
+
+    def prune(self, min_width: float, min_height: float):
+        """Drop tiny rectangles and ones narrower/shorter than any piece left."""
+        rects = self.rects
+        self.keep(
+            (rects[:, 2] > MIN_FREE_RECT_CM)
+            & (rects[:, 3] > MIN_FREE_RECT_CM)
+            & (rects[:, 2] >= min_width)
+            & (rects[:, 3] >= min_height)
+        )
+
+    def merge(self, tolerance: float = 1e-9):
+        """Join pairs of rectangles that share a full edge, until none do."""
+        merged = True
+        while merged:
+            merged = False
+            rects = self.rects
+            for i in range(self.size):
+                x, y, w, h = rects[i]
+                same_row = (np.abs(rects[:, 1] - y) < tolerance) & (
+                    np.abs(rects[:, 3] - h) < tolerance
+                )
+                same_col = (np.abs(rects[:, 0] - x) < tolerance) & (
+                    np.abs(rects[:, 2] - w) < tolerance
+                )
+                right = same_row & (np.abs(rects[:, 0] - (x + w)) < tolerance)
+                above = same_col & (np.abs(rects[:, 1] - (y + h)) < tolerance)
+                if right.any():
+                    j = int(np.argmax(right))
+                    rects[i, 2] += rects[j, 2]
+                elif above.any():
+                    j = int(np.argmax(above))
+                    rects[i, 3] += rects[j, 3]
+                else:
+                    continue
+                self.pop(j)
+                merged = True
+                break
+
+
+def _guillotine_place_array(
+    prepared: List[Dict],
+    free_rect: FreeRect,
+    gap: float,
+    split_rule: str,
+    merge_free_rects: bool,
+) -> Tuple[List[NestedPiece], float]:
+    """Guillotine placement over a FreeRectStore with vectorized best fit."""
+    store = FreeRectStore(free_rect)
+    placed_pieces: List[NestedPiece] = []
+    actual_max_y = 0
+
+    # Smallest padded width / height among the pieces still to place
+    sizes = np.array(
+        [
+            [
+                min(p[f"bbox_{angle}"].width for angle in p["rotations"]) + gap,
+                min(p[f"bbox_{angle}"].height for angle in p["rotations"]) + gap,
+            ]
+            for p in prepared
+        ]
+    ).reshape(-1, 2)
+    remaining_min = np.minimum.accumulate(sizes[::-1], axis=0)[::-1]
+
+    for k, piece in enumerate(prepared):
+        best_rect_idx, best_score, best_rotation = -1, float("inf"), 0
+
+        # Try both rotations
+        for rotation in piece["rotations"]:
+            bbox = piece[f"bbox_{rotation}"]
+            index, score = store.best_fit(bbox.width + gap, bbox.height + gap)
+            if index >= 0 and score < best_score:
+                best_rect_idx, best_score, best_rotation = index, score, rotation
+
+        if best_rect_idx == -1:
+            continue
+
+        best_bbox = piece[f"bbox_{best_rotation}"]
+        rect = store.pop(best_rect_idx)
+        placed_pieces.append(_nested_piece(piece, best_rotation, rect.x, rect.y))
+        actual_max_y = max(actual_max_y, rect.y + best_bbox.height)
+
+        store.extend(
+            _split_free_rect(
+                rect, best_bbox.width + gap, best_bbox.height + gap, split_rule
+            )
+        )
+        if merge_free_rects:
+            store.merge()
+        if k + 1 < len(prepared):
+            store.prune(*remaining_min[k + 1])
+        else:
+            store.prune(0.0, 0.0)
+
+    return placed_pieces, actual_max_y
+
+
+def guillotine_nest(
     contour_groups: List[List[Point]],
     fabric_width: float = CUTTER_WIDTH_CM,
     gap: float = GAP_CM,
+    split_rule: str = "shorter_axis",  # shorter_axis, longer_axis, area
+    engine: str = "array",
+    merge_free_rects: bool = False,
+    rotation_table: Optional[Any] = None,
 ) -> NestingResult:
     """
-    Skyline bin-packing algorithm.
+    Guillotine bin-packing algorithm.
 
-    Maintains a "skyline" - the top edge of placed pieces.
-    Places new pieces in the lowest valley of the skyline.
+    After placing each piece, splits the remaining free space into
+    smaller rectangles using guillotine cuts (full-width or full-height).
 
-    This produces tighter packing than shelf-based for varied piece heights.
+    Args:
+        contour_groups: List of point lists representing pieces
+        fabric_width: Maximum width
+        gap: Gap between pieces
+        split_rule: How to split remaining space after placement
+        engine: "array" (NumPy free-rectangle store) or "list" (reference
+                implementation); both give the same layout
+        merge_free_rects: Join free rectangles sharing a full edge after each
+                split ("array" only; can change the layout)
+        rotation_table: rotation_table.RotationTable with the pieces' allowed
+                angles and pre-rotated shapes
+
+    Returns:
+        NestingResult with optimized layout
     """
     if not contour_groups:
         return NestingResult([], fabric_width, 0, 0, True, "No pieces")
+    if engine not in ("array", "list"):
+        raise ValueError(f"Unknown guillotine engine: {engine}")
 
-    # Prepare pieces
-    prepared = []
-    for i, points in enumerate(contour_groups):
-        if not points:
-            continue
+    # Prepare pieces with all rotations
+    prepared = _prepare_pieces(contour_groups, rotation_table)
+
+    # Sort by area (largest first)
+    prepared.sort(key=lambda p: p["bbox_0"].area, reverse=True)
+
+    # Initialize with one large free rectangle
+    # Use a large initial height that we'll trim later
+    max_height = sum(_max_height(p) for p in prepared) + gap * len(prepared)
+    free_rect = FreeRect(0, 0, fabric_width, max_height)
 
-        normalized = normalize_to_origin(points)
-        bbox = calculate_bbox(normalized)
-
-        rotated_90 = rotate_points(points, 90)
-        rotated_90 = normalize_to_origin(rotated_90)
-        bbox_90 = calculate_bbox(rotated_90)
-
-        prepared.append(
-            {
-                "id": i,
-                "original": points,
-                "points_0": normalized,
-                "bbox_0": bbox,
-                "points_90": rotated_90,
-                "bbox_90": bbox_90,
-            }
+    if engine == "array":
+        placed_pieces, actual_max_y = _guillotine_place_array(
+            prepared, free_rect, gap, split_rule, merge_free_rects
+        )
+    else:
+        placed_pieces, actual_max_y = _guillotine_place_list(
+            prepared, [free_rect], gap, split_rule
         )
 
-    # Sort by height (tallest first)
-    prepared.sort(
-        key=lambda p: max(p["bbox_0"].height, p["bbox_90"].height), reverse=True
+    # Calculate utilization
+    fabric_length = actual_max_y
+    total_piece_area = sum(p.bbox.area for p in placed_pieces)
+    fabric_area = fabric_width * fabric_length if fabric_length > 0 else 1
+    utilization = (total_piece_area / fabric_area) * 100
+
+    return NestingResult(
+        pieces=placed_pieces,
+        fabric_width=fabric_width,
+        fabric_length=fabric_length,
+        utilization=utilization,
+        success=True,
+        message=f"Guillotine nested {len(placed_pieces)} pieces at {utilization:.1f}% utilization",
     )
 
+
+# ---------------------------------------------------------------------------
+# Skyline
+# ---------------------------------------------------------------------------
+
+
+def _skyline_place_list(
+    prepared: List[Dict], fabric_width: float, gap: float
+) -> List[NestedPiece]:
+    """Reference skyline placement over a list of SkylineNode segments."""
     # Initialize skyline
     skyline: List[SkylineNode] = [SkylineNode(x=0, y=0, width=fabric_width)]
 
@@ -297,11 +481,8 @@ def skyline_nest(
         best_bbox = piece["bbox_0"]
 
         # Try both rotations
-        for rotation in [0, 90]:
-            if rotation == 0:
-                bbox = piece["bbox_0"]
-            else:
-                bbox = piece["bbox_90"]
+        for rotation in piece["rotations"]:
+            bbox = piece[f"bbox_{rotation}"]
 
             piece_w = bbox.width + gap
             piece_h = bbox.height + gap
@@ -334,22 +515,7 @@ def skyline_nest(
         if best_y == float("inf"):
             continue
 
-        # Place the piece
-        if best_rotation == 0:
-            placed_points = piece["points_0"]
-        else:
-            placed_points = piece["points_90"]
-
-        placed_pieces.append(
-            NestedPiece(
-                piece_id=piece["id"],
-                original_points=piece["original"],
-                transformed_points=placed_points,
-                bbox=best_bbox,
-                position=(best_x, best_y),
-                rotation=best_rotation,
-            )
-        )
+        placed_pieces.append(_nested_piece(piece, best_rotation, best_x, best_y))
 
         # Update skyline
         piece_w = best_bbox.width + gap
@@ -423,6 +589,220 @@ def skyline_nest(
             merged_skyline if merged_skyline else [SkylineNode(0, 0, fabric_width)]
         )
 
+    return placed_pieces
+
+
+class ArraySkyline:
+    """
+    Skyline as parallel NumPy arrays of segment x, y and width.
+
+    best_fit() evaluates every start segment at once: a prefix sum of the
+    widths gives the segments each candidate spans, and a segmented max
+    (np.maximum.reduceat) gives the height the piece would rest at.
+    place() splices the piece top into the arrays and re-merges only the
+    span it touched (plus any run it merges into), which is all the list
+    implementation's full merge pass can change.
+    """
+
+    def __init__(self, fabric_width: float):
+        self.fabric_width = fabric_width
+        # One row per segment: x, y, width
+        self.rows = np.array([[0.0, 0.0, fabric_width]])
+
+    @property
+    def x(self) -> np.ndarray:
+        return self.rows[:, 0]
+
+    @property
+    def y(self) -> np.ndarray:
+        return self.rows[:, 1]
+
+    @property
+    def width(self) -> np.ndarray:
+        return self.rows[:, 2]
+
+    def __len__(self) -> int:
+        return len(self.rows)
+
+    def best_fit(self, piece_w: float) -> Tuple[float, int]:
+        """Lowest resting height and its segment index ((inf, -1) if none fit)."""
+        starts = np.nonzero(self.x + piece_w <= self.fabric_width)[0]
+        if not len(starts):
+            return float("inf"), -1
+
+        n = len(self.x)
+        offsets = np.concatenate(([0.0], np.cumsum(self.width)))
+        targets = offsets[starts] + piece_w
+        ends = np.searchsorted(offsets[:n], targets, side="left")
+        ends = np.maximum(ends, starts + 1)
+
+        # Prefix-sum rounding can disagree with subtracting widths one by one
+        # when a piece edge lands on a segment edge; redo those exactly
+        near = np.abs(offsets[np.minimum(ends, n)] - targets) < EDGE_EPSILON
+        near |= np.abs(offsets[ends - 1] - targets) < EDGE_EPSILON
+        for k in np.nonzero(near)[0].tolist():
+            j, remaining = int(starts[k]), piece_w
+            while remaining > 0 and j < n:
+                remaining -= self.width[j]
+                j += 1
+            ends[k] = j
+
+        heights = np.append(self.y, -np.inf)
+        bounds = np.empty(2 * len(starts), dtype=np.intp)
+        bounds[0::2] = starts
+        bounds[1::2] = ends
+        resting = np.maximum.reduceat(heights, bounds)[0::2]
+
+        best = int(np.argmin(resting))
+        return float(resting[best]), int(starts[best])
+
+    def place(self, index: int, x: float, piece_w: float, top: float):
+        """Raise the skyline under a piece placed at segment index."""
+        seg_rows = self.rows
+        seg_x, seg_y, seg_w = self.x, self.y, self.width
+        seg_end = seg_x + seg_w
+        overlap = np.nonzero((seg_end > x) & (seg_x < x + piece_w))[0].tolist()
+        if not overlap:
+            return
+        first, last = overlap[0], overlap[-1] + 1
+
+        # Segments are walked in array order, like the list implementation;
+        # after an overhanging split that order is not always sorted by x, so
+        # untouched segments can sit between the ones under the piece
+        parts = []
+        previous_y = seg_y[first - 1] if first else None
+        start = first
+        for i in overlap:
+            if i > start:
+                parts.append((False, seg_rows[start:i]))
+                previous_y = seg_y[i - 1]
+            start = i + 1
+
+            nodes = []
+            if seg_x[i] < x:
+                nodes.append((seg_x[i], seg_y[i], x - seg_x[i]))
+                previous_y = seg_y[i]
+            if i == index or (previous_y is not None and previous_y != top):
+                nodes.append((x, top, piece_w))
+                previous_y = top
+            if seg_end[i] > x + piece_w:
+                nodes.append((x + piece_w, seg_y[i], seg_end[i] - (x + piece_w)))
+                previous_y = seg_y[i]
+            parts.append((True, nodes))
+
+        # Sequential merge from the last segment before the span to the first
+        # segment after it that stays separate. Untouched runs were already
+        # merged, so once one of their segments stays separate the rest do too
+        merged = []
+        pending = (
+            [seg_x[first - 1], seg_y[first - 1], seg_w[first - 1]] if first else None
+        )
+        for changed, part in parts:
+            k = 0
+            while (
+                k < len(part)
+                and pending is not None
+                and abs(pending[1] - part[k][1]) < 0.01
+            ):
+                pending[2] += part[k][2]
+                k += 1
+            if k == len(part):
+                continue
+            if pending is not None:
+                merged.append([pending])
+            if changed:
+                pending = list(part[k])
+                for node in part[k + 1 :]:
+                    if abs(pending[1] - node[1]) < 0.01:
+                        pending[2] += node[2]
+                    else:
+                        merged.append([pending])
+                        pending = list(node)
+            else:
+                merged.append(part[k:-1])
+                pending = list(part[-1])
+
+        tail = last
+        while tail < len(seg_x) and abs(pending[1] - seg_y[tail]) < 0.01:
+            pending[2] += seg_w[tail]
+            tail += 1
+        merged.append([pending])
+
+        head = max(first - 1, 0)
+        self.rows = np.concatenate(
+            [seg_rows[:head]]
+            + [np.asarray(rows, dtype=np.float64).reshape(-1, 3) for rows in merged]
+            + [seg_rows[tail:]]
+        )
+
+
+def _skyline_place_array(
+    prepared: List[Dict], fabric_width: float, gap: float
+) -> List[NestedPiece]:
+    """Skyline placement over an ArraySkyline with vectorized best fit."""
+    skyline = ArraySkyline(fabric_width)
+    placed_pieces: List[NestedPiece] = []
+
+    for piece in prepared:
+        best_y, best_idx, best_rotation = float("inf"), -1, 0
+
+        # Try both rotations
+        for rotation in piece["rotations"]:
+            piece_w = piece[f"bbox_{rotation}"].width + gap
+            if piece_w > fabric_width:
+                continue
+            y, index = skyline.best_fit(piece_w)
+            if y < best_y:
+                best_y, best_idx, best_rotation = y, index, rotation
+
+        if best_idx == -1:
+            continue
+
+        bbox = piece[f"bbox_{best_rotation}"]
+        best_x = float(skyline.x[best_idx])
+        placed_pieces.append(_nested_piece(piece, best_rotation, best_x, best_y))
+        skyline.place(best_idx, best_x, bbox.width + gap, best_y + bbox.height + gap)
+
+    return placed_pieces
+
+
+def skyline_nest(
+    contour_groups: List[List[Point]],
+    fabric_width: float = CUTTER_WIDTH_CM,
+    gap: float = GAP_CM,
+    engine: str = "array",
+    rotation_table: Optional[Any] = None,
+) -> NestingResult:
+    """
+    Skyline bin-packing algorithm.
+
+    Maintains a "skyline" - the top edge of placed pieces.
+    Places new pieces in the lowest valley of the skyline.
+
+    This produces tighter packing than shelf-based for varied piece heights.
+
+    Args:
+        engine: "array" (NumPy skyline, vectorized search) or "list"
+                (reference implementation); both give the same layout
+        rotation_table: rotation_table.RotationTable with the pieces' allowed
+                angles and pre-rotated shapes
+    """
+    if not contour_groups:
+        return NestingResult([], fabric_width, 0, 0, True, "No pieces")
+    if engine not in ("array", "list"):
+        raise ValueError(f"Unknown skyline engine: {engine}")
+
+    # Prepare pieces
+    prepared = _prepare_pieces(contour_groups, rotation_table)
+
+    # Sort by height (tallest first)
+    prepared.sort(key=_max_height, reverse=True)
+
+    if engine == "array":
+        placed_pieces = _skyline_place_array(prepared, fabric_width, gap)
+    else:
+        placed_pieces = _skyline_place_list(prepared, fabric_width, gap)
+
     # Calculate results
     fabric_length = max(
         (p.position[1] + p.bbox.height for p in placed_pieces), default=0
@@ -445,6 +825,7 @@ def best_nest(
     contour_groups: List[List[Point]],
     fabric_width: float = CUTTER_WIDTH_CM,
     gap: float = GAP_CM,
+    rotation_table: Optional[Any] = None,
 ) -> NestingResult:
     """
     Try multiple algorithms and return the best result.
@@ -457,21 +838,27 @@ def best_nest(
 
     # Try shelf-based (fastest)
     try:
-        result_shelf = nest_bottom_left_fill(contour_groups, fabric_width, gap)
+        result_shelf = nest_bottom_left_fill(
+            contour_groups, fabric_width, gap, rotation_table=rotation_table
+        )
         results.append(("shelf", result_shelf))
     except Exception:
         pass
 
     # Try guillotine
     try:
-        result_guillotine = guillotine_nest(contour_groups, fabric_width, gap)
+        result_guillotine = guillotine_nest(
+            contour_groups, fabric_width, gap, rotation_table=rotation_table
+        )
         results.append(("guillotine", result_guillotine))
     except Exception:
         pass
 
     # Try skyline
     try:
-        result_skyline = skyline_nest(contour_groups, fabric_width, gap)
+        result_skyline = skyline_nest(
+            contour_groups, fabric_width, gap, rotation_table=rotation_table
+        )
         results.append(("skyline", result_skyline))
     except Exception:
         pass
@@ -23,6 +23,22 @@ Practical maximum (considering bounding box fill ratios):
 - Skinny Trousers: ~65% (pieces are only 65% filled - lots of curves)
 - Skinny Cargo: ~77% (pieces are 77% filled)
 
+By default the algorithms run as a portfolio: each one in its own worker
+process against a shared deadline, stopping early once any of them reaches
+PORTFOLIO_TARGET_UTILIZATION. Per-algorithm wall time and outcome are
+reported in NestingResult.metadata["portfolio"]. The true-shape NFP nester
+(nfp_nesting) is opt-in: pass algorithms=[..., "nfp"] (optional_algorithms()).
+
+Inside nesting_profiler.profile_nesting() each algorithm is timed as phase
+"algorithm.<name>"; portfolio workers profile themselves in the same mode
+and their reports are merged back under the profile's "algorithms".
+
+Anytime mode (anytime_nest / nest_until) runs the same process-pool
+portfolio and hands back every improved layout as soon as any worker finds
+it, so callers can stop at the first "good enough" layout, a deadline, or a
+CancellationToken instead of waiting for the whole budget. Anytime runs
+always have a deadline (DEFAULT_TIMEOUT_SECONDS unless given).
+
 Note: Reaching 98% requires true polygon interlocking, which needs:
 1. Pieces with complementary shapes (concave fits convex)
 2. No-Fit Polygon (NFP) based placement
@@ -33,15 +49,23 @@ Date: 2026-01-31
 """
 
 import time
-from typing import List, Dict, Optional
+import contextvars
+import queue
+import itertools
+import threading
+import multiprocessing
+from typing import Any, Iterator, List, Dict, Optional, Tuple
 
 from nesting_engine import (
     Point,
     NestingResult,
+    CancellationToken,
+    ImprovementCallback,
     CUTTER_WIDTH_CM,
     GAP_CM,
     nest_bottom_left_fill,
 )
+from nesting_profiler import active_mode, merge, phase, profile_nesting
 
 # Import improved algorithms
 try:
@@ -53,111 +77,966 @@ except ImportError:
 
 # Import hybrid algorithm
 try:
-    from hybrid_nesting import hybrid_nest
+    from hybrid_nesting import hybrid_nest, seed_order as layout_order
 
     HYBRID_AVAILABLE = True
 except ImportError:
     HYBRID_AVAILABLE = False
 
+# Anytime-capable engines (opt-in via algorithms=)
+try:
+    from turbo_nesting import turbo_nest
+
+    TURBO_AVAILABLE = True
+except ImportError:
+    TURBO_AVAILABLE = False
 
-def master_nest(
+try:
+    from ultimate_nesting import ultimate_nest
+
+    ULTIMATE_AVAILABLE = True
+except ImportError:
+    ULTIMATE_AVAILABLE = False
+
+# True-shape NFP nesting on the integer geometry kernel (opt-in via algorithms=)
+try:
+    from nfp_nesting import nfp_nest_from_points
+
+    NFP_AVAILABLE = True
+except ImportError:
+    NFP_AVAILABLE = False
+
+# Shared per-piece rotation tables (allowed angles + pre-rotated shapes)
+try:
+    from rotation_table import build_rotation_table
+
+    ROTATION_TABLE_AVAILABLE = True
+except ImportError:
+    ROTATION_TABLE_AVAILABLE = False
+
+
+# Default shared deadline of master_nest and anytime nesting
+DEFAULT_TIMEOUT_SECONDS = 60
+# Portfolio mode: stop as soon as any algorithm reaches this utilization
+PORTFOLIO_TARGET_UTILIZATION = 98.0
+# Hybrid never gets more than this, even with a long shared deadline
+HYBRID_MAX_SECONDS = 45
+# Same cap for the NFP nester's GA
+NFP_MAX_SECONDS = 45
+# Sequential mode only starts these with more than this many seconds left
+SLOW_ALGORITHMS = ("hybrid", "nfp")
+SLOW_MIN_SECONDS = 5
+# Time reserved for a worker to ship its result back before the deadline
+PORTFOLIO_RESULT_MARGIN_SECONDS = 1.0
+# Name of a caller's warm-start layout among the algorithms' results
+WARM_START = "warm_start"
+# Anytime mode waits at most this long for the running algorithm to notice
+# a cancellation before abandoning its thread
+ANYTIME_JOIN_SECONDS = 5.0
+
+
+def _rotation_table(contour_groups: List[List[Point]], rotation_table: Any) -> Any:
+    """The caller's rotation table, or a default one built once for every engine."""
+    if rotation_table is None and ROTATION_TABLE_AVAILABLE:
+        rotation_table = build_rotation_table(contour_groups)
+    return rotation_table
+
+
+def _report_rotations(result: NestingResult, rotation_table: Any) -> NestingResult:
+    if rotation_table is not None:
+        result.metadata["rotations"] = rotation_table.report()
+    return result
+
+
+def _seed_order(seed: Optional[NestingResult]) -> Optional[List[Tuple[int, Any]]]:
+    """Placement order of a warm-start layout, for the hybrid optimizer."""
+    if seed is None or not seed.success or not HYBRID_AVAILABLE:
+        return None
+    return layout_order(seed)
+
+
+def _add_seed(
+    results: Dict[str, NestingResult],
+    runs: Dict[str, Dict[str, Any]],
+    seed: Optional[NestingResult],
+):
+    """The warm-start layout competes with the algorithms' results."""
+    if seed is None or not seed.success:
+        return
+    results[WARM_START] = seed
+    runs[WARM_START] = {
+        "status": "ok",
+        "wall_time_s": 0.0,
+        "utilization": seed.utilization,
+    }
+
+
+def _nest_with(
+    name: str,
+    contour_groups: List[List[Point]],
+    fabric_width: float,
+    gap: float,
+    time_budget: float,
+    rotation_table: Any = None,
+    seed_order: Optional[List[Tuple[int, Any]]] = None,
+    cancel_token: Optional[CancellationToken] = None,
+    on_improvement: Optional[ImprovementCallback] = None,
+) -> NestingResult:
+    """
+    Run the named algorithm within time_budget seconds.
+
+    hybrid starts from seed_order. hybrid, turbo and ultimate stop early on
+    cancel_token and report improved layouts to on_improvement (anytime_nest).
+    """
+    if name == "shelf":
+        return nest_bottom_left_fill(
+            contour_groups, fabric_width, gap, rotation_table=rotation_table
+        )
+    if name == "guillotine":
+        return guillotine_nest(
+            contour_groups, fabric_width, gap, rotation_table=rotation_table
+        )
+    if name == "skyline":
+        return skyline_nest(
+            contour_groups, fabric_width, gap, rotation_table=rotation_table
+        )
+    if name == "hybrid":
+        return hybrid_nest(
+            contour_groups,
+            fabric_width,
+            gap,
+            timeout_seconds=max(
+                1.0,
+                min(HYBRID_MAX_SECONDS, time_budget) - PORTFOLIO_RESULT_MARGIN_SECONDS,
+            ),
+            cancel_token=cancel_token,
+            on_improvement=on_improvement,
+            rotation_table=rotation_table,
+            seed_order=seed_order,
+        )
+    if name == "turbo":
+        return turbo_nest(
+            contour_groups,
+            fabric_width,
+            gap,
+            timeout_seconds=max(1.0, time_budget - PORTFOLIO_RESULT_MARGIN_SECONDS),
+            cancel_token=cancel_token,
+            on_improvement=on_improvement,
+            rotation_table=rotation_table,
+        )
+    if name == "ultimate":
+        return ultimate_nest(
+            contour_groups,
+            fabric_width,
+            gap,
+            timeout_seconds=max(1.0, time_budget - PORTFOLIO_RESULT_MARGIN_SECONDS),
+            cancel_token=cancel_token,
+            on_improvement=on_improvement,
+            rotation_table=rotation_table,
+        )
+    if name == "nfp":
+        return nfp_nest_from_points(
+            contour_groups,
+            fabric_width,
+            gap,
+            timeout_seconds=max(
+                1.0,
+                min(NFP_MAX_SECONDS, time_budget) - PORTFOLIO_RESULT_MARGIN_SECONDS,
+            ),
+            rotation_table=rotation_table,
+        )
+    raise ValueError(f"Unknown nesting algorithm: {name}")
+
+
+def _run_portfolio_algorithm(
+    name: str,
+    contour_groups: List[List[Point]],
+    fabric_width: float,
+    gap: float,
+    time_budget: float,
+    rotation_table: Any = None,
+    profile_mode: Optional[str] = None,
+    seed_order: Optional[List[Tuple[int, Any]]] = None,
+) -> Tuple[str, Optional[NestingResult], float, Optional[str]]:
+    """
+    Run one portfolio algorithm inside a worker process.
+
+    Module-level so it can be pickled by multiprocessing.
+
+    Args:
+        profile_mode: Profile the run with a fresh profiler in this mode
+            and return its report in result.metadata["profile"] (worker
+            processes cannot report to the parent's profiler directly)
+
+    Returns:
+        (name, result or None, wall time in seconds, error message or None)
+    """
+    if profile_mode is not None:
+        with profile_nesting(profile_mode, fresh=True) as profiler:
+            outcome = _run_portfolio_algorithm(
+                name,
+                contour_groups,
+                fabric_width,
+                gap,
+                time_budget,
+                rotation_table,
+                seed_order=seed_order,
+            )
+        if outcome[1] is not None and profiler is not None:
+            outcome[1].metadata["profile"] = profiler.report()
+        return outcome
+
+    start = time.time()
+    try:
+        with phase(f"algorithm.{name}"):
+            result = _nest_with(
+                name,
+                contour_groups,
+                fabric_width,
+                gap,
+                time_budget,
+                rotation_table,
+                seed_order,
+            )
+        return name, result, time.time() - start, None
+    except Exception as e:
+        return name, None, time.time() - start, str(e)
+
+
+def available_algorithms() -> List[str]:
+    """Algorithms master_nest runs by default in this environment, fastest first."""
+    names = ["shelf"]
+    if IMPROVED_AVAILABLE:
+        names += ["guillotine", "skyline"]
+    if HYBRID_AVAILABLE:
+        names.append("hybrid")
+    return names
+
+
+def optional_algorithms() -> List[str]:
+    """Further algorithms master_nest / portfolio_nest accept via algorithms=."""
+    return ["nfp"] if NFP_AVAILABLE else []
+
+
+def _can_use_process_pool() -> bool:
+    """Daemonic workers (e.g. an outer pool) are not allowed to fork children."""
+    return not multiprocessing.current_process().daemon
+
+
+def _select_best(results: Dict[str, NestingResult]) -> str:
+    """Name of the highest-utilization successful result."""
+    return max(
+        results.keys(),
+        key=lambda k: results[k].utilization if results[k].success else 0,
+    )
+
+
+def _format_timings(runs: Dict[str, Dict[str, Any]]) -> str:
+    """Compact per-algorithm summary for the result message."""
+    parts = []
+    for name, run in runs.items():
+        if run["status"] == "ok":
+            parts.append(f"{name} {run['utilization']:.1f}% {run['wall_time_s']:.2f}s")
+        else:
+            parts.append(f"{name} {run['status']}")
+    return ", ".join(parts)
+
+
+def portfolio_nest(
     contour_groups: List[List[Point]],
     fabric_width: float = CUTTER_WIDTH_CM,
     gap: float = GAP_CM,
-    timeout_seconds: float = 60,
+    timeout_seconds: float = DEFAULT_TIMEOUT_SECONDS,
+    target_utilization: Optional[float] = PORTFOLIO_TARGET_UTILIZATION,
+    algorithms: Optional[List[str]] = None,
+    max_workers: Optional[int] = None,
     verbose: bool = False,
+    rotation_table: Any = None,
+    seed: Optional[NestingResult] = None,
 ) -> NestingResult:
     """
-    Run all nesting algorithms and return the best result.
+    Run every algorithm in its own worker process against one shared deadline.
 
-    This is the recommended entry point for production nesting.
-    It tries multiple algorithms in parallel and picks the highest utilization.
+    Results are collected as each worker finishes. The run ends when all
+    workers are done, the deadline passes, or a result reaches
+    target_utilization; any workers still running are then terminated.
 
     Args:
         contour_groups: List of point lists representing pieces
         fabric_width: Fabric width in cm
         gap: Gap between pieces in cm
-        timeout_seconds: Maximum time for hybrid algorithm
+        timeout_seconds: Shared wall-clock deadline for the whole portfolio
+        target_utilization: Stop early once a result reaches this (None = never)
+        algorithms: Subset of available_algorithms() to run
+        max_workers: Process count (default: one per algorithm)
         verbose: Print progress
+        rotation_table: rotation_table.RotationTable shared by every
+            algorithm (default: built once from contour_groups)
+        seed: Warm-start layout (e.g. from nesting_cache): hybrid starts
+            from its placement order, and it is returned if no algorithm
+            beats it
 
     Returns:
-        NestingResult with best layout
+        NestingResult with the best layout. metadata["portfolio"] holds the
+        per-algorithm status, wall time and utilization.
     """
     if not contour_groups:
         return NestingResult([], fabric_width, 0, 0, True, "No pieces")
 
-    results: Dict[str, NestingResult] = {}
-
-    # Fast algorithms (< 1 second)
+    names = algorithms or available_algorithms()
     start = time.time()
+    deadline = start + timeout_seconds
+    rotation_table = _rotation_table(contour_groups, rotation_table)
+    order = _seed_order(seed)
+
+    workers = max_workers or len(names)
+    finished: "queue.Queue" = queue.Queue()
+    results: Dict[str, NestingResult] = {}
+    runs: Dict[str, Dict[str, Any]] = {
+        name: {"status": "timeout", "wall_time_s": None, "utilization": None}
+        for name in names
+    }
+    stopped_early = False
 
-    # 1. Shelf-based (baseline)
+    pool = multiprocessing.Pool(processes=workers)
     try:
-        results["shelf"] = nest_bottom_left_fill(contour_groups, fabric_width, gap)
-        if verbose:
-            print(f"  Shelf: {results['shelf'].utilization:.1f}%")
-    except Exception as e:
-        if verbose:
-            print(f"  Shelf: FAILED ({e})")
+        for name in names:
+            pool.apply_async(
+                _run_portfolio_algorithm,
+                (
+                    name,
+                    contour_groups,
+                    fabric_width,
+                    gap,
+                    timeout_seconds,
+                    rotation_table,
+                    active_mode(),
+                    order,
+                ),
+                callback=finished.put,
+                error_callback=lambda e, n=name: finished.put((n, None, 0.0, str(e))),
+            )
 
-    # 2. Guillotine
-    if IMPROVED_AVAILABLE:
-        try:
-            results["guillotine"] = guillotine_nest(contour_groups, fabric_width, gap)
-            if verbose:
-                print(f"  Guillotine: {results['guillotine'].utilization:.1f}%")
-        except Exception as e:
+        pending = len(names)
+        while pending:
+            remaining = deadline - time.time()
+            if remaining <= 0:
+                break
+            try:
+                name, result, elapsed, error = finished.get(timeout=remaining)
+            except queue.Empty:
+                break
+            pending -= 1
+
+            run = runs[name]
+            run["wall_time_s"] = round(elapsed, 3)
+            if result is None:
+                run["status"] = "failed"
+                run["error"] = error
+                if verbose:
+                    print(f"  {name.capitalize()}: FAILED ({error})")
+                continue
+
+            run["status"] = "ok" if result.success else "failed"
+            run["utilization"] = result.utilization
+            results[name] = result
+            merge(name, result.metadata.pop("profile", None))
             if verbose:
-                print(f"  Guillotine: FAILED ({e})")
+                print(
+                    f"  {name.capitalize()}: {result.utilization:.1f}% ({elapsed:.2f}s)"
+                )
 
-    # 3. Skyline
-    if IMPROVED_AVAILABLE:
+            if (
+                target_utilization is not None
+                and result.success
+                and result.utilization >= target_utilization
+            ):
+                stopped_early = pending > 0
+                break
+    finally:
+        pool.terminate()
+        pool.join()
+
+    for run in runs.values():
+        if stopped_early and run["status"] == "timeout":
+            run["status"] = "cancelled"
+    _add_seed(results, runs, seed)
+
+    portfolio = {
+        "mode": "parallel",
+        "workers": workers,
+        "timeout_seconds": timeout_seconds,
+        "target_utilization": target_utilization,
+        "stopped_early": stopped_early,
+        "wall_time_s": round(time.time() - start, 3),
+        "algorithms": runs,
+    }
+
+    if not results:
+        return NestingResult(
+            [],
+            fabric_width,
+            0,
+            0,
+            False,
+            f"All algorithms failed ({_format_timings(runs)})",
+            metadata={"portfolio": portfolio},
+        )
+
+    best_name = _select_best(results)
+    best = results[best_name]
+    portfolio["winner"] = best_name
+
+    result = NestingResult(
+        pieces=best.pieces,
+        fabric_width=best.fabric_width,
+        fabric_length=best.fabric_length,
+        utilization=best.utilization,
+        success=best.success,
+        message=(
+            f"Best result ({best_name}): {best.utilization:.1f}% utilization "
+            f"[{_format_timings(runs)}]"
+        ),
+        metadata={**best.metadata, "portfolio": portfolio},
+    )
+    return _report_rotations(result, rotation_table)
+
+
+def master_nest(
+    contour_groups: List[List[Point]],
+    fabric_width: float = CUTTER_WIDTH_CM,
+    gap: float = GAP_CM,
+    timeout_seconds: float = DEFAULT_TIMEOUT_SECONDS,
+    verbose: bool = False,
+    parallel: bool = True,
+    target_utilization: Optional[float] = PORTFOLIO_TARGET_UTILIZATION,
+    rotation_table: Any = None,
+    algorithms: Optional[List[str]] = None,
+    seed: Optional[NestingResult] = None,
+) -> NestingResult:
+    """
+    Run all nesting algorithms and return the best result.
+
+    This is the recommended entry point for production nesting.
+    It tries multiple algorithms in parallel and picks the highest utilization.
+    When worker processes are unavailable (already inside a daemonic pool
+    worker, or the host refuses to spawn) the algorithms run one after
+    another instead.
+
+    Args:
+        contour_groups: List of point lists representing pieces
+        fabric_width: Fabric width in cm
+        gap: Gap between pieces in cm
+        timeout_seconds: Shared deadline for all algorithms
+        verbose: Print progress
+        parallel: Run the algorithms as a process-pool portfolio
+        target_utilization: Parallel mode stops early once this is reached
+        rotation_table: rotation_table.RotationTable with each piece's
+            allowed angles (default: built once here, NESTING_GRAIN_MODE)
+        algorithms: Algorithms to run (default available_algorithms());
+            may include optional_algorithms(), e.g. ["skyline", "nfp"]
+        seed: Warm-start layout the algorithms start from and must beat
+            (see portfolio_nest)
+
+    Returns:
+        NestingResult with best layout; metadata["portfolio"] reports the
+        wall time and outcome of each algorithm
+    """
+    if not contour_groups:
+        return NestingResult([], fabric_width, 0, 0, True, "No pieces")
+
+    rotation_table = _rotation_table(contour_groups, rotation_table)
+
+    if parallel and _can_use_process_pool():
         try:
-            results["skyline"] = skyline_nest(contour_groups, fabric_width, gap)
-            if verbose:
-                print(f"  Skyline: {results['skyline'].utilization:.1f}%")
-        except Exception as e:
+            return portfolio_nest(
+                contour_groups,
+                fabric_width,
+                gap,
+                timeout_seconds=timeout_seconds,
+                target_utilization=target_utilization,
+                algorithms=algorithms,
+                verbose=verbose,
+                rotation_table=rotation_table,
+                seed=seed,
+            )
+        except OSError as e:
+            # Sandboxed hosts may refuse to spawn processes
             if verbose:
-                print(f"  Skyline: FAILED ({e})")
+                print(f"  Portfolio unavailable ({e}), running sequentially")
 
-    fast_time = time.time() - start
-    remaining_time = timeout_seconds - fast_time
+    results: Dict[str, NestingResult] = {}
+    runs: Dict[str, Dict[str, Any]] = {}
+    order = _seed_order(seed)
 
-    # 4. Hybrid (slower, but often better)
-    if HYBRID_AVAILABLE and remaining_time > 5:
-        try:
-            # Temporarily reduce hybrid timeout if we've already found good results
-            best_so_far = max((r.utilization for r in results.values()), default=0)
-            if best_so_far > 85:
-                # Already good, limit hybrid time
-                remaining_time = min(remaining_time, 15)
+    # Fast algorithms first (< 1 second), then the slow ones while time remains
+    start = time.time()
+    for name in algorithms or available_algorithms():
+        remaining_time = timeout_seconds - (time.time() - start)
+        if name in SLOW_ALGORITHMS and remaining_time <= SLOW_MIN_SECONDS:
+            continue
 
-            results["hybrid"] = hybrid_nest(contour_groups, fabric_width, gap)
-            if verbose:
-                print(f"  Hybrid: {results['hybrid'].utilization:.1f}%")
-        except Exception as e:
+        _, result, elapsed, error = _run_portfolio_algorithm(
+            name,
+            contour_groups,
+            fabric_width,
+            gap,
+            remaining_time,
+            rotation_table,
+            seed_order=order,
+        )
+        runs[name] = {
+            "status": "failed" if result is None else "ok",
+            "wall_time_s": round(elapsed, 3),
+            "utilization": result.utilization if result is not None else None,
+        }
+        if result is None:
+            runs[name]["error"] = error
             if verbose:
-                print(f"  Hybrid: FAILED ({e})")
+                print(f"  {name.capitalize()}: FAILED ({error})")
+            continue
+
+        results[name] = result
+        if verbose:
+            print(f"  {name.capitalize()}: {result.utilization:.1f}%")
+    _add_seed(results, runs, seed)
+
+    portfolio = {
+        "mode": "sequential",
+        "wall_time_s": round(time.time() - start, 3),
+        "algorithms": runs,
+    }
 
     if not results:
-        return NestingResult([], fabric_width, 0, 0, False, "All algorithms failed")
+        return NestingResult(
+            [],
+            fabric_width,
+            0,
+            0,
+            False,
+            "All algorithms failed",
+            metadata={"portfolio": portfolio},
+        )
 
     # Find best result
-    best_name = max(
-        results.keys(),
-        key=lambda k: results[k].utilization if results[k].success else 0,
-    )
+    best_name = _select_best(results)
     best = results[best_name]
+    portfolio["winner"] = best_name
 
     # Update message to indicate which algorithm won
-    return NestingResult(
+    result = NestingResult(
         pieces=best.pieces,
         fabric_width=best.fabric_width,
         fabric_length=best.fabric_length,
         utilization=best.utilization,
         success=best.success,
         message=f"Best result ({best_name}): {best.utilization:.1f}% utilization",
+        metadata={**best.metadata, "portfolio": portfolio},
+    )
+    return _report_rotations(result, rotation_table)
+
+
+def anytime_algorithms() -> List[str]:
+    """Algorithms anytime_nest can run in this environment."""
+    names = available_algorithms()
+    if TURBO_AVAILABLE:
+        names.append("turbo")
+    if ULTIMATE_AVAILABLE:
+        names.append("ultimate")
+    return names + optional_algorithms()
+
+
+def _deadline(token: Optional[CancellationToken]) -> Optional[float]:
+    """Earliest deadline of a token and its parents (None if none has one)."""
+    deadlines = []
+    while token is not None:
+        if token.deadline is not None:
+            deadlines.append(token.deadline)
+        token = token.parent
+    return min(deadlines) if deadlines else None
+
+
+def _time_budget(token: CancellationToken) -> float:
+    """Seconds an anytime algorithm has left before the token's deadline."""
+    deadline = _deadline(token)
+    if deadline is None:
+        return DEFAULT_TIMEOUT_SECONDS
+    return max(1.0, deadline - time.time())
+
+
+# Anytime worker processes report through this queue (set by the pool initializer)
+_anytime_progress = None
+
+
+def _init_anytime_worker(progress):
+    global _anytime_progress
+    _anytime_progress = progress
+
+
+def _run_anytime_worker(
+    name: str,
+    contour_groups: List[List[Point]],
+    fabric_width: float,
+    gap: float,
+    deadline: Optional[float],
+    rotation_table: Any = None,
+    seed_order: Optional[List[Tuple[int, Any]]] = None,
+    profile_mode: Optional[str] = None,
+):
+    """
+    Run one anytime algorithm inside a worker process.
+
+    Module-level so it can be pickled by multiprocessing. Every improvement
+    and the final result are put on the pool's progress queue as
+    (name, result), followed by (name, None) once the algorithm is done.
+    """
+    progress = _anytime_progress
+    token = CancellationToken(deadline=deadline)
+    try:
+        with profile_nesting(profile_mode or "off", fresh=True) as profiler:
+            with phase(f"algorithm.{name}"):
+                result = _nest_with(
+                    name,
+                    contour_groups,
+                    fabric_width,
+                    gap,
+                    _time_budget(token),
+                    rotation_table,
+                    seed_order,
+                    cancel_token=token,
+                    on_improvement=lambda r: progress.put((name, r)),
+                )
+        if profiler is not None:
+            result.metadata["profile"] = profiler.report()
+    except Exception as e:
+        result = NestingResult([], fabric_width, 0, 0, False, str(e))
+    progress.put((name, result))
+    progress.put((name, None))
+
+
+def _anytime_pool(workers: int) -> Tuple[Any, Any]:
+    """Worker pool for anytime_nest and the queue its workers report to."""
+    progress = multiprocessing.Queue()
+    pool = multiprocessing.Pool(
+        processes=workers,
+        initializer=_init_anytime_worker,
+        initargs=(progress,),
+    )
+    return pool, progress
+
+
+def _anytime_pool_results(
+    pool: Any,
+    progress: Any,
+    names: List[str],
+    contour_groups: List[List[Point]],
+    fabric_width: float,
+    gap: float,
+    token: CancellationToken,
+    rotation_table: Any,
+    seed_order: Optional[List[Tuple[int, Any]]],
+) -> Iterator[Tuple[str, NestingResult]]:
+    """
+    (name, result) from every algorithm running in its own pool worker,
+    against the token's (earliest) deadline. The caller terminates the pool.
+    """
+    deadline = _deadline(token)
+    for name in names:
+        pool.apply_async(
+            _run_anytime_worker,
+            (
+                name,
+                contour_groups,
+                fabric_width,
+                gap,
+                deadline,
+                rotation_table,
+                seed_order,
+                active_mode(),
+            ),
+            error_callback=lambda e, n=name: progress.put((n, None)),
+        )
+
+    pending = len(names)
+    while pending and not token.cancelled:
+        remaining = token.remaining()
+        try:
+            name, result = progress.get(
+                timeout=min(remaining, 0.5) if remaining is not None else 0.5
+            )
+        except queue.Empty:
+            continue
+        if result is None:
+            pending -= 1
+            continue
+        merge(name, result.metadata.pop("profile", None))
+        yield name, result
+
+
+def _anytime_thread_results(
+    names: List[str],
+    contour_groups: List[List[Point]],
+    fabric_width: float,
+    gap: float,
+    token: CancellationToken,
+    rotation_table: Any,
+    seed_order: Optional[List[Tuple[int, Any]]],
+) -> Iterator[Tuple[str, NestingResult]]:
+    """(name, result) from the algorithms run one after another in a thread."""
+    found: "queue.Queue" = queue.Queue()
+
+    def worker():
+        for name in names:
+            if token.cancelled:
+                break
+            try:
+                result = _nest_with(
+                    name,
+                    contour_groups,
+                    fabric_width,
+                    gap,
+                    _time_budget(token),
+                    rotation_table,
+                    seed_order,
+                    cancel_token=token,
+                    on_improvement=lambda r, n=name: found.put((n, r)),
+                )
+                found.put((name, result))
+            except Exception as e:
+                found.put((name, NestingResult([], fabric_width, 0, 0, False, str(e))))
+        found.put(None)
+
+    # Run in a copy of this context so the caller's profiler sees the phases
+    thread = threading.Thread(
+        target=contextvars.copy_context().run,
+        args=(worker,),
+        name="anytime-nest",
+        daemon=True,
     )
+    thread.start()
+    try:
+        while not token.cancelled:
+            remaining = token.remaining()
+            try:
+                item = found.get(
+                    timeout=min(remaining, 0.5) if remaining is not None else 0.5
+                )
+            except queue.Empty:
+                continue
+            if item is None:
+                break
+            yield item
+    finally:
+        token.cancel("closed")
+        thread.join(ANYTIME_JOIN_SECONDS)
+
+
+def anytime_nest(
+    contour_groups: List[List[Point]],
+    fabric_width: float = CUTTER_WIDTH_CM,
+    gap: float = GAP_CM,
+    timeout_seconds: Optional[float] = DEFAULT_TIMEOUT_SECONDS,
+    target_utilization: Optional[float] = None,
+    cancel_token: Optional[CancellationToken] = None,
+    algorithms: Optional[List[str]] = None,
+    rotation_table: Any = None,
+    seed: Optional[NestingResult] = None,
+    parallel: bool = True,
+) -> Iterator[NestingResult]:
+    """
+    Yield each improved layout as soon as any algorithm finds it.
+
+    Like master_nest, the algorithms run as a portfolio: each in its own
+    worker process against the shared deadline. hybrid, turbo and ultimate
+    also report the improvements they find while searching. Every yielded
+    result beats the previous one and carries metadata["anytime"]
+    (algorithm, mode, elapsed_s, improvement number). When worker processes are
+    unavailable the algorithms run one after another (fastest first) in a
+    background thread instead.
+
+    The search stops when a yielded layout reaches target_utilization, the
+    deadline passes, cancel_token is cancelled, the algorithms run out, or
+    the caller stops iterating.
+
+    Args:
+        contour_groups: List of point lists representing pieces
+        fabric_width: Fabric width in cm
+        gap: Gap between pieces in cm
+        timeout_seconds: Deadline for the whole search (None =
+            DEFAULT_TIMEOUT_SECONDS; the search is never unbounded)
+        target_utilization: Stop once a layout reaches this
+        cancel_token: Caller's token; cancelling it stops the search
+        algorithms: Subset of anytime_algorithms() in run order
+            (default: available_algorithms())
+        rotation_table: rotation_table.RotationTable shared by every
+            algorithm (default: built once from contour_groups)
+        seed: Warm-start layout, yielded first; hybrid starts from its
+            placement order
+        parallel: Run the algorithms in a process pool
+    """
+    if not contour_groups:
+        return
+
+    names = algorithms or available_algorithms()
+    rotation_table = _rotation_table(contour_groups, rotation_table)
+    if timeout_seconds is None:
+        timeout_seconds = DEFAULT_TIMEOUT_SECONDS
+    start = time.time()
+    token = CancellationToken(deadline=start + timeout_seconds, parent=cancel_token)
+    order = _seed_order(seed)
+
+    pool = progress = None
+    if parallel and _can_use_process_pool():
+        try:
+            pool, progress = _anytime_pool(len(names))
+        except OSError:
+            # Sandboxed hosts may refuse to spawn processes
+            pool = None
+    if pool is not None:
+        source = _anytime_pool_results(
+            pool,
+            progress,
+            names,
+            contour_groups,
+            fabric_width,
+            gap,
+            token,
+            rotation_table,
+            order,
+        )
+    else:
+        source = _anytime_thread_results(
+            names, contour_groups, fabric_width, gap, token, rotation_table, order
+        )
+    found = source
+    if seed is not None and seed.success:
+        found = itertools.chain([(WARM_START, seed)], source)
+
+    best_utilization = -1.0
+    improvements = 0
+    try:
+        for name, result in found:
+            if not result.success or result.utilization <= best_utilization:
+                continue
+
+            best_utilization = result.utilization
+            improvements += 1
+            result.metadata["anytime"] = {
+                "algorithm": name,
+                "mode": "parallel" if pool is not None else "sequential",
+                "elapsed_s": round(time.time() - start, 3),
+                "improvement": improvements,
+            }
+            yield _report_rotations(result, rotation_table)
+
+            if (
+                target_utilization is not None
+                and best_utilization >= target_utilization
+            ):
+                token.cancel("target")
+                break
+    finally:
+        token.cancel("closed")
+        source.close()
+        if pool is not None:
+            pool.terminate()
+            pool.join()
+            progress.close()
+
+
+def nest_until(
+    contour_groups: List[List[Point]],
+    fabric_width: float = CUTTER_WIDTH_CM,
+    gap: float = GAP_CM,
+    timeout_seconds: Optional[float] = DEFAULT_TIMEOUT_SECONDS,
+    target_utilization: Optional[float] = None,
+    cancel_token: Optional[CancellationToken] = None,
+    on_improvement: Optional[ImprovementCallback] = None,
+    algorithms: Optional[List[str]] = None,
+    rotation_table: Any = None,
+    seed: Optional[NestingResult] = None,
+    parallel: bool = True,
+) -> NestingResult:
+    """
+    Callback form of anytime_nest: return the best layout once it is good
+    enough, the deadline passes or the caller cancels.
+
+    Args:
+        timeout_seconds: Deadline (None = DEFAULT_TIMEOUT_SECONDS, so a
+            target that is never reached cannot run unbounded)
+        on_improvement: Called with every improved layout as it is found
+        (others as for anytime_nest)
+
+    Returns:
+        Best NestingResult; metadata["anytime"] adds stop_reason ("target",
+        "deadline", "exhausted" or the cancel_token's reason) and the time
+        to the first layout
+    """
+    if not contour_groups:
+        return NestingResult([], fabric_width, 0, 0, True, "No pieces")
+
+    if timeout_seconds is None:
+        timeout_seconds = DEFAULT_TIMEOUT_SECONDS
+    start = time.time()
+    token = CancellationToken(deadline=start + timeout_seconds, parent=cancel_token)
+    best: Optional[NestingResult] = None
+    first_s: Optional[float] = None
+    stop_reason = None
+
+    results = anytime_nest(
+        contour_groups,
+        fabric_width,
+        gap,
+        timeout_seconds=timeout_seconds,
+        target_utilization=target_utilization,
+        cancel_token=token,
+        algorithms=algorithms,
+        rotation_table=rotation_table,
+        seed=seed,
+        parallel=parallel,
+    )
+    try:
+        for result in results:
+            best = result
+            if first_s is None:
+                first_s = result.metadata["anytime"]["elapsed_s"]
+            if on_improvement is not None:
+                on_improvement(result)
+            if (
+                target_utilization is not None
+                and result.utilization >= target_utilization
+            ):
+                stop_reason = "target"
+                break
+    finally:
+        results.close()
+
+    stop_reason = stop_reason or token.reason or "exhausted"
+    summary = {
+        "stop_reason": stop_reason,
+        "target_utilization": target_utilization,
+        "timeout_seconds": timeout_seconds,
+        "first_result_s": first_s,
+        "wall_time_s": round(time.time() - start, 3),
+    }
+
+    if best is None:
+        return NestingResult(
+            [],
+            fabric_width,
+            0,
+            0,
+            False,
+            f"No layout found ({stop_reason})",
+            metadata={"anytime": summary},
+        )
+
+    best.metadata["anytime"] = {**best.metadata["anytime"], **summary}
+    best.message = (
+        f"{best.message} [anytime: {stop_reason} after "
+        f"{summary['wall_time_s']:.2f}s]"
+    )
+    return best
 
 
 def analyze_nesting_potential(
@@ -263,6 +1142,11 @@ def main():
     parser.add_argument(
         "--verbose", "-v", action="store_true", help="Show all algorithm results"
     )
+    parser.add_argument(
+        "--sequential",
+        action="store_true",
+        help="Run algorithms one after another instead of in worker processes",
+    )
 
     args = parser.parse_args()
 
@@ -321,7 +1205,9 @@ def main():
         if args.verbose:
             print("  Running algorithms...")
 
-        result = master_nest(contour_groups, verbose=args.verbose)
+        result = master_nest(
+            contour_groups, verbose=args.verbose, parallel=not args.sequential
+        )
 
         elapsed = time.time() - t0
 
@@ -0,0 +1,652 @@
+#!/usr/bin/env python3
+"""
+Nesting Benchmark Suite
+
+Reproducible comparison of every nesting entry point, with a stored baseline
+so performance and quality regressions are caught before they ship.
+
+Corpus:
+    Each template in ExampleFiles/pds is loaded once (cutting contours in cm)
+    and scaled uniformly by each scale factor, giving cases like "tee@1.10".
+
+Runs:
+    Every engine x case runs in a fresh worker process (so peak memory and
+    NFP caches do not leak between runs) with the global random / numpy
+    seeds fixed, the seed passed to the GA engines, and a cold NFP cache.
+    Each run records status, wall_time_s, peak_memory_mb, utilization and
+    fabric_length_cm.
+
+Simplification:
+    With simplify_tolerance > 0 every run nests contour_simplify hulls
+    (simplification time included in wall_time_s) and records the vertex
+    counts. Comparing such a report against a baseline recorded without
+    it (time_saved()) gives the time the simplification saves.
+
+Regression check:
+    compare_to_baseline() flags runs that fail where the baseline succeeded,
+    got slower or hungrier beyond a relative tolerance (with a small absolute
+    floor so timer noise on fast engines is ignored), lost utilization, or
+    need more fabric.
+
+Usage:
+    corpus = build_corpus(scales=(0.9, 1.0, 1.1))
+    report = run_benchmark(corpus, engines=["shelf", "skyline"], seed=42)
+    save_report(report, "bench.json")
+    regressions = compare_to_baseline(report, load_report(default_baseline_path()))
+
+CLI:
+    sds bench nesting --scales 0.9,1.0,1.1 --save-baseline
+    sds bench nesting --simplify 0.05        # time saved vs the baseline
+
+Environment:
+    NESTING_BENCH_BASELINE - baseline JSON (default: benchmarks/nesting_baseline.json)
+
+Author: Claude
+Date: 2026-02-02
+"""
+
+import os
+import sys
+import json
+import time
+import random
+import logging
+import platform
+import tempfile
+import importlib
+import tracemalloc
+import multiprocessing
+from dataclasses import dataclass, field, asdict
+from datetime import datetime
+from pathlib import Path
+from typing import Any, Dict, List, Optional, Sequence
+
+import numpy as np
+
+try:
+    import resource
+
+    RESOURCE_AVAILABLE = True
+except ImportError:  # Windows
+    RESOURCE_AVAILABLE = False
+
+from nesting_engine import Point, CUTTER_WIDTH_CM
+from contour_simplify import simplify_pieces
+
+logger = logging.getLogger(__name__)
+
+PROJECT_ROOT = Path(__file__).resolve().parents[2]
+DEFAULT_CORPUS_DIR = PROJECT_ROOT / "ExampleFiles" / "pds"
+DEFAULT_BASELINE_FILENAME = "nesting_baseline.json"
+
+REPORT_VERSION = 1
+DEFAULT_SEED = 42
+DEFAULT_SCALES = (0.9, 1.0, 1.1)
+# Production gap (production_pipeline.NESTING_GAP_CM) for every engine
+BENCH_GAP_CM = 0.5
+# Budget handed to engines that take a timeout
+DEFAULT_TIME_BUDGET_SECONDS = 30.0
+# Hard limit per run; the worker is killed after this
+DEFAULT_RUN_TIMEOUT_SECONDS = 300.0
+
+# Regression tolerances
+TIME_TOLERANCE = 0.25  # +25% wall time
+TIME_FLOOR_SECONDS = 0.05  # ...and at least this much slower
+MEMORY_TOLERANCE = 0.25  # +25% peak memory
+MEMORY_FLOOR_MB = 5.0
+UTILIZATION_TOLERANCE = 0.5  # percentage points
+LENGTH_TOLERANCE = 0.01  # +1% fabric length
+
+
+@dataclass(frozen=True)
+class EngineSpec:
+    """How to call one nesting entry point."""
+
+    module: str
+    function: str
+    seeded: bool = False  # accepts seed=
+    timed: bool = False  # accepts timeout_seconds=
+    extra: Dict[str, Any] = field(default_factory=dict)
+
+
+# Every entry point, called as fn(contour_groups, fabric_width, gap, ...)
+ENGINES: Dict[str, EngineSpec] = {
+    "shelf": EngineSpec("nesting_engine", "nest_bottom_left_fill"),
+    "guillotine": EngineSpec("improved_nesting", "guillotine_nest"),
+    "skyline": EngineSpec("improved_nesting", "skyline_nest"),
+    "hybrid": EngineSpec("hybrid_nesting", "hybrid_nest", timed=True),
+    "turbo": EngineSpec("turbo_nesting", "turbo_nest", timed=True),
+    "ultimate": EngineSpec(
+        "ultimate_nesting", "ultimate_nest", seeded=True, extra={"workers": 1}
+    ),
+    "fast": EngineSpec("fast_nesting", "fast_nest_adapter"),
+    "nfp": EngineSpec("nfp_nesting", "nfp_nest_from_points", seeded=True),
+    "optimal": EngineSpec("optimal_nesting", "optimal_nest_adapter"),
+}
+
+
+def available_engines() -> List[str]:
+    """Engines whose modules import in this environment."""
+    names = []
+    for name, spec in ENGINES.items():
+        try:
+            getattr(importlib.import_module(spec.module), spec.function)
+            names.append(name)
+        except (ImportError, AttributeError) as e:
+            logger.debug(f"Engine {name} unavailable: {e}")
+    return names
+
+
+# ---------------------------------------------------------------------------
+# Corpus
+# ---------------------------------------------------------------------------
+
+
+@dataclass
+class BenchmarkCase:
+    """One template at one scale."""
+
+    name: str  # e.g. "tee@1.10"
+    template: str  # PDS filename
+    scale: float
+    contour_groups: List[List[Point]]
+
+    @property
+    def piece_count(self) -> int:
+        return len(self.contour_groups)
+
+    @property
+    def piece_area_cm2(self) -> float:
+        total = 0.0
+        for pts in self.contour_groups:
+            n = len(pts)
+            area = sum(
+                pts[i].x * pts[(i + 1) % n].y - pts[(i + 1) % n].x * pts[i].y
+                for i in range(n)
+            )
+            total += abs(area) / 2
+        return total
+
+
+def template_alias(filename: str) -> str:
+    """Short name for a template: "Light  Jacket_2D.PDS" -> "jacket"."""
+    stem = Path(filename).stem.replace("_2D", "")
+    return stem.split()[-1].lower()
+
+
+def load_template_contours(pds_path: Path) -> List[List[Point]]:
+    """Cutting contours of a PDS template in cm, as nesting point lists."""
+    from production_pipeline import (
+        extract_xml_from_pds,
+        extract_piece_dimensions,
+        extract_svg_geometry,
+        transform_to_cm,
+    )
+
+    xml_content = extract_xml_from_pds(str(pds_path))
+    pieces = extract_piece_dimensions(xml_content, "Small")
+    total_width = sum(p["size_x"] for p in pieces.values())
+    total_height = max(p["size_y"] for p in pieces.values()) if pieces else 0
+
+    contours, metadata = extract_svg_geometry(xml_content, cutting_contours_only=True)
+    contours_cm = transform_to_cm(contours, metadata, total_width, total_height)
+
+    return [[Point(p.x, p.y) for p in c.points] for c in contours_cm if c.points]
+
+
+def scale_contour_groups(
+    contour_groups: List[List[Point]], scale: float
+) -> List[List[Point]]:
+    """Uniformly scale every piece about the origin."""
+    return [[Point(p.x * scale, p.y * scale) for p in pts] for pts in contour_groups]
+
+
+def build_corpus(
+    pds_dir: Optional[Path] = None,
+    scales: Sequence[float] = DEFAULT_SCALES,
+    templates: Optional[Sequence[str]] = None,
+) -> List[BenchmarkCase]:
+    """
+    Build benchmark cases from PDS templates.
+
+    Args:
+        pds_dir: Template directory (default: ExampleFiles/pds)
+        scales: Uniform scale factors applied to each template
+        templates: Template aliases to include (default: all)
+    """
+    pds_dir = Path(pds_dir or DEFAULT_CORPUS_DIR)
+    cases = []
+
+    for pds_path in sorted(pds_dir.glob("*.PDS")):
+        alias = template_alias(pds_path.name)
+        if templates and alias not in templates:
+            continue
+
+        base = load_template_contours(pds_path)
+        for scale in scales:
+            cases.append(
+                BenchmarkCase(
+                    name=f"{alias}@{scale:.2f}",
+                    template=pds_path.name,
+                    scale=scale,
+                    contour_groups=scale_contour_groups(base, scale),
+                )
+            )
+
+    return cases
+
+
+# ---------------------------------------------------------------------------
+# Running
+# ---------------------------------------------------------------------------
+
+
+def _maxrss_mb() -> float:
+    """Peak resident set size of this process in MB."""
+    rss = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # Linux reports KB, macOS bytes
+    return rss / (1024 * 1024) if sys.platform == "darwin" else rss / 1024
+
+
+def _execute(
+    engine: str,
+    contour_groups: List[List[Point]],
+    fabric_width: float,
+    seed: int,
+    time_budget: float,
+    use_rusage: bool,
+    simplify_tolerance: float = 0.0,
+) -> Dict[str, Any]:
+    """Run one engine once and measure it (in whatever process calls this)."""
+    spec = ENGINES[engine]
+    fn = getattr(importlib.import_module(spec.module), spec.function)
+
+    kwargs = dict(spec.extra)
+    if spec.seeded:
+        kwargs["seed"] = seed
+    if spec.timed:
+        kwargs["timeout_seconds"] = time_budget
+
+    random.seed(seed)
+    np.random.seed(seed)
+
+    if use_rusage:
+        rss_before = _maxrss_mb()
+    else:
+        tracemalloc.start()
+
+    start = time.perf_counter()
+    try:
+        simplified = None
+        if simplify_tolerance > 0:
+            simplified = simplify_pieces(contour_groups, simplify_tolerance)
+            contour_groups = simplified.hulls
+        result = fn(contour_groups, fabric_width, BENCH_GAP_CM, **kwargs)
+        if simplified is not None and result.success:
+            result = simplified.restore(result)
+    finally:
+        wall_time = time.perf_counter() - start
+        if use_rusage:
+            peak_mb = _maxrss_mb() - rss_before
+        else:
+            peak_mb = tracemalloc.get_traced_memory()[1] / (1024 * 1024)
+            tracemalloc.stop()
+
+    measurement = {
+        "status": "ok" if result.success else "failed",
+        "wall_time_s": round(wall_time, 4),
+        "peak_memory_mb": round(peak_mb, 2),
+        "utilization": round(result.utilization, 3),
+        "fabric_length_cm": round(result.fabric_length, 3),
+        "pieces_placed": len(result.pieces),
+        "error": None if result.success else result.message,
+    }
+    if simplified is not None:
+        measurement["vertices"] = simplified.vertices_before
+        measurement["vertices_nested"] = simplified.vertices_after
+    return measurement
+
+
+def _worker_main(
+    conn, engine, contour_groups, fabric_width, seed, time_budget, simplify_tolerance
+):
+    """Worker process entry: cold NFP cache, run, send the measurement back."""
+    with tempfile.TemporaryDirectory() as tmp:
+        os.environ["NFP_CACHE_PATH"] = str(Path(tmp) / "nfp_cache.sqlite3")
+        try:
+            measurement = _execute(
+                engine,
+                contour_groups,
+                fabric_width,
+                seed,
+                time_budget,
+                use_rusage=RESOURCE_AVAILABLE,
+                simplify_tolerance=simplify_tolerance,
+            )
+        except Exception as e:
+            measurement = {"status": "error", "error": f"{type(e).__name__}: {e}"}
+    conn.send(measurement)
+    conn.close()
+
+
+def run_engine_case(
+    engine: str,
+    case: BenchmarkCase,
+    fabric_width: float = CUTTER_WIDTH_CM,
+    seed: int = DEFAULT_SEED,
+    time_budget: float = DEFAULT_TIME_BUDGET_SECONDS,
+    run_timeout: float = DEFAULT_RUN_TIMEOUT_SECONDS,
+    isolate: bool = True,
+    simplify_tolerance: float = 0.0,
+) -> Dict[str, Any]:
+    """
+    Benchmark one engine on one case.
+
+    With isolate=True the run happens in a fresh process (peak RSS growth,
+    cold NFP cache, killed after run_timeout). With isolate=False it runs
+    in-process and peak memory comes from tracemalloc; use that where
+    processes cannot be started (e.g. inside a daemonic worker).
+    """
+    record = {
+        "engine": engine,
+        "case": case.name,
+        "template": case.template,
+        "scale": case.scale,
+        "pieces": case.piece_count,
+    }
+
+    if not isolate or multiprocessing.current_process().daemon:
+        try:
+            record.update(
+                _execute(
+                    engine,
+                    case.contour_groups,
+                    fabric_width,
+                    seed,
+                    time_budget,
+                    use_rusage=False,
+                    simplify_tolerance=simplify_tolerance,
+                )
+            )
+        except Exception as e:
+            record.update(status="error", error=f"{type(e).__name__}: {e}")
+        return record
+
+    parent_conn, child_conn = multiprocessing.Pipe(duplex=False)
+    proc = multiprocessing.Process(
+        target=_worker_main,
+        args=(
+            child_conn,
+            engine,
+            case.contour_groups,
+            fabric_width,
+            seed,
+            time_budget,
+            simplify_tolerance,
+        ),
+    )
+    start = time.perf_counter()
+    proc.start()
+    child_conn.close()
+
+    if parent_conn.poll(run_timeout):
+        try:
+            record.update(parent_conn.recv())
+        except EOFError:
+            record.update(status="error", error="worker exited without a result")
+    else:
+        record.update(
+            status="timeout",
+            wall_time_s=round(time.perf_counter() - start, 4),
+            error=f"no result after {run_timeout:.0f}s",
+        )
+        proc.terminate()
+
+    proc.join()
+    parent_conn.close()
+    return record
+
+
+def run_benchmark(
+    corpus: List[BenchmarkCase],
+    engines: Optional[Sequence[str]] = None,
+    fabric_width: float = CUTTER_WIDTH_CM,
+    seed: int = DEFAULT_SEED,
+    time_budget: float = DEFAULT_TIME_BUDGET_SECONDS,
+    run_timeout: float = DEFAULT_RUN_TIMEOUT_SECONDS,
+    isolate: bool = True,
+    progress=None,
+    simplify_tolerance: float = 0.0,
+) -> Dict[str, Any]:
+    """
+    Benchmark engines over a corpus.
+
+    Args:
+        corpus: Cases from build_corpus()
+        engines: Engine names (default: every available engine)
+        fabric_width: Fabric width in cm
+        seed: Seed for every run
+        time_budget: timeout_seconds for engines that take one
+        run_timeout: Hard limit per run
+        isolate: Run each measurement in a fresh process
+        progress: Optional callback(record) after each run
+        simplify_tolerance: Nest contour_simplify hulls at this tolerance (cm)
+
+    Returns:
+        Report dict (see save_report)
+    """
+    engines = list(engines or available_engines())
+    unknown = [name for name in engines if name not in ENGINES]
+    if unknown:
+        raise ValueError(f"Unknown engines: {', '.join(unknown)}")
+
+    results = []
+    for case in corpus:
+        for engine in engines:
+            record = run_engine_case(
+                engine,
+                case,
+                fabric_width=fabric_width,
+                seed=seed,
+                time_budget=time_budget,
+                run_timeout=run_timeout,
+                isolate=isolate,
+                simplify_tolerance=simplify_tolerance,
+            )
+            results.append(record)
+            if progress is not None:
+                progress(record)
+
+    return {
+        "version": REPORT_VERSION,
+        "created_at": datetime.now().isoformat(),
+        "environment": {
+            "python": platform.python_version(),
+            "platform": platform.platform(),
+            "cpu_count": os.cpu_count(),
+            "numpy": np.__version__,
+            "memory_method": (
+                "rusage" if isolate and RESOURCE_AVAILABLE else "tracemalloc"
+            ),
+        },
+        "config": {
+            "engines": engines,
+            "cases": [case.name for case in corpus],
+            "fabric_width_cm": fabric_width,
+            "gap_cm": BENCH_GAP_CM,
+            "seed": seed,
+            "time_budget_s": time_budget,
+            "run_timeout_s": run_timeout,
+            "isolated": isolate,
+            "simplify_tolerance_cm": simplify_tolerance,
+        },
+        "results": results,
+    }
+
+
+# ---------------------------------------------------------------------------
+# Reports and baselines
+# ---------------------------------------------------------------------------
+
+
+def default_baseline_path() -> Path:
+    """Baseline report location (env var or benchmarks/ in the project)."""
+    return Path(
+        os.getenv("NESTING_BENCH_BASELINE")
+        or PROJECT_ROOT / "benchmarks" / DEFAULT_BASELINE_FILENAME
+    )
+
+
+def save_report(report: Dict[str, Any], path: Path):
+    """Write a report as JSON."""
+    path = Path(path)
+    path.parent.mkdir(parents=True, exist_ok=True)
+    with open(path, "w") as f:
+        json.dump(report, f, indent=2)
+
+
+def load_report(path: Path) -> Optional[Dict[str, Any]]:
+    """Read a report, or None if the file does not exist."""
+    path = Path(path)
+    if not path.exists():
+        return None
+    with open(path) as f:
+        return json.load(f)
+
+
+@dataclass
+class Regression:
+    """One metric that got worse than the baseline."""
+
+    engine: str
+    case: str
+    metric: str
+    baseline: Any
+    current: Any
+
+    @property
+    def change_percent(self) -> Optional[float]:
+        if isinstance(self.baseline, (int, float)) and self.baseline:
+            return round((self.current - self.baseline) / self.baseline * 100, 1)
+        return None
+
+    def to_dict(self) -> Dict[str, Any]:
+        d = asdict(self)
+        d["change_percent"] = self.change_percent
+        return d
+
+    def __str__(self) -> str:
+        change = self.change_percent
+        suffix = f" ({change:+.1f}%)" if change is not None else ""
+        return (
+            f"{self.engine} {self.case}: {self.metric} "
+            f"{self.baseline} -> {self.current}{suffix}"
+        )
+
+
+def compare_to_baseline(
+    report: Dict[str, Any],
+    baseline: Dict[str, Any],
+    time_tolerance: float = TIME_TOLERANCE,
+    memory_tolerance: float = MEMORY_TOLERANCE,
+    utilization_tolerance: float = UTILIZATION_TOLERANCE,
+    length_tolerance: float = LENGTH_TOLERANCE,
+) -> List[Regression]:
+    """
+    Regressions of a report against a baseline report.
+
+    Only (engine, case) pairs present in both are compared. Slower or
+    hungrier runs are flagged only when they exceed both the relative
+    tolerance and the absolute floor.
+    """
+    base_runs = {(r["engine"], r["case"]): r for r in baseline.get("results", [])}
+    regressions = []
+
+    for run in report.get("results", []):
+        key = (run["engine"], run["case"])
+        base = base_runs.get(key)
+        if base is None:
+            continue
+
+        def flag(metric):
+            regressions.append(
+                Regression(key[0], key[1], metric, base.get(metric), run.get(metric))
+            )
+
+        if base.get("status") == "ok" and run.get("status") != "ok":
+            flag("status")
+            continue
+        if run.get("status") != "ok" or base.get("status") != "ok":
+            continue
+
+        if (
+            run["wall_time_s"] > base["wall_time_s"] * (1 + time_tolerance)
+            and run["wall_time_s"] - base["wall_time_s"] > TIME_FLOOR_SECONDS
+        ):
+            flag("wall_time_s")
+
+        if (
+            run["peak_memory_mb"] > base["peak_memory_mb"] * (1 + memory_tolerance)
+            and run["peak_memory_mb"] - base["peak_memory_mb"] > MEMORY_FLOOR_MB
+        ):
+            flag("peak_memory_mb")
+
+        if run["utilization"] < base["utilization"] - utilization_tolerance:
+            flag("utilization")
+
+        if run["fabric_length_cm"] > base["fabric_length_cm"] * (1 + length_tolerance):
+            flag("fabric_length_cm")
+
+    return regressions
+
+
+def time_saved(report: Dict[str, Any], baseline: Dict[str, Any]) -> Dict[str, Any]:
+    """
+    Total wall time of a report against a baseline.
+
+    Only (engine, case) pairs that succeeded in both are summed, e.g. a
+    --simplify run against a baseline recorded without simplification.
+    """
+    base_runs = {(r["engine"], r["case"]): r for r in baseline.get("results", [])}
+    baseline_s = current_s = 0.0
+    runs = 0
+
+    for run in report.get("results", []):
+        base = base_runs.get((run["engine"], run["case"]))
+        if base is None or run.get("status") != "ok" or base.get("status") != "ok":
+            continue
+        baseline_s += base["wall_time_s"]
+        current_s += run["wall_time_s"]
+        runs += 1
+
+    baseline_s, current_s = round(baseline_s, 3), round(current_s, 3)
+    return {
+        "runs": runs,
+        "baseline_s": baseline_s,
+        "current_s": current_s,
+        "saved_s": round(baseline_s - current_s, 3),
+        "saved_percent": (
+            round((baseline_s - current_s) / baseline_s * 100, 1) if baseline_s else 0
+        ),
+    }
+
+
+def format_report(report: Dict[str, Any]) -> str:
+    """Fixed-width table of a report's runs."""
+    lines = [
+        f"{'case':<14}{'engine':<12}{'status':<9}{'time s':>9}"
+        f"{'mem MB':>9}{'util %':>9}{'length cm':>11}"
+    ]
+    for r in report["results"]:
+        if r.get("status") == "ok":
+            lines.append(
+                f"{r['case']:<14}{r['engine']:<12}{r['status']:<9}"
+                f"{r['wall_time_s']:>9.3f}{r['peak_memory_mb']:>9.1f}"
+                f"{r['utilization']:>9.2f}{r['fabric_length_cm']:>11.1f}"
+            )
+        else:
+            lines.append(
+                f"{r['case']:<14}{r['engine']:<12}{r.get('status', '?'):<9}"
+                f"  {r.get('error') or ''}"
+            )
+    return "\n".join(lines)
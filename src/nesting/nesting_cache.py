@@ -0,0 +1,823 @@
+#!/usr/bin/env python3
+"""
+Whole-Result Nesting Cache
+
+For a given template the pieces process_order sends to nest_contours depend
+only on the template, the (quantized) scale factors, the fabric width and
+the gap. Customers with similar measurements produce identical or
+near-identical piece sets, yet every order re-ran master_nest from scratch.
+This cache stores finished layouts and replays them.
+
+Keys:
+    exact  - SHA-1 of every piece's outline (translated to the origin and
+             quantized to 1/1000 cm, in piece order) plus fabric width and
+             gap. A hit replays the stored placements directly.
+    family - the same, but each piece is first normalized to its own unit
+             bounding box, so every scale of one template shares a family.
+             Used to warm-start a slightly different scale from the nearest
+             cached layout.
+
+Stored per layout: fabric length, utilization, per-piece extents and the
+placements (piece id, rotation, offset of the placed piece's bounding box).
+Layouts live in an in-memory LRU in front of a SQLite file with
+least-recently-used eviction.
+
+Warm start (family match within NESTING_WARM_START_DELTA on both axes):
+1. The cached layout with offsets scaled by the size ratio, if no pieces
+   collide and it fits the fabric width
+2. Otherwise the cached placement order and rotations, replayed through the
+   hybrid bottom-left decoder
+A seed within NESTING_WARM_START_TOLERANCE of the cached length (scaled by
+the same ratio) is handed to the nesting run as its starting layout: the
+optimizer starts from it and returns it only if nothing beats it. Seeds are
+never stored; only the run's result is.
+
+Usage:
+    cache = get_nesting_cache()
+    result = cache.nest(
+        contour_groups, fabric_width, gap,
+        run=lambda seed: master_nest(contour_groups, fabric_width, gap, seed=seed),
+    )
+    result.metadata["nesting_cache"]   # {"status": "hit" | "warm" | "miss", ...}
+
+Environment:
+    NESTING_CACHE_ENABLED        - 1 enables the cache in nest_contours (default 0)
+    NESTING_CACHE_PATH           - SQLite file (default: <tmp>/sds_nesting_cache.sqlite3)
+    NESTING_CACHE_MAX_ENTRIES    - layouts kept on disk (default 2000)
+    NESTING_WARM_START_DELTA     - max relative size change for a warm start (default 0.05)
+    NESTING_WARM_START_TOLERANCE - accepted seed length over the scaled
+                                   cached length (default 0.02 = 2%)
+
+Author: Claude
+Date: 2026-02-02
+"""
+
+import os
+import json
+import hashlib
+import logging
+import sqlite3
+import tempfile
+import threading
+import time
+from collections import OrderedDict
+from pathlib import Path
+from typing import Any, Callable, Dict, List, Optional, Sequence, Tuple
+
+import numpy as np
+
+from nesting_engine import (
+    BoundingBox,
+    NestedPiece,
+    NestingResult,
+    rotate_points,
+    normalize_to_origin,
+)
+from contour_array import as_contour_array
+from nesting_profiler import count
+
+try:
+    from shapely.affinity import translate
+    from hybrid_nesting import HybridNester, Piece, PlacementIndex, points_to_shapely
+
+    HYBRID_AVAILABLE = True
+except ImportError:
+    HYBRID_AVAILABLE = False
+
+logger = logging.getLogger(__name__)
+
+# Quantization for the geometry fingerprint (matches nfp_cache)
+HASH_SCALE = 1000
+# Bump when the stored layout format changes so stale entries are never used.
+# 2: Hybrid/Turbo/Ultimate placements are points at the origin plus position;
+#    v1 entries from those engines hold doubled offsets
+# 3: warm-start seeds are no longer stored; v2 may hold unoptimized seeds
+#    as complete layouts
+CACHE_VERSION = 3
+DEFAULT_MEMORY_ENTRIES = 256
+DEFAULT_MAX_ENTRIES = 2000
+DEFAULT_WARM_START_DELTA = 0.05
+DEFAULT_WARM_START_TOLERANCE = 0.02
+DEFAULT_CACHE_FILENAME = "sds_nesting_cache.sqlite3"
+
+
+def nesting_cache_enabled() -> bool:
+    """
+    Whether nest_contours should use the cache (NESTING_CACHE_ENABLED).
+
+    Off by default: the cache writes a SQLite file shared by every process
+    on the host, so a deployment opts in (and sets NESTING_CACHE_PATH).
+    """
+    return os.getenv("NESTING_CACHE_ENABLED", "0").lower() in ("1", "true", "yes")
+
+
+def _piece_coords(contour_groups: Sequence[Any]) -> List[np.ndarray]:
+    """Each piece as an N x 2 array translated to the origin."""
+    coords = []
+    for group in contour_groups:
+        array = as_contour_array(group).coords
+        coords.append(array - array.min(axis=0) if len(array) else array)
+    return coords
+
+
+def _digest(kind: str, fabric_width: float, gap: float, parts: List[bytes]) -> str:
+    digest = hashlib.sha1()
+    digest.update(
+        f"v{CACHE_VERSION}:{kind}:w={round(fabric_width * HASH_SCALE)}:"
+        f"gap={round(gap * HASH_SCALE)}:n={len(parts)}:".encode()
+    )
+    for part in parts:
+        digest.update(len(part).to_bytes(8, "little"))
+        digest.update(part)
+    return digest.hexdigest()
+
+
+def layout_keys(
+    contour_groups: Sequence[Any],
+    fabric_width: float,
+    gap: float,
+    angles: Optional[Sequence[Sequence[float]]] = None,
+) -> Tuple[str, str, np.ndarray]:
+    """
+    Exact key, family key and per-piece (width, height) extents.
+
+    The exact key changes with any vertex moving more than 1/1000 cm; the
+    family key only changes with the piece shapes' proportions. angles
+    (RotationTable.signature()) keys layouts by each piece's allowed
+    rotations, so a grain-restricted order never replays a freer layout.
+    """
+    coords = _piece_coords(contour_groups)
+    extents = np.array(
+        [c.max(axis=0) if len(c) else (0.0, 0.0) for c in coords], dtype=np.float64
+    ).reshape(-1, 2)
+
+    exact_parts = [np.round(c * HASH_SCALE).astype(np.int64).tobytes() for c in coords]
+    family_parts = []
+    for c, extent in zip(coords, extents):
+        unit = c / np.where(extent > 0, extent, 1.0)
+        family_parts.append(np.round(unit * HASH_SCALE).astype(np.int64).tobytes())
+    if angles is not None:
+        signature = repr([tuple(piece) for piece in angles]).encode()
+        exact_parts.append(signature)
+        family_parts.append(signature)
+
+    return (
+        _digest("exact", fabric_width, gap, exact_parts),
+        _digest("family", fabric_width, gap, family_parts),
+        extents,
+    )
+
+
+def _angles(rotation_table: Any) -> Optional[Tuple]:
+    return rotation_table.signature() if rotation_table is not None else None
+
+
+def _placed(points: Any, rotation: float) -> Any:
+    """Piece rotated like the engines do and moved to the origin."""
+    return normalize_to_origin(rotate_points(points, rotation) if rotation else points)
+
+
+def _polygon_area(points: Any) -> float:
+    return as_contour_array(points).area
+
+
+class NestingCache:
+    """
+    Layout cache: per-process LRU in front of a SQLite file.
+
+    The disk tier is optional - if the database cannot be opened or written
+    the cache keeps working in memory only.
+    """
+
+    def __init__(
+        self,
+        path: Optional[Path] = None,
+        max_entries: Optional[int] = None,
+        max_memory_entries: int = DEFAULT_MEMORY_ENTRIES,
+        warm_start_delta: Optional[float] = None,
+        warm_start_tolerance: Optional[float] = None,
+        persistent: bool = True,
+    ):
+        """
+        Initialize nesting cache.
+
+        Args:
+            path: SQLite file (defaults to env var or the temp directory)
+            max_entries: Layouts kept on disk before LRU eviction
+            max_memory_entries: Size of the in-memory LRU tier
+            warm_start_delta: Max relative size change for a warm start (0 disables)
+            warm_start_tolerance: Accepted seed length over the scaled cached length
+            persistent: Use the on-disk tier
+        """
+        if path is None:
+            path = os.getenv("NESTING_CACHE_PATH") or (
+                Path(tempfile.gettempdir()) / DEFAULT_CACHE_FILENAME
+            )
+        self.path = Path(path)
+        self.max_entries = max_entries or int(
+            os.getenv("NESTING_CACHE_MAX_ENTRIES", DEFAULT_MAX_ENTRIES)
+        )
+        self.max_memory_entries = max_memory_entries
+        self.warm_start_delta = (
+            float(os.getenv("NESTING_WARM_START_DELTA", DEFAULT_WARM_START_DELTA))
+            if warm_start_delta is None
+            else warm_start_delta
+        )
+        self.warm_start_tolerance = (
+            float(
+                os.getenv("NESTING_WARM_START_TOLERANCE", DEFAULT_WARM_START_TOLERANCE)
+            )
+            if warm_start_tolerance is None
+            else warm_start_tolerance
+        )
+        self.persistent = persistent
+
+        self._memory: "OrderedDict[str, Dict[str, Any]]" = OrderedDict()
+        self._lock = threading.Lock()
+        self._conn: Optional[sqlite3.Connection] = None
+        self._conn_pid: Optional[int] = None
+        self._stats = {
+            "hits": 0,
+            "warm_starts": 0,
+            "warm_rejected": 0,
+            "misses": 0,
+            "stores": 0,
+            "evictions": 0,
+            "disk_errors": 0,
+            "seconds_saved": 0.0,
+        }
+
+    # ------------------------------------------------------------------
+    # Disk tier
+    # ------------------------------------------------------------------
+
+    def _connection(self) -> Optional[sqlite3.Connection]:
+        """SQLite connection for this process (reopened after fork)."""
+        if not self.persistent:
+            return None
+        if self._conn is not None and self._conn_pid == os.getpid():
+            return self._conn
+
+        try:
+            self.path.parent.mkdir(parents=True, exist_ok=True)
+            conn = sqlite3.connect(
+                str(self.path),
+                timeout=10,
+                isolation_level=None,
+                check_same_thread=False,
+            )
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute("PRAGMA synchronous=NORMAL")
+            conn.execute(
+                "CREATE TABLE IF NOT EXISTS layouts ("
+                "key TEXT PRIMARY KEY, family TEXT NOT NULL, data TEXT NOT NULL, "
+                "created_at REAL NOT NULL, last_used REAL NOT NULL)"
+            )
+            conn.execute(
+                "CREATE INDEX IF NOT EXISTS layouts_family ON layouts (family)"
+            )
+        except sqlite3.Error as e:
+            logger.warning(f"Nesting cache disk tier unavailable ({e}), memory only")
+            self.persistent = False
+            return None
+
+        self._conn = conn
+        self._conn_pid = os.getpid()
+        return conn
+
+    def _disk_get(self, key: str) -> Optional[Dict[str, Any]]:
+        conn = self._connection()
+        if conn is None:
+            return None
+        try:
+            row = conn.execute(
+                "SELECT data FROM layouts WHERE key = ?", (key,)
+            ).fetchone()
+            if row:
+                conn.execute(
+                    "UPDATE layouts SET last_used = ? WHERE key = ?",
+                    (time.time(), key),
+                )
+        except sqlite3.Error as e:
+            self._stats["disk_errors"] += 1
+            logger.debug(f"Nesting cache read failed: {e}")
+            return None
+        return json.loads(row[0]) if row else None
+
+    def _disk_family(self, family: str) -> List[Tuple[str, Dict[str, Any]]]:
+        conn = self._connection()
+        if conn is None:
+            return []
+        try:
+            rows = conn.execute(
+                "SELECT key, data FROM layouts WHERE family = ?", (family,)
+            ).fetchall()
+        except sqlite3.Error as e:
+            self._stats["disk_errors"] += 1
+            logger.debug(f"Nesting cache read failed: {e}")
+            return []
+        return [(key, json.loads(data)) for key, data in rows]
+
+    def _disk_put(self, key: str, entry: Dict[str, Any]):
+        conn = self._connection()
+        if conn is None:
+            return
+        now = time.time()
+        try:
+            conn.execute(
+                "INSERT OR REPLACE INTO layouts "
+                "(key, family, data, created_at, last_used) VALUES (?, ?, ?, ?, ?)",
+                (key, entry["family"], json.dumps(entry), now, now),
+            )
+            evicted = conn.execute(
+                "DELETE FROM layouts WHERE key IN (SELECT key FROM layouts "
+                "ORDER BY last_used DESC LIMIT -1 OFFSET ?)",
+                (self.max_entries,),
+            ).rowcount
+            self._stats["evictions"] += max(0, evicted)
+        except sqlite3.Error as e:
+            self._stats["disk_errors"] += 1
+            logger.debug(f"Nesting cache write failed: {e}")
+
+    # ------------------------------------------------------------------
+    # Memory tier
+    # ------------------------------------------------------------------
+
+    def _memory_put(self, key: str, entry: Dict[str, Any]):
+        self._memory[key] = entry
+        self._memory.move_to_end(key)
+        while len(self._memory) > self.max_memory_entries:
+            self._memory.popitem(last=False)
+
+    def _get(self, key: str) -> Optional[Dict[str, Any]]:
+        with self._lock:
+            entry = self._memory.get(key)
+            if entry is not None:
+                self._memory.move_to_end(key)
+                return entry
+            entry = self._disk_get(key)
+            if entry is not None:
+                self._memory_put(key, entry)
+            return entry
+
+    # ------------------------------------------------------------------
+    # Layout replay
+    # ------------------------------------------------------------------
+
+    def _replay(
+        self,
+        contour_groups: Sequence[Any],
+        entry: Dict[str, Any],
+        fabric_width: float,
+        offsets: Optional[np.ndarray] = None,
+    ) -> NestingResult:
+        """NestingResult placing each piece at its stored (or given) offset."""
+        pieces = []
+        for i, (piece_id, rotation, x, y) in enumerate(entry["placements"]):
+            points = _placed(contour_groups[piece_id], rotation)
+            min_x, min_y, max_x, max_y = as_contour_array(points).bounds
+            if offsets is not None:
+                x, y = offsets[i]
+            pieces.append(
+                NestedPiece(
+                    piece_id=piece_id,
+                    original_points=contour_groups[piece_id],
+                    transformed_points=points,
+                    bbox=BoundingBox(min_x, min_y, max_x, max_y),
+                    position=(float(x), float(y)),
+                    rotation=rotation,
+                )
+            )
+
+        return NestingResult(
+            pieces=pieces,
+            fabric_width=fabric_width,
+            fabric_length=entry["fabric_length"],
+            utilization=entry["utilization"],
+            success=True,
+            message=entry["message"],
+            metadata=dict(entry.get("metadata", {})),
+        )
+
+    def lookup(
+        self,
+        contour_groups: Sequence[Any],
+        fabric_width: float,
+        gap: float,
+        complete_only: bool = True,
+        rotation_table: Any = None,
+    ) -> Optional[NestingResult]:
+        """
+        Cached layout for exactly this piece set, or None.
+
+        Args:
+            complete_only: Ignore layouts from runs that were stopped early
+                (anytime nesting with a deadline or target)
+            rotation_table: The order's rotation_table.RotationTable
+        """
+        key, _, _ = layout_keys(
+            contour_groups, fabric_width, gap, _angles(rotation_table)
+        )
+        entry = self._get(key)
+        if entry is None or (complete_only and not entry["complete"]):
+            return None
+        if len(entry["placements"]) != len(contour_groups):
+            return None
+
+        result = self._replay(contour_groups, entry, fabric_width)
+        self._stats["hits"] += 1
+        self._stats["seconds_saved"] += entry.get("nest_seconds", 0.0)
+        count("layout_cache_hits")
+        result.metadata["nesting_cache"] = {
+            "status": "hit",
+            "key": key[:12],
+            "seconds_saved": entry.get("nest_seconds", 0.0),
+        }
+        return result
+
+    def _nearest_family_entry(
+        self,
+        family: str,
+        extents: np.ndarray,
+        complete_only: bool,
+    ) -> Optional[Tuple[Dict[str, Any], float, float]]:
+        """Family layout with the smallest size change within the delta."""
+        with self._lock:
+            candidates = {
+                key: entry
+                for key, entry in self._memory.items()
+                if entry["family"] == family
+            }
+            for key, entry in self._disk_family(family):
+                candidates.setdefault(key, entry)
+
+        best = None
+        totals = extents.sum(axis=0)
+        for entry in candidates.values():
+            if complete_only and not entry["complete"]:
+                continue
+            cached = np.asarray(entry["extents"], dtype=np.float64).sum(axis=0)
+            if np.any(cached <= 0):
+                continue
+            ratio_x, ratio_y = totals / cached
+            delta = max(abs(ratio_x - 1), abs(ratio_y - 1))
+            if delta <= self.warm_start_delta and (best is None or delta < best[0]):
+                best = (delta, entry, float(ratio_x), float(ratio_y))
+
+        return None if best is None else best[1:]
+
+    def _scaled_layout(
+        self,
+        contour_groups: Sequence[Any],
+        entry: Dict[str, Any],
+        fabric_width: float,
+        gap: float,
+        ratio_x: float,
+        ratio_y: float,
+    ) -> Optional[NestingResult]:
+        """Cached layout with offsets scaled by the size ratio, if still valid."""
+        offsets = np.array([p[2:] for p in entry["placements"]], dtype=np.float64)
+        offsets *= (ratio_x, ratio_y)
+
+        index = PlacementIndex(gap)
+        max_y = 0.0
+        for (piece_id, rotation, _, _), (x, y) in zip(entry["placements"], offsets):
+            poly = points_to_shapely(_placed(contour_groups[piece_id], rotation))
+            min_x, min_y, max_x, max_y_piece = poly.bounds
+            if x + max_x > fabric_width + 1e-6:
+                return None
+            placed = translate(poly, x, y)
+            if index.collides(placed):
+                return None
+            index.add(placed)
+            max_y = max(max_y, y + max_y_piece)
+
+        result = self._replay(contour_groups, entry, fabric_width, offsets=offsets)
+        result.fabric_length = max_y
+        return result
+
+    def _decoded_layout(
+        self,
+        contour_groups: Sequence[Any],
+        entry: Dict[str, Any],
+        fabric_width: float,
+        gap: float,
+        rotation_table: Any = None,
+    ) -> Optional[NestingResult]:
+        """Cached placement order and rotations through the hybrid decoder."""
+        nester = HybridNester(fabric_width, gap)
+        pieces = [
+            Piece(
+                i,
+                points,
+                points_to_shapely(points),
+                rotated=(
+                    rotation_table.polygons(i) if rotation_table is not None else None
+                ),
+            )
+            for i, points in enumerate(contour_groups)
+        ]
+        placements = sorted(entry["placements"], key=lambda p: (p[3], p[2]))
+        order = [p[0] for p in placements]
+        rotations = [p[1] if p[1] in pieces[p[0]].rotations else 0 for p in placements]
+
+        placed, length = nester.nest_with_order(pieces, order, rotations)
+        if len(placed) != len(pieces):
+            return None
+
+        seeded = {
+            "placements": [[p.piece_id, p.rotation, p.x, p.y] for p in placed],
+            "fabric_length": length,
+            "utilization": 0.0,
+            "message": f"Warm-started {len(placed)} pieces in {length:.2f} cm",
+        }
+        return self._replay(contour_groups, seeded, fabric_width)
+
+    def warm_start(
+        self,
+        contour_groups: Sequence[Any],
+        fabric_width: float,
+        gap: float,
+        complete_only: bool = True,
+        rotation_table: Any = None,
+    ) -> Optional[NestingResult]:
+        """
+        Starting layout seeded from the nearest cached scale of the same pieces.
+
+        The seed is not optimized; nest() hands it to the nesting run.
+        Returns None if no family layout is within the delta or the seed is
+        not within the tolerance of the cached (scaled) length. The result's
+        metadata["nesting_cache"]["seed"] says which seed was used.
+        """
+        if self.warm_start_delta <= 0 or not HYBRID_AVAILABLE or not contour_groups:
+            return None
+
+        _, family, extents = layout_keys(
+            contour_groups, fabric_width, gap, _angles(rotation_table)
+        )
+        match = self._nearest_family_entry(family, extents, complete_only)
+        if match is None:
+            return None
+        entry, ratio_x, ratio_y = match
+        if len(entry["placements"]) != len(contour_groups):
+            return None
+
+        seed = "scaled"
+        try:
+            result = self._scaled_layout(
+                contour_groups, entry, fabric_width, gap, ratio_x, ratio_y
+            )
+            if result is None:
+                seed = "decoded"
+                result = self._decoded_layout(
+                    contour_groups, entry, fabric_width, gap, rotation_table
+                )
+        except Exception as e:
+            logger.debug(f"Nesting cache warm start failed: {e}")
+            result = None
+
+        expected_length = entry["fabric_length"] * ratio_y
+        if result is None or result.fabric_length > expected_length * (
+            1 + self.warm_start_tolerance
+        ):
+            self._stats["warm_rejected"] += 1
+            return None
+
+        piece_area = sum(_polygon_area(p.transformed_points) for p in result.pieces)
+        fabric_area = fabric_width * result.fabric_length
+        result.utilization = piece_area / fabric_area * 100 if fabric_area > 0 else 0
+        result.message = (
+            f"Warm-started {len(result.pieces)} pieces in "
+            f"{result.fabric_length:.2f} cm"
+        )
+        result.metadata["nesting_cache"] = {
+            "status": "warm",
+            "seed": seed,
+            "scale_ratio": [round(ratio_x, 4), round(ratio_y, 4)],
+            "cached_length": entry["fabric_length"],
+            "seed_length": result.fabric_length,
+        }
+        return result
+
+    # ------------------------------------------------------------------
+    # Store
+    # ------------------------------------------------------------------
+
+    def store(
+        self,
+        contour_groups: Sequence[Any],
+        result: NestingResult,
+        gap: float,
+        complete: bool = True,
+        nest_seconds: float = 0.0,
+        rotation_table: Any = None,
+    ) -> bool:
+        """
+        Store a successful layout.
+
+        Placements are recorded as the placed bounding-box offset of each
+        piece after its rotation, so any engine's result (whichever
+        transformed_points / position convention it uses) replays to the
+        same geometry. An existing layout is only replaced by a complete one
+        or a shorter one of the same kind.
+
+        Returns:
+            True if the layout was stored
+        """
+        if not result.success or len(result.pieces) != len(contour_groups):
+            return False
+
+        key, family, extents = layout_keys(
+            contour_groups, result.fabric_width, gap, _angles(rotation_table)
+        )
+
+        placements = []
+        for piece in result.pieces:
+            rotation = piece.rotation
+            placed = as_contour_array(piece.transformed_points).coords
+            min_xy = placed.min(axis=0) + piece.position
+            size = placed.max(axis=0) - placed.min(axis=0)
+
+            expected = as_contour_array(
+                _placed(contour_groups[piece.piece_id], rotation)
+            ).coords.max(axis=0)
+            if not np.allclose(size, expected, atol=1e-3):
+                logger.debug(
+                    f"Nesting cache: piece {piece.piece_id} does not match "
+                    f"rotation {rotation}, layout not cached"
+                )
+                return False
+            placements.append(
+                [piece.piece_id, rotation, float(min_xy[0]), float(min_xy[1])]
+            )
+
+        existing = self._get(key)
+        if existing is not None and (existing["complete"] and not complete):
+            return False
+        if (
+            existing is not None
+            and existing["complete"] == complete
+            and existing["fabric_length"] <= result.fabric_length
+        ):
+            return False
+
+        metadata = {}
+        for name, value in result.metadata.items():
+            if name == "nesting_cache":
+                continue
+            try:
+                metadata[name] = json.loads(json.dumps(value))
+            except (TypeError, ValueError):
+                pass
+        entry = {
+            "family": family,
+            "complete": complete,
+            "fabric_length": float(result.fabric_length),
+            "utilization": float(result.utilization),
+            "message": result.message,
+            "metadata": metadata,
+            "extents": extents.tolist(),
+            "placements": placements,
+            "nest_seconds": round(nest_seconds, 3),
+        }
+
+        with self._lock:
+            self._memory_put(key, entry)
+            self._disk_put(key, entry)
+            self._stats["stores"] += 1
+        return True
+
+    def nest(
+        self,
+        contour_groups: Sequence[Any],
+        fabric_width: float,
+        gap: float,
+        run: Callable[[Optional[NestingResult]], NestingResult],
+        complete: bool = True,
+        rotation_table: Any = None,
+    ) -> NestingResult:
+        """
+        Cached layout, or run(seed) - and cache the outcome.
+
+        Args:
+            run: Computes the layout on a miss. Called with the warm-start
+                seed (see warm_start) to start the optimizer from, or None
+            complete: run() is a full nest (False for deadline/target runs;
+                those only use and replace other partial layouts)
+            rotation_table: The order's rotation_table.RotationTable; layouts
+                are keyed by its allowed angles
+        """
+        result = self.lookup(
+            contour_groups,
+            fabric_width,
+            gap,
+            complete_only=complete,
+            rotation_table=rotation_table,
+        )
+        if result is not None:
+            return result
+
+        seeded = self.warm_start(
+            contour_groups,
+            fabric_width,
+            gap,
+            complete_only=complete,
+            rotation_table=rotation_table,
+        )
+        if seeded is not None:
+            info = seeded.metadata.pop("nesting_cache")
+            self._stats["warm_starts"] += 1
+            count("layout_cache_warm_starts")
+        else:
+            info = {"status": "miss"}
+            self._stats["misses"] += 1
+            count("layout_cache_misses")
+
+        start = time.time()
+        result = run(seeded)
+        elapsed = time.time() - start
+
+        if result.success:
+            self.store(
+                contour_groups,
+                result,
+                gap,
+                complete=complete,
+                nest_seconds=elapsed,
+                rotation_table=rotation_table,
+            )
+        if seeded is not None:
+            info["improved"] = result.fabric_length < seeded.fabric_length - 1e-9
+        result.metadata["nesting_cache"] = info
+        return result
+
+    # ------------------------------------------------------------------
+    # Maintenance
+    # ------------------------------------------------------------------
+
+    def clear_memory(self):
+        """Drop the in-memory tier (the disk tier is kept)."""
+        with self._lock:
+            self._memory.clear()
+
+    def clear(self):
+        """Drop both tiers."""
+        self.clear_memory()
+        conn = self._connection()
+        if conn is not None:
+            try:
+                conn.execute("DELETE FROM layouts")
+            except sqlite3.Error as e:
+                logger.debug(f"Nesting cache clear failed: {e}")
+
+    def get_stats(self) -> Dict[str, Any]:
+        """Get cache statistics."""
+        lookups = (
+            self._stats["hits"] + self._stats["warm_starts"] + self._stats["misses"]
+        )
+        # Warm starts still run the nester, so only hits count as served
+        served = self._stats["hits"]
+
+        stats = {
+            "persistent": self.persistent,
+            "path": str(self.path) if self.persistent else None,
+            "memory_entries": len(self._memory),
+            **{k: v for k, v in self._stats.items() if k != "seconds_saved"},
+            "seconds_saved": round(self._stats["seconds_saved"], 1),
+            "hit_rate_percent": round(served / lookups * 100, 1) if lookups else 0,
+        }
+
+        conn = self._connection()
+        if conn is not None:
+            try:
+                stats["disk_entries"] = conn.execute(
+                    "SELECT COUNT(*) FROM layouts"
+                ).fetchone()[0]
+            except sqlite3.Error:
+                pass
+
+        return stats
+
+    def reset_stats(self):
+        """Zero the counters."""
+        for name in self._stats:
+            self._stats[name] = 0.0 if name == "seconds_saved" else 0
+
+    def close(self):
+        """Close the SQLite connection."""
+        if self._conn is not None and self._conn_pid == os.getpid():
+            self._conn.close()
+        self._conn = None
+        self._conn_pid = None
+
+
+# Singleton instance for convenience
+_nesting_cache: Optional[NestingCache] = None
+
+
+def get_nesting_cache() -> NestingCache:
+    """Get or create the process-wide nesting cache."""
+    global _nesting_cache
+    if _nesting_cache is None:
+        _nesting_cache = NestingCache()
+    return _nesting_cache
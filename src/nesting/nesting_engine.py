@@ -11,15 +11,22 @@ Algorithm: Bottom-Left Fill with Rotation
 3. Place each piece at lowest available Y position, as far left as possible
 4. Try 0, 90, 180, 270 degree rotations to find best fit
 
+Pieces may be point lists or ContourArray; the geometry helpers keep
+ContourArray input as arrays (see contour_array.py).
+
 Author: Claude
 Date: 2026-01-30
 """
 
 import math
-from typing import List, Dict, Tuple, Optional
+import time
+import threading
+from typing import Any, Callable, List, Dict, Tuple, Optional
 from dataclasses import dataclass, field
 from copy import deepcopy
 
+from contour_array import ContourArray
+
 
 # Constants
 CUTTER_WIDTH_CM = 157.48  # 62 inches
@@ -84,13 +91,82 @@ class NestingResult:
     utilization: float  # Percentage of fabric used
     success: bool
     message: str
+    metadata: Dict[str, Any] = field(default_factory=dict)
+
+
+# Called by anytime-capable nesters with each improved layout
+ImprovementCallback = Callable[[NestingResult], None]
+
+
+class CancellationToken:
+    """
+    Cooperative stop signal for long-running nesters.
+
+    Nesters poll `cancelled` between candidate layouts and return their best
+    layout so far once it is set. A token is cancelled explicitly (cancel())
+    or implicitly when its deadline passes or its parent token is
+    cancelled. Safe to share between threads.
+    """
+
+    def __init__(
+        self,
+        deadline: Optional[float] = None,
+        parent: Optional["CancellationToken"] = None,
+    ):
+        """
+        Args:
+            deadline: Absolute time.time() after which the token counts as
+                cancelled (None = no deadline)
+            parent: Token whose cancellation also cancels this one
+        """
+        self.deadline = deadline
+        self.parent = parent
+        self._event = threading.Event()
+        self._reason: Optional[str] = None
+
+    @classmethod
+    def with_timeout(cls, seconds: Optional[float]) -> "CancellationToken":
+        """Token that expires `seconds` from now (never if None)."""
+        return cls(None if seconds is None else time.time() + seconds)
+
+    def cancel(self, reason: str = "cancelled"):
+        """Ask every nester holding this token to stop (first reason wins)."""
+        if not self._event.is_set():
+            self._reason = reason
+            self._event.set()
+
+    @property
+    def cancelled(self) -> bool:
+        if self._event.is_set():
+            return True
+        if self.parent is not None and self.parent.cancelled:
+            self.cancel(self.parent.reason or "cancelled")
+            return True
+        if self.deadline is not None and time.time() >= self.deadline:
+            self.cancel("deadline")
+            return True
+        return False
+
+    @property
+    def reason(self) -> Optional[str]:
+        """Why the token was cancelled ("deadline", or the cancel() reason)."""
+        return self._reason if self.cancelled else None
+
+    def remaining(self) -> Optional[float]:
+        """Seconds left before the deadline (None if there is none)."""
+        if self.deadline is None:
+            return None
+        return max(0.0, self.deadline - time.time())
 
 
 def calculate_bbox(points: List[Point]) -> BoundingBox:
     """Calculate bounding box for a set of points."""
-    if not points:
+    if not len(points):
         return BoundingBox(0, 0, 0, 0)
 
+    if isinstance(points, ContourArray):
+        return BoundingBox(*points.bounds)
+
     xs = [p.x for p in points]
     ys = [p.y for p in points]
 
@@ -106,6 +182,9 @@ def rotate_points(
     points: List[Point], degrees: int, center: Tuple[float, float] = None
 ) -> List[Point]:
     """Rotate points around center (or their centroid if not specified)."""
+    if isinstance(points, ContourArray):
+        return points.rotated(degrees, center)
+
     if not points:
         return []
 
@@ -139,6 +218,9 @@ def rotate_points(
 
 def normalize_to_origin(points: List[Point]) -> List[Point]:
     """Move points so bounding box starts at (0, 0)."""
+    if isinstance(points, ContourArray):
+        return points.normalized()
+
     if not points:
         return []
 
@@ -157,26 +239,33 @@ def check_overlap(box1: BoundingBox, box2: BoundingBox, gap: float = GAP_CM) ->
 
 
 def find_best_rotation(
-    points: List[Point], fabric_width: float, rotations: List[int] = [0, 90, 180, 270]
+    points: List[Point],
+    fabric_width: float,
+    rotations: List[int] = [0, 90, 180, 270],
+    shapes: Optional[Dict[int, Any]] = None,
 ) -> Tuple[List[Point], int, BoundingBox]:
     """Find rotation that best fits within fabric width.
 
     Always returns normalized points (bounding box starting at origin).
+    shapes (angle -> RotatedShape from a rotation table) replaces both
+    rotations and the per-call rotating.
     """
-    # Start with normalized 0-degree rotation as default
-    normalized_0 = normalize_to_origin(points)
-    best_points = normalized_0
-    best_rotation = 0
-    best_bbox = calculate_bbox(normalized_0)
-
-    for rotation in rotations:
-        if rotation == 0:
-            rotated = normalized_0  # Already computed
-        else:
-            rotated = rotate_points(points, rotation)
-            rotated = normalize_to_origin(rotated)
-        bbox = calculate_bbox(rotated)
+    if shapes is not None:
+        candidates = [(angle, shape.points, shape.bbox) for angle, shape in shapes.items()]
+    else:
+        # Normalized 0-degree rotation is the default
+        normalized_0 = normalize_to_origin(points)
+        candidates = [(0, normalized_0, calculate_bbox(normalized_0))]
+        for rotation in rotations:
+            if rotation == 0:
+                rotated = normalized_0  # Already computed
+            else:
+                rotated = rotate_points(points, rotation)
+                rotated = normalize_to_origin(rotated)
+            candidates.append((rotation, rotated, calculate_bbox(rotated)))
 
+    best_rotation, best_points, best_bbox = candidates[0]
+    for rotation, rotated, bbox in candidates:
         # Prefer rotation where width fits within fabric
         if bbox.width <= fabric_width:
             # If both fit, prefer smaller width (more efficient)
@@ -219,6 +308,7 @@ def nest_bottom_left_fill(
     fabric_width: float = CUTTER_WIDTH_CM,
     gap: float = GAP_CM,
     allow_rotation: bool = True,
+    rotation_table: Optional[Any] = None,
 ) -> NestingResult:
     """
     Nest pattern pieces using bottom-left fill algorithm.
@@ -228,6 +318,9 @@ def nest_bottom_left_fill(
     2. Places each piece at the lowest Y position possible
     3. Within that Y level, places as far left as possible
     4. Tries rotations to optimize fit
+
+    rotation_table (rotation_table.RotationTable) supplies each piece's
+    allowed angles and pre-rotated outlines.
     """
     if not contour_groups:
         return NestingResult(
@@ -246,7 +339,11 @@ def nest_bottom_left_fill(
             continue
 
         if allow_rotation:
-            rotated_points, rotation, bbox = find_best_rotation(points, fabric_width)
+            rotated_points, rotation, bbox = find_best_rotation(
+                points,
+                fabric_width,
+                shapes=rotation_table.shapes(i) if rotation_table is not None else None,
+            )
         else:
             rotated_points = normalize_to_origin(points)
             rotation = 0
@@ -267,10 +364,15 @@ def nest_bottom_left_fill(
     if oversized:
         # Try rotating oversized pieces
         for piece in oversized:
+            if rotation_table is not None and not rotation_table.allows(piece["id"], 90):
+                continue
             if piece["bbox"].height <= fabric_width:
                 # Rotate 90 degrees
-                rotated = rotate_points(piece["original"], 90)
-                rotated = normalize_to_origin(rotated)
+                if rotation_table is not None:
+                    rotated = rotation_table.shape(piece["id"], 90).points
+                else:
+                    rotated = rotate_points(piece["original"], 90)
+                    rotated = normalize_to_origin(rotated)
                 piece["points"] = rotated
                 piece["rotation"] = 90
                 piece["bbox"] = calculate_bbox(rotated)
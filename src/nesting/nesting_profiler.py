@@ -0,0 +1,322 @@
+#!/usr/bin/env python3
+"""
+Nesting Profiler Hooks
+
+When an order takes 50 s to nest there was no way to tell where the time
+went: candidate generation, NFP computation, collision tests, compaction or
+the random-search tail of HybridNester.optimize. The engines now report
+phase timers and operation counters to the active NestingProfiler:
+
+    with phase("hybrid.compaction"):
+        ...
+    count("candidates", len(candidates))
+
+Both are module functions that return immediately when no profiler is
+active (one context-variable lookup), so the hooks stay in production code
+and cost close to nothing when profiling is off. Hooks sit at batch /
+layout granularity, never in per-vertex loops.
+
+A profiler is active inside profile_nesting(), for the thread (context)
+that entered it: orders nested concurrently on threads (roll_inventory,
+batch_pipeline) each report to their own profiler. Its report lands in
+NestingResult.metadata["profile"] and is exported to the Prometheus
+histograms in observability.metrics (sds_nesting_phase_seconds,
+sds_nesting_operations):
+
+    {
+        "mode": "timers",
+        "wall_s": 12.4,
+        "phases": {"hybrid.random_search": {"seconds": 9.8, "calls": 1}, ...},
+        "counters": {"layouts_evaluated": 311, "intersection_tests": 48210, ...},
+        "algorithms": {"skyline": {...}, ...},   # per portfolio worker
+        "top": "...",                            # cprofile / pyinstrument only
+    }
+
+Portfolio workers run in other processes: master_nesting starts a fresh
+profiler in each worker (same mode) and merges the worker's report back
+under "algorithms".
+
+Modes (profile argument or NESTING_PROFILE):
+    off           no profiler (default)
+    timers        phase timers and counters
+    cprofile      timers plus a cProfile capture (top functions by cumtime)
+    pyinstrument  timers plus a pyinstrument capture (falls back to cProfile)
+
+Usage:
+    with profile_nesting("timers") as profiler:
+        result = master_nest(pieces, fabric_width, gap)
+    attach_profile(result, profiler)
+    result.metadata["profile"]["counters"]
+
+Environment:
+    NESTING_PROFILE           - default mode (default "off")
+    NESTING_PROFILE_TOP       - functions kept in the "top" text (default 25)
+
+Author: Claude
+Date: 2026-02-02
+"""
+
+import io
+import os
+import time
+import contextvars
+import logging
+import cProfile
+import pstats
+from contextlib import contextmanager
+from dataclasses import dataclass, field
+from typing import Any, Dict, Iterator, List, Optional
+
+try:
+    from pyinstrument import Profiler as InstrumentProfiler
+
+    PYINSTRUMENT_AVAILABLE = True
+except ImportError:
+    PYINSTRUMENT_AVAILABLE = False
+
+try:
+    from observability.metrics import record_nesting_profile
+
+    METRICS_AVAILABLE = True
+except ImportError:
+    METRICS_AVAILABLE = False
+
+logger = logging.getLogger(__name__)
+
+PROFILE_MODES = ("off", "timers", "cprofile", "pyinstrument")
+# Accepted spellings of "timers" / "off" in NESTING_PROFILE
+_ON = ("1", "true", "yes", "on")
+_OFF = ("", "0", "false", "no", "none")
+
+
+def profile_mode() -> str:
+    """Default mode from NESTING_PROFILE."""
+    return normalize_mode(os.getenv("NESTING_PROFILE", "off"))
+
+
+def profile_top() -> int:
+    return int(os.getenv("NESTING_PROFILE_TOP", "25"))
+
+
+def normalize_mode(mode: Optional[str]) -> str:
+    """A PROFILE_MODES entry for a mode name or on/off flag."""
+    value = (mode or "").strip().lower()
+    if value in _OFF:
+        return "off"
+    if value in _ON:
+        return "timers"
+    if value not in PROFILE_MODES:
+        logger.warning(f"Unknown NESTING_PROFILE mode {mode!r}, profiling off")
+        return "off"
+    return value
+
+
+class _Phase:
+    """Context manager timing one phase into a profiler."""
+
+    __slots__ = ("profiler", "name", "start")
+
+    def __init__(self, profiler: "NestingProfiler", name: str):
+        self.profiler = profiler
+        self.name = name
+
+    def __enter__(self):
+        self.start = time.perf_counter()
+        return self
+
+    def __exit__(self, *exc):
+        self.profiler.add_time(self.name, time.perf_counter() - self.start)
+        return False
+
+
+class _NoPhase:
+    """Shared do-nothing phase used while no profiler is active."""
+
+    __slots__ = ()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        return False
+
+
+_NO_PHASE = _NoPhase()
+
+
+@dataclass
+class NestingProfiler:
+    """Phase timers, counters and an optional function-level capture."""
+
+    mode: str = "timers"
+    phases: Dict[str, List[float]] = field(default_factory=dict)  # [s, calls]
+    counters: Dict[str, int] = field(default_factory=dict)
+    algorithms: Dict[str, Dict[str, Any]] = field(default_factory=dict)
+    started: float = 0.0
+    wall_s: float = 0.0
+    top: Optional[str] = None
+    _capture: Any = field(default=None, repr=False)
+
+    def phase(self, name: str) -> _Phase:
+        return _Phase(self, name)
+
+    def add_time(self, name: str, seconds: float, calls: int = 1):
+        entry = self.phases.get(name)
+        if entry is None:
+            self.phases[name] = [seconds, calls]
+        else:
+            entry[0] += seconds
+            entry[1] += calls
+
+    def count(self, name: str, amount: int = 1):
+        self.counters[name] = self.counters.get(name, 0) + amount
+
+    def merge(self, label: str, report: Optional[Dict[str, Any]]):
+        """Fold a worker's report in, keeping it under algorithms[label]."""
+        if not report:
+            return
+        for name, entry in report.get("phases", {}).items():
+            self.add_time(name, entry["seconds"], entry["calls"])
+        for name, value in report.get("counters", {}).items():
+            self.count(name, value)
+        self.algorithms[label] = report
+
+    def start(self) -> "NestingProfiler":
+        self.started = time.perf_counter()
+        if self.mode == "pyinstrument" and not PYINSTRUMENT_AVAILABLE:
+            logger.info("pyinstrument not installed, capturing with cProfile")
+            self.mode = "cprofile"
+        if self.mode == "pyinstrument":
+            self._capture = InstrumentProfiler()
+            self._capture.start()
+        elif self.mode == "cprofile":
+            self._capture = cProfile.Profile()
+            try:
+                self._capture.enable()
+            except ValueError:
+                # Another cProfile (e.g. python -m cProfile) already runs
+                logger.info("cProfile already active, keeping timers only")
+                self._capture = None
+        return self
+
+    def stop(self) -> "NestingProfiler":
+        self.wall_s = time.perf_counter() - self.started
+        if self._capture is None:
+            return self
+        if self.mode == "pyinstrument":
+            self._capture.stop()
+            self.top = self._capture.output_text(unicode=False, color=False)
+        else:
+            self._capture.disable()
+            out = io.StringIO()
+            stats = pstats.Stats(self._capture, stream=out)
+            stats.sort_stats("cumulative").print_stats(profile_top())
+            self.top = out.getvalue()
+        self._capture = None
+        return self
+
+    def report(self) -> Dict[str, Any]:
+        """Summary for NestingResult.metadata["profile"]."""
+        wall_s = self.wall_s
+        if not wall_s and self.started:
+            wall_s = time.perf_counter() - self.started  # Still running
+        report = {
+            "mode": self.mode,
+            "wall_s": round(wall_s, 4),
+            "phases": {
+                name: {"seconds": round(seconds, 4), "calls": calls}
+                for name, (seconds, calls) in sorted(
+                    self.phases.items(), key=lambda item: -item[1][0]
+                )
+            },
+            "counters": dict(sorted(self.counters.items())),
+        }
+        if self.algorithms:
+            report["algorithms"] = self.algorithms
+        if self.top:
+            report["top"] = self.top
+        return report
+
+
+# The profiler hooks report to, per thread / context (None = profiling off)
+_active: contextvars.ContextVar[Optional[NestingProfiler]] = contextvars.ContextVar(
+    "nesting_profiler", default=None
+)
+
+
+def active() -> Optional[NestingProfiler]:
+    return _active.get()
+
+
+def active_mode() -> Optional[str]:
+    """Mode of the active profiler, for starting one in a worker process."""
+    profiler = _active.get()
+    return profiler.mode if profiler is not None else None
+
+
+def phase(name: str):
+    """Time a block into the active profiler (no-op when profiling is off)."""
+    profiler = _active.get()
+    if profiler is None:
+        return _NO_PHASE
+    return _Phase(profiler, name)
+
+
+def count(name: str, amount: int = 1):
+    """Add to a counter of the active profiler (no-op when profiling is off)."""
+    profiler = _active.get()
+    if profiler is not None:
+        profiler.count(name, amount)
+
+
+def merge(label: str, report: Optional[Dict[str, Any]]):
+    """Merge a worker's report into the active profiler."""
+    profiler = _active.get()
+    if profiler is not None:
+        profiler.merge(label, report)
+
+
+@contextmanager
+def profile_nesting(
+    mode: Optional[str] = None, fresh: bool = False
+) -> Iterator[Optional[NestingProfiler]]:
+    """
+    Activate a profiler for the enclosed nesting run.
+
+    Yields None when the mode (default NESTING_PROFILE) is off. Nested uses
+    share the outer profiler unless fresh=True, which worker processes use
+    to drop a profiler inherited through fork.
+    """
+    mode = normalize_mode(mode) if mode is not None else profile_mode()
+    if mode == "off":
+        yield None
+        return
+    outer = _active.get()
+    if outer is not None and not fresh:
+        yield outer
+        return
+
+    profiler = NestingProfiler(mode).start()
+    reset = _active.set(profiler)
+    try:
+        yield profiler
+    finally:
+        profiler.stop()
+        _active.reset(reset)
+
+
+def attach_profile(result: Any, profiler: Optional[NestingProfiler]) -> Any:
+    """
+    Store a finished profiler's report in result.metadata["profile"] and
+    export it to the Prometheus histograms. No-op for profiler None.
+    """
+    if profiler is None or result is None:
+        return result
+    report = profiler.report()
+    result.metadata["profile"] = report
+    if METRICS_AVAILABLE:
+        try:
+            record_nesting_profile(report)
+        except Exception as e:
+            logger.debug(f"Profile metrics export failed: {e}")
+    return result
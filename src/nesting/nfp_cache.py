@@ -0,0 +1,335 @@
+#!/usr/bin/env python3
+"""
+Persistent No-Fit Polygon Cache
+
+NFPs depend only on the shapes of the two pieces (and the gap), not on the
+order they come from. The same template pieces are nested over and over, so
+NFPs are keyed by a geometry hash and shared across orders and workers.
+
+Tiers:
+1. In-memory LRU (per process)
+2. SQLite on disk (shared by every worker on the host, WAL mode)
+
+Geometry hash:
+    Each polygon's exterior is oriented counter-clockwise, translated so its
+    bounding box starts at the origin, quantized to 1/1000 cm and rotated to
+    start at its lexicographically smallest vertex. The key is the SHA-1 of
+    both canonical polygons plus the gap. NFPs are stored in that canonical
+    frame and shifted back on lookup, so the same piece at any offset hits.
+
+Usage:
+    cache = get_nfp_cache()
+    nfp = cache.get_or_compute(fixed, orbiting, gap, calculate_nfp)
+    print(cache.get_stats())
+
+Environment:
+    NFP_CACHE_PATH  - SQLite file (default: <tmp>/sds_nfp_cache.sqlite3)
+
+Author: Claude
+Date: 2026-02-02
+"""
+
+import os
+import hashlib
+import logging
+import sqlite3
+import tempfile
+import threading
+import time
+from collections import OrderedDict
+from pathlib import Path
+from typing import Callable, Dict, Any, Optional, Tuple
+
+import numpy as np
+
+try:
+    import shapely
+    from shapely.affinity import translate
+    from shapely.geometry import Polygon as ShapelyPolygon
+    from shapely.geometry.polygon import orient
+
+    SHAPELY_AVAILABLE = True
+except ImportError:
+    SHAPELY_AVAILABLE = False
+
+logger = logging.getLogger(__name__)
+
+# Quantization for the geometry hash (matches the pyclipper SCALE)
+HASH_SCALE = 1000
+# Bump when the NFP algorithm changes so stale entries are never reused
+CACHE_VERSION = 1
+DEFAULT_MEMORY_ENTRIES = 4096
+DEFAULT_CACHE_FILENAME = "sds_nfp_cache.sqlite3"
+
+
+def canonical_polygon(poly: "ShapelyPolygon") -> Tuple[bytes, Tuple[float, float]]:
+    """
+    Canonical byte form of a polygon exterior and its bounding-box origin.
+
+    Returns:
+        (canonical bytes, (minx, miny))
+    """
+    poly = orient(poly, 1.0)
+    coords = np.asarray(poly.exterior.coords, dtype=np.float64)[:-1]
+    origin = coords.min(axis=0)
+
+    quantized = np.round((coords - origin) * HASH_SCALE).astype(np.int64)
+    start = np.lexsort((quantized[:, 1], quantized[:, 0]))[0]
+    quantized = np.roll(quantized, -start, axis=0)
+
+    return quantized.tobytes(), (float(origin[0]), float(origin[1]))
+
+
+def nfp_key(
+    fixed: "ShapelyPolygon", orbiting: "ShapelyPolygon", gap: float
+) -> Tuple[str, Tuple[float, float]]:
+    """
+    Geometry hash for an NFP and the offset of the real pair from canonical.
+
+    NFP(A + a, B + b) = NFP(A, B) + (a - b), so the offset is
+    fixed origin minus orbiting origin.
+    """
+    fixed_bytes, fixed_origin = canonical_polygon(fixed)
+    orbit_bytes, orbit_origin = canonical_polygon(orbiting)
+
+    digest = hashlib.sha1()
+    digest.update(f"v{CACHE_VERSION}:gap={round(gap * HASH_SCALE)}:".encode())
+    digest.update(len(fixed_bytes).to_bytes(8, "little"))
+    digest.update(fixed_bytes)
+    digest.update(orbit_bytes)
+
+    offset = (fixed_origin[0] - orbit_origin[0], fixed_origin[1] - orbit_origin[1])
+    return digest.hexdigest(), offset
+
+
+class NFPCache:
+    """
+    Two-tier NFP cache: per-process LRU in front of a shared SQLite file.
+
+    The disk tier is optional - if the database cannot be opened or written
+    the cache keeps working in memory only.
+    """
+
+    def __init__(
+        self,
+        path: Optional[Path] = None,
+        max_memory_entries: int = DEFAULT_MEMORY_ENTRIES,
+        persistent: bool = True,
+    ):
+        """
+        Initialize NFP cache.
+
+        Args:
+            path: SQLite file (defaults to env var or the temp directory)
+            max_memory_entries: Size of the in-memory LRU tier
+            persistent: Use the on-disk tier
+        """
+        if path is None:
+            path = os.getenv("NFP_CACHE_PATH") or (
+                Path(tempfile.gettempdir()) / DEFAULT_CACHE_FILENAME
+            )
+        self.path = Path(path)
+        self.max_memory_entries = max_memory_entries
+        self.persistent = persistent
+
+        self._memory: "OrderedDict[str, ShapelyPolygon]" = OrderedDict()
+        self._lock = threading.Lock()
+        self._conn: Optional[sqlite3.Connection] = None
+        self._conn_pid: Optional[int] = None
+        self._stats = {"memory_hits": 0, "disk_hits": 0, "misses": 0, "disk_errors": 0}
+
+    def __getstate__(self):
+        # Connections and locks stay behind; worker processes reopen the file
+        state = self.__dict__.copy()
+        state["_conn"] = None
+        state["_conn_pid"] = None
+        del state["_lock"]
+        return state
+
+    def __setstate__(self, state):
+        self.__dict__.update(state)
+        self._lock = threading.Lock()
+
+    # ------------------------------------------------------------------
+    # Disk tier
+    # ------------------------------------------------------------------
+
+    def _connection(self) -> Optional[sqlite3.Connection]:
+        """SQLite connection for this process (reopened after fork)."""
+        if not self.persistent:
+            return None
+        if self._conn is not None and self._conn_pid == os.getpid():
+            return self._conn
+
+        try:
+            self.path.parent.mkdir(parents=True, exist_ok=True)
+            conn = sqlite3.connect(
+                str(self.path),
+                timeout=10,
+                isolation_level=None,
+                check_same_thread=False,
+            )
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute("PRAGMA synchronous=NORMAL")
+            conn.execute(
+                "CREATE TABLE IF NOT EXISTS nfp ("
+                "key TEXT PRIMARY KEY, wkb BLOB NOT NULL, created_at REAL NOT NULL)"
+            )
+        except sqlite3.Error as e:
+            logger.warning(f"NFP cache disk tier unavailable ({e}), memory only")
+            self.persistent = False
+            return None
+
+        self._conn = conn
+        self._conn_pid = os.getpid()
+        return conn
+
+    def _disk_get(self, key: str) -> Optional["ShapelyPolygon"]:
+        conn = self._connection()
+        if conn is None:
+            return None
+        try:
+            row = conn.execute("SELECT wkb FROM nfp WHERE key = ?", (key,)).fetchone()
+        except sqlite3.Error as e:
+            self._stats["disk_errors"] += 1
+            logger.debug(f"NFP cache read failed: {e}")
+            return None
+        return shapely.from_wkb(row[0]) if row else None
+
+    def _disk_put(self, key: str, nfp: "ShapelyPolygon"):
+        conn = self._connection()
+        if conn is None:
+            return
+        try:
+            conn.execute(
+                "INSERT OR IGNORE INTO nfp (key, wkb, created_at) VALUES (?, ?, ?)",
+                (key, shapely.to_wkb(nfp), time.time()),
+            )
+        except sqlite3.Error as e:
+            self._stats["disk_errors"] += 1
+            logger.debug(f"NFP cache write failed: {e}")
+
+    # ------------------------------------------------------------------
+    # Memory tier
+    # ------------------------------------------------------------------
+
+    def _memory_put(self, key: str, nfp: "ShapelyPolygon"):
+        self._memory[key] = nfp
+        self._memory.move_to_end(key)
+        while len(self._memory) > self.max_memory_entries:
+            self._memory.popitem(last=False)
+
+    # ------------------------------------------------------------------
+    # Public API
+    # ------------------------------------------------------------------
+
+    def get_or_compute(
+        self,
+        fixed: "ShapelyPolygon",
+        orbiting: "ShapelyPolygon",
+        gap: float,
+        compute: Callable[
+            ["ShapelyPolygon", "ShapelyPolygon", float], "ShapelyPolygon"
+        ],
+    ) -> "ShapelyPolygon":
+        """
+        Return the NFP of orbiting around fixed, computing it on a miss.
+
+        Args:
+            fixed: Fixed piece polygon
+            orbiting: Orbiting piece polygon
+            gap: Gap between pieces (part of the key)
+            compute: NFP function called as compute(fixed, orbiting, gap)
+        """
+        key, (dx, dy) = nfp_key(fixed, orbiting, gap)
+
+        with self._lock:
+            canonical = self._memory.get(key)
+            if canonical is not None:
+                self._memory.move_to_end(key)
+                self._stats["memory_hits"] += 1
+            else:
+                canonical = self._disk_get(key)
+                if canonical is not None:
+                    self._stats["disk_hits"] += 1
+                    self._memory_put(key, canonical)
+
+        if canonical is not None:
+            return translate(canonical, dx, dy) if (dx or dy) else canonical
+
+        nfp = compute(fixed, orbiting, gap)
+        canonical = translate(nfp, -dx, -dy) if (dx or dy) else nfp
+
+        with self._lock:
+            self._stats["misses"] += 1
+            self._memory_put(key, canonical)
+            self._disk_put(key, canonical)
+
+        return nfp
+
+    def clear_memory(self):
+        """Drop the in-memory tier (the disk tier is kept)."""
+        with self._lock:
+            self._memory.clear()
+
+    def clear(self):
+        """Drop both tiers."""
+        self.clear_memory()
+        conn = self._connection()
+        if conn is not None:
+            try:
+                conn.execute("DELETE FROM nfp")
+            except sqlite3.Error as e:
+                logger.debug(f"NFP cache clear failed: {e}")
+
+    def get_stats(self) -> Dict[str, Any]:
+        """Get cache statistics."""
+        hits = self._stats["memory_hits"] + self._stats["disk_hits"]
+        total = hits + self._stats["misses"]
+
+        stats = {
+            "persistent": self.persistent,
+            "path": str(self.path) if self.persistent else None,
+            "memory_entries": len(self._memory),
+            "memory_hits": self._stats["memory_hits"],
+            "disk_hits": self._stats["disk_hits"],
+            "hits": hits,
+            "misses": self._stats["misses"],
+            "disk_errors": self._stats["disk_errors"],
+            "hit_rate_percent": round(hits / total * 100, 1) if total > 0 else 0,
+        }
+
+        conn = self._connection()
+        if conn is not None:
+            try:
+                stats["disk_entries"] = conn.execute(
+                    "SELECT COUNT(*) FROM nfp"
+                ).fetchone()[0]
+            except sqlite3.Error:
+                pass
+
+        return stats
+
+    def reset_stats(self):
+        """Zero the hit/miss counters."""
+        for name in self._stats:
+            self._stats[name] = 0
+
+    def close(self):
+        """Close the SQLite connection."""
+        if self._conn is not None and self._conn_pid == os.getpid():
+            self._conn.close()
+        self._conn = None
+        self._conn_pid = None
+
+
+# Singleton instance for convenience
+_nfp_cache: Optional[NFPCache] = None
+
+
+def get_nfp_cache() -> NFPCache:
+    """Get or create the process-wide NFP cache."""
+    global _nfp_cache
+    if _nfp_cache is None:
+        _nfp_cache = NFPCache()
+    return _nfp_cache
@@ -0,0 +1,634 @@
+#!/usr/bin/env python3
+"""
+Integer Geometry Kernel for NFP Nesting
+
+nfp_nesting used to do its geometry on Point objects in Python loops:
+convex-hull Minkowski sums (so concave pieces could never interlock),
+vertex-only point-in-polygon collision checks, and per-candidate loops
+inside the GA. This kernel replaces that with batched NumPy operations on
+fixed-point integer coordinates (SCALE units per cm, the same 1/1000 cm
+grid ultimate_nesting uses for pyclipper), so every containment, crossing
+and separating-axis test is exact.
+
+Non-convex no-fit polygons
+    A piece is split once into convex parts (ear-clipping triangulation,
+    then Hertel-Mehlhorn merging of removable diagonals). The NFP of two
+    pieces is the union of the NFPs of their part pairs, and the NFP of two
+    convex parts is their Minkowski sum (edge merge by angle). PairNFP keeps
+    that union without ever building its outline: its candidate vertices
+    are the part-pair sums' vertices, and contains() decides "reference
+    point strictly inside the NFP" for a whole batch of points with one
+    separating-axis test per part pair. The gap is added by growing the
+    fixed piece's parts outward (mitred, squared off at sharp corners).
+
+Batched primitives
+    points_in_polygon     crossing-number test, many points x all edges
+    points_on_boundary    exact point-on-edge test
+    segments_intersect    proper crossings, all edges of A x all edges of B
+    polygons_overlap      interior overlap (touching is not overlap)
+    slide_distance        how far a piece can slide along a direction before
+                          touching others (vertex rays x edges, both ways),
+                          used to drop and push placements into contact
+
+Usage:
+    shape = PieceShape.build(coords_cm, rotation=90)
+    nfp = PairNFP.build(fixed_shape, shape, gap_units)
+    inside = nfp.contains(candidates - fixed_offset)
+
+Author: Claude
+Date: 2026-02-02
+"""
+
+import math
+from dataclasses import dataclass, field
+from typing import List, Optional, Sequence, Tuple
+
+import numpy as np
+
+# Fixed-point units per cm (matches ultimate_nesting.SCALE)
+SCALE = 1000
+# Convex corners sharper than this mitre ratio are squared off when grown
+MITRE_LIMIT = 2.0
+# Points x edges evaluated per batch in the crossing-number test
+BATCH_CELLS = 1 << 20
+# Largest part-pair NFPs used to screen out buried NFP vertices
+PRUNE_PAIRS = 32
+
+
+def to_fixed(coords: Sequence) -> np.ndarray:
+    """cm coordinates as an N x 2 int64 array of kernel units."""
+    return np.round(np.asarray(coords, dtype=np.float64).reshape(-1, 2) * SCALE).astype(
+        np.int64
+    )
+
+
+def from_fixed(coords: np.ndarray) -> np.ndarray:
+    """Kernel units back to cm."""
+    return np.asarray(coords, dtype=np.float64) / SCALE
+
+
+def _cross(o: np.ndarray, a: np.ndarray, b: np.ndarray) -> np.ndarray:
+    """(a - o) x (b - o), broadcast over leading dimensions."""
+    return (a[..., 0] - o[..., 0]) * (b[..., 1] - o[..., 1]) - (
+        a[..., 1] - o[..., 1]
+    ) * (b[..., 0] - o[..., 0])
+
+
+def signed_area2(ring: np.ndarray) -> int:
+    """Twice the signed area (positive = counter-clockwise)."""
+    x, y = ring[:, 0], ring[:, 1]
+    return int(np.sum(x * np.roll(y, -1) - np.roll(x, -1) * y))
+
+
+def clean_ring(ring: np.ndarray) -> np.ndarray:
+    """
+    Indices of a ring's vertices without repeats or straight-through points,
+    in counter-clockwise order.
+    """
+    index = np.arange(len(ring))
+    while len(index) >= 3:
+        points = ring[index]
+        nxt = np.roll(points, -1, axis=0)
+        # Repeats first: a corner next to its own repeat looks straight
+        distinct = np.any(points != nxt, axis=1)
+        if not distinct.all():
+            index = index[distinct]
+            continue
+        keep = _cross(np.roll(points, 1, axis=0), points, nxt) != 0
+        if keep.all():
+            break
+        index = index[keep]
+    if len(index) >= 3 and signed_area2(ring[index]) < 0:
+        index = index[::-1]
+    return index
+
+
+def convex_hull(points: np.ndarray) -> np.ndarray:
+    """Indices of the convex hull (monotone chain), counter-clockwise."""
+    order = np.lexsort((points[:, 1], points[:, 0]))
+    if len(order) < 3:
+        return order
+
+    def chain(indices):
+        hull: List[int] = []
+        for i in indices:
+            while (
+                len(hull) >= 2
+                and _cross(points[hull[-2]], points[hull[-1]], points[i]) <= 0
+            ):
+                hull.pop()
+            hull.append(int(i))
+        return hull
+
+    lower, upper = chain(order), chain(order[::-1])
+    return np.array(lower[:-1] + upper[:-1], dtype=np.int64)
+
+
+# ----------------------------------------------------------------------
+# Batched predicates
+# ----------------------------------------------------------------------
+
+
+def points_in_polygon(points: np.ndarray, ring: np.ndarray) -> np.ndarray:
+    """
+    Crossing-number point-in-polygon test for many points at once.
+
+    Exact on integer input. Points on the boundary may land either side;
+    combine with points_on_boundary() where that matters.
+    """
+    points = np.asarray(points).reshape(-1, 2)
+    start, end = ring, np.roll(ring, -1, axis=0)
+    inside = np.zeros(len(points), dtype=bool)
+    step = max(1, BATCH_CELLS // max(1, len(ring)))
+    for lo in range(0, len(points), step):
+        px = points[lo : lo + step, 0:1]
+        py = points[lo : lo + step, 1:2]
+        straddle = (start[:, 1] > py) != (end[:, 1] > py)
+        # Crossing is right of the point: compare without dividing
+        lhs = (px - start[:, 0]) * (end[:, 1] - start[:, 1])
+        rhs = (py - start[:, 1]) * (end[:, 0] - start[:, 0])
+        right = np.where(end[:, 1] > start[:, 1], lhs < rhs, lhs > rhs)
+        inside[lo : lo + step] = np.count_nonzero(straddle & right, axis=1) % 2 == 1
+    return inside
+
+
+def points_on_boundary(points: np.ndarray, ring: np.ndarray) -> np.ndarray:
+    """Exact test for points lying on any edge of the ring."""
+    points = np.asarray(points).reshape(-1, 1, 2)
+    start, end = ring[None], np.roll(ring, -1, axis=0)[None]
+    collinear = _cross(start, end, points) == 0
+    within = (
+        (points[..., 0] >= np.minimum(start[..., 0], end[..., 0]))
+        & (points[..., 0] <= np.maximum(start[..., 0], end[..., 0]))
+        & (points[..., 1] >= np.minimum(start[..., 1], end[..., 1]))
+        & (points[..., 1] <= np.maximum(start[..., 1], end[..., 1]))
+    )
+    return np.any(collinear & within, axis=1)
+
+
+def segments_intersect(
+    a_start: np.ndarray, a_end: np.ndarray, b_start: np.ndarray, b_end: np.ndarray
+) -> np.ndarray:
+    """
+    Proper crossings between every segment of A and every segment of B.
+
+    Returns an (len(A), len(B)) bool matrix; segments that only touch or
+    overlap collinearly do not count.
+    """
+    a0, a1 = a_start[:, None], a_end[:, None]
+    b0, b1 = b_start[None], b_end[None]
+    o1 = np.sign(_cross(b0, b1, a0))
+    o2 = np.sign(_cross(b0, b1, a1))
+    o3 = np.sign(_cross(a0, a1, b0))
+    o4 = np.sign(_cross(a0, a1, b1))
+    return (o1 * o2 < 0) & (o3 * o4 < 0)
+
+
+def is_simple(ring: np.ndarray) -> bool:
+    """No two non-adjacent edges cross."""
+    start, end = ring, np.roll(ring, -1, axis=0)
+    crossings = segments_intersect(start, end, start, end)
+    return not crossings.any()
+
+
+def _strictly_inside(points: np.ndarray, ring: np.ndarray) -> np.ndarray:
+    return points_in_polygon(points, ring) & ~points_on_boundary(points, ring)
+
+
+def polygons_overlap(a: np.ndarray, b: np.ndarray) -> bool:
+    """
+    Whether the interiors of two simple integer polygons overlap.
+
+    Touching along edges or at vertices is not overlap.
+    """
+    a_min, a_max = a.min(axis=0), a.max(axis=0)
+    b_min, b_max = b.min(axis=0), b.max(axis=0)
+    if np.any(a_max <= b_min) or np.any(b_max <= a_min):
+        return False
+    if segments_intersect(a, np.roll(a, -1, axis=0), b, np.roll(b, -1, axis=0)).any():
+        return True
+    # Vertices and edge midpoints, in doubled coordinates to stay integer
+    a2, b2 = a * 2, b * 2
+    a_probe = np.vstack([a2, a + np.roll(a, -1, axis=0)])
+    b_probe = np.vstack([b2, b + np.roll(b, -1, axis=0)])
+    return bool(
+        _strictly_inside(a_probe, b2).any() or _strictly_inside(b_probe, a2).any()
+    )
+
+
+def slide_distance(
+    moving: np.ndarray,
+    obstacles: Sequence[np.ndarray],
+    direction: Tuple[float, float],
+) -> float:
+    """
+    How far moving can translate along direction before it touches any
+    obstacle ring (kernel units, inf if nothing is in the way).
+
+    Rays from moving's vertices are cast against obstacle edges, and rays
+    from obstacle vertices (backwards) against moving's edges; the nearest
+    forward hit wins. Contacts already touching (distance 0) do not block.
+    """
+    d = np.asarray(direction, dtype=np.float64)
+    d = d / np.hypot(*d)
+    best = math.inf
+    moving_f = moving.astype(np.float64)
+    m_start, m_end = moving_f, np.roll(moving_f, -1, axis=0)
+    for ring in obstacles:
+        ring_f = ring.astype(np.float64)
+        r_start, r_end = ring_f, np.roll(ring_f, -1, axis=0)
+        best = min(
+            best,
+            _ray_hits(moving_f, r_start, r_end, d),
+            _ray_hits(ring_f, m_start, m_end, -d),
+        )
+    return best
+
+
+def _ray_hits(
+    origins: np.ndarray, start: np.ndarray, end: np.ndarray, d: np.ndarray
+) -> float:
+    """Nearest positive distance from any origin along d to any segment."""
+    edge = end - start  # (E, 2)
+    denom = d[0] * edge[:, 1] - d[1] * edge[:, 0]  # d x edge
+    offset = start[None] - origins[:, None]  # (V, E, 2)
+    with np.errstate(divide="ignore", invalid="ignore"):
+        t = (offset[..., 0] * edge[:, 1] - offset[..., 1] * edge[:, 0]) / denom
+        u = (offset[..., 0] * d[1] - offset[..., 1] * d[0]) / denom
+    hit = (denom != 0) & (u >= 0) & (u <= 1) & (t > 0.5)
+    return float(t[hit].min()) if hit.any() else math.inf
+
+
+# ----------------------------------------------------------------------
+# Convex decomposition
+# ----------------------------------------------------------------------
+
+
+def triangulate(ring: np.ndarray) -> Optional[List[Tuple[int, int, int]]]:
+    """
+    Ear-clipping triangulation of a simple counter-clockwise ring.
+
+    Returns vertex-index triangles, or None if no ear can be found (the
+    ring is not simple).
+    """
+    remaining = list(range(len(ring)))
+    triangles = []
+    k = 0
+    stalls = 0
+    while len(remaining) > 3:
+        m = len(remaining)
+        i0, i1, i2 = remaining[(k - 1) % m], remaining[k % m], remaining[(k + 1) % m]
+        p0, p1, p2 = ring[i0], ring[i1], ring[i2]
+        turn = _cross(p0, p1, p2)
+        ear = False
+        if turn > 0:
+            others = ring[[i for i in remaining if i not in (i0, i1, i2)]]
+            inside = (
+                (_cross(p0, p1, others) >= 0)
+                & (_cross(p1, p2, others) >= 0)
+                & (_cross(p2, p0, others) >= 0)
+            )
+            ear = not inside.any()
+        elif turn == 0 and stalls >= m:
+            # Spike or straight run left after clipping: drop the vertex
+            remaining.pop(k % m)
+            stalls = 0
+            continue
+        if ear:
+            triangles.append((i0, i1, i2))
+            remaining.pop(k % m)
+            stalls = 0
+        else:
+            k += 1
+            stalls += 1
+            if stalls > 2 * m:
+                return None
+    if len(remaining) == 3 and _cross(*ring[remaining]) > 0:
+        triangles.append(tuple(remaining))
+    return triangles
+
+
+def _is_convex(ring: np.ndarray) -> bool:
+    return bool(
+        np.all(_cross(np.roll(ring, 1, axis=0), ring, np.roll(ring, -1, axis=0)) >= 0)
+    )
+
+
+def convex_decomposition(ring: np.ndarray) -> List[np.ndarray]:
+    """
+    Convex parts of a simple counter-clockwise ring, as index arrays.
+
+    Triangulates, then merges neighbouring parts across each diagonal
+    whenever the merged part stays convex (Hertel-Mehlhorn). Rings that
+    cannot be triangulated fall back to their convex hull, which covers
+    the piece.
+    """
+    if _is_convex(ring):
+        return [np.arange(len(ring))]
+    triangles = triangulate(ring) if is_simple(ring) else None
+    if not triangles:
+        return [convex_hull(ring)]
+
+    parts = {n: list(t) for n, t in enumerate(triangles)}
+    owner = {}
+    for n, part in parts.items():
+        for a, b in zip(part, part[1:] + part[:1]):
+            owner[(a, b)] = n
+
+    # One pass over the diagonals; owner always reflects the merged parts
+    for a, b in list(owner):
+        n, other = owner.get((a, b)), owner.get((b, a))
+        if n is None or other is None or n == other:
+            continue
+        # parts[n] runs a -> b; rotate it to b .. a, and parts[other] to a .. b
+        p, q = parts[n], parts[other]
+        i, j = p.index(b), q.index(a)
+        p = p[i:] + p[:i]
+        q = q[j:] + q[:j]
+        candidate = p + q[1:-1]
+        if not _is_convex(ring[candidate]):
+            continue
+        parts[n] = candidate
+        del parts[other]
+        del owner[(a, b)], owner[(b, a)]
+        for u, v in zip(q, q[1:]):
+            owner[(u, v)] = n
+    return [np.asarray(part, dtype=np.int64) for part in parts.values()]
+
+
+def grow_convex(part: np.ndarray, distance: float) -> np.ndarray:
+    """
+    A convex ring grown outward by distance (kernel units).
+
+    Edges move out along their normals and meet at mitred corners; corners
+    sharper than MITRE_LIMIT are squared off instead, so the result always
+    covers every point within distance of the part.
+    """
+    if distance <= 0 or len(part) < 3:
+        return part
+    points = part.astype(np.float64)
+    edges = np.roll(points, -1, axis=0) - points
+    lengths = np.hypot(edges[:, 0], edges[:, 1])
+    keep = lengths > 0
+    points, edges, lengths = points[keep], edges[keep], lengths[keep]
+    tangents = edges / lengths[:, None]
+    normals = np.column_stack([tangents[:, 1], -tangents[:, 0]])  # outward (CCW)
+
+    grown = []
+    for i in range(len(points)):
+        n_in, n_out = normals[i - 1], normals[i]
+        denom = 1.0 + float(n_in @ n_out)
+        if denom > 2.0 / (MITRE_LIMIT * MITRE_LIMIT):
+            grown.append(points[i] + distance * (n_in + n_out) / denom)
+        else:
+            grown.append(points[i] + distance * (n_in + tangents[i - 1]))
+            grown.append(points[i] + distance * (n_out - tangents[i]))
+    grown = np.asarray(grown)
+    # Round away from the part so rounding never eats into the gap
+    centre = points.mean(axis=0)
+    outward = np.sign(grown - centre)
+    return (np.round(grown + 0.5 * outward)).astype(np.int64)
+
+
+# ----------------------------------------------------------------------
+# Pieces and no-fit polygons
+# ----------------------------------------------------------------------
+
+
+@dataclass
+class PieceShape:
+    """A piece at one rotation, normalized, with its convex parts."""
+
+    outline: np.ndarray  # N x 2 int64, counter-clockwise
+    parts: List[np.ndarray]  # Convex parts, each M x 2 int64 counter-clockwise
+    width: int
+    height: int
+    _arrays: dict = field(default_factory=dict, repr=False)
+
+    @classmethod
+    def build(
+        cls,
+        coords: Sequence,
+        rotation: float = 0,
+        decomposition: Optional[Tuple[np.ndarray, List[np.ndarray]]] = None,
+    ) -> "PieceShape":
+        """
+        Piece rotated about its vertex centroid (as nfp_nesting.Polygon
+        does), moved to the origin and converted to kernel units.
+
+        Args:
+            coords: N x 2 outline in cm
+            rotation: Degrees counter-clockwise
+            decomposition: (outline indices, part indices) from decompose(),
+                           reused across rotations of the same piece
+        """
+        coords = np.asarray(coords, dtype=np.float64).reshape(-1, 2)
+        if decomposition is None:
+            decomposition = decompose(coords)
+        index, part_indices = decomposition
+
+        if rotation:
+            rad = math.radians(rotation)
+            cos_a, sin_a = math.cos(rad), math.sin(rad)
+            centre = coords.mean(axis=0)
+            rel = coords - centre
+            coords = np.column_stack(
+                [
+                    rel[:, 0] * cos_a - rel[:, 1] * sin_a,
+                    rel[:, 0] * sin_a + rel[:, 1] * cos_a,
+                ]
+            )
+        fixed = to_fixed(coords - coords.min(axis=0))
+        width, height = fixed.max(axis=0) - fixed.min(axis=0)
+        return cls(
+            outline=fixed[index],
+            parts=[fixed[p] for p in part_indices],
+            width=int(width),
+            height=int(height),
+        )
+
+    def part_arrays(self, gap: int = 0, negate: bool = False) -> "PartArrays":
+        """Convex parts grown by gap (and/or point-reflected), cached."""
+        key = (gap, negate)
+        if key not in self._arrays:
+            parts = [grow_convex(p, gap) for p in self.parts]
+            self._arrays[key] = PartArrays.build(
+                [-p for p in parts] if negate else parts
+            )
+        return self._arrays[key]
+
+
+def decompose(coords: np.ndarray) -> Tuple[np.ndarray, List[np.ndarray]]:
+    """
+    Outline vertex indices and convex part indices of a piece (in cm).
+
+    Rotation preserves convexity, so one decomposition serves every angle.
+    """
+    fixed = to_fixed(coords)
+    index = clean_ring(fixed)
+    if len(index) < 3:
+        return np.arange(len(fixed)), [np.arange(len(fixed))]
+    parts = convex_decomposition(fixed[index])
+    return index, [index[p] for p in parts if len(p) >= 3]
+
+
+def _from_bottom(ring: np.ndarray) -> np.ndarray:
+    start = np.lexsort((ring[:, 0], ring[:, 1]))[0]
+    return np.roll(ring, -start, axis=0)
+
+
+def minkowski_convex(p: np.ndarray, q: np.ndarray) -> np.ndarray:
+    """Vertices of the Minkowski sum of two convex counter-clockwise rings."""
+    arrays = PartArrays.build([p, q])
+    return _minkowski_pairs(arrays, arrays, np.array([0]), np.array([1]))[0]
+
+
+@dataclass
+class PartArrays:
+    """
+    Convex parts padded to one length, for pairwise batch operations.
+
+    Rings start at their bottom-left vertex, so edge angles increase along
+    each ring. Padding repeats the last vertex, with zero-length edges
+    sorted last and normals copied from the first edge, none of which
+    changes sums, projections or separating-axis results.
+    """
+
+    vertices: np.ndarray  # P x L x 2
+    edges: np.ndarray  # P x L x 2
+    angles: np.ndarray  # P x L
+    normals: np.ndarray  # P x L x 2
+
+    @classmethod
+    def build(cls, parts: Sequence[np.ndarray]) -> "PartArrays":
+        length = max(len(p) for p in parts)
+        vertices = np.empty((len(parts), length, 2), dtype=np.int64)
+        edges = np.zeros((len(parts), length, 2), dtype=np.int64)
+        for i, part in enumerate(parts):
+            ring = _from_bottom(part)
+            vertices[i, : len(ring)] = ring
+            vertices[i, len(ring) :] = ring[-1]
+            edges[i, : len(ring)] = np.roll(ring, -1, axis=0) - ring
+        angles = np.mod(np.arctan2(edges[..., 1], edges[..., 0]), 2 * np.pi)
+        zero = ~np.any(edges != 0, axis=2)
+        angles[zero] = np.inf
+        normals = np.stack([edges[..., 1], -edges[..., 0]], axis=2)
+        first = normals[np.arange(len(parts)), np.argmax(~zero, axis=1)]
+        normals = np.where(zero[..., None], first[:, None], normals)
+        return cls(vertices, edges, angles, normals)
+
+
+def _minkowski_pairs(
+    a: PartArrays, b: PartArrays, ai: np.ndarray, bi: np.ndarray
+) -> np.ndarray:
+    """Vertices of the Minkowski sums of parts a[ai] and b[bi] (K x L x 2)."""
+    edges = np.concatenate([a.edges[ai], b.edges[bi]], axis=1)
+    angles = np.concatenate([a.angles[ai], b.angles[bi]], axis=1)
+    order = np.argsort(angles, axis=1, kind="stable")
+    edges = np.take_along_axis(edges, order[..., None], axis=1)
+    start = a.vertices[ai, 0] + b.vertices[bi, 0]
+    steps = np.cumsum(edges, axis=1)
+    steps = np.concatenate([np.zeros_like(steps[:, :1]), steps[:, :-1]], axis=1)
+    return start[:, None] + steps
+
+
+@dataclass
+class PairNFP:
+    """
+    No-fit polygon of an orbiting piece around a fixed piece.
+
+    The union of convex part-pair NFPs, in the fixed piece's frame; a point
+    is the orbiting piece's offset (its normalized origin).
+    """
+
+    vertices: np.ndarray  # Contact offsets on the NFP boundary, V x 2 int64
+    pair_min: np.ndarray  # K x 2 bounding boxes of the part-pair NFPs
+    pair_max: np.ndarray
+    axes: np.ndarray  # K x A x 2 separating-axis normals
+    fixed_min: np.ndarray  # K x A projections of each fixed part
+    fixed_max: np.ndarray
+    moving_min: np.ndarray  # K x A projections of each orbiting part
+    moving_max: np.ndarray
+    bounds: Tuple[int, int, int, int]
+
+    @classmethod
+    def build(cls, fixed: PieceShape, moving: PieceShape, gap: int = 0) -> "PairNFP":
+        """NFP of moving around fixed, keeping gap units between them."""
+        f = fixed.part_arrays(gap)
+        m = moving.part_arrays(0, negate=True)
+        fi = np.repeat(np.arange(len(f.vertices)), len(m.vertices))
+        mi = np.tile(np.arange(len(m.vertices)), len(f.vertices))
+
+        sums = _minkowski_pairs(f, m, fi, mi)
+        axes = np.concatenate([f.normals[fi], m.normals[mi]], axis=1)
+        fixed_proj = np.einsum("kad,kpd->kap", axes, f.vertices[fi])
+        # m holds the reflected parts: projections of the real ones flip sign
+        moving_proj = -np.einsum("kad,kpd->kap", axes, m.vertices[mi])
+
+        vertices = np.unique(sums.reshape(-1, 2), axis=0)
+        nfp = cls(
+            vertices=vertices,
+            pair_min=sums.min(axis=1),
+            pair_max=sums.max(axis=1),
+            axes=axes,
+            fixed_min=fixed_proj.min(axis=2),
+            fixed_max=fixed_proj.max(axis=2),
+            moving_min=moving_proj.min(axis=2),
+            moving_max=moving_proj.max(axis=2),
+            bounds=(
+                int(vertices[:, 0].min()),
+                int(vertices[:, 1].min()),
+                int(vertices[:, 0].max()),
+                int(vertices[:, 1].max()),
+            ),
+        )
+        # Part-pair vertices buried inside the union are never contacts.
+        # The largest part pairs bury most of them, so screen with those first
+        extent = np.prod(nfp.pair_max - nfp.pair_min, axis=1)
+        largest = np.argsort(-extent, kind="stable")[:PRUNE_PAIRS]
+        vertices = vertices[~nfp.contains(vertices, largest)]
+        nfp.vertices = vertices[~nfp.contains(vertices)]
+        return nfp
+
+    def contains(
+        self, offsets: np.ndarray, pairs: Optional[np.ndarray] = None
+    ) -> np.ndarray:
+        """
+        Offsets (C x 2, fixed frame) strictly inside the NFP - i.e. where
+        the orbiting piece would overlap the fixed one. Touching is allowed.
+
+        pairs restricts the test to some part pairs (indices into axes).
+        """
+        offsets = np.asarray(offsets).reshape(-1, 2)
+        inside = np.zeros(len(offsets), dtype=bool)
+        if pairs is None:
+            pairs = np.arange(len(self.axes))
+        x0, y0, x1, y1 = self.bounds
+        near = np.flatnonzero(
+            (offsets[:, 0] > x0)
+            & (offsets[:, 0] < x1)
+            & (offsets[:, 1] > y0)
+            & (offsets[:, 1] < y1)
+        )
+        pair_min, pair_max = self.pair_min[pairs], self.pair_max[pairs]
+        step = max(1, BATCH_CELLS // (16 * len(pairs)))
+        for lo in range(0, len(near), step):
+            index = near[lo : lo + step]
+            points = offsets[index]
+            # Only part pairs whose NFP box strictly holds the point can hit
+            boxed = np.all(
+                (points[:, None] > pair_min[None]) & (points[:, None] < pair_max[None]),
+                axis=2,
+            )
+            ci, ki = np.nonzero(boxed)
+            if not len(ci):
+                continue
+            ki = pairs[ki]
+            shift = np.einsum("mad,md->ma", self.axes[ki], points[ci])
+            overlap = np.all(
+                (self.moving_min[ki] + shift < self.fixed_max[ki])
+                & (self.moving_max[ki] + shift > self.fixed_min[ki]),
+                axis=1,
+            )
+            inside[index[ci[overlap]]] = True
+        return inside
@@ -0,0 +1,868 @@
+#!/usr/bin/env python3
+"""
+NFP-Based True Shape Nesting - Target 98%+ Utilization
+
+This module implements professional-grade nesting using:
+1. No-Fit Polygon (NFP) for precise collision detection
+2. Inner-Fit Polygon (IFP) for bin boundaries
+3. Bottom-Left-Fill with true shape placement
+4. Multiple rotation angles (0, 90, 180, 270 + fine angles)
+5. Genetic algorithm for global optimization
+
+NFP Concept:
+- NFP of pieces A and B is a polygon that represents all positions
+  where A can be placed without overlapping B
+- By placing A's reference point outside NFP(A,B), we guarantee no collision
+- This allows pieces to interlock and nest tightly
+
+Geometry (NFPs, containment, overlap and sliding tests) runs on the integer
+NumPy kernel in nfp_kernel; NFPs of concave pieces are exact, built from
+their convex decompositions.
+
+Author: Claude
+Date: 2026-01-30
+"""
+
+import math
+import time
+import random
+from typing import Any, List, Tuple, Optional, Dict, Sequence, Set
+from dataclasses import dataclass, field
+from copy import deepcopy
+from collections import defaultdict
+
+import numpy as np
+
+from genetic_optimizer import (
+    PopulationEvaluator,
+    ProgressCallback,
+    anneal,
+    make_individual,
+    swap_or_rotate_neighbour,
+)
+from nfp_kernel import (
+    SCALE,
+    PairNFP,
+    PieceShape,
+    decompose,
+    from_fixed,
+    points_in_polygon,
+    polygons_overlap,
+    slide_distance,
+    to_fixed,
+)
+from nesting_profiler import count, phase
+
+# Constants
+CUTTER_WIDTH_CM = 157.48  # 62 inches
+GAP_CM = 0.3  # Smaller gap for tighter nesting
+ROTATION_ANGLES = [
+    0,
+    90,
+    180,
+    270,
+]  # Can add more: [0, 45, 90, 135, 180, 225, 270, 315]
+EPSILON = 1e-6
+CANDIDATE_BATCH = 512  # Placement candidates tested per kernel call
+SLIDE_ATTEMPTS = 6  # Halvings of a compaction slide before giving up
+
+
+@dataclass
+class Point:
+    x: float
+    y: float
+
+    def __eq__(self, other):
+        if not isinstance(other, Point):
+            return False
+        return abs(self.x - other.x) < EPSILON and abs(self.y - other.y) < EPSILON
+
+    def __hash__(self):
+        return hash((round(self.x, 6), round(self.y, 6)))
+
+    def __add__(self, other):
+        return Point(self.x + other.x, self.y + other.y)
+
+    def __sub__(self, other):
+        return Point(self.x - other.x, self.y - other.y)
+
+
+@dataclass
+class Polygon:
+    """A polygon represented as a list of vertices."""
+
+    points: List[Point]
+
+    @property
+    def bounds(self) -> Tuple[float, float, float, float]:
+        """Return (min_x, min_y, max_x, max_y)."""
+        xs = [p.x for p in self.points]
+        ys = [p.y for p in self.points]
+        return (min(xs), min(ys), max(xs), max(ys))
+
+    @property
+    def width(self) -> float:
+        b = self.bounds
+        return b[2] - b[0]
+
+    @property
+    def height(self) -> float:
+        b = self.bounds
+        return b[3] - b[1]
+
+    @property
+    def area(self) -> float:
+        """Calculate polygon area using shoelace formula."""
+        n = len(self.points)
+        if n < 3:
+            return 0
+        area = 0
+        for i in range(n):
+            j = (i + 1) % n
+            area += self.points[i].x * self.points[j].y
+            area -= self.points[j].x * self.points[i].y
+        return abs(area) / 2
+
+    @property
+    def centroid(self) -> Point:
+        """Calculate polygon centroid."""
+        n = len(self.points)
+        cx = sum(p.x for p in self.points) / n
+        cy = sum(p.y for p in self.points) / n
+        return Point(cx, cy)
+
+    def translate(self, dx: float, dy: float) -> "Polygon":
+        """Return translated polygon."""
+        return Polygon([Point(p.x + dx, p.y + dy) for p in self.points])
+
+    def rotate(self, angle_deg: float, center: Optional[Point] = None) -> "Polygon":
+        """Return rotated polygon."""
+        if center is None:
+            center = self.centroid
+
+        rad = math.radians(angle_deg)
+        cos_a = math.cos(rad)
+        sin_a = math.sin(rad)
+
+        rotated = []
+        for p in self.points:
+            dx = p.x - center.x
+            dy = p.y - center.y
+            new_x = dx * cos_a - dy * sin_a + center.x
+            new_y = dx * sin_a + dy * cos_a + center.y
+            rotated.append(Point(new_x, new_y))
+
+        return Polygon(rotated)
+
+    def normalize(self) -> "Polygon":
+        """Move polygon so min corner is at origin."""
+        min_x, min_y, _, _ = self.bounds
+        return self.translate(-min_x, -min_y)
+
+    def offset(self, distance: float) -> "Polygon":
+        """Offset polygon outward by distance (simplified - adds to bounding box)."""
+        # For proper offset, would need Clipper library
+        # This is a simplified version that expands the bounding box
+        points = []
+        centroid = self.centroid
+        for p in self.points:
+            dx = p.x - centroid.x
+            dy = p.y - centroid.y
+            length = math.sqrt(dx * dx + dy * dy)
+            if length > 0:
+                scale = (length + distance) / length
+                points.append(Point(centroid.x + dx * scale, centroid.y + dy * scale))
+            else:
+                points.append(p)
+        return Polygon(points)
+
+
+def point_in_polygon(point: Point, polygon: Polygon) -> bool:
+    """Check if point is inside polygon (exact on the kernel's integer grid)."""
+    ring = to_fixed([(p.x, p.y) for p in polygon.points])
+    return bool(points_in_polygon(to_fixed([(point.x, point.y)]), ring)[0])
+
+
+def polygons_intersect(poly_a: Polygon, poly_b: Polygon) -> bool:
+    """Check if the interiors of two polygons overlap (touching is allowed)."""
+    return polygons_overlap(
+        to_fixed([(p.x, p.y) for p in poly_a.points]),
+        to_fixed([(p.x, p.y) for p in poly_b.points]),
+    )
+
+
+@dataclass
+class PlacedPiece:
+    """A piece that has been placed in the nest."""
+
+    piece_id: int
+    polygon: Polygon
+    position: Point
+    rotation: float
+    original_polygon: Polygon
+    offset: Optional[np.ndarray] = None  # Position in kernel units
+
+
+@dataclass
+class NestingResult:
+    """Result of nesting operation."""
+
+    pieces: List[PlacedPiece]
+    fabric_width: float
+    fabric_length: float
+    utilization: float
+    success: bool
+    message: str
+
+
+@dataclass
+class _Placed:
+    """Kernel-side record of a placed piece."""
+
+    key: Tuple[int, float]
+    shape: PieceShape
+    offset: np.ndarray  # (x, y) in kernel units
+
+
+class NFPNester:
+    """
+    NFP-based nesting engine for achieving 98%+ utilization.
+
+    Geometry runs on nfp_kernel: pieces are decomposed into convex parts
+    once, no-fit polygons are exact for concave pieces (so pieces interlock)
+    and are cached per (piece, rotation) pair across calls with the same
+    polygon list, which is what the GA does for every individual.
+    """
+
+    def __init__(
+        self,
+        fabric_width: float = CUTTER_WIDTH_CM,
+        gap: float = GAP_CM,
+        rotations: List[float] = None,
+    ):
+        self.fabric_width = fabric_width
+        self.gap = gap
+        self.rotations = rotations or ROTATION_ANGLES
+        self.width_units = int(math.floor(fabric_width * SCALE))
+        self.gap_units = int(round(gap * SCALE))
+
+        # Caches, valid for one polygon list
+        self._polygons: Optional[List[Polygon]] = None
+        self._decompositions: Dict[int, Tuple] = {}
+        self._shapes: Dict[Tuple[int, float], PieceShape] = {}
+        self.nfp_cache: Dict[Tuple[int, float, int, float], PairNFP] = {}
+
+    def _reset(self, polygons: List[Polygon]):
+        if polygons is not self._polygons:
+            self._polygons = polygons
+            self._decompositions.clear()
+            self._shapes.clear()
+            self.nfp_cache.clear()
+
+    def _shape(self, piece_id: int, rotation: float) -> PieceShape:
+        key = (piece_id, rotation)
+        if key not in self._shapes:
+            coords = np.array([(p.x, p.y) for p in self._polygons[piece_id].points])
+            if piece_id not in self._decompositions:
+                self._decompositions[piece_id] = decompose(coords)
+            self._shapes[key] = PieceShape.build(
+                coords, rotation, self._decompositions[piece_id]
+            )
+        return self._shapes[key]
+
+    def _get_nfp(
+        self, fixed: _Placed, orbit_key: Tuple[int, float], orbiting: PieceShape
+    ) -> PairNFP:
+        """Get NFP from cache or calculate."""
+        key = fixed.key + orbit_key
+        nfp = self.nfp_cache.get(key)
+        if nfp is not None:
+            count("nfp_cache_hits")
+            return nfp
+        count("nfp_computed")
+        with phase("nfp.build"):
+            nfp = PairNFP.build(fixed.shape, orbiting, self.gap_units)
+        self.nfp_cache[key] = nfp
+        return nfp
+
+    def _collides(
+        self,
+        points: np.ndarray,
+        nfps: List[PairNFP],
+        placed: List[_Placed],
+    ) -> np.ndarray:
+        count("intersection_tests", len(points) * len(nfps))
+        hit = np.zeros(len(points), dtype=bool)
+        for nfp, other in zip(nfps, placed):
+            hit |= nfp.contains(points - other.offset)
+        return hit
+
+    def _compact(
+        self,
+        shape: PieceShape,
+        position: np.ndarray,
+        nfps: List[PairNFP],
+        placed: List[_Placed],
+    ) -> np.ndarray:
+        """Slide a placement down, then left, until it touches something."""
+        with phase("nfp.compaction"):
+            return self._slide(shape, position, nfps, placed)
+
+    def _slide(
+        self,
+        shape: PieceShape,
+        position: np.ndarray,
+        nfps: List[PairNFP],
+        placed: List[_Placed],
+    ) -> np.ndarray:
+        obstacles = [other.shape.outline + other.offset for other in placed]
+        for axis in (1, 0):
+            direction = (-1.0, 0.0) if axis == 0 else (0.0, -1.0)
+            free = slide_distance(shape.outline + position, obstacles, direction)
+            step = min(float(position[axis]), free - self.gap_units)
+            # Clearance along the slide is not clearance along the normal:
+            # back off until the NFPs accept the move
+            for _ in range(SLIDE_ATTEMPTS):
+                if step < 1:
+                    break
+                moved = position.copy()
+                moved[axis] -= int(step)
+                if not self._collides(moved[None], nfps, placed)[0]:
+                    position = moved
+                    break
+                step /= 2
+        return position
+
+    def _find_placement_position(
+        self,
+        piece_key: Tuple[int, float],
+        shape: PieceShape,
+        placed_pieces: List[_Placed],
+    ) -> Optional[np.ndarray]:
+        """
+        Find the best position for a piece using NFP.
+
+        Strategy: Bottom-left fill - the lowest Y position, then the
+        leftmost X at that Y, among NFP vertices (positions touching a
+        placed piece) and their projections onto the fabric edges.
+        """
+        max_x = self.width_units - shape.width
+        if max_x < 0:
+            return None
+        if not placed_pieces:
+            return np.zeros(2, dtype=np.int64)
+
+        nfps = [self._get_nfp(other, piece_key, shape) for other in placed_pieces]
+        touching = np.vstack(
+            [nfp.vertices + other.offset for nfp, other in zip(nfps, placed_pieces)]
+        )
+        top = max(int(other.offset[1]) + other.shape.height for other in placed_pieces)
+        zeros = np.zeros(len(touching), dtype=np.int64)
+        candidates = np.vstack(
+            [
+                touching,
+                np.column_stack([touching[:, 0], zeros]),  # dropped to the bottom
+                np.column_stack([zeros, touching[:, 1]]),  # pushed to the left
+                np.column_stack([zeros + max_x, touching[:, 1]]),  # pushed right
+                [[0, top + self.gap_units]],  # always free
+            ]
+        )
+        ok = (
+            (candidates[:, 0] >= 0)
+            & (candidates[:, 0] <= max_x)
+            & (candidates[:, 1] >= 0)
+        )
+        candidates = np.unique(candidates[ok], axis=0)
+        candidates = candidates[np.lexsort((candidates[:, 0], candidates[:, 1]))]
+
+        for lo in range(0, len(candidates), CANDIDATE_BATCH):
+            chunk = candidates[lo : lo + CANDIDATE_BATCH]
+            free = ~self._collides(chunk, nfps, placed_pieces)
+            count("candidates", len(chunk))
+            if free.any():
+                position = chunk[int(np.argmax(free))]
+                return self._compact(shape, position, nfps, placed_pieces)
+        return None
+
+    def nest(
+        self,
+        polygons: List[Polygon],
+        order: Optional[Sequence[int]] = None,
+        rotations: Optional[Sequence[float]] = None,
+        piece_angles: Optional[Sequence[Sequence[float]]] = None,
+    ) -> NestingResult:
+        """
+        Nest polygons to minimize fabric usage.
+
+        Args:
+            polygons: List of polygons to nest
+            order: Placement order (indices into polygons); default is
+                   largest area first, trying every allowed rotation
+            rotations: Rotation of the piece at each position of order; an
+                       angle the piece may not take, or that does not fit
+                       the width, falls back to its other allowed angles
+            piece_angles: Allowed angles per piece (default self.rotations)
+
+        Returns:
+            NestingResult with placement information; piece_id is always the
+            index into polygons
+        """
+        if not polygons:
+            return NestingResult([], self.fabric_width, 0, 0, True, "No pieces")
+        self._reset(polygons)
+        count("layouts_evaluated")
+
+        def allowed(piece_id: int) -> Sequence[float]:
+            if piece_angles is not None:
+                return piece_angles[piece_id] or (0,)
+            return self.rotations
+
+        if order is None:
+            order = sorted(range(len(polygons)), key=lambda i: -polygons[i].area)
+            choices = [list(allowed(i)) for i in order]
+        else:
+            choices = []
+            for position, piece_id in enumerate(order):
+                angles = list(allowed(piece_id))
+                wanted = rotations[position] if rotations is not None else angles[0]
+                if wanted in angles:
+                    angles.remove(wanted)
+                    angles.insert(0, wanted)
+                choices.append(angles)
+
+        placed: List[_Placed] = []
+        failed_pieces = []
+
+        for piece_id, angles in zip(order, choices):
+            best = None
+            for rotation in angles:
+                key = (piece_id, rotation)
+                shape = self._shape(piece_id, rotation)
+                position = self._find_placement_position(key, shape, placed)
+                if position is None:
+                    continue
+                # Across rotations, keep the one whose top stays lowest
+                score = (int(position[1]) + shape.height, int(position[0]))
+                if best is None or score < best[0]:
+                    best = (score, key, shape, position)
+                if rotations is not None:
+                    break  # Decoding a GA individual: first angle that fits
+
+            if best is None:
+                failed_pieces.append(piece_id)
+            else:
+                placed.append(_Placed(*best[1:]))
+
+        placed_pieces = []
+        for record in placed:
+            piece_id, rotation = record.key
+            corner = from_fixed(record.offset)
+            outline = from_fixed(record.shape.outline + record.offset)
+            placed_pieces.append(
+                PlacedPiece(
+                    piece_id=piece_id,
+                    polygon=Polygon([Point(x, y) for x, y in outline]),
+                    position=Point(float(corner[0]), float(corner[1])),
+                    rotation=rotation,
+                    original_polygon=polygons[piece_id],
+                    offset=record.offset,
+                )
+            )
+
+        # Calculate results
+        if placed_pieces:
+            max_y = max(p.polygon.bounds[3] for p in placed_pieces)
+            total_area = sum(p.polygon.area for p in placed_pieces)
+            fabric_area = self.fabric_width * max_y
+            utilization = (total_area / fabric_area) * 100 if fabric_area > 0 else 0
+        else:
+            max_y = 0
+            utilization = 0
+
+        success = len(failed_pieces) == 0
+        message = f"Placed {len(placed_pieces)}/{len(polygons)} pieces at {utilization:.1f}% utilization"
+
+        if failed_pieces:
+            message += f" (failed: {failed_pieces})"
+
+        return NestingResult(
+            pieces=placed_pieces,
+            fabric_width=self.fabric_width,
+            fabric_length=max_y,
+            utilization=utilization,
+            success=success,
+            message=message,
+        )
+
+
+class OrderFitness:
+    """
+    Picklable GA fitness: utilization of NFPNester decoding (order, rotations).
+
+    Shipped once to each evaluator worker, which keeps its own NFP cache.
+    """
+
+    def __init__(
+        self,
+        polygons: List[Polygon],
+        fabric_width: float,
+        gap: float = GAP_CM,
+        piece_angles: Optional[Sequence[Sequence[float]]] = None,
+    ):
+        self.polygons = polygons
+        self.piece_angles = piece_angles
+        self.nester = NFPNester(fabric_width, gap)
+
+    def nest(self, order, rotations) -> NestingResult:
+        return self.nester.nest(self.polygons, order, rotations, self.piece_angles)
+
+    def __call__(self, order, rotations) -> float:
+        return self.nest(order, rotations).utilization
+
+
+def optimize_with_genetic_algorithm(
+    polygons: List[Polygon],
+    fabric_width: float = CUTTER_WIDTH_CM,
+    population_size: int = 50,
+    generations: int = 100,
+    mutation_rate: float = 0.1,
+    seed: Optional[int] = None,
+    workers: Optional[int] = None,
+    anneal_iterations: int = 0,
+    progress_callback: Optional[ProgressCallback] = None,
+    gap: float = GAP_CM,
+    piece_angles: Optional[Sequence[Sequence[float]]] = None,
+    timeout_seconds: Optional[float] = None,
+) -> NestingResult:
+    """
+    Use genetic algorithm to find optimal piece ordering and rotations.
+
+    Each individual is a permutation of pieces with rotation choices.
+    Fitness is scored on a process pool (workers, default CPU count) and
+    memoized; seed makes the run reproducible. anneal_iterations > 0 adds a
+    simulated-annealing pass on the GA winner. progress_callback receives a
+    GenerationProgress per generation / annealing step. piece_angles limits
+    each piece's rotations (e.g. from a RotationTable); timeout_seconds
+    stops the search and returns the best layout found so far.
+    """
+    n = len(polygons)
+    if n == 0:
+        return NestingResult([], fabric_width, 0, 0, True, "No pieces")
+
+    start_time = time.time()
+    deadline = start_time + timeout_seconds if timeout_seconds else None
+    rng = random.Random(seed)
+    fitness = OrderFitness(polygons, fabric_width, gap, piece_angles)
+    rotation_choices = (
+        sorted({angle for angles in piece_angles for angle in angles} | {0})
+        if piece_angles is not None
+        else ROTATION_ANGLES
+    )
+
+    # Individual: (piece_order, rotations)
+    def create_individual():
+        order = list(range(n))
+        rng.shuffle(order)
+        rotations = [rng.choice(rotation_choices) for _ in range(n)]
+        return (order, rotations)
+
+    def crossover(parent1, parent2):
+        order1, rot1 = parent1
+        order2, rot2 = parent2
+
+        # Order crossover (OX)
+        start = rng.randint(0, n - 1)
+        end = rng.randint(start, n)
+
+        child_order = [-1] * n
+        child_order[start:end] = order1[start:end]
+
+        remaining = [x for x in order2 if x not in child_order[start:end]]
+        j = 0
+        for i in range(n):
+            if child_order[i] == -1:
+                child_order[i] = remaining[j]
+                j += 1
+
+        # Rotation crossover
+        child_rot = [rot1[i] if rng.random() < 0.5 else rot2[i] for i in range(n)]
+
+        return (child_order, child_rot)
+
+    def mutate(individual):
+        order, rotations = list(individual[0]), list(individual[1])
+
+        if rng.random() < mutation_rate:
+            # Swap two pieces
+            i, j = rng.sample(range(n), 2)
+            order[i], order[j] = order[j], order[i]
+
+        if rng.random() < mutation_rate:
+            # Change a rotation
+            i = rng.randint(0, n - 1)
+            rotations[i] = rng.choice(rotation_choices)
+
+        return (order, rotations)
+
+    # Initialize population, seeded with the greedy (largest first) layout
+    greedy = fitness.nester.nest(polygons, piece_angles=piece_angles)
+    greedy_order = [p.piece_id for p in greedy.pieces]
+    missing = [i for i in range(n) if i not in set(greedy_order)]
+    population = [
+        (
+            greedy_order + missing,
+            [p.rotation for p in greedy.pieces] + [0] * len(missing),
+        )
+    ]
+    population += [create_individual() for _ in range(population_size - 1)]
+
+    best_individual = None
+    best_fitness = 0
+    generations_run = 0
+
+    with PopulationEvaluator(fitness, workers) as evaluator:
+        for gen in range(generations):
+            if deadline is not None and time.time() > deadline and best_individual:
+                break
+            generations_run += 1
+
+            # Evaluate fitness (parallel, memoized)
+            scores = evaluator.evaluate(population)
+            fitness_scores = list(zip(population, scores))
+            fitness_scores.sort(key=lambda x: -x[1])
+
+            if fitness_scores[0][1] > best_fitness:
+                best_fitness = fitness_scores[0][1]
+                best_individual = fitness_scores[0][0]
+
+            if progress_callback is not None:
+                progress_callback(
+                    evaluator.progress("genetic", gen, scores, best_fitness, start_time)
+                )
+
+            # Early termination if we hit target
+            if best_fitness >= 98:
+                break
+
+            # Selection (top 50%)
+            survivors = [ind for ind, _ in fitness_scores[: population_size // 2]]
+
+            # Create next generation
+            next_gen = survivors.copy()
+
+            while len(next_gen) < population_size:
+                parent1, parent2 = rng.sample(survivors, 2)
+                child = crossover(parent1, parent2)
+                child = mutate(child)
+                next_gen.append(child)
+
+            population = next_gen
+
+        if anneal_iterations > 0 and best_individual and best_fitness < 98:
+            best_individual, best_fitness = anneal(
+                make_individual(*best_individual),
+                best_fitness,
+                evaluator,
+                rng,
+                swap_or_rotate_neighbour(rotation_choices),
+                anneal_iterations,
+                deadline=deadline,
+                progress_callback=progress_callback,
+                start_time=start_time,
+            )
+
+    # Return best result
+    if best_individual:
+        order, rotations = best_individual
+        result = fitness.nest(order, rotations)
+        result.message = f"GA optimized: {result.utilization:.1f}% after {generations_run} generations"
+        return result
+
+    return fitness.nester.nest(polygons, piece_angles=piece_angles)
+
+
+def nest_for_production(
+    contour_groups: List[List[Tuple[float, float]]],
+    fabric_width: float = CUTTER_WIDTH_CM,
+    target_utilization: float = 95.0,
+    use_ga: bool = True,
+) -> NestingResult:
+    """
+    Main entry point for production nesting.
+
+    Args:
+        contour_groups: List of piece contours, each as list of (x, y) tuples
+        fabric_width: Fabric width in cm
+        target_utilization: Target utilization percentage
+        use_ga: Use genetic algorithm optimization
+
+    Returns:
+        NestingResult with optimized placement
+    """
+    # Convert to Polygon objects
+    polygons = []
+    for contour in contour_groups:
+        points = [Point(x, y) for x, y in contour]
+        if points:
+            polygons.append(Polygon(points))
+
+    if use_ga and len(polygons) > 2:
+        return optimize_with_genetic_algorithm(
+            polygons,
+            fabric_width,
+            population_size=30,
+            generations=50,
+        )
+    else:
+        nester = NFPNester(fabric_width)
+        return nester.nest(polygons)
+
+
+# Adapter function for compatibility with existing code
+def nfp_nest_from_points(
+    contour_groups: List[List],  # List of Point objects from nesting_engine
+    fabric_width: float = CUTTER_WIDTH_CM,
+    gap: float = GAP_CM,
+    seed: Optional[int] = None,
+    timeout_seconds: Optional[float] = None,
+    rotation_table: Optional[Any] = None,
+) -> "NestingResult":
+    """
+    Adapter for existing nesting_engine.Point format.
+
+    Pieces come back in the nesting_engine convention: transformed_points
+    and bbox normalized to the origin, position the placed bbox corner.
+
+    Args:
+        seed: Seed for the GA (reproducible layouts)
+        timeout_seconds: Stop the GA after this long (best layout so far)
+        rotation_table: rotation_table.RotationTable limiting each piece's
+                        angles (e.g. one-way fabrics)
+    """
+    from nesting_engine import (
+        BoundingBox,
+        NestingResult as OldNestingResult,
+        NestedPiece,
+        Point as OldPoint,
+    )
+
+    # Convert to our format (piece_id is the index into contour_groups)
+    polys = [Polygon([Point(p.x, p.y) for p in contour]) for contour in contour_groups]
+    piece_angles = (
+        [rotation_table.angles(i) for i in range(len(polys))]
+        if rotation_table is not None
+        else None
+    )
+
+    if len(polys) > 2:
+        result = optimize_with_genetic_algorithm(
+            polys,
+            fabric_width,
+            population_size=30,
+            generations=50,
+            seed=seed,
+            gap=gap,
+            piece_angles=piece_angles,
+            timeout_seconds=timeout_seconds,
+        )
+    else:
+        nester = NFPNester(fabric_width, gap)
+        result = nester.nest(polys, piece_angles=piece_angles)
+
+    # Convert back to old format
+    nested_pieces = []
+    for placed in result.pieces:
+        x, y = placed.position.x, placed.position.y
+        trans_points = [OldPoint(p.x - x, p.y - y) for p in placed.polygon.points]
+        bounds = placed.polygon.bounds
+
+        nested_pieces.append(
+            NestedPiece(
+                piece_id=placed.piece_id,
+                original_points=contour_groups[placed.piece_id],
+                transformed_points=trans_points,
+                bbox=BoundingBox(0, 0, bounds[2] - x, bounds[3] - y),
+                position=(x, y),
+                rotation=int(placed.rotation),
+            )
+        )
+
+    return OldNestingResult(
+        pieces=nested_pieces,
+        fabric_width=fabric_width,
+        fabric_length=result.fabric_length,
+        utilization=result.utilization,
+        success=result.success,
+        message=result.message,
+    )
+
+
+def main():
+    """Test NFP nesting."""
+    import sys
+
+    sys.path.insert(0, ".")
+
+    from production_pipeline import (
+        extract_xml_from_pds,
+        extract_piece_dimensions,
+        extract_svg_geometry,
+        transform_to_cm,
+    )
+    from pathlib import Path
+
+    # Test with a PDS file
+    pds_files = [
+        "DS-speciale/inputs/pds/Basic Tee_2D.PDS",
+        "DS-speciale/inputs/pds/Light  Jacket_2D.PDS",
+    ]
+
+    for pds_path in pds_files:
+        if not Path(pds_path).exists():
+            continue
+
+        print(f"\n{'=' * 60}")
+        print(f"Testing: {Path(pds_path).stem}")
+        print("=" * 60)
+
+        # Extract geometry
+        xml_content = extract_xml_from_pds(pds_path)
+        pieces = extract_piece_dimensions(xml_content, "Small")
+        total_width = sum(p["size_x"] for p in pieces.values())
+        total_height = max(p["size_y"] for p in pieces.values()) if pieces else 0
+
+        contours, metadata = extract_svg_geometry(
+            xml_content, cutting_contours_only=True
+        )
+        contours_cm = transform_to_cm(contours, metadata, total_width, total_height)
+
+        # Convert to polygon format
+        polygons = []
+        for c in contours_cm:
+            points = [Point(p.x, p.y) for p in c.points]
+            polygons.append(Polygon(points))
+
+        print(f"Pieces: {len(polygons)}")
+        print(f"Total area: {sum(p.area for p in polygons):.1f} sq cm")
+
+        # Test basic NFP nesting
+        print("\nBasic NFP nesting...")
+        nester = NFPNester(CUTTER_WIDTH_CM)
+        result = nester.nest(polygons)
+        print(f"  Utilization: {result.utilization:.1f}%")
+        print(f"  Fabric length: {result.fabric_length:.1f} cm")
+
+        # Test with GA
+        print("\nGA-optimized NFP nesting...")
+        result = optimize_with_genetic_algorithm(
+            polygons,
+            CUTTER_WIDTH_CM,
+            population_size=30,
+            generations=30,
+        )
+        print(f"  Utilization: {result.utilization:.1f}%")
+        print(f"  Fabric length: {result.fabric_length:.1f} cm")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,499 @@
+#!/usr/bin/env python3
+"""
+Piece-Pair Clustering Before Nesting
+
+Garment templates are full of mirrored or repeated pairs - left/right
+fronts, sleeves, trouser legs, cuffs - and every engine searches each piece
+independently, so search cost grows with the raw piece count. This stage
+fuses complementary pairs into single composite pieces before nesting and
+splits them again afterwards:
+
+1. Candidate pairs are pieces of near-equal area and bounding box
+   (mirrored and repeated pieces)
+2. For each candidate the second piece is tried at 0 and 180 degrees
+   (180 interlocks sloped fronts and legs head-to-toe) and slid against the
+   first from the right and from above at several offsets, stopping where
+   the pair is exactly the gap apart - points on the pair's no-fit polygon.
+   The tightest arrangement (smallest bounding box) wins, and it is cached
+   by the pair's geometry, so repeat orders of a template skip the search
+3. Disjoint pairs whose arrangement is at least as dense as either piece
+   alone become composites: the two pieces plus the bridge across the gap
+   between them, so engines see one simply-connected outline
+4. expand() turns each placed composite back into its two pieces, applying
+   the composite's rotation and offset to each member's internal offset
+
+Pairs are only formed between pieces with the same allowed rotations, and
+only at internal rotations those angle sets are closed under, so every
+rotation an engine gives a composite is legal for both members.
+
+Usage:
+    clusters = cluster_pieces(contour_groups, fabric_width, gap)
+    result = master_nest(clusters.composites, fabric_width, gap)
+    result = clusters.expand(result)
+    result.metadata["clusters"]   # pairs, pieces before/after, cluster_ms
+
+Environment:
+    NESTING_CLUSTER_PAIRS     - 1 enables pairing in nest_contours (default 0)
+    NESTING_CLUSTER_MIN_GAIN  - density gain a pair needs over its pieces
+                                (default 0.0)
+
+Author: Claude
+Date: 2026-02-02
+"""
+
+import os
+import time
+import hashlib
+import logging
+from collections import OrderedDict
+from dataclasses import dataclass, field
+from typing import Any, Dict, List, Optional, Sequence, Tuple
+
+import numpy as np
+
+from nesting_engine import BoundingBox, NestingResult
+from contour_array import ContourArray, as_contour_array
+
+try:
+    from shapely.geometry import Polygon as ShapelyPolygon
+    from shapely.ops import unary_union
+    from shapely.validation import make_valid
+
+    SHAPELY_AVAILABLE = True
+except ImportError:
+    SHAPELY_AVAILABLE = False
+
+logger = logging.getLogger(__name__)
+
+PAIR_ROTATIONS = (0, 180)
+# Pieces pair up when their areas and bounding boxes agree within this ratio
+MATCH_TOLERANCE = 0.03
+# Perpendicular offsets tried per slide direction
+SLIDE_OFFSETS = 7
+# Bisection steps when sliding a piece into contact
+SLIDE_STEPS = 24
+MAX_CACHED_ARRANGEMENTS = 1024
+
+_arrangements: "OrderedDict[str, Optional[PairArrangement]]" = OrderedDict()
+_arrangement_stats = {"hits": 0, "misses": 0}
+
+
+def clustering_enabled() -> bool:
+    """
+    Whether nest_contours pairs pieces (NESTING_CLUSTER_PAIRS).
+
+    Off by default: composites change the layout, so a deployment opts in.
+    """
+    return os.getenv("NESTING_CLUSTER_PAIRS", "0").lower() in ("1", "true", "yes")
+
+
+def cluster_min_gain() -> float:
+    """Density gain a pair needs over its pieces (NESTING_CLUSTER_MIN_GAIN)."""
+    return float(os.getenv("NESTING_CLUSTER_MIN_GAIN", "0"))
+
+
+def clear_arrangement_cache() -> None:
+    """Forget cached pair arrangements (tests, template updates)."""
+    _arrangements.clear()
+    _arrangement_stats["hits"] = 0
+    _arrangement_stats["misses"] = 0
+
+
+def arrangement_cache_stats() -> Dict[str, int]:
+    return {**_arrangement_stats, "entries": len(_arrangements)}
+
+
+@dataclass
+class PairArrangement:
+    """Where the second piece of a pair sits relative to the first."""
+
+    rotation: float  # Of the second piece, about the origin
+    offset: Tuple[float, float]  # Added to the rotated second piece
+    density: float  # Pair area over its gap-grown bounding-box area
+
+
+@dataclass
+class ClusterMember:
+    """One piece inside a composite, in the composite's frame."""
+
+    piece_id: int
+    rotation: float  # Relative to the piece's original orientation
+    coords: np.ndarray  # The piece rotated and offset into the frame
+
+
+@dataclass
+class Cluster:
+    """A composite piece and the pieces it stands for."""
+
+    members: List[ClusterMember]
+    density: float = 0.0
+
+
+def _polygon(coords: np.ndarray) -> Any:
+    poly = ShapelyPolygon(coords)
+    if not poly.is_valid:
+        poly = make_valid(poly)
+        if hasattr(poly, "geoms"):
+            poly = max(poly.geoms, key=lambda p: p.area)
+    return poly
+
+
+def _normalized(coords: np.ndarray) -> np.ndarray:
+    return coords - coords.min(axis=0)
+
+
+def _rotated(coords: np.ndarray, degrees: float) -> np.ndarray:
+    """coords rotated counter-clockwise about the origin (as ContourArray)."""
+    if degrees == 0:
+        return coords
+    return ContourArray(coords).rotated(degrees, center=(0.0, 0.0)).coords
+
+
+def _bbox_density(coords: np.ndarray, area: float, gap: float) -> float:
+    """Area over the bounding box an engine reserves (grown by the gap)."""
+    width, height = np.ptp(coords, axis=0)
+    return area / ((width + gap) * (height + gap)) if width > 0 and height > 0 else 0.0
+
+
+def _pair_key(a: np.ndarray, b: np.ndarray, gap: float, rotations: Sequence) -> str:
+    digest = hashlib.sha1()
+    digest.update(f"gap={round(gap * 1000)}:rot={tuple(rotations)}:".encode())
+    for coords in (a, b):
+        quantized = np.round(_normalized(coords) * 1000).astype(np.int64)
+        digest.update(len(quantized).to_bytes(8, "little"))
+        digest.update(quantized.tobytes())
+    return digest.hexdigest()
+
+
+def _slide(
+    fixed: Any,
+    moving: np.ndarray,
+    axis: int,
+    offset: float,
+    limit: float,
+    gap: float,
+) -> Optional[Tuple[float, float]]:
+    """
+    Slide moving towards fixed along axis until they are gap apart.
+
+    moving starts beyond limit on the axis (clear of fixed by the gap) at
+    the given perpendicular offset; returns its final (dx, dy) or None.
+    """
+
+    def shifted(distance: float) -> np.ndarray:
+        shift = np.zeros(2)
+        shift[axis] = distance
+        shift[1 - axis] = offset
+        return shift
+
+    low, high = 0.0, limit
+    if fixed.distance(_polygon(moving + shifted(high))) < gap - 1e-9:
+        return None
+    for _ in range(SLIDE_STEPS):
+        middle = (low + high) / 2
+        if fixed.distance(_polygon(moving + shifted(middle))) >= gap - 1e-9:
+            high = middle
+        else:
+            low = middle
+    return tuple(shifted(high))
+
+
+def best_arrangement(
+    first: np.ndarray,
+    second: np.ndarray,
+    gap: float,
+    rotations: Sequence[float] = PAIR_ROTATIONS,
+    max_width: Optional[float] = None,
+) -> Optional[PairArrangement]:
+    """
+    Tightest placement of second next to first, gap apart.
+
+    Args:
+        first, second: N x 2 outlines (first is normalized to the origin)
+        rotations: Rotations of second to try
+        max_width: Reject arrangements wider than this (the fabric)
+    """
+    first = _normalized(first)
+    fixed = _polygon(first)
+    area = fixed.area + _polygon(second).area
+    width_a, height_a = np.ptp(first, axis=0)
+
+    best = None
+    for rotation in rotations:
+        moving = _normalized(_rotated(second, rotation))
+        width_b, height_b = np.ptp(moving, axis=0)
+        # (axis to slide along, span of first across it, moving size across it)
+        for axis, span, size in ((0, height_a, height_b), (1, width_a, width_b)):
+            limit = (width_a if axis == 0 else height_a) + gap
+            for offset in np.linspace(-0.25 * size, span - 0.75 * size, SLIDE_OFFSETS):
+                shift = _slide(fixed, moving, axis, float(offset), limit, gap)
+                if shift is None:
+                    continue
+                placed = moving + shift
+                coords = np.vstack([first, placed])
+                if max_width is not None and np.ptp(coords[:, 0]) > max_width:
+                    continue
+                density = _bbox_density(coords, area, gap)
+                if best is None or density > best.density + 1e-12:
+                    best = PairArrangement(
+                        rotation, (float(shift[0]), float(shift[1])), float(density)
+                    )
+    return best
+
+
+def _cached_arrangement(
+    first: np.ndarray,
+    second: np.ndarray,
+    gap: float,
+    rotations: Sequence[float],
+    max_width: Optional[float],
+) -> Optional[PairArrangement]:
+    key = _pair_key(first, second, gap, rotations) + f":w={max_width}"
+    if key in _arrangements:
+        _arrangements.move_to_end(key)
+        _arrangement_stats["hits"] += 1
+        return _arrangements[key]
+
+    _arrangement_stats["misses"] += 1
+    arrangement = best_arrangement(first, second, gap, rotations, max_width)
+    _arrangements[key] = arrangement
+    if len(_arrangements) > MAX_CACHED_ARRANGEMENTS:
+        _arrangements.popitem(last=False)
+    return arrangement
+
+
+def _composite(coords_a: np.ndarray, coords_b: np.ndarray, gap: float) -> np.ndarray:
+    """
+    One outline covering both pieces and the gap between them.
+
+    A morphological closing bridges the gap; if that still leaves two parts
+    the convex hull is used. The result always covers both pieces.
+    """
+    a, b = _polygon(coords_a), _polygon(coords_b)
+    pieces = unary_union([a, b])
+    reach = gap / 2 + 1e-3
+    closed = pieces.buffer(reach, join_style="mitre").buffer(-reach, join_style="mitre")
+    outline = unary_union([closed, pieces])
+    if outline.geom_type != "Polygon":
+        outline = pieces.convex_hull
+    outline = ShapelyPolygon(outline.exterior.coords)
+    return np.asarray(outline.exterior.coords)[:-1]
+
+
+def _like(original: Any, coords: np.ndarray) -> Any:
+    """coords in the same container type as original (ContourArray or Point list)."""
+    if isinstance(original, ContourArray):
+        return original.with_coords(coords)
+    point_cls = type(original[0])
+    return [point_cls(x, y) for x, y in coords.tolist()]
+
+
+@dataclass
+class PieceClusters:
+    """Composite pieces for nesting plus what is needed to split them."""
+
+    originals: List[Any]
+    composites: List[Any]
+    clusters: List[Cluster]
+    cluster_ms: float
+    cache_hits: int = 0
+    pair_ids: List[Tuple[int, int]] = field(default_factory=list)
+
+    @property
+    def pairs(self) -> int:
+        return len(self.pair_ids)
+
+    def report(self) -> Dict[str, Any]:
+        """Summary for NestingResult.metadata["clusters"]."""
+        return {
+            "pairs": self.pairs,
+            "pieces_before": len(self.originals),
+            "pieces_after": len(self.composites),
+            "arrangement_cache_hits": self.cache_hits,
+            "cluster_ms": round(self.cluster_ms, 2),
+        }
+
+    def expand(self, result: NestingResult) -> NestingResult:
+        """
+        Replace every placed composite with its member pieces.
+
+        Members get the composite's rotation plus their own, and are placed
+        by the offset that moved the rotated composite to its placement.
+        Positions are kept, as in contour_simplify.restore(). The engine's
+        utilization is scaled down by the bridge area the composites added,
+        so it stays comparable with unclustered runs of the same engine.
+        """
+        if not self.pairs:
+            return result
+
+        pieces = []
+        nested_area = real_area = 0.0
+        for piece in result.pieces:
+            cluster = self.clusters[piece.piece_id]
+            if len(cluster.members) == 1:
+                member = cluster.members[0]
+                piece.piece_id = member.piece_id
+                piece.original_points = self.originals[member.piece_id]
+                pieces.append(piece)
+                continue
+
+            composite = as_contour_array(self.composites[piece.piece_id])
+            nested_area += composite.area
+            placed = as_contour_array(piece.transformed_points).coords
+            rotated = composite.rotated(piece.rotation, center=(0.0, 0.0)).coords
+            offset = placed.min(axis=0) - rotated.min(axis=0)
+            for member in cluster.members:
+                original = self.originals[member.piece_id]
+                coords = _rotated(member.coords, piece.rotation) + offset
+                min_x, min_y = coords.min(axis=0)
+                max_x, max_y = coords.max(axis=0)
+                pieces.append(
+                    type(piece)(
+                        piece_id=member.piece_id,
+                        original_points=original,
+                        transformed_points=_like(original, coords),
+                        bbox=BoundingBox(
+                            float(min_x), float(min_y), float(max_x), float(max_y)
+                        ),
+                        position=piece.position,
+                        rotation=_rotation(piece.rotation + member.rotation),
+                    )
+                )
+                real_area += as_contour_array(original).area
+
+        result.pieces = pieces
+        fabric_area = result.fabric_width * result.fabric_length
+        if fabric_area > 0:
+            result.utilization -= (nested_area - real_area) / fabric_area * 100
+        result.metadata["clusters"] = self.report()
+        return result
+
+
+def _rotation(angle: float) -> float:
+    angle = round(angle % 360, 6)
+    return int(angle) if angle == int(angle) else angle
+
+
+def _internal_rotations(rotation_table: Any, i: int, j: int) -> Tuple[float, ...]:
+    """Rotations of j inside a pair with i that keep every composite angle legal."""
+    if rotation_table is None:
+        return PAIR_ROTATIONS
+    angles = set(rotation_table.angles(i))
+    if angles != set(rotation_table.angles(j)):
+        return ()
+    return tuple(
+        r for r in PAIR_ROTATIONS if all(_rotation(a + r) in angles for a in angles)
+    )
+
+
+def _candidates(coords: List[np.ndarray], areas: List[float]) -> List[Tuple[int, int]]:
+    """Pairs of pieces with near-equal area and bounding box."""
+    sizes = [np.sort(np.ptp(c, axis=0)) if len(c) else np.zeros(2) for c in coords]
+    pairs = []
+    for i in range(len(coords)):
+        if areas[i] <= 0:
+            continue
+        for j in range(i + 1, len(coords)):
+            if areas[j] <= 0:
+                continue
+            if abs(areas[i] - areas[j]) > MATCH_TOLERANCE * max(areas[i], areas[j]):
+                continue
+            if np.all(np.abs(sizes[i] - sizes[j]) <= MATCH_TOLERANCE * sizes[i]):
+                pairs.append((i, j))
+    return pairs
+
+
+def cluster_pieces(
+    contour_groups: Sequence[Any],
+    fabric_width: Optional[float] = None,
+    gap: float = 0.5,
+    rotation_table: Any = None,
+    min_gain: Optional[float] = None,
+) -> PieceClusters:
+    """
+    Fuse complementary piece pairs into composite pieces.
+
+    Args:
+        contour_groups: Pieces (Point lists or ContourArray)
+        fabric_width: Composites wider than this are not formed
+        gap: Gap kept between the two pieces of a pair
+        rotation_table: rotation_table.RotationTable limiting pair rotations
+        min_gain: Density a pair must gain over its denser piece
+                  (default NESTING_CLUSTER_MIN_GAIN)
+    """
+    start = time.perf_counter()
+    min_gain = cluster_min_gain() if min_gain is None else min_gain
+    hits_before = _arrangement_stats["hits"]
+
+    originals = list(contour_groups)
+    coords = [as_contour_array(points).coords for points in originals]
+    areas = [
+        _polygon(c).area if SHAPELY_AVAILABLE and len(c) >= 3 else 0.0 for c in coords
+    ]
+
+    scored = []
+    if SHAPELY_AVAILABLE:
+        for i, j in _candidates(coords, areas):
+            rotations = _internal_rotations(rotation_table, i, j)
+            if not rotations:
+                continue
+            arrangement = _cached_arrangement(
+                coords[i], coords[j], gap, rotations, fabric_width
+            )
+            if arrangement is None:
+                continue
+            alone = max(
+                _bbox_density(coords[i], areas[i], gap),
+                _bbox_density(coords[j], areas[j], gap),
+            )
+            if arrangement.density >= alone + min_gain - 1e-9:
+                scored.append((arrangement.density, i, j, arrangement))
+
+    # Densest pairs first; each piece joins at most one pair
+    paired = set()
+    pair_ids = []
+    arrangements = {}
+    for density, i, j, arrangement in sorted(scored, key=lambda s: (-s[0], s[1], s[2])):
+        if i in paired or j in paired:
+            continue
+        paired.update((i, j))
+        pair_ids.append((i, j))
+        arrangements[i] = (j, arrangement)
+
+    composites = []
+    clusters = []
+    for i, points in enumerate(originals):
+        if i in arrangements:
+            j, arrangement = arrangements[i]
+            first = _normalized(coords[i])
+            second = _normalized(_rotated(coords[j], arrangement.rotation))
+            second = second + arrangement.offset
+            outline = _composite(first, second, gap)
+            origin = outline.min(axis=0)
+            composites.append(_like(points, outline - origin))
+            clusters.append(
+                Cluster(
+                    members=[
+                        ClusterMember(i, 0, first - origin),
+                        ClusterMember(j, arrangement.rotation, second - origin),
+                    ],
+                    density=arrangement.density,
+                )
+            )
+        elif i not in paired:
+            composites.append(points)
+            clusters.append(Cluster(members=[ClusterMember(i, 0, coords[i])]))
+
+    clustered = PieceClusters(
+        originals=originals,
+        composites=composites,
+        clusters=clusters,
+        cluster_ms=(time.perf_counter() - start) * 1000,
+        cache_hits=_arrangement_stats["hits"] - hits_before,
+        pair_ids=pair_ids,
+    )
+    logger.debug(
+        f"Clustered {len(originals)} pieces into {len(composites)} "
+        f"({len(pair_ids)} pairs) in {clustered.cluster_ms:.1f} ms"
+    )
+    return clustered
@@ -0,0 +1,347 @@
+#!/usr/bin/env python3
+"""
+Per-Piece Rotation Tables
+
+Every engine used to rotate pieces itself: shelf and skyline rotate Point
+lists inside their placement loops, hybrid/turbo/ultimate build Shapely
+rotations per Piece, and each one hard-codes its own angle list. A
+RotationTable does that once per order: for every piece it holds the rotated
+outline (normalized to the origin), its bounding box and area, and the
+rotated Shapely polygon, for the angles that piece may be cut at. All
+engines take the table through their rotation_table argument and look
+rotations up instead of recomputing them, which is what makes finer angle
+sets affordable.
+
+Allowed angles come from the piece's grain constraint:
+
+    any      0, 90, 180, 270   cross-grain cutting allowed (previous default)
+    two_way  0, 180            along the grain, either direction
+    one_way  0                 napped / pile / one-way prints
+    free     every 15 degrees  non-woven, no grain
+
+A grain tolerance adds small tilts around each allowed angle (e.g. +/-1 and
++/-2 degrees), which markers commonly allow for woven fabrics.
+
+The grain for a piece is, in order of precedence: ContourArray
+metadata["grain"], the grain argument, a keyword in the material / fabric
+code (see MATERIAL_GRAIN), NESTING_GRAIN_MODE. 0 degrees is always allowed.
+
+Usage:
+    table = build_rotation_table(contour_groups, material="VELVET-NAVY")
+    result = master_nest(contour_groups, fabric_width, gap, rotation_table=table)
+    table.angles(0)          # (0,)
+    table.shape(0, 0).bbox   # BoundingBox of piece 0 at 0 degrees
+
+Environment:
+    NESTING_GRAIN_MODE          - default grain mode (default "any")
+    NESTING_GRAIN_TOLERANCE_DEG - tilt allowed around each angle (default 0)
+    NESTING_ROTATION_STEP_DEG   - spacing of the tilts (default 1)
+
+Author: Claude
+Date: 2026-02-02
+"""
+
+import os
+import time
+import logging
+from dataclasses import dataclass, field
+from typing import Any, Dict, Iterable, List, Optional, Sequence, Tuple
+
+from nesting_engine import (
+    BoundingBox,
+    calculate_bbox,
+    normalize_to_origin,
+    rotate_points,
+)
+from contour_array import ContourArray, as_contour_array
+
+try:
+    from shapely.geometry import Polygon as ShapelyPolygon
+    from shapely.affinity import rotate, translate
+    from shapely.validation import make_valid
+
+    SHAPELY_AVAILABLE = True
+except ImportError:
+    SHAPELY_AVAILABLE = False
+
+logger = logging.getLogger(__name__)
+
+GRAIN_ANGLES: Dict[str, Tuple[float, ...]] = {
+    "any": (0, 90, 180, 270),
+    "two_way": (0, 180),
+    "one_way": (0,),
+    "free": tuple(range(0, 360, 15)),
+}
+DEFAULT_GRAIN = "any"
+
+# Keywords in a material name or fabric code that fix its grain mode
+MATERIAL_GRAIN: Dict[str, str] = {
+    "velvet": "one_way",
+    "velour": "one_way",
+    "corduroy": "one_way",
+    "suede": "one_way",
+    "mohair": "one_way",
+    "fur": "one_way",
+    "pile": "one_way",
+    "nap": "one_way",
+    "stripe": "two_way",
+    "pinstripe": "two_way",
+    "check": "two_way",
+    "plaid": "two_way",
+    "tartan": "two_way",
+    "herringbone": "two_way",
+    "interfacing": "free",
+    "fusible": "free",
+    "nonwoven": "free",
+    "non-woven": "free",
+    "felt": "free",
+}
+
+
+def grain_mode() -> str:
+    """Default grain mode from the environment."""
+    return os.getenv("NESTING_GRAIN_MODE", DEFAULT_GRAIN).lower()
+
+
+def grain_tolerance() -> float:
+    """Grain tilt tolerance in degrees from the environment."""
+    return float(os.getenv("NESTING_GRAIN_TOLERANCE_DEG", "0"))
+
+
+def rotation_step() -> float:
+    """Spacing of grain tilts in degrees from the environment."""
+    return float(os.getenv("NESTING_ROTATION_STEP_DEG", "1"))
+
+
+def grain_for_material(material: Optional[str]) -> Optional[str]:
+    """Grain mode implied by a material name or fabric code, if any."""
+    if not material:
+        return None
+    name = material.lower()
+    for keyword, mode in MATERIAL_GRAIN.items():
+        if keyword in name:
+            return mode
+    return None
+
+
+def _angle(value: float) -> float:
+    """Angle in [0, 360), as an int when whole (engines key rotations by it)."""
+    value = round(value % 360, 6)
+    return int(value) if value == int(value) else value
+
+
+def allowed_angles(
+    grain: Optional[str] = None,
+    tolerance: Optional[float] = None,
+    step: Optional[float] = None,
+) -> Tuple[float, ...]:
+    """
+    Rotation angles a piece with this grain mode may be cut at.
+
+    Args:
+        grain: Grain mode (default NESTING_GRAIN_MODE)
+        tolerance: Tilt allowed around each angle in degrees
+                   (default NESTING_GRAIN_TOLERANCE_DEG; ignored for "free")
+        step: Spacing of the tilts (default NESTING_ROTATION_STEP_DEG)
+    """
+    grain = (grain or grain_mode()).lower()
+    if grain not in GRAIN_ANGLES:
+        raise ValueError(f"Unknown grain mode: {grain}")
+    tolerance = grain_tolerance() if tolerance is None else tolerance
+    step = rotation_step() if step is None else step
+
+    base = GRAIN_ANGLES[grain]
+    tilts = [0.0]
+    if tolerance > 0 and step > 0 and grain != "free":
+        count = int(tolerance / step + 1e-9)
+        for k in range(1, count + 1):
+            tilts.extend((k * step, -k * step))
+
+    angles: List[float] = []
+    for angle in base:
+        for tilt in tilts:
+            value = _angle(angle + tilt)
+            if value not in angles:
+                angles.append(value)
+    return tuple(angles)
+
+
+def _valid_polygon(points: Any) -> Any:
+    """Shapely polygon for a piece, repaired like the engines' points_to_shapely."""
+    if isinstance(points, ContourArray):
+        coords = points.coords
+    else:
+        coords = [(p.x, p.y) for p in points]
+    if len(coords) < 3:
+        return ShapelyPolygon()
+    poly = ShapelyPolygon(coords)
+    if not poly.is_valid:
+        poly = make_valid(poly)
+        if hasattr(poly, "geoms"):
+            poly = max(poly.geoms, key=lambda p: p.area)
+    return poly
+
+
+def rotated_polygons(poly: Any, angles: Iterable[float]) -> Dict[float, Any]:
+    """
+    Rotations of a Shapely polygon about its centroid, each at the origin.
+
+    poly is normalized first; angle 0 is the normalized polygon itself.
+    """
+    bounds = poly.bounds
+    poly = translate(poly, -bounds[0], -bounds[1])
+    rotations = {}
+    for angle in angles:
+        rotated = poly if angle == 0 else rotate(poly, angle, origin="centroid")
+        bounds = rotated.bounds
+        rotations[angle] = translate(rotated, -bounds[0], -bounds[1])
+    return rotations
+
+
+@dataclass
+class RotatedShape:
+    """One piece at one angle, normalized to the origin."""
+
+    angle: float
+    points: Any  # Same container type as the piece (Point list or ContourArray)
+    bbox: BoundingBox
+    area: float
+    polygon: Any = None  # Shapely polygon, when Shapely is available
+
+    @property
+    def width(self) -> float:
+        return self.bbox.width
+
+    @property
+    def height(self) -> float:
+        return self.bbox.height
+
+
+@dataclass
+class PieceRotations:
+    """Allowed angles of one piece and its shape at each."""
+
+    piece_id: int
+    grain: str
+    shapes: Dict[float, RotatedShape] = field(default_factory=dict)
+
+    @property
+    def angles(self) -> Tuple[float, ...]:
+        return tuple(self.shapes)
+
+
+@dataclass
+class RotationTable:
+    """Rotation lookups for every piece of an order, indexed like contour_groups."""
+
+    pieces: List[PieceRotations]
+    build_ms: float = 0.0
+
+    def __len__(self) -> int:
+        return len(self.pieces)
+
+    def angles(self, piece_id: int) -> Tuple[float, ...]:
+        """Allowed angles of a piece, 0 first."""
+        return self.pieces[piece_id].angles
+
+    def allows(self, piece_id: int, angle: float) -> bool:
+        return angle in self.pieces[piece_id].shapes
+
+    def shape(self, piece_id: int, angle: float) -> RotatedShape:
+        """A piece at one of its allowed angles."""
+        return self.pieces[piece_id].shapes[angle]
+
+    def shapes(self, piece_id: int) -> Dict[float, RotatedShape]:
+        return self.pieces[piece_id].shapes
+
+    def polygons(self, piece_id: int) -> Dict[float, Any]:
+        """Rotated Shapely polygons of a piece by angle."""
+        return {
+            angle: shape.polygon
+            for angle, shape in self.pieces[piece_id].shapes.items()
+        }
+
+    def signature(self) -> Tuple[Tuple[float, ...], ...]:
+        """Allowed angles of every piece (part of layout cache keys)."""
+        return tuple(piece.angles for piece in self.pieces)
+
+    def report(self) -> Dict[str, Any]:
+        """Summary for NestingResult.metadata["rotations"]."""
+        grains: Dict[str, int] = {}
+        for piece in self.pieces:
+            grains[piece.grain] = grains.get(piece.grain, 0) + 1
+        return {
+            "pieces": len(self.pieces),
+            "grain": grains,
+            "angles": sum(len(piece.shapes) for piece in self.pieces),
+            "build_ms": round(self.build_ms, 2),
+        }
+
+
+def _piece_grain(points: Any, grain: Optional[str]) -> str:
+    metadata = getattr(points, "metadata", None) or {}
+    return (metadata.get("grain") or grain or grain_mode()).lower()
+
+
+def build_rotation_table(
+    contour_groups: Sequence[Any],
+    grain: Optional[str] = None,
+    material: Optional[str] = None,
+    angles: Optional[Sequence[float]] = None,
+    tolerance: Optional[float] = None,
+    step: Optional[float] = None,
+    polygons: bool = True,
+) -> RotationTable:
+    """
+    Rotation table for one order's pieces.
+
+    Args:
+        contour_groups: Pieces (Point lists or ContourArray)
+        grain: Grain mode for pieces without their own metadata["grain"]
+        material: Material name / fabric code used when grain is not given
+        angles: Explicit angle set for every piece (overrides grain)
+        tolerance: Grain tilt tolerance in degrees
+        step: Spacing of the tilts
+        polygons: Also build the rotated Shapely polygons
+    """
+    start = time.perf_counter()
+    grain = grain or grain_for_material(material)
+    with_polygons = polygons and SHAPELY_AVAILABLE
+
+    pieces = []
+    for i, points in enumerate(contour_groups):
+        piece_grain = "custom" if angles is not None else _piece_grain(points, grain)
+        if angles is not None:
+            piece_angles = tuple(dict.fromkeys([0] + [_angle(a) for a in angles]))
+        else:
+            piece_angles = allowed_angles(piece_grain, tolerance, step)
+
+        piece = PieceRotations(piece_id=i, grain=piece_grain)
+        if len(points):
+            rotated = {}
+            if with_polygons and len(points) >= 3:
+                rotated = rotated_polygons(_valid_polygon(points), piece_angles)
+            for angle in piece_angles:
+                shape_points = normalize_to_origin(
+                    points if angle == 0 else rotate_points(points, angle)
+                )
+                polygon = rotated.get(angle)
+                piece.shapes[angle] = RotatedShape(
+                    angle=angle,
+                    points=shape_points,
+                    bbox=calculate_bbox(shape_points),
+                    area=(
+                        polygon.area
+                        if polygon is not None
+                        else as_contour_array(shape_points).area
+                    ),
+                    polygon=polygon,
+                )
+        pieces.append(piece)
+
+    table = RotationTable(pieces=pieces, build_ms=(time.perf_counter() - start) * 1000)
+    logger.debug(
+        f"Rotation table: {len(pieces)} pieces, "
+        f"{table.report()['angles']} rotations in {table.build_ms:.1f} ms"
+    )
+    return table
@@ -11,6 +11,19 @@ This module achieves high utilization with reasonable speed by:
 Key insight: The bottleneck in NFP-based nesting is NFP computation.
 Instead, we use direct polygon intersection tests which are fast with Shapely.
 
+Collision engines (selectable per call):
+- exact:  scan candidate positions with Shapely intersection tests
+- raster: marker as a NumPy occupancy grid (default 2 mm cells), stored as
+          per-column fill heights. Each piece is rasterized once per rotation
+          (inflated by half the gap plus half a cell diagonal, so disjoint
+          cells guarantee the full gap), the lowest-leftmost slot comes from
+          a vectorized sliding-window max over the column heights, and the
+          chosen position is verified against the exact polygons.
+
+The multi-pass optimizer is anytime: nest() can report each improved layout
+through on_improvement and stops early (keeping its best layout) when its
+CancellationToken is cancelled.
+
 Author: Claude
 Date: 2026-01-31
 """
@@ -18,13 +31,17 @@ Date: 2026-01-31
 import math
 import random
 import time
-from typing import List, Tuple, Optional, Dict, Any
+from typing import Any, Callable, Dict, List, Optional, Tuple
 from dataclasses import dataclass, field
 from copy import deepcopy
 
+import numpy as np
+from numpy.lib.stride_tricks import sliding_window_view
+
 try:
+    import shapely
     from shapely.geometry import Polygon as ShapelyPolygon, box as shapely_box
-    from shapely.affinity import translate, rotate
+    from shapely.affinity import translate
     from shapely.validation import make_valid
     from shapely.prepared import prep
     from shapely import STRtree
@@ -39,22 +56,39 @@ from nesting_engine import (
     BoundingBox,
     NestedPiece,
     NestingResult,
+    CancellationToken,
+    ImprovementCallback,
     calculate_bbox,
     normalize_to_origin,
     GAP_CM,
     CUTTER_WIDTH_CM,
 )
+from contour_array import ContourArray
+from rotation_table import rotated_polygons
+from nesting_profiler import count, phase
 
 # Constants
 ROTATION_ANGLES = [0, 90, 180, 270]
 
+# Collision engines
+ENGINE_EXACT = "exact"
+ENGINE_RASTER = "raster"
+RASTER_RESOLUTION_CM = 0.2  # 2 mm cells
+# Slack for the exact verification pass (Shapely buffers are polygonal)
+RASTER_VERIFY_TOLERANCE = 0.01
+# Sentinel heights for mask columns the piece does not occupy
+_EMPTY_COLUMN = 1 << 40
+
 
 def points_to_shapely(points: List[Point]) -> ShapelyPolygon:
     """Convert Point list to Shapely polygon."""
-    coords = [(p.x, p.y) for p in points]
+    if isinstance(points, ContourArray):
+        coords = points.coords
+    else:
+        coords = [(p.x, p.y) for p in points]
     if len(coords) < 3:
         return ShapelyPolygon()
-    if coords[0] != coords[-1]:
+    if isinstance(coords, list) and coords[0] != coords[-1]:
         coords.append(coords[0])
     poly = ShapelyPolygon(coords)
     if not poly.is_valid:
@@ -64,8 +98,15 @@ def points_to_shapely(points: List[Point]) -> ShapelyPolygon:
     return poly
 
 
-def shapely_to_points(poly: ShapelyPolygon) -> List[Point]:
-    """Convert Shapely polygon to Point list."""
+def shapely_to_points(poly: ShapelyPolygon, like: Any = None) -> List[Point]:
+    """
+    Convert Shapely polygon to Point list.
+
+    If `like` is a ContourArray the result is a ContourArray carrying its
+    contour metadata (no per-point objects).
+    """
+    if isinstance(like, ContourArray):
+        return like.with_coords(ContourArray.from_shapely(poly).coords)
     if poly.is_empty:
         return []
     coords = list(poly.exterior.coords)
@@ -83,23 +124,108 @@ class Piece:
     rotations: Dict[int, Tuple[ShapelyPolygon, float, float]] = field(
         default_factory=dict
     )
+    # Raster masks keyed by (rotation, resolution, inflate), built on demand
+    raster_masks: Dict[Tuple[int, float, float], "RasterMask"] = field(
+        default_factory=dict
+    )
+
+    # Normalized polygons by allowed angle (from a rotation table)
+    rotated: Optional[Dict[int, ShapelyPolygon]] = field(default=None, repr=False)
 
     def __post_init__(self):
         self.area = self.shapely_poly.area
         # Pre-compute rotations with dimensions
-        for angle in ROTATION_ANGLES:
-            if angle == 0:
-                rotated = self.shapely_poly
-            else:
-                rotated = rotate(self.shapely_poly, angle, origin="centroid")
-            # Normalize to origin
-            bounds = rotated.bounds
-            rotated = translate(rotated, -bounds[0], -bounds[1])
+        rotated_polys = self.rotated or rotated_polygons(
+            self.shapely_poly, ROTATION_ANGLES
+        )
+        for angle, rotated in rotated_polys.items():
             width = rotated.bounds[2] - rotated.bounds[0]
             height = rotated.bounds[3] - rotated.bounds[1]
             self.rotations[angle] = (rotated, width, height)
 
 
+@dataclass
+class RasterMask:
+    """
+    Column profile of a rasterized piece.
+
+    Mask column k covers grid column (x_cell + k - margin). bottom/top are
+    the first occupied row and one past the last occupied row, relative to
+    the piece origin; unoccupied columns hold +/-_EMPTY_COLUMN.
+    """
+
+    bottom: np.ndarray
+    top: np.ndarray
+    margin: int
+
+    @property
+    def width(self) -> int:
+        return len(self.bottom)
+
+
+def rasterize_piece(
+    poly: ShapelyPolygon, resolution: float, inflate: float
+) -> RasterMask:
+    """
+    Rasterize an origin-normalized polygon onto the marker grid.
+
+    A cell is marked when its center lies within poly.buffer(inflate); with
+    inflate >= half a cell diagonal every cell the un-inflated shape touches
+    is included.
+    """
+    margin = int(math.ceil(inflate / resolution))
+    _, _, maxx, maxy = poly.bounds
+    cols = int(math.ceil(maxx / resolution)) + 2 * margin
+    rows = int(math.ceil(maxy / resolution)) + 2 * margin
+
+    xs = (np.arange(cols) - margin + 0.5) * resolution
+    ys = (np.arange(rows) - margin + 0.5) * resolution
+    grid_x, grid_y = np.meshgrid(xs, ys)
+
+    region = poly.buffer(inflate) if inflate > 0 else poly
+    shapely.prepare(region)
+    inside = shapely.contains_xy(region, grid_x, grid_y)
+
+    occupied = inside.any(axis=0)
+    first = inside.argmax(axis=0)
+    last = rows - inside[::-1].argmax(axis=0)
+
+    bottom = np.where(occupied, first - margin, _EMPTY_COLUMN).astype(np.int64)
+    top = np.where(occupied, last - margin, -_EMPTY_COLUMN).astype(np.int64)
+    return RasterMask(bottom=bottom, top=top, margin=margin)
+
+
+class RasterMarker:
+    """
+    Marker occupancy grid kept as per-column fill heights (in cells).
+
+    Columns are padded by the mask margin on both sides so masks of pieces
+    at the fabric edge index the array directly.
+    """
+
+    def __init__(self, fabric_width: float, resolution: float, margin: int):
+        self.resolution = resolution
+        self.margin = margin
+        self.heights = np.zeros(
+            int(math.ceil(fabric_width / resolution)) + 2 * margin + 2,
+            dtype=np.int64,
+        )
+
+    def lowest_slot(self, mask: RasterMask, max_col: int) -> Optional[Tuple[int, int]]:
+        """Bottom-left (col, row) for the mask, cols 0..max_col."""
+        if max_col < 0:
+            return None
+        windows = sliding_window_view(self.heights, mask.width)[: max_col + 1]
+        rows = np.maximum((windows - mask.bottom).max(axis=1), 0)
+        col = int(np.argmin(rows))
+        return col, int(rows[col])
+
+    def occupy(self, mask: RasterMask, col: int, row: int):
+        """Raise column heights under a mask placed at (col, row)."""
+        span = self.heights[col : col + mask.width]
+        np.maximum(span, row + mask.top, out=span)
+
+
 @dataclass
 class Placement:
     """A placed piece."""
@@ -122,9 +248,76 @@ class TurboNester:
         self,
         fabric_width: float = CUTTER_WIDTH_CM,
         gap: float = GAP_CM,
+        engine: str = ENGINE_EXACT,
+        raster_resolution: float = RASTER_RESOLUTION_CM,
     ):
+        self._check_engine(engine)
         self.fabric_width = fabric_width
         self.gap = gap
+        self.engine = engine
+        self.raster_resolution = raster_resolution
+        # Positions where the raster slot failed exact verification
+        self.raster_fallbacks = 0
+
+    @staticmethod
+    def _check_engine(engine: str):
+        if engine not in (ENGINE_EXACT, ENGINE_RASTER):
+            raise ValueError(f"Unknown collision engine: {engine}")
+
+    @property
+    def _raster_inflate(self) -> float:
+        return self.gap / 2 + self.raster_resolution * math.sqrt(2) / 2
+
+    def _raster_mask(self, piece: Piece, rotation: int) -> RasterMask:
+        """Rasterized piece for a rotation (computed once per piece)."""
+        key = (rotation, self.raster_resolution, self._raster_inflate)
+        mask = piece.raster_masks.get(key)
+        if mask is None:
+            mask = rasterize_piece(
+                piece.rotations[rotation][0],
+                self.raster_resolution,
+                self._raster_inflate,
+            )
+            piece.raster_masks[key] = mask
+        return mask
+
+    def _find_position_raster(
+        self,
+        piece_poly: ShapelyPolygon,
+        piece_w: float,
+        mask: RasterMask,
+        marker: RasterMarker,
+        placed_polys: List[ShapelyPolygon],
+    ) -> Optional[Tuple[int, int]]:
+        """
+        Find the bottom-left grid slot and verify it with exact polygons.
+
+        Returns (col, row) in grid cells, or None if the slot fails
+        verification or the piece does not fit the fabric width.
+        """
+        max_col = int(math.floor((self.fabric_width - piece_w) / marker.resolution))
+        slot = marker.lowest_slot(mask, max_col)
+        count("candidates")
+        if slot is None or not placed_polys:
+            return slot
+
+        count("intersection_tests", len(placed_polys))
+
+        col, row = slot
+        test_poly = translate(
+            piece_poly, col * marker.resolution, row * marker.resolution
+        )
+        if self.gap > RASTER_VERIFY_TOLERANCE:
+            too_close = shapely.dwithin(
+                placed_polys, test_poly, self.gap - RASTER_VERIFY_TOLERANCE
+            )
+        else:
+            too_close = shapely.intersects(
+                placed_polys, test_poly.buffer(-RASTER_VERIFY_TOLERANCE)
+            )
+        if too_close.any():
+            return None
+        return slot
 
     def _find_position_heightmap(
         self,
@@ -184,6 +377,7 @@ class TurboNester:
             for y in [min_y] + [min_y + i * step for i in range(1, 100)]:
                 if y >= best_y:
                     break
+                count("candidates")
 
                 test_poly = translate(piece_poly, x, y)
                 test_buffered = test_poly.buffer(
@@ -211,21 +405,37 @@ class TurboNester:
         pieces: List[Piece],
         order: List[int] = None,
         rotations: List[int] = None,
+        engine: Optional[str] = None,
     ) -> Tuple[List[Placement], float]:
         """
         Greedy bottom-left fill with true polygon collision.
+
+        Args:
+            engine: Collision engine for this call (defaults to self.engine)
         """
+        count("layouts_evaluated")
         if order is None:
             order = list(range(len(pieces)))
         if rotations is None:
             rotations = [0] * len(pieces)
+        engine = engine or self.engine
+        self._check_engine(engine)
 
         placements: List[Placement] = []
         max_y = 0
 
+        marker = None
+        placed_polys: List[ShapelyPolygon] = []
+        if engine == ENGINE_RASTER:
+            margin = int(math.ceil(self._raster_inflate / self.raster_resolution))
+            marker = RasterMarker(self.fabric_width, self.raster_resolution, margin)
+
         for idx, piece_idx in enumerate(order):
             piece = pieces[piece_idx]
             rotation = rotations[idx]
+            if rotation not in piece.rotations:
+                # Not allowed for this piece's grain
+                rotation = 0
 
             # Get rotated polygon
             poly, w, h = piece.rotations[rotation]
@@ -233,7 +443,7 @@ class TurboNester:
             # Skip if too wide
             if w > self.fabric_width:
                 # Try other rotations
-                for rot in ROTATION_ANGLES:
+                for rot in piece.rotations:
                     poly_r, w_r, h_r = piece.rotations[rot]
                     if w_r <= self.fabric_width:
                         poly, w, h = poly_r, w_r, h_r
@@ -243,14 +453,23 @@ class TurboNester:
                     continue  # Can't fit this piece
 
             # Find position
-            pos = self._find_position_heightmap(poly, w, h, placements)
+            if marker is not None:
+                pos = self._place_raster(
+                    piece, rotation, poly, w, h, placements, marker, placed_polys
+                )
+            else:
+                pos = self._find_position_heightmap(poly, w, h, placements)
 
             if pos is None:
                 # Force placement at bottom
                 pos = (0, max_y + self.gap)
+                if marker is not None:
+                    self._occupy_raster(marker, piece, rotation, *pos)
 
             x, y = pos
             placed_poly = translate(poly, x, y)
+            if marker is not None:
+                placed_polys.append(placed_poly)
 
             placements.append(
                 Placement(
@@ -268,6 +487,44 @@ class TurboNester:
 
         return placements, max_y
 
+    def _place_raster(
+        self,
+        piece: Piece,
+        rotation: int,
+        poly: ShapelyPolygon,
+        w: float,
+        h: float,
+        placements: List[Placement],
+        marker: RasterMarker,
+        placed_polys: List[ShapelyPolygon],
+    ) -> Optional[Tuple[float, float]]:
+        """Place one piece with the raster engine, updating the marker."""
+        mask = self._raster_mask(piece, rotation)
+        slot = self._find_position_raster(poly, w, mask, marker, placed_polys)
+
+        if slot is not None:
+            col, row = slot
+            marker.occupy(mask, col, row)
+            return (col * marker.resolution, row * marker.resolution)
+
+        # Verification failed: use the exact search and mark conservatively
+        self.raster_fallbacks += 1
+        pos = self._find_position_heightmap(poly, w, h, placements)
+        if pos is not None:
+            self._occupy_raster(marker, piece, rotation, *pos)
+        return pos
+
+    def _occupy_raster(
+        self, marker: RasterMarker, piece: Piece, rotation: int, x: float, y: float
+    ):
+        """Mark an off-grid position on the marker (covers both neighbour cells)."""
+        mask = self._raster_mask(piece, rotation)
+        col = int(math.floor(x / marker.resolution))
+        row = int(math.ceil(y / marker.resolution))
+        last_col = len(marker.heights) - mask.width
+        for c in {min(col, last_col), min(col + 1, last_col)}:
+            marker.occupy(mask, c, row)
+
     def calculate_utilization(
         self, placements: List[Placement], pieces: List[Piece], fabric_length: float
     ) -> float:
@@ -283,9 +540,19 @@ class TurboNester:
         pieces: List[Piece],
         n_iterations: int = 50,
         timeout_seconds: float = 30,
+        engine: Optional[str] = None,
+        cancel_token: Optional[CancellationToken] = None,
+        on_improvement: Optional[
+            Callable[[List[Placement], float, float], None]
+        ] = None,
     ) -> Tuple[List[Placement], float, float]:
         """
         Multi-pass optimization trying different orderings and rotations.
+
+        Args:
+            cancel_token: Stop early (with the best layout so far) once cancelled
+            on_improvement: Called with (placements, length, utilization)
+                whenever a better layout is found
         """
         n = len(pieces)
         if n == 0:
@@ -297,55 +564,46 @@ class TurboNester:
         best_length = float("inf")
         best_util = 0
 
-        # Strategy 1: Area descending (largest first)
-        order = sorted(range(n), key=lambda i: -pieces[i].area)
-        for rots in self._generate_rotation_combos(n, 4):
-            placements, length = self.nest_greedy(pieces, order, rots)
-            util = self.calculate_utilization(placements, pieces, length)
-            if util > best_util:
-                best_util = util
-                best_placements = placements
-                best_length = length
-            if time.time() - start_time > timeout_seconds / 3:
-                break
-
-        # Strategy 2: Height descending
-        order = sorted(range(n), key=lambda i: -pieces[i].rotations[0][2])
-        for rots in self._generate_rotation_combos(n, 4):
-            placements, length = self.nest_greedy(pieces, order, rots)
-            util = self.calculate_utilization(placements, pieces, length)
-            if util > best_util:
-                best_util = util
-                best_placements = placements
-                best_length = length
-            if time.time() - start_time > timeout_seconds * 2 / 3:
-                break
+        def stopped() -> bool:
+            return cancel_token is not None and cancel_token.cancelled
 
-        # Strategy 3: Width descending
-        order = sorted(range(n), key=lambda i: -pieces[i].rotations[0][1])
-        for rots in self._generate_rotation_combos(n, 4):
-            placements, length = self.nest_greedy(pieces, order, rots)
+        def attempt(order: List[int], rots: List[int]):
+            nonlocal best_placements, best_length, best_util
+            placements, length = self.nest_greedy(pieces, order, rots, engine)
             util = self.calculate_utilization(placements, pieces, length)
             if util > best_util:
                 best_util = util
                 best_placements = placements
                 best_length = length
-            if time.time() - start_time > timeout_seconds:
-                break
+                if on_improvement is not None:
+                    on_improvement(best_placements, best_length, best_util)
+
+        # Strategies 1-3: area, height and width descending, each with its
+        # share of the time budget
+        strategies = [
+            (lambda i: -pieces[i].area, 1 / 3),
+            (lambda i: -pieces[i].rotations[0][2], 2 / 3),
+            (lambda i: -pieces[i].rotations[0][1], 1),
+        ]
+        with phase("turbo.heuristics"):
+            for key, budget_share in strategies:
+                if stopped():
+                    break
+                order = sorted(range(n), key=key)
+                for rots in self._generate_rotation_combos(n, 4):
+                    attempt(order, rots)
+                    if time.time() - start_time > timeout_seconds * budget_share:
+                        break
+                    if stopped():
+                        break
 
         # Strategy 4: Random permutations
-        while time.time() - start_time < timeout_seconds:
-            order = list(range(n))
-            random.shuffle(order)
-            rots = [random.choice(ROTATION_ANGLES) for _ in range(n)]
-
-            placements, length = self.nest_greedy(pieces, order, rots)
-            util = self.calculate_utilization(placements, pieces, length)
-
-            if util > best_util:
-                best_util = util
-                best_placements = placements
-                best_length = length
+        with phase("turbo.random_search"):
+            while time.time() - start_time < timeout_seconds and not stopped():
+                order = list(range(n))
+                random.shuffle(order)
+                rots = [random.choice(list(piece.rotations)) for piece in pieces]
+                attempt(order, rots)
 
         return best_placements, best_length, best_util
 
@@ -363,10 +621,29 @@ class TurboNester:
             combos.append([random.choice([0, 90]) for _ in range(n)])
         return combos[:max_combos]
 
-    def nest(self, contour_groups: List[List[Point]]) -> NestingResult:
+    def nest(
+        self,
+        contour_groups: List[List[Point]],
+        engine: Optional[str] = None,
+        timeout_seconds: float = 30,
+        cancel_token: Optional[CancellationToken] = None,
+        on_improvement: Optional[ImprovementCallback] = None,
+        rotation_table: Optional[Any] = None,
+    ) -> NestingResult:
         """
         Main nesting function.
+
+        Args:
+            contour_groups: List of point lists representing pieces
+            engine: Collision engine for this call (defaults to self.engine)
+            timeout_seconds: Budget for the multi-pass optimizer
+            cancel_token: Return the best layout so far once cancelled
+            on_improvement: Called with a NestingResult for each better layout
+            rotation_table: rotation_table.RotationTable with the pieces'
+                allowed angles and pre-rotated polygons
         """
+        engine = engine or self.engine
+        self._check_engine(engine)
         if not SHAPELY_AVAILABLE:
             raise RuntimeError("Shapely required")
 
@@ -384,28 +661,61 @@ class TurboNester:
                     continue
                 bounds = poly.bounds
                 poly = translate(poly, -bounds[0], -bounds[1])
-                pieces.append(Piece(id=i, original_points=points, shapely_poly=poly))
+                rotated = (
+                    rotation_table.polygons(i) if rotation_table is not None else None
+                )
+                pieces.append(
+                    Piece(
+                        id=i, original_points=points, shapely_poly=poly, rotated=rotated
+                    )
+                )
             except Exception as e:
                 continue
 
         if not pieces:
             return NestingResult([], self.fabric_width, 0, 0, False, "No valid pieces")
 
+        report = None
+        if on_improvement is not None:
+
+            def report(placements, length, util):
+                on_improvement(
+                    self._to_result(placements, pieces, length, util, engine)
+                )
+
         # Run optimization
+        self.raster_fallbacks = 0
         placements, fabric_length, utilization = self.optimize_multi_pass(
-            pieces, timeout_seconds=30
+            pieces,
+            timeout_seconds=timeout_seconds,
+            engine=engine,
+            cancel_token=cancel_token,
+            on_improvement=report,
         )
+        return self._to_result(placements, pieces, fabric_length, utilization, engine)
 
-        # Convert to NestingResult format
+    def _to_result(
+        self,
+        placements: List[Placement],
+        pieces: List[Piece],
+        fabric_length: float,
+        utilization: float,
+        engine: str,
+    ) -> NestingResult:
+        """Convert optimizer placements to a NestingResult."""
         nested_pieces = []
         for placement in placements:
             orig_piece = next((p for p in pieces if p.id == placement.piece_id), None)
             if orig_piece is None:
                 continue
 
-            transformed = shapely_to_points(placement.polygon)
+            # Points at the origin; position places them (as nest_contours adds)
             bounds = placement.polygon.bounds
-            bbox = BoundingBox(bounds[0], bounds[1], bounds[2], bounds[3])
+            transformed = shapely_to_points(
+                translate(placement.polygon, -bounds[0], -bounds[1]),
+                like=orig_piece.original_points,
+            )
+            bbox = BoundingBox(0.0, 0.0, bounds[2] - bounds[0], bounds[3] - bounds[1])
 
             nested_pieces.append(
                 NestedPiece(
@@ -413,7 +723,7 @@ class TurboNester:
                     original_points=orig_piece.original_points,
                     transformed_points=transformed,
                     bbox=bbox,
-                    position=(placement.x, placement.y),
+                    position=(bounds[0], bounds[1]),
                     rotation=placement.rotation,
                 )
             )
@@ -425,6 +735,13 @@ class TurboNester:
             utilization=utilization,
             success=True,
             message=f"Turbo nested {len(nested_pieces)} pieces at {utilization:.1f}%",
+            metadata={
+                "engine": engine,
+                "raster_resolution_cm": (
+                    self.raster_resolution if engine == ENGINE_RASTER else None
+                ),
+                "raster_fallbacks": self.raster_fallbacks,
+            },
         )
 
 
@@ -432,10 +749,22 @@ def turbo_nest(
     contour_groups: List[List[Point]],
     fabric_width: float = CUTTER_WIDTH_CM,
     gap: float = GAP_CM,
+    engine: str = ENGINE_EXACT,
+    timeout_seconds: float = 30,
+    raster_resolution: float = RASTER_RESOLUTION_CM,
+    cancel_token: Optional[CancellationToken] = None,
+    on_improvement: Optional[ImprovementCallback] = None,
+    rotation_table: Optional[Any] = None,
 ) -> NestingResult:
     """Main entry point."""
-    nester = TurboNester(fabric_width, gap)
-    return nester.nest(contour_groups)
+    nester = TurboNester(fabric_width, gap, engine, raster_resolution)
+    return nester.nest(
+        contour_groups,
+        timeout_seconds=timeout_seconds,
+        cancel_token=cancel_token,
+        on_improvement=on_improvement,
+        rotation_table=rotation_table,
+    )
 
 
 def main():
@@ -18,6 +18,10 @@ Key insight: To reach 98%, we must:
 3. Try many orderings and rotations
 4. Use sub-pixel positioning precision
 
+The GA is anytime: nest() can report each improved layout through
+on_improvement and stops early (keeping its best layout) when its
+CancellationToken is cancelled.
+
 Author: Claude
 Date: 2026-01-30
 """
@@ -25,13 +29,16 @@ Date: 2026-01-30
 import math
 import random
 import time
-from typing import List, Tuple, Optional, Dict, Any
+from typing import Any, Callable, Dict, List, Optional, Tuple
 from dataclasses import dataclass, field
 from copy import deepcopy
 from functools import lru_cache
 import itertools
 
+import numpy as np
+
 try:
+    import shapely
     from shapely.geometry import (
         Polygon as ShapelyPolygon,
         Point as ShapelyPoint,
@@ -60,11 +67,25 @@ from nesting_engine import (
     BoundingBox,
     NestedPiece,
     NestingResult,
+    CancellationToken,
+    ImprovementCallback,
     calculate_bbox,
     normalize_to_origin,
     GAP_CM,
     CUTTER_WIDTH_CM,
 )
+from contour_array import ContourArray
+from rotation_table import rotated_polygons
+from nesting_profiler import count, phase
+from nfp_cache import NFPCache, get_nfp_cache
+from genetic_optimizer import (
+    ANNEAL_TIME_SHARE,
+    PopulationEvaluator,
+    ProgressCallback,
+    anneal,
+    make_individual,
+    swap_or_rotate_neighbour,
+)
 
 # Constants
 SCALE = 1000  # Scale for pyclipper (it uses integers)
@@ -96,16 +117,27 @@ FINE_ROTATIONS = [
     345,
 ]
 
+# Candidate position engines for UltimateNester
+ENGINE_EXACT = "exact"  # Original: exact Shapely test for every candidate
+ENGINE_BATCHED = "batched"  # Vectorized point-in-NFP filter, then exact check
+COLLISION_SHRINK = 0.1  # Negative buffer used by the exact overlap test (cm)
+NFP_TOLERANCE = 0.05  # Shaved off NFPs so touching candidates survive (cm)
+GRID_STEP = 5  # Fallback grid spacing in Y (cm)
+GRID_MAX_Y = 2000  # Fallback grid extent in Y (cm)
+
 
 def points_to_shapely(points: List[Point]) -> ShapelyPolygon:
     """Convert our Point list to Shapely polygon."""
     if not SHAPELY_AVAILABLE:
         raise RuntimeError("Shapely not available")
-    coords = [(p.x, p.y) for p in points]
+    if isinstance(points, ContourArray):
+        coords = points.coords
+    else:
+        coords = [(p.x, p.y) for p in points]
     if len(coords) < 3:
         return ShapelyPolygon()
     # Ensure closed
-    if coords[0] != coords[-1]:
+    if isinstance(coords, list) and coords[0] != coords[-1]:
         coords.append(coords[0])
     poly = ShapelyPolygon(coords)
     if not poly.is_valid:
@@ -115,8 +147,15 @@ def points_to_shapely(points: List[Point]) -> ShapelyPolygon:
     return poly
 
 
-def shapely_to_points(poly: ShapelyPolygon) -> List[Point]:
-    """Convert Shapely polygon to our Point list."""
+def shapely_to_points(poly: ShapelyPolygon, like: Any = None) -> List[Point]:
+    """
+    Convert Shapely polygon to our Point list.
+
+    If `like` is a ContourArray the result is a ContourArray carrying its
+    contour metadata (no per-point objects).
+    """
+    if isinstance(like, ContourArray):
+        return like.with_coords(ContourArray.from_shapely(poly).coords)
     if poly.is_empty:
         return []
     coords = list(poly.exterior.coords)
@@ -235,16 +274,9 @@ class Piece:
 
     def __post_init__(self):
         self.area = self.shapely_poly.area
-        # Pre-compute rotations
-        for angle in ROTATION_ANGLES:
-            if angle == 0:
-                rotated = self.shapely_poly
-            else:
-                rotated = rotate(self.shapely_poly, angle, origin="centroid")
-            # Normalize to origin
-            bounds = rotated.bounds
-            rotated = translate(rotated, -bounds[0], -bounds[1])
-            self.rotations[angle] = rotated
+        # Pre-compute rotations (normalized to origin) unless supplied
+        if not self.rotations:
+            self.rotations = rotated_polygons(self.shapely_poly, ROTATION_ANGLES)
 
 
 @dataclass
@@ -258,6 +290,25 @@ class Placement:
     polygon: ShapelyPolygon
 
 
+class GreedyFitness:
+    """
+    Picklable GA fitness: utilization of a greedy nest for (order, rotations).
+
+    Shipped once to each evaluator worker together with a copy of the
+    nester, so the worker keeps its own NFP caches between individuals.
+    """
+
+    def __init__(self, nester: "UltimateNester", pieces: List[Piece]):
+        self.nester = nester
+        self.pieces = pieces
+
+    def __call__(self, order: Tuple[int, ...], rotations: Tuple[int, ...]) -> float:
+        placements, length = self.nester.nest_greedy(
+            self.pieces, list(order), list(rotations)
+        )
+        return self.nester.calculate_utilization(placements, self.pieces, length)
+
+
 class UltimateNester:
     """
     High-performance nesting engine using true polygon operations.
@@ -268,11 +319,25 @@ class UltimateNester:
         fabric_width: float = CUTTER_WIDTH_CM,
         gap: float = GAP_CM,
         rotations: List[int] = None,
+        engine: str = ENGINE_BATCHED,
+        nfp_store: Optional[NFPCache] = None,
     ):
+        if engine not in (ENGINE_EXACT, ENGINE_BATCHED):
+            raise ValueError(f"Unknown candidate engine: {engine}")
         self.fabric_width = fabric_width
         self.gap = gap
         self.rotations = rotations or ROTATION_ANGLES
+        self.engine = engine
         self.nfp_cache: Dict[Tuple, ShapelyPolygon] = {}
+        # Cross-order NFP store keyed by geometry hash (memory + SQLite)
+        self.nfp_store = nfp_store if nfp_store is not None else get_nfp_cache()
+        # Batched engine caches: shrunk+prepared NFPs, shrunk pieces, and
+        # the shrunk placed polygons of the layout currently being built
+        self._nfp_core_cache: Dict[Tuple, ShapelyPolygon] = {}
+        self._shrunk_cache: Dict[Tuple[int, int], ShapelyPolygon] = {}
+        self._placed_cache: Dict[Tuple, ShapelyPolygon] = {}
+        # Counters from the last optimize_genetic run
+        self.optimizer_stats: Dict[str, Any] = {}
 
     def _get_nfp_key(
         self, fixed_id: int, fixed_rot: int, orbit_id: int, orbit_rot: int
@@ -282,15 +347,185 @@ class UltimateNester:
     def _compute_nfp(
         self, fixed: Piece, fixed_rot: int, orbiting: Piece, orbit_rot: int
     ) -> ShapelyPolygon:
-        """Compute NFP with caching."""
+        """Compute NFP with caching (per-nester dict, then the shared store)."""
+        key = self._get_nfp_key(fixed.id, fixed_rot, orbiting.id, orbit_rot)
+
+        nfp = self.nfp_cache.get(key)
+        if nfp is not None:
+            count("nfp_cache_hits")
+            return nfp
+
+        count("nfp_lookups")
+        with phase("ultimate.nfp"):
+            nfp = self.nfp_store.get_or_compute(
+                fixed.rotations[fixed_rot],
+                orbiting.rotations[orbit_rot],
+                self.gap,
+                calculate_nfp,
+            )
+        self.nfp_cache[key] = nfp
+        return nfp
+
+    def _nfp_core(
+        self, fixed: Piece, fixed_rot: int, orbiting: Piece, orbit_rot: int
+    ) -> ShapelyPolygon:
+        """NFP shrunk by NFP_TOLERANCE and prepared for contains_xy."""
         key = self._get_nfp_key(fixed.id, fixed_rot, orbiting.id, orbit_rot)
+        core = self._nfp_core_cache.get(key)
+        if core is None:
+            nfp = self._compute_nfp(fixed, fixed_rot, orbiting, orbit_rot)
+            core = nfp.buffer(-NFP_TOLERANCE) if not nfp.is_empty else nfp
+            shapely.prepare(core)
+            self._nfp_core_cache[key] = core
+        return core
+
+    def _shrunk_piece(self, piece: Piece, rotation: int) -> ShapelyPolygon:
+        """Piece at origin shrunk for the exact overlap test."""
+        key = (piece.id, rotation)
+        shrunk = self._shrunk_cache.get(key)
+        if shrunk is None:
+            shrunk = piece.rotations[rotation].buffer(-COLLISION_SHRINK)
+            self._shrunk_cache[key] = shrunk
+        return shrunk
+
+    def _placed_geometry(self, placed: Placement) -> ShapelyPolygon:
+        """Shrunk, prepared polygon of a placement (built once per layout)."""
+        key = (placed.piece_id, placed.rotation, placed.x, placed.y)
+        geom = self._placed_cache.get(key)
+        if geom is None:
+            geom = placed.polygon.buffer(-COLLISION_SHRINK)
+            shapely.prepare(geom)
+            self._placed_cache[key] = geom
+        return geom
+
+    def _find_position(
+        self,
+        piece: Piece,
+        rotation: int,
+        placements: List[Placement],
+        pieces: Dict[int, Piece],
+    ) -> Optional[Tuple[float, float]]:
+        """Dispatch to the configured candidate engine."""
+        if self.engine == ENGINE_BATCHED:
+            return self._find_bottom_left_position_batched(
+                piece, rotation, placements, pieces
+            )
+        return self._find_bottom_left_position(piece, rotation, placements, pieces)
+
+    def _find_bottom_left_position_batched(
+        self,
+        piece: Piece,
+        rotation: int,
+        placements: List[Placement],
+        pieces: Dict[int, Piece],
+    ) -> Optional[Tuple[float, float]]:
+        """
+        Batched bottom-left search.
+
+        1. Gather NFP vertices and the fallback grid as one NumPy array,
+           dropping anything above the always-free row on top of the layout
+        2. Reject candidates inside any placed NFP with vectorized contains_xy
+        3. Exact-check the survivors in (y, x) order against cached placed
+           polygons, stopping at the first valid one
+        """
+        piece_poly = piece.rotations[rotation]
+        piece_w = piece_poly.bounds[2] - piece_poly.bounds[0]
+
+        if not placements:
+            return (0, 0)
+
+        max_x = self.fabric_width - piece_w
+        if max_x < -0.01:
+            return None
 
-        if key not in self.nfp_cache:
-            fixed_poly = fixed.rotations[fixed_rot]
-            orbit_poly = orbiting.rotations[orbit_rot]
-            self.nfp_cache[key] = calculate_nfp(fixed_poly, orbit_poly, self.gap)
+        # Directly above the layout is always free, so nothing higher can win
+        top = max(placed.polygon.bounds[3] for placed in placements)
+        ceiling = round(top + self.gap, 2)
 
-        return self.nfp_cache[key]
+        cores = []
+        coord_blocks = [np.array([[0.0, ceiling]])]
+        for placed in placements:
+            placed_piece = pieces[placed.piece_id]
+            nfp = self._compute_nfp(placed_piece, placed.rotation, piece, rotation)
+            if nfp.is_empty:
+                continue
+            coords = shapely.get_coordinates(nfp.exterior)
+            coord_blocks.append(coords + (placed.x, placed.y))
+            cores.append(
+                (
+                    self._nfp_core(placed_piece, placed.rotation, piece, rotation),
+                    placed.x,
+                    placed.y,
+                )
+            )
+
+        grid_x = np.array(
+            [
+                0,
+                self.fabric_width / 4,
+                self.fabric_width / 2,
+                3 * self.fabric_width / 4,
+                self.fabric_width - piece_w - 1,
+            ]
+        )
+        grid_x = grid_x[(grid_x >= 0) & (grid_x <= max_x)]
+        grid_y = np.arange(0, min(GRID_MAX_Y, ceiling + GRID_STEP), GRID_STEP)
+        gx, gy = np.meshgrid(grid_x, grid_y)
+        coord_blocks.append(np.column_stack([gx.ravel(), gy.ravel()]))
+
+        candidates = np.round(np.vstack(coord_blocks), 2)
+        xs, ys = candidates[:, 0], candidates[:, 1]
+        keep = (xs >= 0) & (xs <= max_x + 0.01) & (ys >= 0) & (ys <= ceiling)
+        candidates = np.unique(candidates[keep], axis=0)
+        xs, ys = candidates[:, 0], candidates[:, 1]
+
+        # Vectorized point-in-NFP rejection (NFPs tested in their own frame)
+        feasible = np.ones(len(candidates), dtype=bool)
+        for core, ox, oy in cores:
+            if core.is_empty:
+                continue
+            minx, miny, maxx, maxy = core.bounds
+            idx = np.nonzero(
+                feasible
+                & (xs > minx + ox)
+                & (xs < maxx + ox)
+                & (ys > miny + oy)
+                & (ys < maxy + oy)
+            )[0]
+            if len(idx):
+                feasible[idx] = ~shapely.contains_xy(core, xs[idx] - ox, ys[idx] - oy)
+
+        order = np.lexsort((xs, ys))
+        order = order[feasible[order]]
+        count("candidates", len(candidates))
+        count("candidates_after_nfp", len(order))
+
+        shrunk = self._shrunk_piece(piece, rotation)
+        placed_geoms = [self._placed_geometry(placed) for placed in placements]
+        placed_bounds = np.array([geom.bounds for geom in placed_geoms])
+        s_minx, s_miny, s_maxx, s_maxy = shrunk.bounds
+
+        position = None
+        tests = 0
+        for i in order:
+            x, y = float(xs[i]), float(ys[i])
+            hits = np.nonzero(
+                (placed_bounds[:, 0] < s_maxx + x)
+                & (placed_bounds[:, 2] > s_minx + x)
+                & (placed_bounds[:, 1] < s_maxy + y)
+                & (placed_bounds[:, 3] > s_miny + y)
+            )[0]
+            if not len(hits):
+                position = (x, y)
+                break
+            tests += len(hits)
+            test_poly = translate(shrunk, x, y)
+            if not any(placed_geoms[j].intersects(test_poly) for j in hits):
+                position = (x, y)
+                break
+
+        count("intersection_tests", tests)
+        return position
 
     def _find_bottom_left_position(
         self,
@@ -346,6 +581,7 @@ class UltimateNester:
 
         # Sort by Y (bottom) then X (left)
         sorted_candidates = sorted(candidates, key=lambda p: (p[1], p[0]))
+        count("candidates", len(sorted_candidates))
 
         # Test each candidate for validity
         for x, y in sorted_candidates:
@@ -391,6 +627,7 @@ class UltimateNester:
         Returns:
             (placements, fabric_length)
         """
+        count("layouts_evaluated")
         if order is None:
             # Default: largest area first
             order = sorted(range(len(pieces)), key=lambda i: -pieces[i].area)
@@ -401,19 +638,23 @@ class UltimateNester:
         pieces_dict = {p.id: p for p in pieces}
         placements: List[Placement] = []
         max_y = 0
+        self._placed_cache.clear()
 
         for idx, piece_idx in enumerate(order):
             piece = pieces[piece_idx]
             rotation = rotations[idx]
+            if rotation not in piece.rotations:
+                # Not allowed for this piece's grain
+                rotation = 0
 
-            # Try specified rotation first, then others
-            rotation_order = [rotation] + [r for r in self.rotations if r != rotation]
+            # Try specified rotation first, then the others the piece allows
+            rotation_order = [rotation] + [
+                r for r in self.rotations if r != rotation and r in piece.rotations
+            ]
 
             placed = False
             for rot in rotation_order:
-                pos = self._find_bottom_left_position(
-                    piece, rot, placements, pieces_dict
-                )
+                pos = self._find_position(piece, rot, placements, pieces_dict)
 
                 if pos is not None:
                     x, y = pos
@@ -475,10 +716,32 @@ class UltimateNester:
         elite_size: int = 5,
         mutation_rate: float = 0.15,
         timeout_seconds: float = 60,
+        seed: Optional[int] = None,
+        workers: Optional[int] = None,
+        anneal_iterations: int = 0,
+        progress_callback: Optional[ProgressCallback] = None,
+        cancel_token: Optional[CancellationToken] = None,
+        on_improvement: Optional[
+            Callable[[List[Placement], float, float], None]
+        ] = None,
     ) -> Tuple[List[Placement], float, float]:
         """
         Genetic algorithm optimization for piece ordering and rotation.
 
+        Args:
+            seed: Seed for all GA/annealing randomness (same seed and
+                generation count -> same result)
+            workers: Fitness evaluation processes (defaults to CPU count)
+            anneal_iterations: Simulated-annealing steps on the GA winner
+                (0 disables; gets ANNEAL_TIME_SHARE of the budget)
+            progress_callback: Called with a GenerationProgress per
+                generation / annealing step
+            cancel_token: Stop after the current generation / annealing
+                step once cancelled (keeping the best individual so far)
+            on_improvement: Called with (placements, length, utilization)
+                whenever a generation improves on the best layout; the
+                layout is rebuilt for it, so only pass one if needed
+
         Returns:
             (best_placements, best_fabric_length, best_utilization)
         """
@@ -487,27 +750,28 @@ class UltimateNester:
             return [], 0, 0
 
         start_time = time.time()
+        deadline = start_time + timeout_seconds
+        ga_deadline = (
+            start_time + timeout_seconds * (1 - ANNEAL_TIME_SHARE)
+            if anneal_iterations > 0
+            else deadline
+        )
+        rng = random.Random(seed)
 
         # Individual: (order, rotations)
         def create_individual():
             order = list(range(n))
-            random.shuffle(order)
-            rots = [random.choice(self.rotations) for _ in range(n)]
+            rng.shuffle(order)
+            rots = [rng.choice(self.rotations) for _ in range(n)]
             return (order, rots)
 
-        def evaluate(individual):
-            order, rots = individual
-            placements, length = self.nest_greedy(pieces, order, rots)
-            util = self.calculate_utilization(placements, pieces, length)
-            return util, placements, length
-
         def crossover(p1, p2):
             order1, rot1 = p1
             order2, rot2 = p2
 
             # Order crossover (PMX)
             size = len(order1)
-            start, end = sorted(random.sample(range(size), 2))
+            start, end = sorted(rng.sample(range(size), 2))
 
             child_order = [-1] * size
             child_order[start:end] = order1[start:end]
@@ -531,7 +795,7 @@ class UltimateNester:
 
             # Rotation crossover
             child_rot = [
-                rot1[i] if random.random() < 0.5 else rot2[i] for i in range(size)
+                rot1[i] if rng.random() < 0.5 else rot2[i] for i in range(size)
             ]
 
             return (child_order, child_rot)
@@ -540,19 +804,19 @@ class UltimateNester:
             order, rots = list(individual[0]), list(individual[1])
 
             # Swap mutation
-            if random.random() < mutation_rate:
-                i, j = random.sample(range(n), 2)
+            if rng.random() < mutation_rate:
+                i, j = rng.sample(range(n), 2)
                 order[i], order[j] = order[j], order[i]
 
             # Rotation mutation
-            if random.random() < mutation_rate:
-                i = random.randint(0, n - 1)
-                rots[i] = random.choice(self.rotations)
+            if rng.random() < mutation_rate:
+                i = rng.randint(0, n - 1)
+                rots[i] = rng.choice(self.rotations)
 
             # Shift mutation (move piece to different position)
-            if random.random() < mutation_rate / 2:
-                i = random.randint(0, n - 1)
-                j = random.randint(0, n - 1)
+            if rng.random() < mutation_rate / 2:
+                i = rng.randint(0, n - 1)
+                j = rng.randint(0, n - 1)
                 if i != j:
                     val = order.pop(i)
                     order.insert(j, val)
@@ -581,71 +845,125 @@ class UltimateNester:
         population[2] = (width_order, [0] * n)
 
         best_util = 0
-        best_placements = []
-        best_length = float("inf")
         best_individual = None
         generations_without_improvement = 0
 
-        for gen in range(generations):
-            if time.time() - start_time > timeout_seconds:
-                break
-
-            # Evaluate population
-            evaluated = []
-            for ind in population:
-                util, placements, length = evaluate(ind)
-                evaluated.append((util, ind, placements, length))
-
-            # Sort by utilization (higher is better)
-            evaluated.sort(key=lambda x: -x[0])
-
-            if evaluated[0][0] > best_util:
-                best_util = evaluated[0][0]
-                best_individual = evaluated[0][1]
-                best_placements = evaluated[0][2]
-                best_length = evaluated[0][3]
-                generations_without_improvement = 0
-            else:
-                generations_without_improvement += 1
-
-            # Early termination
-            if best_util >= 98:
-                break
-
-            if generations_without_improvement > 15:
-                # Inject fresh blood
-                for i in range(population_size // 4):
-                    population[-(i + 1)] = create_individual()
-                generations_without_improvement = 0
-
-            # Selection and reproduction
-            elites = [ind for _, ind, _, _ in evaluated[:elite_size]]
+        evaluator = PopulationEvaluator(GreedyFitness(self, pieces), workers)
+        try:
+            for gen in range(generations):
+                if time.time() > ga_deadline:
+                    break
+                if cancel_token is not None and cancel_token.cancelled:
+                    break
 
-            # Tournament selection for the rest
-            new_population = elites.copy()
+                # Evaluate population (parallel, memoized)
+                scores = evaluator.evaluate(population)
+                evaluated = list(zip(scores, population))
+
+                # Sort by utilization (higher is better)
+                evaluated.sort(key=lambda x: -x[0])
+
+                if evaluated[0][0] > best_util:
+                    best_util = evaluated[0][0]
+                    best_individual = evaluated[0][1]
+                    generations_without_improvement = 0
+                    if on_improvement is not None:
+                        order, rots = best_individual
+                        placements, length = self.nest_greedy(
+                            pieces, list(order), list(rots)
+                        )
+                        on_improvement(placements, length, best_util)
+                else:
+                    generations_without_improvement += 1
+
+                if progress_callback is not None:
+                    progress_callback(
+                        evaluator.progress(
+                            "genetic", gen, scores, best_util, start_time
+                        )
+                    )
 
-            while len(new_population) < population_size:
-                # Tournament
-                tournament = random.sample(evaluated, min(5, len(evaluated)))
-                parent1 = max(tournament, key=lambda x: x[0])[1]
+                # Early termination
+                if best_util >= 98:
+                    break
 
-                tournament = random.sample(evaluated, min(5, len(evaluated)))
-                parent2 = max(tournament, key=lambda x: x[0])[1]
+                if generations_without_improvement > 15:
+                    # Inject fresh blood
+                    for i in range(population_size // 4):
+                        population[-(i + 1)] = create_individual()
+                    generations_without_improvement = 0
+
+                # Selection and reproduction
+                elites = [ind for _, ind in evaluated[:elite_size]]
+
+                # Tournament selection for the rest
+                new_population = elites.copy()
+
+                while len(new_population) < population_size:
+                    # Tournament
+                    tournament = rng.sample(evaluated, min(5, len(evaluated)))
+                    parent1 = max(tournament, key=lambda x: x[0])[1]
+
+                    tournament = rng.sample(evaluated, min(5, len(evaluated)))
+                    parent2 = max(tournament, key=lambda x: x[0])[1]
+
+                    child = crossover(parent1, parent2)
+                    child = mutate(child)
+                    new_population.append(child)
+
+                population = new_population
+
+            # Optional simulated-annealing refinement of the winner
+            if anneal_iterations > 0 and best_individual is not None and best_util < 98:
+                best_individual, best_util = anneal(
+                    make_individual(*best_individual),
+                    best_util,
+                    evaluator,
+                    rng,
+                    swap_or_rotate_neighbour(self.rotations),
+                    anneal_iterations,
+                    deadline=deadline,
+                    progress_callback=progress_callback,
+                    start_time=start_time,
+                    cancel_token=cancel_token,
+                )
 
-                child = crossover(parent1, parent2)
-                child = mutate(child)
-                new_population.append(child)
+            self.optimizer_stats = evaluator.get_stats()
+        finally:
+            evaluator.close()
 
-            population = new_population
+        if best_individual is None:
+            return [], float("inf"), 0
 
+        # Rebuild the winning layout (fitness workers only return scores)
+        order, rots = best_individual
+        best_placements, best_length = self.nest_greedy(pieces, list(order), list(rots))
         return best_placements, best_length, best_util
 
-    def nest(self, contour_groups: List[List[Point]]) -> NestingResult:
+    def nest(
+        self,
+        contour_groups: List[List[Point]],
+        seed: Optional[int] = None,
+        workers: Optional[int] = None,
+        anneal_iterations: int = 0,
+        progress_callback: Optional[ProgressCallback] = None,
+        timeout_seconds: float = 90,
+        cancel_token: Optional[CancellationToken] = None,
+        on_improvement: Optional[ImprovementCallback] = None,
+        rotation_table: Optional[Any] = None,
+    ) -> NestingResult:
         """
         Main nesting function - compatible with existing interface.
 
         Args:
             contour_groups: List of point lists representing pieces
+            seed, workers, anneal_iterations, progress_callback,
+            timeout_seconds, cancel_token:
+                Passed to optimize_genetic
+            on_improvement: Called with a NestingResult for each better layout
+            rotation_table: rotation_table.RotationTable with the pieces'
+                allowed angles and pre-rotated polygons; rotation genes then
+                draw from every angle in it (e.g. FINE_ROTATIONS for "free")
 
         Returns:
             NestingResult with optimized layout
@@ -676,6 +994,11 @@ class UltimateNester:
                         id=i,
                         original_points=points,
                         shapely_poly=poly,
+                        rotations=(
+                            rotation_table.polygons(i)
+                            if rotation_table is not None
+                            else rotated_polygons(poly, self.rotations)
+                        ),
                     )
                 )
             except Exception as e:
@@ -684,28 +1007,54 @@ class UltimateNester:
 
         if not pieces:
             return NestingResult([], self.fabric_width, 0, 0, False, "No valid pieces")
+        if rotation_table is not None:
+            self.rotations = list(
+                dict.fromkeys(angle for piece in pieces for angle in piece.rotations)
+            )
+
+        report = None
+        if on_improvement is not None:
+
+            def report(placements, length, util):
+                on_improvement(self._to_result(placements, pieces, length, util, seed))
 
         # Run GA optimization
         placements, fabric_length, utilization = self.optimize_genetic(
             pieces,
             population_size=40,
             generations=80,
-            timeout_seconds=90,
+            timeout_seconds=timeout_seconds,
+            seed=seed,
+            workers=workers,
+            anneal_iterations=anneal_iterations,
+            progress_callback=progress_callback,
+            cancel_token=cancel_token,
+            on_improvement=report,
         )
+        return self._to_result(placements, pieces, fabric_length, utilization, seed)
 
-        # Convert placements back to NestingResult format
+    def _to_result(
+        self,
+        placements: List[Placement],
+        pieces: List[Piece],
+        fabric_length: float,
+        utilization: float,
+        seed: Optional[int],
+    ) -> NestingResult:
+        """Convert optimizer placements to a NestingResult."""
         nested_pieces = []
         for placement in placements:
             orig_piece = next((p for p in pieces if p.id == placement.piece_id), None)
             if orig_piece is None:
                 continue
 
-            # Get transformed points
-            transformed = shapely_to_points(placement.polygon)
-
-            # Calculate bbox
+            # Points at the origin; position places them (as nest_contours adds)
             bounds = placement.polygon.bounds
-            bbox = BoundingBox(bounds[0], bounds[1], bounds[2], bounds[3])
+            transformed = shapely_to_points(
+                translate(placement.polygon, -bounds[0], -bounds[1]),
+                like=orig_piece.original_points,
+            )
+            bbox = BoundingBox(0.0, 0.0, bounds[2] - bounds[0], bounds[3] - bounds[1])
 
             nested_pieces.append(
                 NestedPiece(
@@ -713,7 +1062,7 @@ class UltimateNester:
                     original_points=orig_piece.original_points,
                     transformed_points=transformed,
                     bbox=bbox,
-                    position=(placement.x, placement.y),
+                    position=(bounds[0], bounds[1]),
                     rotation=placement.rotation,
                 )
             )
@@ -725,6 +1074,10 @@ class UltimateNester:
             utilization=utilization,
             success=True,
             message=f"Ultimate nested {len(nested_pieces)} pieces at {utilization:.1f}% utilization",
+            metadata={
+                "nfp_cache": self.nfp_store.get_stats(),
+                "optimizer": {**self.optimizer_stats, "seed": seed},
+            },
         )
 
 
@@ -732,6 +1085,14 @@ def ultimate_nest(
     contour_groups: List[List[Point]],
     fabric_width: float = CUTTER_WIDTH_CM,
     gap: float = GAP_CM,
+    engine: str = ENGINE_BATCHED,
+    nfp_store: Optional[NFPCache] = None,
+    seed: Optional[int] = None,
+    workers: Optional[int] = None,
+    timeout_seconds: float = 90,
+    cancel_token: Optional[CancellationToken] = None,
+    on_improvement: Optional[ImprovementCallback] = None,
+    rotation_table: Optional[Any] = None,
 ) -> NestingResult:
     """
     Main entry point for ultimate nesting.
@@ -739,8 +1100,16 @@ def ultimate_nest(
     This function provides the highest utilization by using true polygon
     operations with genetic algorithm optimization.
     """
-    nester = UltimateNester(fabric_width, gap)
-    return nester.nest(contour_groups)
+    nester = UltimateNester(fabric_width, gap, engine=engine, nfp_store=nfp_store)
+    return nester.nest(
+        contour_groups,
+        seed=seed,
+        workers=workers,
+        timeout_seconds=timeout_seconds,
+        cancel_token=cancel_token,
+        on_improvement=on_improvement,
+        rotation_table=rotation_table,
+    )
 
 
 def compare_all_algorithms(
@@ -23,6 +23,7 @@ from .metrics import (
     update_queue_metrics,
     record_order_complete,
     record_order_failed,
+    record_nesting_profile,
     ORDERS_TOTAL,
     PROCESSING_TIME,
     QUEUE_LENGTH,
@@ -37,6 +38,7 @@ __all__ = [
     "update_queue_metrics",
     "record_order_complete",
     "record_order_failed",
+    "record_nesting_profile",
     "ORDERS_TOTAL",
     "PROCESSING_TIME",
     "QUEUE_LENGTH",
@@ -7,6 +7,8 @@ Metrics:
 - sds_orders_total: Counter of orders by status and garment type
 - sds_order_processing_seconds: Histogram of processing times
 - sds_nesting_utilization_percent: Histogram of fabric utilization
+- sds_nesting_phase_seconds: Histogram of nesting phase times by phase
+- sds_nesting_operations: Histogram of nesting operation counts by counter
 - sds_queue_length: Gauge of queue depth by priority
 - sds_active_workers: Gauge of active worker count
 - sds_dlq_size: Gauge of dead letter queue size
@@ -99,6 +101,20 @@ FABRIC_LENGTH = Histogram(
     buckets=[25, 50, 75, 100, 150, 200, 300],
 )
 
+NESTING_PHASE_SECONDS = Histogram(
+    "sds_nesting_phase_seconds",
+    "Time spent per nesting phase (nesting_profiler)",
+    ["phase"],
+    buckets=[0.001, 0.01, 0.05, 0.1, 0.5, 1, 5, 10, 30, 60],
+)
+
+NESTING_OPERATIONS = Histogram(
+    "sds_nesting_operations",
+    "Operations per profiled nesting run (candidates, NFPs, layouts, ...)",
+    ["counter"],
+    buckets=[1, 10, 100, 1000, 10000, 100000, 1000000, 10000000],
+)
+
 # =============================================================================
 # Gauges (current values)
 # =============================================================================
@@ -211,6 +227,23 @@ def record_order_failed(garment_type: str, failure_type: str) -> None:
     FAILURES_TOTAL.labels(type=failure_type).inc()
 
 
+def record_nesting_profile(profile: dict) -> None:
+    """
+    Record a nesting profiler report (NestingResult.metadata["profile"]).
+
+    Args:
+        profile: Report with "phases" ({name: {"seconds", "calls"}}) and
+                 "counters" ({name: count})
+    """
+    if not PROMETHEUS_AVAILABLE:
+        return
+
+    for name, entry in profile.get("phases", {}).items():
+        NESTING_PHASE_SECONDS.labels(phase=name).observe(entry["seconds"])
+    for name, value in profile.get("counters", {}).items():
+        NESTING_OPERATIONS.labels(counter=name).observe(value)
+
+
 def set_circuit_breaker_state(service: str, state: str) -> None:
     """
     Update circuit breaker state metric.
@@ -13,6 +13,9 @@ Features:
 
 Redis Key Structure:
     sds:cache:template:{name}  - Binary template data
+    sds:cache:compiled:{hash}  - Compiled template artifact (.npz bytes) by
+                                 source SHA-256; the L3 tier of
+                                 core/template_store.TemplateStore
     sds:cache:stats            - Cache hit/miss counters
 
 Usage:
@@ -46,6 +49,7 @@ class TemplateCache:
     """
 
     KEY_PREFIX = "sds:cache:template"
+    COMPILED_KEY_PREFIX = "sds:cache:compiled"
     DEFAULT_TTL = 3600  # 1 hour
 
     def __init__(self, redis_url: Optional[str] = None):
@@ -166,6 +170,49 @@ class TemplateCache:
         except Exception:
             pass
 
+    def get_compiled(self, content_hash: str) -> Optional[bytes]:
+        """
+        Get a compiled template artifact by its source content hash.
+
+        Args:
+            content_hash: SHA-256 of the PDS file
+
+        Returns:
+            Artifact bytes or None if not cached
+        """
+        if not self.is_available:
+            return None
+
+        try:
+            data = self._client.get(f"{self.COMPILED_KEY_PREFIX}:{content_hash}")
+            self._stats["hits" if data else "misses"] += 1
+            return data or None
+        except Exception as e:
+            logger.debug(f"Cache get error for compiled {content_hash[:12]}: {e}")
+            return None
+
+    def set_compiled(self, content_hash: str, data: bytes, ttl: int = None):
+        """
+        Cache a compiled template artifact.
+
+        Content-addressed entries never go stale, so the TTL only bounds
+        how long templates nobody uses stay in Redis.
+
+        Args:
+            content_hash: SHA-256 of the PDS file
+            data: Artifact bytes
+            ttl: Time-to-live in seconds (default 1 hour)
+        """
+        if not self.is_available:
+            return
+
+        try:
+            key = f"{self.COMPILED_KEY_PREFIX}:{content_hash}"
+            self._client.setex(key, ttl or self.DEFAULT_TTL, data)
+            logger.debug(f"Cached compiled template: {content_hash[:12]}")
+        except Exception as e:
+            logger.debug(f"Cache set error for compiled {content_hash[:12]}: {e}")
+
     def get_template(
         self, template_name: str, template_dir: Optional[Path] = None
     ) -> Optional[bytes]:
@@ -261,32 +261,9 @@ class OrderQueue:
             return None
 
         try:
-            # Try each priority queue in order
-            for priority in JobPriority:
-                queue_key = self._key("queue", priority.name.lower())
-
-                # ZPOPMIN gets lowest score (oldest) item
-                result = self._client.zpopmin(queue_key, count=1)
-
-                if result:
-                    order_id = result[0][0]
-
-                    # Move to processing set
-                    self._client.sadd(self._key("queue", "processing"), order_id)
-
-                    # Update status
-                    self._client.set(
-                        self._key("order", order_id, "status"),
-                        JobStatus.PROCESSING.value,
-                    )
-                    self._client.hset(
-                        self._key("order", order_id, "data"),
-                        "started_at",
-                        datetime.utcnow().isoformat(),
-                    )
-
-                    # Get order data
-                    return self._get_order_data(order_id)
+            order = self._pop_next()
+            if order is not None:
+                return order
 
             # No orders in any queue - wait briefly
             time.sleep(min(timeout, 1))
@@ -296,6 +273,82 @@ class OrderQueue:
             logger.error(f"Dequeue error: {e}")
             return None
 
+    def dequeue_batch(
+        self, max_orders: int, window_seconds: float, timeout: int = 5
+    ) -> List[Dict[str, Any]]:
+        """
+        Collect several orders for a shared marker (blocking).
+
+        Waits for a first order like dequeue(), then keeps taking orders
+        until max_orders are held or window_seconds have passed since the
+        first one. A RUSH first order is returned on its own immediately.
+
+        Args:
+            max_orders: Max orders to return
+            window_seconds: How long to wait for more orders
+            timeout: Seconds to wait for the first order
+
+        Returns:
+            Order data dicts in dequeue order (empty if none)
+        """
+        first = self.dequeue(timeout=timeout)
+        if first is None:
+            return []
+
+        orders = [first]
+        if first.get("_meta", {}).get("priority") == JobPriority.RUSH.name:
+            return orders
+
+        deadline = time.time() + window_seconds
+        while len(orders) < max_orders:
+            try:
+                order = self._pop_next()
+            except Exception as e:
+                logger.error(f"Dequeue error: {e}")
+                break
+
+            if order is not None:
+                orders.append(order)
+                continue
+
+            remaining = deadline - time.time()
+            if remaining <= 0:
+                break
+            time.sleep(min(remaining, 1))
+
+        return orders
+
+    def _pop_next(self) -> Optional[Dict[str, Any]]:
+        """Pop the next order by priority and mark it processing (non-blocking)."""
+        # Try each priority queue in order
+        for priority in JobPriority:
+            queue_key = self._key("queue", priority.name.lower())
+
+            # ZPOPMIN gets lowest score (oldest) item
+            result = self._client.zpopmin(queue_key, count=1)
+
+            if result:
+                order_id = result[0][0]
+
+                # Move to processing set
+                self._client.sadd(self._key("queue", "processing"), order_id)
+
+                # Update status
+                self._client.set(
+                    self._key("order", order_id, "status"),
+                    JobStatus.PROCESSING.value,
+                )
+                self._client.hset(
+                    self._key("order", order_id, "data"),
+                    "started_at",
+                    datetime.utcnow().isoformat(),
+                )
+
+                # Get order data
+                return self._get_order_data(order_id)
+
+        return None
+
     def _get_order_data(self, order_id: str) -> Optional[Dict[str, Any]]:
         """Get order data from Redis."""
         try:
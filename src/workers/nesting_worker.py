@@ -13,6 +13,10 @@ Features:
 - Automatic retry with exponential backoff
 - Dead-letter queue after 3 failures
 - Worker identification for debugging
+- Optional shared markers: orders on the same fabric that arrive within
+  MARKER_BATCH_WINDOW_SECONDS are nested together (MARKER_BATCHING=1)
+- Compiled templates kept resident in the worker's template cache and
+  re-checked every TEMPLATE_REFRESH_SECONDS (default 300)
 
 Usage:
     # Run directly
@@ -21,6 +25,9 @@ Usage:
     # With custom worker ID
     WORKER_ID=worker-1 python -m src.workers.nesting_worker
 
+    # Share markers between orders on the same fabric
+    MARKER_BATCHING=1 MARKER_BATCH_WINDOW_SECONDS=600 python -m src.workers.nesting_worker
+
     # Scale with Docker Compose
     docker-compose up -d --scale nesting-worker=3
 
@@ -44,6 +51,12 @@ sys.path.insert(0, str(Path(__file__).parent.parent.parent))
 sys.path.insert(0, str(Path(__file__).parent.parent / "core"))
 
 from scalability.queue_manager import OrderQueue, JobStatus, JobPriority
+from marker_batcher import (
+    group_orders_for_markers,
+    fabric_key,
+    batch_window_seconds,
+    batch_max_orders,
+)
 
 # Cutter queue integration
 try:
@@ -95,12 +108,24 @@ class NestingWorker:
         self.orders_processed = 0
         self.orders_failed = 0
         self.start_time = None
+        self.batch_markers = os.getenv("MARKER_BATCHING", "").lower() in (
+            "1",
+            "true",
+            "yes",
+        )
 
         # Import production modules
         self._api = None
         self._Order = None
         self._load_production_modules()
 
+        # Keep compiled templates resident (re-checked every refresh interval)
+        self.template_refresh_seconds = float(
+            os.getenv("TEMPLATE_REFRESH_SECONDS", "300")
+        )
+        self._templates_refreshed_at = 0.0
+        self._refresh_templates()
+
         # Initialize cutter queue (optional - only if available)
         self._cutter_queue = None
         self._init_cutter_queue()
@@ -126,6 +151,29 @@ class NestingWorker:
             logger.error(f"Failed to load production modules: {e}")
             raise
 
+    def _refresh_templates(self, force: bool = False):
+        """
+        Load every template into this worker's template cache so orders never
+        wait on a compile. Templates edited since the last refresh are
+        recompiled here (their content hash changed), between orders.
+        """
+        now = time.monotonic()
+        if (
+            not force
+            and now - self._templates_refreshed_at < self.template_refresh_seconds
+        ):
+            return
+        self._templates_refreshed_at = now
+        store_enabled = os.getenv("TEMPLATE_STORE_ENABLED", "1").lower()
+        if self._api is None or store_enabled in ("0", "false", "no"):
+            return
+        try:
+            resident = self._api.compile_templates()
+            logger.debug(f"Templates resident: {', '.join(resident) or 'none'}")
+        except Exception as e:
+            # Orders still compile their template on demand
+            logger.warning(f"Template refresh failed: {e}")
+
     def _init_cutter_queue(self):
         """Initialize connection to resilient cutter queue."""
         if not CUTTER_QUEUE_AVAILABLE:
@@ -170,14 +218,7 @@ class NestingWorker:
 
         try:
             # Determine priority based on order data
-            priority_str = order_data.get("priority", "normal").lower()
-            priority_map = {
-                "rush": CutterPriority.RUSH,
-                "high": CutterPriority.HIGH,
-                "normal": CutterPriority.NORMAL,
-                "low": CutterPriority.LOW,
-            }
-            priority = priority_map.get(priority_str, CutterPriority.NORMAL)
+            priority = self._cutter_priority(order_data)
 
             # Build piece info list (if available from result)
             pieces = []
@@ -192,6 +233,8 @@ class NestingWorker:
                 measurements=order_data.get("measurements"),
                 pieces=pieces,
                 fabric_length_cm=result.fabric_length_cm or 0.0,
+                fabric_width_cm=getattr(result, "fabric_width_cm", None),
+                roll_id=getattr(result, "roll_id", None),
             )
 
             logger.info(
@@ -203,6 +246,63 @@ class NestingWorker:
             logger.error(f"Failed to submit order {order_id} to cutter queue: {e}")
             # Don't fail the order - cutting queue is optional enhancement
 
+    def _cutter_priority(self, order_data: Dict[str, Any]):
+        """Cutter queue priority for an order dict."""
+        priority_str = order_data.get("priority", "normal").lower()
+        priority_map = {
+            "rush": CutterPriority.RUSH,
+            "high": CutterPriority.HIGH,
+            "normal": CutterPriority.NORMAL,
+            "low": CutterPriority.LOW,
+        }
+        return priority_map.get(priority_str, CutterPriority.NORMAL)
+
+    def _submit_marker_to_cutter_queue(
+        self,
+        batch_id: str,
+        results: list,
+        orders_data: list,
+    ):
+        """
+        Submit a shared marker to the cutter queue once, as one job.
+
+        The job gets the most urgent priority of the orders on the marker.
+        """
+        if self._cutter_queue is None:
+            logger.debug(
+                f"Cutter queue not available, skipping submission for {batch_id}"
+            )
+            return
+
+        plt_file = results[0].plt_file
+        if not plt_file or not Path(plt_file).exists():
+            logger.warning(f"No PLT file for marker {batch_id}, cannot queue")
+            return
+
+        try:
+            priority = min(
+                (self._cutter_priority(d) for d in orders_data),
+                key=lambda p: p.value,
+            )
+            job = self._cutter_queue.add_job(
+                order_id=batch_id,
+                plt_file=Path(plt_file),
+                priority=priority,
+                pieces=[
+                    {"order_id": r.order_id, "piece_count": r.piece_count}
+                    for r in results
+                ],
+                fabric_length_cm=sum(r.fabric_length_cm or 0.0 for r in results),
+                fabric_width_cm=getattr(results[0], "fabric_width_cm", None),
+                roll_id=getattr(results[0], "roll_id", None),
+            )
+            logger.info(
+                f"Submitted marker job {job.job_id} to cutter queue "
+                f"(priority: {priority.name}, {len(results)} orders)"
+            )
+        except Exception as e:
+            logger.error(f"Failed to submit marker {batch_id} to cutter queue: {e}")
+
     def _setup_signal_handlers(self):
         """Setup graceful shutdown handlers."""
         signal.signal(signal.SIGTERM, self._handle_shutdown)
@@ -241,6 +341,11 @@ class NestingWorker:
 
         logger.info(f"Worker {self.worker_id} starting...")
         logger.info(f"Redis available: {self.queue.is_available}")
+        if self.batch_markers:
+            logger.info(
+                f"Shared markers enabled: window={batch_window_seconds():.0f}s, "
+                f"max_orders={batch_max_orders()}"
+            )
 
         if not self.queue.is_available:
             logger.error("Redis not available - worker cannot start")
@@ -251,6 +356,16 @@ class NestingWorker:
                 # Send heartbeat (Redis + file-based for Docker healthcheck)
                 self.queue.worker_heartbeat(self.worker_id)
                 self._write_heartbeat_file()
+                self._refresh_templates()
+
+                if self.batch_markers:
+                    # Collect orders for shared markers
+                    orders_data = self.queue.dequeue_batch(
+                        batch_max_orders(), batch_window_seconds(), timeout=5
+                    )
+                    if orders_data:
+                        self._process_batch(orders_data)
+                    continue
 
                 # Try to get an order
                 order_data = self.queue.dequeue(timeout=5)
@@ -292,35 +407,18 @@ class NestingWorker:
             # Convert dict to Order object
             order = self._create_order_object(order_data)
 
-            # Process through pipeline
+            # Process through pipeline; rush orders take the first
+            # good-enough layout instead of the full nesting budget
             logger.info(f"Starting pipeline for {order_id}...")
-            result = self._api.process_order(order)
+            if str(order_data.get("priority", "normal")).lower() == "rush":
+                result = self._api.process_order(order, rush=True)
+            else:
+                result = self._api.process_order(order)
 
             processing_time = time.time() - start_time
 
             if result.success:
-                # Mark complete
-                self.queue.complete(
-                    order_id,
-                    {
-                        "success": True,
-                        "plt_file": str(result.plt_file) if result.plt_file else None,
-                        "fabric_length_cm": result.fabric_length_cm,
-                        "fabric_utilization": result.fabric_utilization,
-                        "piece_count": result.piece_count,
-                        "processing_time_ms": result.processing_time_ms,
-                        "worker_id": self.worker_id,
-                        "completed_at": datetime.utcnow().isoformat(),
-                    },
-                )
-
-                self.orders_processed += 1
-                logger.info(
-                    f"Order {order_id} completed: "
-                    f"{result.fabric_utilization:.1f}% utilization, "
-                    f"{result.piece_count} pieces, "
-                    f"{processing_time:.1f}s"
-                )
+                self._complete_order(order_id, result, processing_time)
 
                 # Submit to cutter queue for cutting
                 self._submit_to_cutter_queue(order_id, result, order_data)
@@ -339,6 +437,102 @@ class NestingWorker:
         finally:
             self.current_order_id = None
 
+    def _complete_order(self, order_id: str, result, processing_time: float):
+        """Mark an order complete in the queue."""
+        self.queue.complete(
+            order_id,
+            {
+                "success": True,
+                "plt_file": str(result.plt_file) if result.plt_file else None,
+                "fabric_length_cm": result.fabric_length_cm,
+                "fabric_utilization": result.fabric_utilization,
+                "piece_count": result.piece_count,
+                "processing_time_ms": result.processing_time_ms,
+                "batch_id": getattr(result, "batch_id", None),
+                "worker_id": self.worker_id,
+                "completed_at": datetime.utcnow().isoformat(),
+            },
+        )
+
+        self.orders_processed += 1
+        logger.info(
+            f"Order {order_id} completed: "
+            f"{result.fabric_utilization:.1f}% utilization, "
+            f"{result.piece_count} pieces, "
+            f"{processing_time:.1f}s"
+        )
+
+    def _process_batch(self, orders_data: list):
+        """
+        Process dequeued orders, sharing markers between same-fabric orders.
+
+        Args:
+            orders_data: Order data dicts from dequeue_batch
+        """
+        groups = group_orders_for_markers(
+            orders_data,
+            key=lambda o: fabric_key(o, self._api.fabric_width_cm),
+            window_seconds=batch_window_seconds(),
+            max_orders=batch_max_orders(),
+        )
+        for group in groups:
+            if len(group) == 1:
+                self._process_order(group[0])
+            else:
+                self._process_marker(group)
+
+    def _process_marker(self, orders_data: list):
+        """
+        Nest several orders onto one shared marker.
+
+        Args:
+            orders_data: Order data dicts sharing a fabric
+        """
+        start_time = time.time()
+        order_ids = [d.get("order_id", "unknown") for d in orders_data]
+        logger.info(f"Processing shared marker for {len(order_ids)} orders")
+
+        valid = []
+        for order_data in orders_data:
+            try:
+                valid.append((order_data, self._create_order_object(order_data)))
+            except Exception as e:
+                self._handle_failure(
+                    order_data.get("order_id", "unknown"),
+                    f"{type(e).__name__}: {str(e)}",
+                )
+        if not valid:
+            return
+
+        try:
+            results = self._api.process_marker_batch([order for _, order in valid])
+        except Exception as e:
+            error_msg = f"{type(e).__name__}: {str(e)}"
+            logger.error(f"Shared marker exception: {error_msg}")
+            traceback.print_exc()
+            for order_data, _ in valid:
+                self._handle_failure(order_data.get("order_id", "unknown"), error_msg)
+            return
+
+        processing_time = time.time() - start_time
+        succeeded = []
+        for (order_data, order), result in zip(valid, results):
+            if result.success:
+                self._complete_order(order.order_id, result, processing_time)
+                succeeded.append((order_data, result))
+            else:
+                error_msg = (
+                    "; ".join(result.errors) if result.errors else "Unknown error"
+                )
+                self._handle_failure(order.order_id, error_msg)
+
+        if succeeded:
+            self._submit_marker_to_cutter_queue(
+                succeeded[0][1].batch_id,
+                [result for _, result in succeeded],
+                [order_data for order_data, _ in succeeded],
+            )
+
     def _create_order_object(self, order_data: Dict[str, Any]):
         """Convert order dict to Order object."""
         # Handle nested measurements
@@ -370,6 +564,13 @@ class NestingWorker:
         except ValueError:
             fit_type = self._FitType.REGULAR
 
+        # Fabric is optional; only pass it when the order names one
+        fabric = {
+            key: order_data[key]
+            for key in ("fabric_code", "fabric_width_cm")
+            if order_data.get(key)
+        }
+
         return self._Order(
             order_id=order_data.get("order_id"),
             customer_id=order_data.get("customer_id", "worker-queue"),
@@ -378,6 +579,7 @@ class NestingWorker:
             measurements=measurements_obj,
             quantity=order_data.get("quantity", 1),
             notes=order_data.get("notes", ""),
+            **fabric,
         )
 
     def _handle_failure(self, order_id: str, error: str):
@@ -399,6 +601,13 @@ class NestingWorker:
                 f"rate={rate:.1f}/hour"
             )
 
+        try:
+            from template_store import get_template_store
+
+            logger.info(f"Template cache: {get_template_store().get_stats()}")
+        except ImportError:
+            pass
+
 
 def run_worker(worker_id: Optional[str] = None):
     """
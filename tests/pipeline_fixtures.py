@@ -0,0 +1,133 @@
+#!/usr/bin/env python3
+"""
+Shared fixtures for the src/core pipeline tests
+
+Importing this module puts src, src/core and src/nesting on sys.path.
+
+The project root still holds older flat copies of several src/core modules
+(production_pipeline, pattern_scaler, samedaysuits_api, ...), and the older
+test modules put the root first on sys.path. use_src_core() returns a
+setUpModule / tearDownModule pair that binds the src/core copies while a
+test module runs and puts the root copies back afterwards:
+
+    setUpModule, tearDownModule = use_src_core({"NESTING_CACHE_ENABLED": "0"})
+
+The order helpers (make_order, fake_prepare, fast_nest, ...) let the API
+tests run without parsing PDS files or running the nesting portfolio.
+"""
+
+import os
+import sys
+from pathlib import Path
+from types import SimpleNamespace
+from typing import Dict, Optional
+from unittest.mock import patch
+
+ROOT = Path(__file__).resolve().parent.parent
+SRC_CORE = ROOT / "src" / "core"
+PDS_DIR = ROOT / "DS-speciale" / "inputs" / "pds"
+
+# Add src to path
+sys.path.insert(0, str(ROOT / "src"))
+sys.path.insert(0, str(SRC_CORE))
+sys.path.insert(0, str(ROOT / "src" / "nesting"))
+
+CORE_MODULE_NAMES = frozenset(path.stem for path in SRC_CORE.glob("*.py"))
+
+
+def _from_src_core(module) -> bool:
+    module_file = getattr(module, "__file__", None)
+    return module_file is not None and Path(module_file).resolve().parent == SRC_CORE
+
+
+def use_src_core(env: Optional[Dict[str, str]] = None):
+    """
+    setUpModule / tearDownModule binding the src/core modules.
+
+    setUpModule drops root copies of src/core modules from sys.modules and
+    puts src/core first on sys.path; tearDownModule restores both, so test
+    modules collected later keep the copies they imported. env is set for
+    the duration of the test module.
+    """
+    environ = patch.dict(os.environ, env or {})
+    replaced = {}
+    saved_path = []
+    loaded_before = set()
+
+    def setUpModule():
+        saved_path[:] = sys.path
+        loaded_before.clear()
+        loaded_before.update(sys.modules)
+        for name in CORE_MODULE_NAMES:
+            module = sys.modules.get(name)
+            if module is not None and not _from_src_core(module):
+                replaced[name] = sys.modules.pop(name)
+        sys.path.insert(0, str(SRC_CORE))
+        environ.start()
+
+    def tearDownModule():
+        environ.stop()
+        for name in CORE_MODULE_NAMES:
+            if name in replaced or name not in loaded_before:
+                sys.modules.pop(name, None)
+        sys.modules.update(replaced)
+        replaced.clear()
+        sys.path[:] = saved_path
+
+    return setUpModule, tearDownModule
+
+
+def make_order(order_id, created_at="2026-02-02T10:00:00", **fabric):
+    from samedaysuits_api import (
+        Order,
+        CustomerMeasurements,
+        GarmentType,
+        FitType,
+    )
+
+    return Order(
+        order_id=order_id,
+        customer_id="CUST-TEST",
+        garment_type=GarmentType.TEE,
+        fit_type=FitType.REGULAR,
+        measurements=CustomerMeasurements(chest_cm=100, waist_cm=85, hip_cm=100),
+        created_at=created_at,
+        **fabric,
+    )
+
+
+def rect_contour(width, height):
+    from production_pipeline import Point, Contour
+
+    return Contour(
+        points=[Point(0, 0), Point(width, 0), Point(width, height), Point(0, height)]
+    )
+
+
+def fake_prepare(api, order):
+    """_prepare_pattern stand-in: three rectangles per order, no PDS parsing."""
+    from samedaysuits_api import PreparedPattern
+
+    return PreparedPattern(
+        template_path=Path("Basic Tee_2D.PDS"),
+        contours_cm=[rect_contour(60, 40), rect_contour(30, 50), rect_contour(20, 20)],
+        scale_result=SimpleNamespace(
+            base_size="M", scale_x=1.0, scale_y=1.0, size_match_quality="exact"
+        ),
+        scaling_applied=False,
+        warnings=[],
+    )
+
+
+def fake_prepare_patterns(api, orders):
+    """_prepare_patterns stand-in (batch_process / process_marker_batch)."""
+    return [fake_prepare(api, order) for order in orders]
+
+
+def fast_nest(contours, fabric_width, material=None, **options):
+    """nest_contours stand-in using the basic bottom-left nester (no portfolio)."""
+    from production_pipeline import nest_contours
+
+    return nest_contours(
+        contours, fabric_width=fabric_width, use_improved=False, material=material
+    )
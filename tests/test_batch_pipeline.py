@@ -0,0 +1,193 @@
+#!/usr/bin/env python3
+"""
+Batch Pipeline Tests
+
+Tests for staged batch processing:
+1. StagedPipeline keeps input order across thread, process and async stages
+2. Failed items, on_error and back-pressure metrics
+3. SameDaySuitsAPI.batch_process(pipelined=True) matches serial processing
+
+Run with:
+    python tests/test_batch_pipeline.py
+"""
+
+import math
+import random
+import tempfile
+import time
+import unittest
+from pathlib import Path
+from unittest.mock import patch
+
+from pipeline_fixtures import (
+    fake_prepare_patterns,
+    fast_nest,
+    make_order,
+    use_src_core,
+)
+
+setUpModule, tearDownModule = use_src_core(
+    {"NESTING_CACHE_ENABLED": "0", "BATCH_PIPELINE_NEST_PROCESSES": "0"}
+)
+
+
+def jitter(value):
+    """Finish items out of order."""
+    time.sleep(random.uniform(0, 0.01))
+    return value
+
+
+async def async_double(value):
+    return value * 2
+
+
+class TestStagedPipeline(unittest.TestCase):
+    """Tests for StagedPipeline."""
+
+    def test_results_in_input_order(self):
+        from batch_pipeline import Stage, StagedPipeline
+
+        pipeline = StagedPipeline(
+            [
+                Stage("jitter", jitter, workers=4),
+                Stage("square", lambda v: v * v, workers=2),
+                Stage("double", async_double, kind="async", workers=3),
+                Stage("add", lambda v: v + 1, kind="async", workers=2),
+            ]
+        )
+        results = pipeline.run(range(40))
+
+        self.assertEqual(results, [2 * v * v + 1 for v in range(40)])
+        stats = pipeline.get_stats()
+        self.assertEqual(list(stats), ["jitter", "square", "double", "add"])
+        self.assertTrue(all(s["items"] == 40 for s in stats.values()))
+        self.assertEqual(pipeline.bottleneck(), "jitter")
+        self.assertEqual(pipeline.run([]), [])
+
+    def test_process_stage(self):
+        from batch_pipeline import Stage, StagedPipeline
+
+        pipeline = StagedPipeline(
+            [Stage("factorial", math.factorial, kind="process", workers=2)]
+        )
+        self.assertEqual(pipeline.run([5, 3, 0]), [120, 6, 1])
+
+        results = pipeline.run([4, -1])
+        self.assertEqual(results[0], 24)
+        self.assertIsInstance(results[1], ValueError)
+
+    def test_failed_items_skip_later_stages(self):
+        from batch_pipeline import Stage, StagedPipeline
+
+        seen = []
+        pipeline = StagedPipeline(
+            [
+                Stage("invert", lambda v: 1 / v, workers=2),
+                Stage("record", lambda v: seen.append(v) or v, kind="async"),
+            ]
+        )
+        results = pipeline.run([1, 0, 4])
+
+        self.assertEqual(results[0], 1.0)
+        self.assertIsInstance(results[1], ZeroDivisionError)
+        self.assertEqual(results[2], 0.25)
+        self.assertEqual(sorted(seen), [0.25, 1.0])
+        self.assertEqual(pipeline.get_stats()["invert"]["errors"], 1)
+
+        recovering = StagedPipeline(
+            [Stage("invert", lambda v: 1 / v), Stage("negate", lambda v: -v)],
+            on_error=lambda stage, item, error: 0,
+        )
+        self.assertEqual(recovering.run([2, 0]), [-0.5, 0])
+
+    def test_back_pressure(self):
+        from batch_pipeline import Stage, StagedPipeline
+
+        def slow(value):
+            time.sleep(0.02)
+            return value
+
+        pipeline = StagedPipeline(
+            [Stage("fast", lambda v: v), Stage("slow", slow, queue_size=2)]
+        )
+        self.assertEqual(pipeline.run(range(10)), list(range(10)))
+
+        stats = pipeline.get_stats()
+        self.assertGreater(stats["fast"]["blocked_seconds"], 0.05)
+        self.assertLessEqual(stats["slow"]["queue_high_water"], 2)
+        self.assertEqual(pipeline.bottleneck(), "slow")
+
+    def test_unknown_stage_kind(self):
+        from batch_pipeline import Stage
+
+        with self.assertRaises(ValueError):
+            Stage("bad", abs, kind="fiber")
+
+
+@patch("samedaysuits_api.SameDaySuitsAPI._update_order_status")
+@patch("samedaysuits_api.nest_contours", fast_nest)
+@patch("samedaysuits_api.SameDaySuitsAPI._prepare_patterns", fake_prepare_patterns)
+class TestPipelinedBatch(unittest.TestCase):
+    """Tests for SameDaySuitsAPI pipelined batches."""
+
+    def setUp(self):
+        from samedaysuits_api import SameDaySuitsAPI
+
+        self._tmp = tempfile.TemporaryDirectory()
+        self.api = SameDaySuitsAPI(output_dir=Path(self._tmp.name))
+
+    def tearDown(self):
+        self._tmp.cleanup()
+
+    def test_matches_serial_processing(self, _status):
+        orders = [
+            make_order("SDS-20260202-0001-A", fabric_width_cm=150),
+            make_order("bad-id"),
+            make_order("SDS-20260202-0003-A", fabric_width_cm=120),
+            make_order("SDS-20260202-0004-A"),
+        ]
+        serial = self.api.batch_process(orders, pipelined=False)
+        pipelined = self.api.batch_process(orders, pipelined=True)
+
+        self.assertEqual([r.order_id for r in pipelined], [o.order_id for o in orders])
+        self.assertEqual([r.success for r in pipelined], [True, False, True, True])
+        for a, b in zip(serial, pipelined):
+            self.assertEqual(a.fabric_length_cm, b.fabric_length_cm)
+            self.assertEqual(a.plt_file, b.plt_file)
+        self.assertTrue(pipelined[3].plt_file.exists())
+
+        # Each piece's byte range in the PLT, for single-piece reprints
+        pieces = pipelined[3].pieces
+        self.assertEqual([p["piece_number"] for p in pieces], [1, 2, 3])
+        data = pipelined[3].plt_file.read_bytes()
+        for piece in pieces:
+            self.assertTrue(
+                data[piece["plt_start_byte"] : piece["plt_end_byte"]].startswith(b"PU")
+            )
+
+        stats = self.api.pipeline_stats
+        self.assertEqual(list(stats), ["prepare", "nest", "qc", "write"])
+        self.assertEqual(stats["prepare"]["items"], 4)
+        self.assertEqual(stats["write"]["items"], 4)
+        self.assertEqual(stats["nest"]["kind"], "thread")
+
+    def test_stage_error_fails_only_its_order(self, _status):
+        orders = [make_order("SDS-20260202-0001-A"), make_order("SDS-20260202-0002-A")]
+
+        def flaky_nest(contours, fabric_width, material=None):
+            if len(self.nested) == 0:
+                self.nested.append(fabric_width)
+                raise RuntimeError("nester crashed")
+            self.nested.append(fabric_width)
+            return fast_nest(contours, fabric_width, material)
+
+        self.nested = []
+        with patch("samedaysuits_api.nest_contours", flaky_nest):
+            results = self.api.process_orders_pipelined(orders)
+
+        self.assertEqual([r.success for r in results], [False, True])
+        self.assertIn("Processing error: nester crashed", results[0].errors)
+
+
+if __name__ == "__main__":
+    unittest.main(verbosity=2)
@@ -0,0 +1,216 @@
+#!/usr/bin/env python3
+"""
+HPGL Writer Tests
+
+Tests for the streaming PLT writer:
+1. Absolute output, labels and per-piece byte offsets
+2. Relative (PR) encoding draws the same path in fewer bytes
+3. Bounds from the nesting result
+4. Labelled order PLTs (EnhancedOutputGenerator)
+
+Run with:
+    python tests/test_hpgl_writer.py
+"""
+
+import io
+import json
+import tempfile
+import unittest
+from pathlib import Path
+from types import SimpleNamespace
+from unittest.mock import patch
+
+import numpy as np
+
+from pipeline_fixtures import use_src_core
+
+setUpModule, tearDownModule = use_src_core()
+
+
+def pieces():
+    from contour_array import ContourArray
+
+    return [
+        ContourArray([(10, 5), (50, 5), (50, 45), (10, 45)]),
+        ContourArray([(60, 5.25), (90.5, 5.25), (75, 30)]),
+        ContourArray([(20, 50), (40, 50), (40, 80), (20, 50)], closed=False),
+    ]
+
+
+def decode(data):
+    """Pen path of an HPGL file: [(pen, x, y), ...] in absolute units."""
+    path, mode, position = [], "PA", (0, 0)
+    for command in data.decode().replace("\n", "").split(";"):
+        op, args = command[:2], command[2:]
+        if op in ("PA", "PR"):
+            mode = op
+        if op not in ("PU", "PD") or not args:
+            continue
+        values = [int(v) for v in args.split(",")]
+        for x, y in zip(values[::2], values[1::2]):
+            if mode == "PR":
+                x, y = position[0] + x, position[1] + y
+            position = (x, y)
+            path.append((op, x, y))
+    return path
+
+
+class TestWriteHPGL(unittest.TestCase):
+    """Tests for write_hpgl."""
+
+    def setUp(self):
+        self._tmp = tempfile.TemporaryDirectory()
+        self.tmp = Path(self._tmp.name)
+
+    def tearDown(self):
+        self._tmp.cleanup()
+
+    def test_absolute_output_and_offsets(self):
+        from hpgl_writer import HPGL_LABEL_TERMINATOR, write_hpgl
+
+        path = self.tmp / "marker.plt"
+        output = write_hpgl(pieces(), path, labels=["A 1/3", None, "C;3"])
+        data = path.read_bytes()
+
+        self.assertEqual(output.size_bytes, len(data))
+        self.assertEqual(output.bounds, (10.0, 5.0, 90.5, 80.0))
+        self.assertTrue(data.startswith(b"IN;\nSP1;\nPU;\n"))
+        self.assertTrue(data.endswith(b"SP0;\nIN;\n"))
+
+        first = data[slice(*output.piece_offsets[0])].decode()
+        self.assertEqual(
+            first,
+            "PU0,0;\nPD16000,0,16000,16000,0,16000;\nPD0,0;\nPU;\n"
+            f"PU8000,8000;\nLBA 1/3{HPGL_LABEL_TERMINATOR};\n",
+        )
+        # Already closed: no closing move; labels are sanitised
+        third = data[slice(*output.piece_offsets[2])].decode()
+        self.assertEqual(third.count("PD"), 1)
+        self.assertIn(f"LBC 3{HPGL_LABEL_TERMINATOR};", third)
+        self.assertEqual(output.piece_offsets[0][1], output.piece_offsets[1][0])
+
+    def test_relative_draws_same_path(self):
+        from contour_array import ContourArray
+        from hpgl_writer import write_hpgl
+
+        rng = np.random.default_rng(7)
+        walk = np.cumsum(rng.uniform(-0.5, 0.5, (400, 2)), axis=0) + 100
+        contours = pieces() + [ContourArray(walk)]
+
+        absolute = write_hpgl(contours, self.tmp / "a.plt", relative=False)
+        relative = write_hpgl(contours, self.tmp / "r.plt", relative=True)
+        data = (self.tmp / "r.plt").read_bytes()
+
+        self.assertEqual(decode((self.tmp / "a.plt").read_bytes()), decode(data))
+        self.assertLess(relative.size_bytes, absolute.size_bytes)
+        for start, end in relative.piece_offsets:
+            piece = data[start:end]
+            self.assertTrue(piece.startswith(b"PU"))
+            self.assertIn(b"PA;", piece)
+
+    def test_bounds_from_nesting_result(self):
+        from hpgl_writer import coords_bounds, nesting_bounds, write_hpgl
+
+        def box(min_x, min_y, max_x, max_y):
+            return SimpleNamespace(
+                final_bbox=SimpleNamespace(
+                    min_x=min_x, min_y=min_y, max_x=max_x, max_y=max_y
+                )
+            )
+
+        result = SimpleNamespace(
+            pieces=[box(10, 5, 50, 45), box(60, 5.25, 90.5, 30), box(20, 50, 40, 80)]
+        )
+        bounds = nesting_bounds(result)
+        self.assertEqual(bounds, coords_bounds([c.coords for c in pieces()]))
+        self.assertIsNone(nesting_bounds(SimpleNamespace(pieces=[])))
+
+        with patch("hpgl_writer.coords_bounds") as scan:
+            write_hpgl(pieces(), self.tmp / "m.plt", bounds=bounds)
+        scan.assert_not_called()
+
+    def test_generate_hpgl_legacy_contours(self):
+        from production_pipeline import Contour, Point, generate_hpgl
+
+        contours = [c.to_contour(Contour, Point) for c in pieces()]
+        contours.insert(1, Contour(points=[]))
+
+        output = generate_hpgl(contours, str(self.tmp / "legacy.plt"))
+        arrays = generate_hpgl(pieces(), str(self.tmp / "arrays.plt"))
+
+        self.assertIsNone(output.piece_offsets[1])
+        self.assertEqual(arrays.piece_offsets[1], output.piece_offsets[2])
+        self.assertEqual(
+            (self.tmp / "legacy.plt").read_bytes(),
+            (self.tmp / "arrays.plt").read_bytes(),
+        )
+        self.assertIsNone(generate_hpgl([], str(self.tmp / "empty.plt")))
+        self.assertFalse((self.tmp / "empty.plt").exists())
+
+
+class TestLabeledPLT(unittest.TestCase):
+    """Tests for EnhancedOutputGenerator PLT output."""
+
+    def test_streamed_pieces_and_offsets(self):
+        from order_file_manager import (
+            EnhancedOutputGenerator,
+            OrderFileManager,
+            PieceInfo,
+        )
+
+        def order_pieces():
+            return [
+                PieceInfo(
+                    name="FRONT",
+                    contour=[(0, 0), (50, 0), (50, 60), (0, 60)],
+                    bounding_box=(0, 0, 50, 60),
+                    grainline={"angle": 90},
+                ),
+                PieceInfo(
+                    name="BACK",
+                    contour=[(60, 0), (110, 0), (110, 70)],
+                    bounding_box=(60, 0, 110, 70),
+                ),
+            ]
+
+        with tempfile.TemporaryDirectory() as tmp:
+            manager = OrderFileManager(tmp)
+            manager.create_order_folder("SDS-20260202-0001-A")
+            generator = EnhancedOutputGenerator(manager)
+
+            text = generator._generate_labeled_plt(
+                "SDS-20260202-0001-A", order_pieces()
+            )
+            outputs = generator.generate_all_outputs(
+                "SDS-20260202-0001-A", order_pieces(), {"utilization": 80}, {}
+            )
+            data = outputs["plt"].read_bytes()
+            report = json.loads(outputs["nesting_report"].read_text())
+
+        self.assertEqual(data.decode(), text)
+        self.assertIn("PD2000,0,2000,2400,0,2400;\nPD0,0;", text)
+        self.assertIn("LB001/002^;", text)
+
+        back = report["plt_pieces"][1]
+        self.assertEqual(back["piece_name"], "BACK")
+        piece = data[back["plt_start_byte"] : back["plt_end_byte"]].decode()
+        self.assertTrue(piece.startswith("SP1;\nPU2400,0;"))
+        self.assertIn("LBBACK^;", piece)
+        self.assertNotIn("FRONT", piece)
+
+    def test_writer_on_stream(self):
+        from hpgl_writer import HPGLWriter
+
+        stream = io.BytesIO()
+        with HPGLWriter(stream) as writer:
+            writer.write("IN;")
+            writer.begin_piece()
+            writer.write("PU0,0;")
+            offsets = writer.end_piece()
+
+        self.assertFalse(stream.closed)
+        self.assertEqual(stream.getvalue()[slice(*offsets)], b"PU0,0;")
+
+
+if __name__ == "__main__":
+    unittest.main(verbosity=2)
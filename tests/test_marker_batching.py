@@ -0,0 +1,250 @@
+#!/usr/bin/env python3
+"""
+Multi-Order Marker Batching Tests
+
+Tests for shared markers:
+1. Order grouping by fabric and time window
+2. Per-order length / cost allocation
+3. PLT piece labels
+4. SameDaySuitsAPI.process_marker_batch / batch_process(batch_markers=True)
+5. Rush orders switching process_order to anytime nesting
+
+Run with:
+    python tests/test_marker_batching.py
+"""
+
+import json
+import tempfile
+import unittest
+from pathlib import Path
+from unittest.mock import patch
+
+from pipeline_fixtures import (
+    fake_prepare_patterns,
+    fast_nest,
+    make_order,
+    rect_contour,
+    use_src_core,
+)
+
+# Every test nests fresh, never from the shared cache
+setUpModule, tearDownModule = use_src_core({"NESTING_CACHE_ENABLED": "0"})
+
+
+class TestOrderGrouping(unittest.TestCase):
+    """Tests for group_orders_for_markers."""
+
+    def test_groups_by_fabric_and_window(self):
+        from marker_batcher import group_orders_for_markers, fabric_key
+
+        orders = [
+            {
+                "order_id": "A",
+                "fabric_code": "NAVY",
+                "created_at": "2026-02-02T10:00:00",
+            },
+            {
+                "order_id": "B",
+                "fabric_code": "GREY",
+                "created_at": "2026-02-02T10:01:00",
+            },
+            {
+                "order_id": "C",
+                "fabric_code": "NAVY",
+                "created_at": "2026-02-02T10:05:00",
+            },
+            {
+                "order_id": "D",
+                "fabric_code": "NAVY",
+                "created_at": "2026-02-02T11:00:00",
+            },
+        ]
+        batches = group_orders_for_markers(
+            orders, key=lambda o: fabric_key(o, 150.0), window_seconds=900
+        )
+
+        self.assertEqual(
+            [[o["order_id"] for o in b] for b in batches], [["A", "C"], ["B"], ["D"]]
+        )
+
+    def test_max_orders_and_width(self):
+        from marker_batcher import group_orders_for_markers, fabric_key
+
+        orders = [{"order_id": str(i)} for i in range(5)]
+        orders.append({"order_id": "wide", "fabric_width_cm": 180})
+        batches = group_orders_for_markers(
+            orders, key=lambda o: fabric_key(o, 150.0), max_orders=2
+        )
+
+        self.assertEqual([len(b) for b in batches], [2, 2, 1, 1])
+        self.assertEqual(batches[-1][0]["order_id"], "wide")
+
+
+class TestCostAllocation(unittest.TestCase):
+    """Tests for allocate_marker_cost."""
+
+    def test_allocation_by_area(self):
+        from marker_batcher import allocate_marker_cost
+
+        allocations = allocate_marker_cost(
+            {"A": [300.0, 100.0], "B": [100.0]},
+            fabric_length_cm=200.0,
+            cost_per_meter=10.0,
+        )
+
+        self.assertEqual([a.order_id for a in allocations], ["A", "B"])
+        self.assertAlmostEqual(allocations[0].share_percent, 80.0)
+        self.assertAlmostEqual(allocations[0].allocated_length_cm, 160.0)
+        self.assertAlmostEqual(allocations[1].allocated_cost, 4.0)
+        self.assertAlmostEqual(
+            sum(a.allocated_length_cm for a in allocations), 200.0, places=1
+        )
+
+
+class TestPieceLabels(unittest.TestCase):
+    """Tests for labelled HPGL output."""
+
+    def test_labels_written_after_each_contour(self):
+        from hpgl_writer import HPGL_LABEL_TERMINATOR
+        from production_pipeline import generate_hpgl
+
+        contours = [rect_contour(10, 10), rect_contour(20, 5)]
+        with tempfile.TemporaryDirectory() as tmp:
+            plt = Path(tmp) / "marker.plt"
+            generate_hpgl(contours, str(plt), labels=["ORD-1 1/2", "ORD-2 1/1"])
+            text = plt.read_text()
+
+        self.assertIn(f"LBORD-1 1/2{HPGL_LABEL_TERMINATOR};", text)
+        self.assertIn(f"LBORD-2 1/1{HPGL_LABEL_TERMINATOR};", text)
+        self.assertLess(text.index("ORD-1"), text.index("ORD-2"))
+
+
+@patch("samedaysuits_api.SameDaySuitsAPI._update_order_status")
+@patch("samedaysuits_api.nest_contours", fast_nest)
+@patch("samedaysuits_api.SameDaySuitsAPI._prepare_patterns", fake_prepare_patterns)
+class TestSharedMarkerAPI(unittest.TestCase):
+    """Tests for SameDaySuitsAPI shared markers."""
+
+    def setUp(self):
+        from samedaysuits_api import SameDaySuitsAPI
+
+        self._tmp = tempfile.TemporaryDirectory()
+        self.api = SameDaySuitsAPI(output_dir=Path(self._tmp.name))
+
+    def tearDown(self):
+        self._tmp.cleanup()
+
+    def test_process_marker_batch(self, _status):
+        orders = [
+            make_order("SDS-20260202-0001-A"),
+            make_order("SDS-20260202-0002-A"),
+        ]
+        results = self.api.process_marker_batch(orders, cost_per_meter=12.0)
+
+        self.assertTrue(all(r.success for r in results))
+        self.assertEqual(results[0].plt_file, results[1].plt_file)
+        self.assertEqual(results[0].batch_id, results[1].batch_id)
+
+        plt_text = results[0].plt_file.read_text()
+        for order in orders:
+            self.assertIn(f"LB{order.order_id} 3/3", plt_text)
+
+        summary = json.loads(
+            (
+                results[0].plt_file.parent / f"{results[0].batch_id}_marker.json"
+            ).read_text()
+        )
+        self.assertAlmostEqual(
+            sum(r.fabric_length_cm for r in results),
+            summary["fabric_length_cm"],
+            places=1,
+        )
+
+        metadata = json.loads(results[1].metadata_file.read_text())
+        self.assertEqual(metadata["batch_marker"]["batch_id"], results[1].batch_id)
+        self.assertAlmostEqual(metadata["batch_marker"]["share_percent"], 50.0)
+        self.assertIsNotNone(metadata["batch_marker"]["allocated_cost"])
+
+    def test_invalid_order_does_not_block_batch(self, _status):
+        orders = [
+            make_order("SDS-20260202-0001-A"),
+            make_order("bad-id"),
+            make_order("SDS-20260202-0003-A"),
+        ]
+        results = self.api.process_marker_batch(orders)
+
+        self.assertEqual([r.success for r in results], [True, False, True])
+        self.assertEqual([r.order_id for r in results], [o.order_id for o in orders])
+
+    def test_batch_process_keeps_input_order(self, _status):
+        orders = [
+            make_order("SDS-20260202-0001-A", fabric_code="NAVY"),
+            make_order("SDS-20260202-0002-A", fabric_code="GREY"),
+            make_order("SDS-20260202-0003-A", fabric_code="NAVY"),
+        ]
+        results = self.api.batch_process(orders, batch_markers=True)
+
+        self.assertEqual([r.order_id for r in results], [o.order_id for o in orders])
+        self.assertIsNotNone(results[0].batch_id)
+        self.assertEqual(results[0].batch_id, results[2].batch_id)
+        self.assertIsNone(results[1].batch_id)
+
+
+@patch("samedaysuits_api.SameDaySuitsAPI._update_order_status")
+@patch("samedaysuits_api.SameDaySuitsAPI._prepare_patterns", fake_prepare_patterns)
+class TestRushNesting(unittest.TestCase):
+    """Tests for process_order anytime nesting options."""
+
+    def setUp(self):
+        from samedaysuits_api import SameDaySuitsAPI
+
+        self._tmp = tempfile.TemporaryDirectory()
+        self.api = SameDaySuitsAPI(output_dir=Path(self._tmp.name))
+        self.calls = []
+
+    def tearDown(self):
+        self._tmp.cleanup()
+
+    def recording_nest(self, contours, fabric_width, material=None, **options):
+        self.calls.append(options)
+        return fast_nest(contours, fabric_width, material)
+
+    def test_rush_uses_good_enough_target(self, _status):
+        import samedaysuits_api
+
+        with patch("samedaysuits_api.nest_contours", self.recording_nest):
+            normal = self.api.process_order(make_order("SDS-20260202-0001-A"))
+            rush = self.api.process_order(make_order("SDS-20260202-0002-A"), rush=True)
+            custom = self.api.process_order(
+                make_order("SDS-20260202-0003-A"),
+                rush=True,
+                target_utilization=55.0,
+            )
+
+        self.assertTrue(normal.success and rush.success and custom.success)
+        self.assertEqual(self.calls[0], {})
+        self.assertEqual(
+            self.calls[1],
+            {
+                "target_utilization": samedaysuits_api.RUSH_TARGET_UTILIZATION,
+                "timeout_seconds": samedaysuits_api.RUSH_NESTING_DEADLINE_SECONDS,
+            },
+        )
+        self.assertEqual(self.calls[2]["target_utilization"], 55.0)
+
+    def test_anytime_summary_in_metadata(self, _status):
+        result = self.api.process_order(
+            make_order("SDS-20260202-0001-A"),
+            target_utilization=1.0,
+            nesting_deadline_seconds=30,
+        )
+
+        self.assertTrue(result.success)
+        metadata = json.loads(result.metadata_file.read_text())
+        self.assertEqual(
+            metadata["production"]["anytime_nesting"]["stop_reason"], "target"
+        )
+
+
+if __name__ == "__main__":
+    unittest.main(verbosity=2)
@@ -0,0 +1,1793 @@
+#!/usr/bin/env python3
+"""
+Nesting Engine Tests
+
+Tests for the nesting package (src/nesting):
+1. Master nesting portfolio (parallel runner with shared deadline)
+2. UltimateNester batched candidate engine
+3. Persistent cross-order NFP cache
+4. TurboNester raster collision engine
+5. HybridNester incremental placement index
+6. Parallel, seedable GA population evaluator
+7. Benchmark suite and baseline regression check
+8. Anytime nesting (progressive results, cancellation, good-enough stop)
+9. Array-backed ContourArray contours
+10. Whole-result nesting cache (replay, warm start, LRU eviction)
+11. Pre-nesting contour simplification
+12. Array-backed skyline and guillotine engines
+13. Shared per-piece rotation tables (grain constraints)
+14. Piece-pair clustering before nesting
+15. Integer NumPy geometry kernel for the NFP nester
+16. Nesting profiler hooks (phase timers, counters, captures)
+17. Hole and concavity filling after nesting
+
+Run with:
+    python tests/test_nesting.py
+"""
+
+import os
+import subprocess
+import sys
+import tempfile
+import time
+import unittest
+from itertools import combinations
+from pathlib import Path
+from unittest.mock import patch
+
+# Add src to path
+sys.path.insert(0, str(Path(__file__).parent.parent / "src"))
+sys.path.insert(0, str(Path(__file__).parent.parent / "src" / "nesting"))
+
+# Bind the src/nesting engines now: test modules collected later put the
+# project root first on sys.path, where older flat copies of these live.
+import nesting_engine  # noqa: E402,F401
+import improved_nesting  # noqa: E402,F401
+import master_nesting  # noqa: E402,F401
+import hybrid_nesting  # noqa: E402,F401
+import turbo_nesting  # noqa: E402,F401
+
+
+def make_rect(width: float, height: float):
+    """Axis-aligned rectangle piece as a Point list."""
+    from nesting_engine import Point
+
+    return [Point(0, 0), Point(width, 0), Point(width, height), Point(0, height)]
+
+
+def sample_pieces():
+    """Small mixed set of rectangular pieces."""
+    return [
+        make_rect(50, 80),
+        make_rect(40, 60),
+        make_rect(30, 40),
+        make_rect(60, 30),
+        make_rect(25, 70),
+    ]
+
+
+class TestMasterNestPortfolio(unittest.TestCase):
+    """Tests for master_nest portfolio mode."""
+
+    @classmethod
+    def setUpClass(cls):
+        from master_nesting import master_nest, portfolio_nest, available_algorithms
+
+        cls.master_nest = staticmethod(master_nest)
+        cls.portfolio_nest = staticmethod(portfolio_nest)
+        cls.available_algorithms = staticmethod(available_algorithms)
+
+    def test_portfolio_reports_every_algorithm(self):
+        """Every algorithm gets a status and the fast ones a wall time."""
+        result = self.master_nest(sample_pieces(), timeout_seconds=4)
+
+        self.assertTrue(result.success)
+        portfolio = result.metadata["portfolio"]
+        self.assertEqual(portfolio["mode"], "parallel")
+        self.assertEqual(
+            sorted(portfolio["algorithms"]), sorted(self.available_algorithms())
+        )
+
+        for name in ("shelf", "guillotine", "skyline"):
+            run = portfolio["algorithms"][name]
+            self.assertEqual(run["status"], "ok")
+            self.assertIsNotNone(run["wall_time_s"])
+            self.assertGreater(run["utilization"], 0)
+
+        self.assertIn(portfolio["winner"], result.message)
+
+    def test_shared_deadline_bounds_wall_time(self):
+        """The whole portfolio returns close to the shared deadline."""
+        start = time.time()
+        self.master_nest(sample_pieces(), timeout_seconds=3)
+        self.assertLess(time.time() - start, 6)
+
+    def test_stops_early_at_target(self):
+        """Reaching the target utilization ends the run without waiting."""
+        start = time.time()
+        result = self.master_nest(
+            sample_pieces(), timeout_seconds=30, target_utilization=1.0
+        )
+        elapsed = time.time() - start
+
+        self.assertLess(elapsed, 10)
+        portfolio = result.metadata["portfolio"]
+        self.assertTrue(portfolio["stopped_early"])
+        statuses = {run["status"] for run in portfolio["algorithms"].values()}
+        self.assertIn("cancelled", statuses)
+
+    def test_algorithm_subset(self):
+        """portfolio_nest can run a subset of algorithms."""
+        result = self.portfolio_nest(
+            sample_pieces(), timeout_seconds=5, algorithms=["shelf", "skyline"]
+        )
+        self.assertEqual(
+            sorted(result.metadata["portfolio"]["algorithms"]), ["shelf", "skyline"]
+        )
+        self.assertEqual(len(result.pieces), 5)
+
+    def test_sequential_mode_records_timings(self):
+        """Sequential fallback still reports per-algorithm timings."""
+        result = self.master_nest(sample_pieces(), timeout_seconds=5, parallel=False)
+
+        portfolio = result.metadata["portfolio"]
+        self.assertEqual(portfolio["mode"], "sequential")
+        self.assertEqual(portfolio["algorithms"]["shelf"]["status"], "ok")
+
+    def test_seed_is_a_starting_point(self):
+        """A warm-start seed competes with the algorithms and starts hybrid."""
+        from improved_nesting import skyline_nest
+
+        pieces = sample_pieces()
+        seed = skyline_nest(pieces, fabric_width=157.48, gap=0.5)
+        for parallel in (True, False):
+            result = self.master_nest(
+                pieces,
+                timeout_seconds=8,
+                parallel=parallel,
+                algorithms=["shelf", "hybrid"],
+                seed=seed,
+            )
+            runs = result.metadata["portfolio"]["algorithms"]
+            self.assertEqual(runs["warm_start"]["status"], "ok")
+            self.assertEqual(runs["hybrid"]["status"], "ok")
+            self.assertGreaterEqual(result.utilization, seed.utilization)
+            self.assertEqual(len(result.pieces), len(pieces))
+
+    def test_empty_input(self):
+        """No pieces returns an empty successful result."""
+        result = self.master_nest([])
+        self.assertTrue(result.success)
+        self.assertEqual(result.pieces, [])
+
+
+class TestUltimateBatchedEngine(unittest.TestCase):
+    """Tests for the vectorized NFP candidate engine in UltimateNester."""
+
+    @classmethod
+    def setUpClass(cls):
+        try:
+            import ultimate_nesting
+        except ImportError as e:
+            raise unittest.SkipTest(f"ultimate_nesting unavailable: {e}")
+
+        cls.un = ultimate_nesting
+        cls.pieces = [
+            ultimate_nesting.Piece(
+                i, points, ultimate_nesting.points_to_shapely(points)
+            )
+            for i, points in enumerate(sample_pieces())
+        ]
+
+    def _nest(self, engine):
+        from nfp_cache import NFPCache
+
+        nester = self.un.UltimateNester(
+            engine=engine, nfp_store=NFPCache(persistent=False)
+        )
+        return nester.nest_greedy(self.pieces)
+
+    def test_batched_layout_is_valid(self):
+        """Batched placements stay on the fabric and never overlap."""
+        placements, length = self._nest(self.un.ENGINE_BATCHED)
+
+        self.assertEqual(len(placements), len(self.pieces))
+        for placement in placements:
+            minx, miny, maxx, _ = placement.polygon.bounds
+            self.assertGreaterEqual(minx, -0.01)
+            self.assertGreaterEqual(miny, -0.01)
+            self.assertLessEqual(maxx, self.un.CUTTER_WIDTH_CM + 0.01)
+
+        for a, b in combinations(placements, 2):
+            self.assertFalse(
+                a.polygon.buffer(-0.1).intersects(b.polygon.buffer(-0.1)),
+                f"pieces {a.piece_id} and {b.piece_id} overlap",
+            )
+
+    def test_batched_no_longer_than_exact(self):
+        """The batched engine does not lose marker length on simple shapes."""
+        _, batched_length = self._nest(self.un.ENGINE_BATCHED)
+        _, exact_length = self._nest(self.un.ENGINE_EXACT)
+        self.assertLessEqual(batched_length, exact_length + 1.0)
+
+    def test_unknown_engine_rejected(self):
+        """Invalid engine names fail fast."""
+        with self.assertRaises(ValueError):
+            self.un.UltimateNester(engine="bogus")
+
+
+class TestNFPCache(unittest.TestCase):
+    """Tests for the geometry-hashed NFP cache."""
+
+    @classmethod
+    def setUpClass(cls):
+        try:
+            import ultimate_nesting
+            from nfp_cache import NFPCache
+        except ImportError as e:
+            raise unittest.SkipTest(f"nfp_cache unavailable: {e}")
+
+        cls.un = ultimate_nesting
+        cls.NFPCache = NFPCache
+
+    def setUp(self):
+        self.tmpdir = tempfile.TemporaryDirectory()
+        self.db_path = Path(self.tmpdir.name) / "nfp.sqlite3"
+        self.calls = 0
+
+    def tearDown(self):
+        self.tmpdir.cleanup()
+
+    def _compute(self, fixed, orbiting, gap):
+        self.calls += 1
+        return self.un.calculate_nfp(fixed, orbiting, gap)
+
+    def _square_and_l(self):
+        from shapely.geometry import Polygon
+
+        square = Polygon([(0, 0), (20, 0), (20, 20), (0, 20)])
+        l_shape = Polygon([(0, 0), (30, 0), (30, 10), (10, 10), (10, 25), (0, 25)])
+        return square, l_shape
+
+    def test_memory_hit_and_counters(self):
+        """Second lookup is served from memory and counted."""
+        cache = self.NFPCache(self.db_path)
+        square, l_shape = self._square_and_l()
+
+        first = cache.get_or_compute(square, l_shape, 0.5, self._compute)
+        second = cache.get_or_compute(square, l_shape, 0.5, self._compute)
+
+        self.assertEqual(self.calls, 1)
+        self.assertTrue(first.equals(second))
+        stats = cache.get_stats()
+        self.assertEqual(stats["misses"], 1)
+        self.assertEqual(stats["memory_hits"], 1)
+        self.assertEqual(stats["hit_rate_percent"], 50.0)
+        cache.close()
+
+    def test_disk_tier_shared_between_instances(self):
+        """A fresh cache (another worker) finds NFPs written to SQLite."""
+        square, l_shape = self._square_and_l()
+
+        writer = self.NFPCache(self.db_path)
+        writer.get_or_compute(square, l_shape, 0.5, self._compute)
+        writer.close()
+
+        reader = self.NFPCache(self.db_path)
+        reader.get_or_compute(square, l_shape, 0.5, self._compute)
+
+        self.assertEqual(self.calls, 1)
+        self.assertEqual(reader.get_stats()["disk_hits"], 1)
+        self.assertEqual(reader.get_stats()["disk_entries"], 1)
+        reader.close()
+
+    def test_key_ignores_position_and_vertex_order(self):
+        """Translated or re-started polygons hit and get a shifted NFP."""
+        from shapely.affinity import translate
+        from shapely.geometry import Polygon
+
+        cache = self.NFPCache(persistent=False)
+        square, l_shape = self._square_and_l()
+        base = cache.get_or_compute(square, l_shape, 0.5, self._compute)
+
+        moved_square = translate(square, 100, 40)
+        restarted_l = Polygon(
+            list(l_shape.exterior.coords)[2:-1] + list(l_shape.exterior.coords)[:2]
+        )
+        moved_l = translate(restarted_l, 7, 3)
+
+        shifted = cache.get_or_compute(moved_square, moved_l, 0.5, self._compute)
+
+        self.assertEqual(self.calls, 1)
+        expected = translate(base, 100 - 7, 40 - 3)
+        self.assertLess(shifted.symmetric_difference(expected).area, 1e-6)
+
+    def test_gap_is_part_of_key(self):
+        """Different gaps never share an NFP."""
+        cache = self.NFPCache(persistent=False)
+        square, l_shape = self._square_and_l()
+
+        cache.get_or_compute(square, l_shape, 0.5, self._compute)
+        cache.get_or_compute(square, l_shape, 1.0, self._compute)
+
+        self.assertEqual(self.calls, 2)
+
+    def test_nester_reuses_nfps_across_orders(self):
+        """A second order with the same pieces computes no new NFPs."""
+        cache = self.NFPCache(self.db_path)
+        pieces = [
+            self.un.Piece(i, points, self.un.points_to_shapely(points))
+            for i, points in enumerate(sample_pieces())
+        ]
+
+        _, first_length = self.un.UltimateNester(nfp_store=cache).nest_greedy(pieces)
+        misses = cache.get_stats()["misses"]
+        _, second_length = self.un.UltimateNester(nfp_store=cache).nest_greedy(pieces)
+
+        self.assertEqual(cache.get_stats()["misses"], misses)
+        self.assertGreater(cache.get_stats()["hits"], 0)
+        self.assertAlmostEqual(first_length, second_length)
+        cache.close()
+
+
+class TestTurboRasterEngine(unittest.TestCase):
+    """Tests for the occupancy-grid collision engine in TurboNester."""
+
+    @classmethod
+    def setUpClass(cls):
+        try:
+            import turbo_nesting
+        except ImportError as e:
+            raise unittest.SkipTest(f"turbo_nesting unavailable: {e}")
+
+        cls.tn = turbo_nesting
+        cls.pieces = [
+            turbo_nesting.Piece(i, points, turbo_nesting.points_to_shapely(points))
+            for i, points in enumerate(sample_pieces())
+        ]
+
+    def test_raster_layout_keeps_gap(self):
+        """Raster placements stay on the fabric and keep the cutting gap."""
+        nester = self.tn.TurboNester()
+        placements, length = nester.nest_greedy(
+            self.pieces, engine=self.tn.ENGINE_RASTER
+        )
+
+        self.assertEqual(len(placements), len(self.pieces))
+        self.assertEqual(nester.raster_fallbacks, 0)
+        for placement in placements:
+            minx, miny, maxx, _ = placement.polygon.bounds
+            self.assertGreaterEqual(minx, 0)
+            self.assertGreaterEqual(miny, 0)
+            self.assertLessEqual(maxx, nester.fabric_width)
+
+        for a, b in combinations(placements, 2):
+            self.assertGreaterEqual(
+                a.polygon.distance(b.polygon),
+                nester.gap - self.tn.RASTER_VERIFY_TOLERANCE,
+                f"pieces {a.piece_id} and {b.piece_id} closer than the gap",
+            )
+
+    def test_mask_covers_every_touched_cell(self):
+        """The inflated mask includes every cell the shape touches."""
+        from shapely.geometry import Polygon, box
+
+        triangle = Polygon([(0, 0), (3.3, 0), (0, 2.7)])
+        resolution = 0.5
+        mask = self.tn.rasterize_piece(triangle, resolution, resolution * 0.7072)
+
+        for col in range(mask.width):
+            local_col = col - mask.margin
+            for row in range(-mask.margin, 10):
+                cell = box(
+                    local_col * resolution,
+                    row * resolution,
+                    (local_col + 1) * resolution,
+                    (row + 1) * resolution,
+                )
+                if cell.intersection(triangle).area > 0:
+                    self.assertTrue(mask.bottom[col] <= row < mask.top[col])
+
+    def test_engine_selectable_per_call(self):
+        """nest() honours a per-call engine and records it."""
+        nester = self.tn.TurboNester()
+        contours = sample_pieces()
+
+        result = nester.nest(
+            contours, engine=self.tn.ENGINE_RASTER, timeout_seconds=0.5
+        )
+
+        self.assertTrue(result.success)
+        self.assertEqual(result.metadata["engine"], self.tn.ENGINE_RASTER)
+        self.assertEqual(len(result.pieces), len(contours))
+        self.assertEqual(nester.engine, self.tn.ENGINE_EXACT)
+
+    def test_unknown_engine_rejected(self):
+        """Invalid engine names fail fast."""
+        with self.assertRaises(ValueError):
+            self.tn.TurboNester(engine="bogus")
+        with self.assertRaises(ValueError):
+            self.tn.TurboNester().nest_greedy(self.pieces, engine="bogus")
+
+
+class TestHybridPlacementIndex(unittest.TestCase):
+    """Tests for the incremental collision index used by HybridNester."""
+
+    @classmethod
+    def setUpClass(cls):
+        try:
+            import hybrid_nesting
+        except ImportError as e:
+            raise unittest.SkipTest(f"hybrid_nesting unavailable: {e}")
+
+        cls.hn = hybrid_nesting
+
+    def _square(self, x, y, size=10):
+        from shapely.geometry import box
+
+        return box(x, y, x + size, y + size)
+
+    def test_collides_respects_gap_and_exclude(self):
+        """Gap-buffered geometry is kept and a slot can be excluded."""
+        index = self.hn.PlacementIndex(gap=1.0)
+        index.add(self._square(0, 0))
+        index.add(self._square(50, 0))
+
+        self.assertTrue(index.collides(self._square(10.2, 0)))
+        self.assertFalse(index.collides(self._square(11.2, 0)))
+        self.assertFalse(index.collides(self._square(5, 5), exclude=0))
+
+    def test_move_updates_bounds(self):
+        """Moving a piece frees its old area."""
+        index = self.hn.PlacementIndex(gap=0.5)
+        index.add(self._square(0, 0))
+        index.move(0, self._square(100, 100))
+
+        self.assertFalse(index.collides(self._square(0, 0)))
+        self.assertTrue(index.collides(self._square(101, 101)))
+
+    def test_counts_avoided_tests(self):
+        """Far-away pieces are rejected by bounds without exact tests."""
+        index = self.hn.PlacementIndex.from_polygons(
+            [self._square(i * 20, 0) for i in range(8)], gap=0.5
+        )
+        index.collides(self._square(0, 50))
+
+        stats = index.get_stats()
+        self.assertEqual(stats["queries"], 1)
+        self.assertEqual(stats["exact_tests"], 0)
+        self.assertEqual(stats["tests_avoided"], 8)
+        self.assertEqual(stats["avoided_percent"], 100.0)
+
+    def test_layout_matches_unindexed_sliding(self):
+        """Indexed nesting places pieces where a fresh index per call does."""
+        nester = self.hn.HybridNester()
+        pieces = [
+            self.hn.Piece(i, points, self.hn.points_to_shapely(points))
+            for i, points in enumerate(sample_pieces())
+        ]
+        order = list(range(len(pieces)))
+        rotations = [0] * len(pieces)
+
+        placements, length = nester.nest_with_order(pieces, order, rotations)
+
+        # Rebuild the same layout one piece at a time without a shared index
+        reference = []
+        for placement in placements:
+            pos = nester.find_position_with_sliding(
+                pieces[placement.piece_id], placement.rotation, reference
+            )
+            self.assertEqual(pos, (placement.x, placement.y))
+            reference.append(placement)
+
+        self.assertGreater(nester.index_stats["tests_avoided"], 0)
+        self.assertAlmostEqual(length, max(p.y + p.height for p in placements))
+
+
+def sum_of_order_fitness(order, rotations):
+    """Cheap picklable fitness used by the evaluator tests."""
+    return float(sum(i * pos for pos, i in enumerate(order)) + rotations.count(90))
+
+
+class TestGeneticOptimizer(unittest.TestCase):
+    """Tests for the shared GA population evaluator and annealing phase."""
+
+    @classmethod
+    def setUpClass(cls):
+        try:
+            import genetic_optimizer
+            import ultimate_nesting
+            from nfp_cache import NFPCache
+        except ImportError as e:
+            raise unittest.SkipTest(f"genetic_optimizer unavailable: {e}")
+
+        cls.go = genetic_optimizer
+        cls.un = ultimate_nesting
+        cls.NFPCache = NFPCache
+        cls.pieces = [
+            ultimate_nesting.Piece(
+                i, points, ultimate_nesting.points_to_shapely(points)
+            )
+            for i, points in enumerate(sample_pieces())
+        ]
+
+    def test_evaluator_memoizes_individuals(self):
+        """Repeated (order, rotations) pairs are scored once."""
+        calls = []
+
+        def fitness(order, rotations):
+            calls.append(order)
+            return sum_of_order_fitness(order, rotations)
+
+        with self.go.PopulationEvaluator(fitness, workers=1) as evaluator:
+            population = [([0, 1, 2], [0, 0, 0]), ([2, 1, 0], [90, 0, 0])]
+            first = evaluator.evaluate(population + [population[0]])
+            second = evaluator.evaluate(population)
+
+        self.assertEqual(len(calls), 2)
+        self.assertEqual(first[:2], second)
+        self.assertEqual(evaluator.get_stats()["cache_hits"], 3)
+
+    def test_parallel_matches_serial(self):
+        """Pool evaluation returns the same scores in population order."""
+        population = [
+            ([i, (i + 1) % 4, (i + 2) % 4, (i + 3) % 4], [90] * 4) for i in range(4)
+        ]
+        expected = [sum_of_order_fitness(*ind) for ind in population]
+
+        with self.go.PopulationEvaluator(sum_of_order_fitness, workers=2) as evaluator:
+            self.assertEqual(evaluator.evaluate(population), expected)
+
+    def test_seeded_run_is_reproducible(self):
+        """Same seed gives the same layout; progress is reported per generation."""
+        store = self.NFPCache(persistent=False)
+        runs = []
+        for workers in (1, 2):
+            progress = []
+            nester = self.un.UltimateNester(nfp_store=store)
+            placements, length, util = nester.optimize_genetic(
+                self.pieces,
+                population_size=6,
+                generations=3,
+                seed=42,
+                workers=workers,
+                anneal_iterations=2,
+                progress_callback=progress.append,
+            )
+            runs.append(
+                (length, util, [(p.piece_id, p.x, p.y, p.rotation) for p in placements])
+            )
+
+            phases = [p.phase for p in progress]
+            self.assertIn("genetic", phases)
+            self.assertEqual(progress[-1].best_fitness, util)
+            self.assertGreater(nester.optimizer_stats["cache_hits"], 0)
+
+        self.assertEqual(runs[0], runs[1])
+
+    def test_anneal_never_worsens(self):
+        """Annealing returns the best individual seen, not the last one."""
+        import random
+
+        start = self.go.make_individual([3, 2, 1, 0], [0, 0, 0, 0])
+        start_fitness = sum_of_order_fitness(*start)
+
+        with self.go.PopulationEvaluator(sum_of_order_fitness, workers=1) as evaluator:
+            best, fitness = self.go.anneal(
+                start,
+                start_fitness,
+                evaluator,
+                random.Random(0),
+                self.go.swap_or_rotate_neighbour([0, 90]),
+                iterations=20,
+            )
+
+        self.assertGreaterEqual(fitness, start_fitness)
+        self.assertEqual(fitness, sum_of_order_fitness(*best))
+
+
+class TestNestingBenchmark(unittest.TestCase):
+    """Tests for the nesting benchmark suite."""
+
+    def setUp(self):
+        import nesting_benchmark
+
+        self.nb = nesting_benchmark
+        self.case = nesting_benchmark.BenchmarkCase(
+            name="rects@1.00",
+            template="rects",
+            scale=1.0,
+            contour_groups=sample_pieces(),
+        )
+
+    def test_corpus_scales_templates(self):
+        corpus = self.nb.build_corpus(scales=(1.0, 1.1), templates=["tee"])
+
+        self.assertEqual([c.name for c in corpus], ["tee@1.00", "tee@1.10"])
+        self.assertEqual(corpus[0].piece_count, corpus[1].piece_count)
+        self.assertAlmostEqual(
+            corpus[1].piece_area_cm2 / corpus[0].piece_area_cm2, 1.21, places=3
+        )
+
+    def test_report_records_metrics(self):
+        report = self.nb.run_benchmark(
+            [self.case], engines=["shelf", "skyline"], isolate=False
+        )
+
+        self.assertEqual(len(report["results"]), 2)
+        for run in report["results"]:
+            self.assertEqual(run["status"], "ok")
+            self.assertEqual(run["pieces_placed"], self.case.piece_count)
+            for metric in (
+                "wall_time_s",
+                "peak_memory_mb",
+                "utilization",
+                "fabric_length_cm",
+            ):
+                self.assertIn(metric, run)
+
+        with tempfile.TemporaryDirectory() as tmp:
+            path = Path(tmp) / "bench.json"
+            self.nb.save_report(report, path)
+            self.assertEqual(self.nb.load_report(path)["results"], report["results"])
+
+    def test_isolated_run_matches_in_process(self):
+        isolated = self.nb.run_engine_case("skyline", self.case, isolate=True)
+        in_process = self.nb.run_engine_case("skyline", self.case, isolate=False)
+
+        self.assertEqual(isolated["status"], "ok")
+        self.assertEqual(isolated["fabric_length_cm"], in_process["fabric_length_cm"])
+
+    def test_unknown_engine_rejected(self):
+        with self.assertRaises(ValueError):
+            self.nb.run_benchmark([self.case], engines=["nope"], isolate=False)
+
+    def test_regressions_flagged(self):
+        def run(engine, **metrics):
+            record = {
+                "engine": engine,
+                "case": "rects@1.00",
+                "status": "ok",
+                "wall_time_s": 1.0,
+                "peak_memory_mb": 50.0,
+                "utilization": 80.0,
+                "fabric_length_cm": 100.0,
+            }
+            record.update(metrics)
+            return record
+
+        baseline = {
+            "results": [run("shelf"), run("skyline"), run("turbo"), run("hybrid")]
+        }
+        report = {
+            "results": [
+                run("shelf", wall_time_s=1.1, peak_memory_mb=52.0),  # noise
+                run("skyline", wall_time_s=2.0, utilization=78.0),
+                run("turbo", status="timeout"),
+                run("new-engine"),
+            ]
+        }
+        regressions = self.nb.compare_to_baseline(report, baseline)
+
+        self.assertEqual(
+            sorted((r.engine, r.metric) for r in regressions),
+            [
+                ("skyline", "utilization"),
+                ("skyline", "wall_time_s"),
+                ("turbo", "status"),
+            ],
+        )
+        slower = next(r for r in regressions if r.metric == "wall_time_s")
+        self.assertEqual(slower.change_percent, 100.0)
+
+    def test_simplified_runs_report_time_saved(self):
+        blobs = self.nb.BenchmarkCase(
+            name="blobs@1.00",
+            template="blobs",
+            scale=1.0,
+            contour_groups=[make_blob(20), make_blob(12, lobes=5)],
+        )
+        baseline = self.nb.run_benchmark([blobs], engines=["shelf"], isolate=False)
+        report = self.nb.run_benchmark(
+            [blobs], engines=["shelf"], isolate=False, simplify_tolerance=0.1
+        )
+
+        run = report["results"][0]
+        self.assertEqual(run["status"], "ok")
+        self.assertEqual(run["vertices"], 240)
+        self.assertLess(run["vertices_nested"], 120)
+        self.assertEqual(report["config"]["simplify_tolerance_cm"], 0.1)
+
+        saved = self.nb.time_saved(report, baseline)
+        self.assertEqual(saved["runs"], 1)
+        self.assertAlmostEqual(
+            saved["saved_s"], saved["baseline_s"] - saved["current_s"], places=3
+        )
+
+
+class TestAnytimeNesting(unittest.TestCase):
+    """Tests for anytime nesting and cancellation tokens."""
+
+    def test_token_deadline_and_parent(self):
+        from nesting_engine import CancellationToken
+
+        parent = CancellationToken()
+        child = CancellationToken(parent=parent)
+        self.assertFalse(child.cancelled)
+        self.assertIsNone(child.reason)
+
+        parent.cancel("rush")
+        self.assertTrue(child.cancelled)
+        self.assertEqual(child.reason, "rush")
+
+        expired = CancellationToken.with_timeout(0)
+        self.assertTrue(expired.cancelled)
+        self.assertEqual(expired.reason, "deadline")
+        self.assertEqual(expired.remaining(), 0.0)
+
+    def test_yields_only_improvements(self):
+        from master_nesting import anytime_nest
+
+        results = list(
+            anytime_nest(
+                sample_pieces(),
+                fabric_width=100,
+                algorithms=["shelf", "guillotine", "skyline"],
+            )
+        )
+
+        self.assertGreater(len(results), 0)
+        utils = [r.utilization for r in results]
+        self.assertEqual(utils, sorted(set(utils)))
+        self.assertEqual(
+            [r.metadata["anytime"]["improvement"] for r in results],
+            list(range(1, len(results) + 1)),
+        )
+
+    def test_stops_at_good_enough_layout(self):
+        from master_nesting import nest_until
+
+        seen = []
+        start = time.time()
+        result = nest_until(
+            sample_pieces(),
+            fabric_width=100,
+            timeout_seconds=30,
+            target_utilization=1.0,
+            on_improvement=seen.append,
+            algorithms=["shelf", "hybrid"],
+        )
+
+        self.assertLess(time.time() - start, 5)
+        self.assertTrue(result.success)
+        self.assertEqual(result.metadata["anytime"]["stop_reason"], "target")
+        self.assertEqual(result.metadata["anytime"]["algorithm"], "shelf")
+        self.assertEqual(seen, [result])
+
+    def test_default_deadline_and_process_pool(self):
+        from master_nesting import _can_use_process_pool, nest_until
+
+        start = time.time()
+        with patch("master_nesting.DEFAULT_TIMEOUT_SECONDS", 2):
+            result = nest_until(
+                sample_pieces(),
+                fabric_width=100,
+                timeout_seconds=None,
+                target_utilization=101,
+                algorithms=["shelf", "hybrid"],
+            )
+
+        self.assertLess(time.time() - start, 10)
+        self.assertTrue(result.success)
+        anytime = result.metadata["anytime"]
+        self.assertEqual(anytime["timeout_seconds"], 2)
+        self.assertIn(anytime["stop_reason"], ("deadline", "exhausted"))
+        mode = "parallel" if _can_use_process_pool() else "sequential"
+        self.assertEqual(anytime["mode"], mode)
+
+    def test_cancelled_before_start(self):
+        from master_nesting import nest_until
+        from nesting_engine import CancellationToken
+
+        token = CancellationToken()
+        token.cancel()
+        result = nest_until(sample_pieces(), fabric_width=100, cancel_token=token)
+
+        self.assertFalse(result.success)
+        self.assertEqual(result.metadata["anytime"]["stop_reason"], "cancelled")
+
+    def test_hybrid_returns_best_so_far_on_cancel(self):
+        from hybrid_nesting import hybrid_nest
+        from nesting_engine import CancellationToken
+
+        token = CancellationToken()
+        improvements = []
+
+        def on_improvement(result):
+            improvements.append(result)
+            token.cancel()
+
+        start = time.time()
+        result = hybrid_nest(
+            sample_pieces(),
+            fabric_width=100,
+            timeout_seconds=30,
+            cancel_token=token,
+            on_improvement=on_improvement,
+        )
+
+        self.assertLess(time.time() - start, 5)
+        self.assertEqual(len(improvements), 1)
+        self.assertEqual(result.utilization, improvements[0].utilization)
+        self.assertEqual(len(result.pieces), len(sample_pieces()))
+
+
+class TestContourArray(unittest.TestCase):
+    """Tests for ContourArray and its use by the nesting engines."""
+
+    def test_transforms_match_point_helpers(self):
+        """rotate_points / normalize_to_origin give the same coordinates."""
+        from contour_array import ContourArray
+        from nesting_engine import Point, rotate_points, normalize_to_origin
+
+        points = [Point(0, 0), Point(40, 5), Point(35, 60), Point(-5, 30)]
+        contour = ContourArray.from_points(points)
+
+        for angle in (0, 45, 90, 180, 270):
+            expected = normalize_to_origin(rotate_points(points, angle))
+            actual = normalize_to_origin(rotate_points(contour, angle))
+            self.assertIsInstance(actual, ContourArray)
+            for p, q in zip(expected, actual):
+                self.assertAlmostEqual(p.x, q.x)
+                self.assertAlmostEqual(p.y, q.y)
+
+    def test_adapters_round_trip(self):
+        """Point lists, Shapely polygons and SVG strings convert losslessly."""
+        from contour_array import ContourArray, parse_svg_points
+        from nesting_engine import Point
+        from hybrid_nesting import points_to_shapely, shapely_to_points
+
+        contour = ContourArray(
+            parse_svg_points("0,0 10,0 extra 10,5 0,5"), fill_color="#ff0000"
+        )
+        self.assertEqual(contour.bounds, (0.0, 0.0, 10.0, 5.0))
+        self.assertAlmostEqual(contour.area, 50.0)
+
+        polygon = points_to_shapely(contour)
+        self.assertAlmostEqual(polygon.area, 50.0)
+        back = shapely_to_points(polygon, like=contour)
+        self.assertIsInstance(back, ContourArray)
+        self.assertEqual(back.fill_color, "#ff0000")
+        self.assertEqual(list(back), list(contour))
+
+        legacy = contour.to_points(Point)
+        self.assertIsInstance(legacy[0], Point)
+        self.assertEqual(list(ContourArray.from_points(legacy)), list(contour))
+
+    def test_nesters_accept_arrays(self):
+        """Shelf and hybrid nesters place ContourArray pieces like point lists."""
+        from contour_array import ContourArray
+        from nesting_engine import nest_bottom_left_fill
+        from hybrid_nesting import hybrid_nest
+
+        arrays = [ContourArray.from_points(p) for p in sample_pieces()]
+
+        legacy = nest_bottom_left_fill(sample_pieces(), fabric_width=100)
+        result = nest_bottom_left_fill(arrays, fabric_width=100)
+        self.assertAlmostEqual(result.fabric_length, legacy.fabric_length)
+        self.assertIsInstance(result.pieces[0].transformed_points, ContourArray)
+
+        result = hybrid_nest(arrays, fabric_width=100, timeout_seconds=2)
+        self.assertEqual(len(result.pieces), len(arrays))
+        for piece in result.pieces:
+            self.assertIsInstance(piece.transformed_points, ContourArray)
+            self.assertAlmostEqual(
+                piece.transformed_points.area, arrays[piece.piece_id].area, places=3
+            )
+
+    def test_core_imports_with_only_core_on_path(self):
+        """Service entry points put only the project root and src/core on sys.path."""
+        root = Path(__file__).resolve().parent.parent
+        script = (
+            "import sys\n"
+            f"sys.path[:0] = [{str(root / 'src' / 'core')!r}, {str(root)!r}]\n"
+            "import samedaysuits_api, contour_array, nesting_engine\n"
+            "print(contour_array.__file__)\n"
+            "print(nesting_engine.__file__)\n"
+        )
+        with tempfile.TemporaryDirectory() as tmp:
+            done = subprocess.run(
+                [sys.executable, "-I", "-c", script],
+                cwd=tmp,
+                capture_output=True,
+                text=True,
+                timeout=120,
+            )
+
+        self.assertEqual(done.returncode, 0, done.stderr)
+        nesting_dir = str(root / "src" / "nesting")
+        for module_file in done.stdout.split():
+            self.assertEqual(str(Path(module_file).parent), nesting_dir)
+
+
+def scaled_pieces(scale_x: float, scale_y: float):
+    """sample_pieces() scaled per axis."""
+    return [make_rect(w * scale_x, h * scale_y) for w, h in SAMPLE_SIZES]
+
+
+SAMPLE_SIZES = [(50, 80), (40, 60), (30, 40), (60, 30), (25, 70)]
+
+
+def placed_bounds(result):
+    """Final (x, y) bounding-box origin of every piece, by piece id."""
+    from contour_array import as_contour_array
+
+    bounds = {}
+    for piece in result.pieces:
+        min_x, min_y, _, _ = as_contour_array(piece.transformed_points).bounds
+        bounds[piece.piece_id] = (
+            round(min_x + piece.position[0], 6),
+            round(min_y + piece.position[1], 6),
+        )
+    return bounds
+
+
+class TestNestingCache(unittest.TestCase):
+    """Tests for the whole-result nesting cache."""
+
+    def setUp(self):
+        from nesting_cache import NestingCache
+
+        self._tmp = tempfile.TemporaryDirectory()
+        self.cache = NestingCache(
+            path=Path(self._tmp.name) / "layouts.sqlite3", warm_start_delta=0.05
+        )
+        self.runs = 0
+        self.seeds = []
+
+    def tearDown(self):
+        self.cache.close()
+        self._tmp.cleanup()
+
+    def run_shelf(self, pieces, fabric_width=100):
+        from nesting_engine import nest_bottom_left_fill
+
+        def run(seed=None):
+            self.runs += 1
+            self.seeds.append(seed)
+            return nest_bottom_left_fill(pieces, fabric_width=fabric_width, gap=0.5)
+
+        return run
+
+    def test_hit_replays_layout(self):
+        """A repeated piece set (at any offset) replays the stored layout."""
+        from nesting_engine import Point
+        from nesting_cache import NestingCache
+
+        pieces = sample_pieces()
+        first = self.cache.nest(pieces, 100, 0.5, self.run_shelf(pieces))
+        self.assertEqual(first.metadata["nesting_cache"]["status"], "miss")
+
+        moved = [[Point(p.x + 7, p.y - 3) for p in piece] for piece in pieces]
+        fresh = NestingCache(path=self.cache.path)  # disk tier only
+        second = fresh.nest(moved, 100, 0.5, self.run_shelf(moved))
+        fresh.close()
+
+        self.assertEqual(self.runs, 1)
+        self.assertEqual(second.metadata["nesting_cache"]["status"], "hit")
+        self.assertEqual(placed_bounds(second), placed_bounds(first))
+        self.assertEqual(second.fabric_length, first.fabric_length)
+
+    def test_other_parameters_miss(self):
+        """Fabric width and gap are part of the key."""
+        pieces = sample_pieces()
+        self.cache.nest(pieces, 100, 0.5, self.run_shelf(pieces))
+
+        self.assertIsNone(self.cache.lookup(pieces, 120, 0.5))
+        self.assertIsNone(self.cache.lookup(pieces, 100, 1.0))
+        self.assertIsNotNone(self.cache.lookup(pieces, 100, 0.5))
+
+    def test_warm_start_from_nearby_scale(self):
+        """A slightly larger scale hands the scaled cached layout to the run."""
+        base = scaled_pieces(1.0, 1.0)
+        cached = self.cache.nest(base, 100, 0.5, self.run_shelf(base))
+
+        pieces = scaled_pieces(1.01, 1.02)
+        result = self.cache.nest(pieces, 100, 0.5, self.run_shelf(pieces))
+
+        self.assertEqual(self.runs, 2)
+        seed = self.seeds[-1]
+        self.assertAlmostEqual(seed.fabric_length, cached.fabric_length * 1.02)
+        self.assertEqual(len(seed.pieces), len(pieces))
+        info = result.metadata["nesting_cache"]
+        self.assertEqual(info["status"], "warm")
+        self.assertEqual(info["seed"], "scaled")
+        self.assertEqual(info["scale_ratio"], [1.01, 1.02])
+        self.assertEqual(info["seed_length"], seed.fabric_length)
+
+        # Only the run's layout is stored, never the unoptimized seed
+        stored = self.cache.lookup(pieces, 100, 0.5)
+        self.assertEqual(placed_bounds(stored), placed_bounds(result))
+        self.assertEqual(stored.fabric_length, result.fabric_length)
+
+        # Too far from any cached scale: nested without a seed
+        far = scaled_pieces(1.2, 1.2)
+        self.cache.nest(far, 100, 0.5, self.run_shelf(far))
+        self.assertEqual(self.runs, 3)
+        self.assertIsNone(self.seeds[-1])
+
+    def test_cache_is_opt_in(self):
+        """nest_contours only uses the cache when NESTING_CACHE_ENABLED is set."""
+        from nesting_cache import nesting_cache_enabled
+
+        with patch.dict(os.environ):
+            os.environ.pop("NESTING_CACHE_ENABLED", None)
+            self.assertFalse(nesting_cache_enabled())
+            os.environ["NESTING_CACHE_ENABLED"] = "1"
+            self.assertTrue(nesting_cache_enabled())
+
+    def test_partial_layouts_not_used_for_full_runs(self):
+        """Layouts from stopped-early runs only serve other anytime runs."""
+        pieces = sample_pieces()
+        self.cache.nest(pieces, 100, 0.5, self.run_shelf(pieces), complete=False)
+
+        self.assertIsNone(self.cache.lookup(pieces, 100, 0.5))
+        self.assertIsNotNone(self.cache.lookup(pieces, 100, 0.5, complete_only=False))
+
+    def test_lru_eviction(self):
+        """The disk tier keeps the most recently used layouts."""
+        from nesting_cache import NestingCache
+
+        cache = NestingCache(
+            path=Path(self._tmp.name) / "small.sqlite3",
+            max_entries=2,
+            warm_start_delta=0,
+        )
+        sets = [scaled_pieces(s, s) for s in (1.0, 1.5, 2.0)]
+        for pieces in sets:
+            cache.nest(pieces, 200, 0.5, self.run_shelf(pieces, 200))
+        cache.clear_memory()
+
+        self.assertEqual(cache.get_stats()["disk_entries"], 2)
+        self.assertEqual(cache.get_stats()["evictions"], 1)
+        self.assertIsNone(cache.lookup(sets[0], 200, 0.5))
+        self.assertIsNotNone(cache.lookup(sets[2], 200, 0.5))
+        cache.close()
+
+
+def make_blob(radius: float, count: int = 120, lobes: int = 3):
+    """Many-vertex wavy outline (a curved pattern piece stand-in)."""
+    import math
+
+    from nesting_engine import Point
+
+    points = []
+    for i in range(count):
+        angle = 2 * math.pi * i / count
+        r = radius * (1 + 0.15 * math.sin(lobes * angle))
+        points.append(Point(radius + r * math.cos(angle), radius + r * math.sin(angle)))
+    return points
+
+
+class TestContourSimplify(unittest.TestCase):
+    """Tests for contour_simplify hulls and restoring full contours."""
+
+    def test_hulls_cover_pieces_with_fewer_vertices(self):
+        """Hulls never shrink a piece and stay within the tolerance."""
+        from shapely.geometry import Polygon
+        from contour_simplify import simplify_pieces
+
+        pieces = [make_blob(20), make_blob(12, lobes=5), make_rect(30, 10)]
+        for method in ("dp", "vw"):
+            simplified = simplify_pieces(pieces, tolerance=0.1, method=method)
+
+            self.assertEqual(simplified.simplified_ids, [0, 1])
+            self.assertIs(simplified.hulls[2], pieces[2])
+            self.assertLess(simplified.vertices_after, simplified.vertices_before / 2)
+            for piece, hull in zip(pieces, simplified.hulls):
+                original = Polygon([(p.x, p.y) for p in piece])
+                outline = Polygon([(p.x, p.y) for p in hull])
+                self.assertTrue(outline.covers(original))
+                self.assertLessEqual(outline.hausdorff_distance(original), 0.2 + 1e-6)
+
+    def test_disabled_and_invalid_method(self):
+        """Tolerance 0 keeps every piece; unknown methods are rejected."""
+        from contour_simplify import simplify_pieces, simplify_tolerance
+
+        with patch.dict(os.environ):
+            os.environ.pop("NESTING_SIMPLIFY_TOLERANCE", None)
+            self.assertEqual(simplify_tolerance(), 0)
+
+        simplified = simplify_pieces([make_blob(10)], tolerance=0)
+        self.assertEqual(simplified.simplified_ids, [])
+        self.assertEqual(simplified.reduction_ratio, 1.0)
+
+        with self.assertRaises(ValueError):
+            simplify_pieces([make_blob(10)], tolerance=0.1, method="spline")
+
+    def test_restore_places_full_contours(self):
+        """Full-resolution pieces land where their hulls were nested."""
+        from shapely.geometry import Polygon
+        from contour_simplify import simplify_pieces
+        from hybrid_nesting import hybrid_nest
+
+        pieces = [
+            make_blob(20),
+            make_blob(15, lobes=4),
+            make_blob(10),
+            make_rect(40, 8),
+        ]
+        simplified = simplify_pieces(pieces, tolerance=0.1)
+        result = simplified.restore(
+            hybrid_nest(simplified.hulls, fabric_width=100, timeout_seconds=2)
+        )
+
+        self.assertEqual(result.metadata["simplification"]["pieces_simplified"], 3)
+        placed = {}
+        for piece in result.pieces:
+            self.assertIs(piece.original_points, pieces[piece.piece_id])
+            self.assertEqual(len(piece.transformed_points), len(pieces[piece.piece_id]))
+            polygon = Polygon(
+                [
+                    (p.x + piece.position[0], p.y + piece.position[1])
+                    for p in piece.transformed_points
+                ]
+            )
+            original = Polygon([(p.x, p.y) for p in pieces[piece.piece_id]])
+            self.assertAlmostEqual(polygon.area, original.area, places=6)
+            placed[piece.piece_id] = polygon
+
+        for a, b in combinations(placed.values(), 2):
+            self.assertGreaterEqual(a.distance(b), 0.5 - 1e-6)
+
+
+def random_rects(count: int, seed: int, low: float = 2.0, high: float = 40.0):
+    """Seeded random rectangles, with repeated sizes like graded markers."""
+    import random
+
+    rng = random.Random(seed)
+    sizes = [(10.0, 30.0), (20.0, 10.0), (5.0, 5.0)]
+    return [
+        (
+            make_rect(*rng.choice(sizes))
+            if rng.random() < 0.3
+            else make_rect(rng.uniform(low, high), rng.uniform(low, high * 1.5))
+        )
+        for _ in range(count)
+    ]
+
+
+def layout_signature(result):
+    """Placement of every piece, by piece id, plus the marker length."""
+    placements = sorted(
+        (p.piece_id, p.rotation, round(p.position[0], 6), round(p.position[1], 6))
+        for p in result.pieces
+    )
+    return placements, round(result.fabric_length, 6)
+
+
+class TestImprovedNestingArrays(unittest.TestCase):
+    """Tests for the NumPy skyline and guillotine engines."""
+
+    NESTERS = ("skyline_nest", "guillotine_nest")
+
+    def _nest(self, name, pieces, fabric_width, gap, engine):
+        nester = getattr(improved_nesting, name)
+        return nester(pieces, fabric_width=fabric_width, gap=gap, engine=engine)
+
+    def test_array_engines_match_list_engines(self):
+        """Array and list engines give the same layout on the same input."""
+        cases = [(sample_pieces(), 157.48, 0.5)] + [
+            (random_rects(40 + seed * 7, seed), width, gap)
+            for seed, (width, gap) in enumerate(
+                [(60, 0.0), (100, 0.5), (157.48, 1.0), (200, 0.5), (157.48, 0.0)]
+            )
+        ]
+        for name in self.NESTERS:
+            for pieces, width, gap in cases:
+                with self.subTest(nester=name, pieces=len(pieces), width=width):
+                    self.assertEqual(
+                        layout_signature(self._nest(name, pieces, width, gap, "array")),
+                        layout_signature(self._nest(name, pieces, width, gap, "list")),
+                    )
+
+    def test_large_marker_is_faster_than_list_engine(self):
+        """
+        On a wide marker (thousands of skyline segments / free rectangles)
+        the array engines beat the list engines. Both run on the same
+        machine, so the comparison holds on a loaded runner; the margin is
+        ~2x.
+        """
+        pieces = random_rects(2000, seed=42)
+        for name in self.NESTERS:
+            elapsed = {}
+            for engine in ("list", "array"):
+                start = time.perf_counter()
+                result = self._nest(name, pieces, 2000, 0.5, engine)
+                elapsed[engine] = time.perf_counter() - start
+                self.assertEqual(len(result.pieces), len(pieces))
+            self.assertLess(
+                elapsed["array"],
+                elapsed["list"],
+                f"{name}: array {elapsed['array']:.2f}s, "
+                f"list {elapsed['list']:.2f}s",
+            )
+
+    def test_merged_free_rects_layout_is_valid(self):
+        """Merging free rectangles still gives a non-overlapping layout."""
+        pieces = random_rects(60, seed=7)
+        result = improved_nesting.guillotine_nest(
+            pieces, fabric_width=120, gap=0.5, merge_free_rects=True
+        )
+
+        self.assertEqual(len(result.pieces), len(pieces))
+        boxes = []
+        for piece in result.pieces:
+            x, y = piece.position
+            boxes.append((x, y, x + piece.bbox.width, y + piece.bbox.height))
+            self.assertLessEqual(x + piece.bbox.width, 120 + 1e-6)
+        for a, b in combinations(boxes, 2):
+            overlap_x = min(a[2], b[2]) - max(a[0], b[0])
+            overlap_y = min(a[3], b[3]) - max(a[1], b[1])
+            self.assertFalse(overlap_x > 1e-6 and overlap_y > 1e-6)
+
+    def test_unknown_engine_rejected(self):
+        """Invalid engine names fail fast."""
+        for name in self.NESTERS:
+            with self.assertRaises(ValueError):
+                self._nest(name, sample_pieces(), 157.48, 0.5, "bogus")
+
+
+class TestRotationTable(unittest.TestCase):
+    """Tests for rotation_table and its use by the engines."""
+
+    def setUp(self):
+        import rotation_table
+
+        self.rt = rotation_table
+
+    def test_grain_modes(self):
+        """Grain modes map to their angle sets; unknown modes fail fast."""
+        self.assertEqual(self.rt.allowed_angles("any", 0), (0, 90, 180, 270))
+        self.assertEqual(self.rt.allowed_angles("two_way", 0), (0, 180))
+        self.assertEqual(self.rt.allowed_angles("one_way", 0), (0,))
+        self.assertEqual(len(self.rt.allowed_angles("free", 0)), 24)
+        with self.assertRaises(ValueError):
+            self.rt.allowed_angles("diagonal")
+
+    def test_grain_tolerance_adds_tilts(self):
+        """A tolerance adds small tilts around each allowed angle."""
+        self.assertEqual(
+            self.rt.allowed_angles("two_way", tolerance=2, step=1),
+            (0, 1, 359, 2, 358, 180, 181, 179, 182, 178),
+        )
+
+    def test_material_implies_grain(self):
+        """Fabric codes with pile or stripe keywords restrict rotations."""
+        table = self.rt.build_rotation_table(
+            sample_pieces(), material="VELVET-NAVY", tolerance=0
+        )
+        self.assertEqual(table.signature(), ((0,),) * 5)
+        self.assertEqual(self.rt.grain_for_material("navy pinstripe"), "two_way")
+        self.assertIsNone(self.rt.grain_for_material("SUPER-120S"))
+
+    def test_table_shapes_match_engine_rotation(self):
+        """Table shapes are the engine's rotated, normalized outlines."""
+        from nesting_engine import normalize_to_origin, rotate_points
+
+        pieces = sample_pieces()
+        table = self.rt.build_rotation_table(pieces, grain="any", tolerance=0)
+        shape = table.shape(0, 90)
+        expected = normalize_to_origin(rotate_points(pieces[0], 90))
+        self.assertEqual(
+            [(p.x, p.y) for p in shape.points], [(p.x, p.y) for p in expected]
+        )
+        self.assertAlmostEqual(shape.width, 80)
+        self.assertAlmostEqual(shape.height, 50)
+        self.assertAlmostEqual(shape.polygon.area, 50 * 80)
+
+    def test_default_table_keeps_layouts(self):
+        """The default table reproduces the engines' previous layouts."""
+        from nesting_engine import nest_bottom_left_fill
+
+        pieces = random_rects(40, seed=3)
+        table = self.rt.build_rotation_table(pieces, grain="any", tolerance=0)
+        nesters = [
+            nest_bottom_left_fill,
+            improved_nesting.skyline_nest,
+            improved_nesting.guillotine_nest,
+        ]
+        for nester in nesters:
+            with self.subTest(nester=nester.__name__):
+                self.assertEqual(
+                    layout_signature(nester(pieces, 157.48, 0.5, rotation_table=table)),
+                    layout_signature(nester(pieces, 157.48, 0.5)),
+                )
+
+    def test_one_way_grain_never_rotates(self):
+        """One-way pieces stay at 0 degrees in every engine."""
+        pieces = random_rects(12, seed=5)
+        table = self.rt.build_rotation_table(pieces, grain="one_way", tolerance=0)
+        results = [
+            improved_nesting.skyline_nest(pieces, 157.48, 0.5, rotation_table=table),
+            improved_nesting.guillotine_nest(pieces, 157.48, 0.5, rotation_table=table),
+            hybrid_nesting.hybrid_nest(
+                pieces, 157.48, 0.5, timeout_seconds=1, rotation_table=table
+            ),
+            turbo_nesting.turbo_nest(
+                pieces, 157.48, 0.5, timeout_seconds=1, rotation_table=table
+            ),
+        ]
+        for result in results:
+            self.assertEqual(len(result.pieces), len(pieces))
+            self.assertEqual({p.rotation for p in result.pieces}, {0})
+
+    def test_master_nest_reports_rotations(self):
+        """master_nest shares one table across engines and reports it."""
+        pieces = sample_pieces()
+        table = self.rt.build_rotation_table(pieces, grain="two_way", tolerance=0)
+        result = master_nesting.master_nest(
+            pieces, timeout_seconds=3, parallel=False, rotation_table=table
+        )
+
+        self.assertTrue(result.success)
+        self.assertEqual(result.metadata["rotations"]["grain"], {"two_way": 5})
+        self.assertTrue({p.rotation for p in result.pieces} <= {0, 180})
+
+
+def make_trapezoid(width: float, height: float, top: float, mirrored: bool = False):
+    """Trapezoid with a sloped right edge (left edge when mirrored)."""
+    from nesting_engine import Point
+
+    coords = [(0, 0), (width, 0), (top, height), (0, height)]
+    if mirrored:
+        coords = [(width - x, y) for x, y in reversed(coords)]
+    return [Point(x, y) for x, y in coords]
+
+
+def placed_polygons(result):
+    """Shapely polygon of every nested piece where it was placed."""
+    from shapely.affinity import translate
+    from shapely.geometry import Polygon
+
+    polygons = {}
+    for piece in result.pieces:
+        polygon = Polygon([(p.x, p.y) for p in piece.transformed_points])
+        polygons[piece.piece_id] = translate(polygon, *piece.position)
+    return polygons
+
+
+class TestPieceClusters(unittest.TestCase):
+    """Tests for piece_clusters."""
+
+    def setUp(self):
+        import piece_clusters
+
+        self.pc = piece_clusters
+        piece_clusters.clear_arrangement_cache()
+
+    def pieces(self):
+        return [
+            make_trapezoid(40, 70, 25),
+            make_trapezoid(40, 70, 25),
+            make_trapezoid(30, 60, 12, mirrored=True),
+            make_trapezoid(30, 60, 12, mirrored=True),
+            make_rect(20, 20),
+        ]
+
+    def test_pairing_is_opt_in(self):
+        """nest_contours only pairs pieces when NESTING_CLUSTER_PAIRS is set."""
+        with patch.dict(os.environ):
+            os.environ.pop("NESTING_CLUSTER_PAIRS", None)
+            self.assertFalse(self.pc.clustering_enabled())
+            os.environ["NESTING_CLUSTER_PAIRS"] = "1"
+            self.assertTrue(self.pc.clustering_enabled())
+
+    def test_pairs_interlock_head_to_toe(self):
+        """Sloped twins fuse at 180 degrees into denser composites."""
+        clusters = self.pc.cluster_pieces(self.pieces(), 157.48, 0.5)
+
+        self.assertEqual(clusters.pair_ids, [(0, 1), (2, 3)])
+        self.assertEqual(len(clusters.composites), 3)
+        for cluster, alone in zip(clusters.clusters, (0.79, 0.68)):
+            self.assertEqual([m.rotation for m in cluster.members], [0, 180])
+            self.assertGreater(cluster.density, alone + 0.15)
+
+    def test_expand_restores_every_piece(self):
+        """Placed composites split into the original pieces, gap apart."""
+        from shapely.geometry import Polygon
+        from nesting_engine import nest_bottom_left_fill
+
+        pieces = self.pieces()
+        clusters = self.pc.cluster_pieces(pieces, 157.48, 0.5)
+        result = clusters.expand(
+            nest_bottom_left_fill(clusters.composites, 157.48, 0.5)
+        )
+
+        self.assertEqual(sorted(p.piece_id for p in result.pieces), list(range(5)))
+        self.assertEqual(result.metadata["clusters"]["pieces_after"], 3)
+        polygons = placed_polygons(result)
+        for piece_id, polygon in polygons.items():
+            original = Polygon([(p.x, p.y) for p in pieces[piece_id]])
+            self.assertAlmostEqual(polygon.area, original.area, places=6)
+        for a, b in combinations(polygons.values(), 2):
+            self.assertGreaterEqual(a.distance(b), 0.5 - 1e-6)
+
+    def test_grain_limits_pair_rotation(self):
+        """One-way pieces only pair without turning."""
+        import rotation_table
+
+        pieces = self.pieces()
+        table = rotation_table.build_rotation_table(
+            pieces, grain="one_way", tolerance=0, polygons=False
+        )
+        clusters = self.pc.cluster_pieces(pieces, 157.48, 0.5, rotation_table=table)
+
+        for cluster in clusters.clusters:
+            self.assertEqual({m.rotation for m in cluster.members}, {0})
+
+    def test_arrangements_are_cached(self):
+        """Repeat orders of a template reuse the pair arrangements."""
+        self.pc.cluster_pieces(self.pieces(), 157.48, 0.5)
+        again = self.pc.cluster_pieces(self.pieces(), 157.48, 0.5)
+
+        self.assertEqual(again.cache_hits, 2)
+        self.assertEqual(again.pair_ids, [(0, 1), (2, 3)])
+
+    def test_no_pairs_for_distinct_pieces(self):
+        """Pieces without a twin pass through unchanged."""
+        pieces = sample_pieces()
+        clusters = self.pc.cluster_pieces(pieces, 157.48, 0.5)
+
+        self.assertEqual(clusters.pairs, 0)
+        self.assertEqual(clusters.composites, pieces)
+
+
+def make_u(width: float = 30, height: float = 20, slot: float = 10, depth: float = 12):
+    """U-shaped piece: a slot of the given width cut down from the top edge."""
+    from nesting_engine import Point
+
+    left, right = (width - slot) / 2, (width + slot) / 2
+    coords = [
+        (0, 0),
+        (width, 0),
+        (width, height),
+        (right, height),
+        (right, height - depth),
+        (left, height - depth),
+        (left, height),
+        (0, height),
+    ]
+    return [Point(x, y) for x, y in coords]
+
+
+class TestNFPKernel(unittest.TestCase):
+    """Tests for nfp_kernel and the NFP nester built on it."""
+
+    def setUp(self):
+        import numpy as np
+        import nfp_kernel
+        import nfp_nesting
+
+        self.np = np
+        self.k = nfp_kernel
+        self.nfp = nfp_nesting
+
+    def coords(self, points):
+        return [(p.x, p.y) for p in points]
+
+    def test_point_in_polygon_matches_shapely(self):
+        """The batched crossing-number test agrees with Shapely."""
+        from shapely.geometry import Point as ShapelyPoint, Polygon
+
+        shape = self.coords(make_u())
+        ring = self.k.to_fixed(shape)
+        points = self.k.to_fixed(
+            self.np.random.default_rng(3).uniform(-5, 35, size=(500, 2))
+        )
+        inside = self.k.points_in_polygon(points, ring)
+        polygon = Polygon(shape)
+        expected = [polygon.contains(ShapelyPoint(*(p / self.k.SCALE))) for p in points]
+        self.assertEqual(inside.tolist(), expected)
+
+    def test_segment_crossings(self):
+        """Proper crossings count; touching and collinear overlaps do not."""
+        a0 = self.np.array([[0, 0], [0, 0], [0, 0]])
+        a1 = self.np.array([[10, 10], [10, 0], [10, 0]])
+        b0 = self.np.array([[0, 10], [10, 0], [5, 0]])
+        b1 = self.np.array([[10, 0], [10, 10], [15, 0]])
+        hits = self.k.segments_intersect(a0, a1, b0, b1)
+        self.assertEqual(hits.diagonal().tolist(), [True, False, False])
+
+    def test_clean_ring_keeps_repeated_corners(self):
+        """A repeated corner is dropped once, not together with its repeat."""
+        ring = self.np.array([[0, 0], [10, 0], [10, 0], [10, 5], [5, 5], [5, 10]])
+        ring = self.np.vstack([ring, [[0, 10], [0, 0]]])
+        index = self.k.clean_ring(ring)
+        self.assertEqual(len(index), 6)
+        self.assertEqual(self.k.signed_area2(ring[index]), 2 * 75)
+
+    def test_concave_nfp_is_exact(self):
+        """NFP containment equals true overlap for concave pieces."""
+        from shapely.affinity import translate
+        from shapely.geometry import Polygon
+
+        fixed = self.k.PieceShape.build(self.coords(make_u()))
+        moving = self.k.PieceShape.build(self.coords(make_rect(8, 10)))
+        self.assertGreater(len(fixed.parts), 1)
+        nfp = self.k.PairNFP.build(fixed, moving)
+
+        offsets = self.np.random.default_rng(5).integers(-15000, 35000, (800, 2))
+        a, b = Polygon(fixed.outline), Polygon(moving.outline)
+        expected = [a.intersection(translate(b, *o)).area > 0 for o in offsets]
+        self.assertEqual(nfp.contains(offsets).tolist(), expected)
+        # The slot is free: a narrow piece drops into it
+        self.assertFalse(nfp.contains(self.np.array([[11000, 8000]]))[0])
+
+    def test_nester_interlocks_without_overlap(self):
+        """Placed pieces keep the gap, keep their ids and use the slot."""
+        from shapely.geometry import Polygon
+
+        pieces = [make_u(), make_rect(8, 10), make_u(), make_rect(60, 6)]
+        result = self.nfp.nfp_nest_from_points(pieces, 61, 0.5, seed=1)
+
+        self.assertTrue(result.success)
+        polygons = placed_polygons(result)
+        self.assertEqual(sorted(polygons), [0, 1, 2, 3])
+        for a, b in combinations(polygons.values(), 2):
+            self.assertGreaterEqual(a.distance(b), 0.5 - 1e-3)
+        for piece_id, polygon in polygons.items():
+            self.assertLessEqual(polygon.bounds[2], 61 + 1e-6)
+            original = Polygon(self.coords(pieces[piece_id]))
+            self.assertAlmostEqual(polygon.area, original.area, places=3)
+        # U pieces side by side, the strip beside them, the block in a slot
+        self.assertLess(result.fabric_length, 20 + 0.5 + 6 + 0.5)
+        self.assertTrue(any(polygons[u].envelope.contains(polygons[1]) for u in (0, 2)))
+
+    def test_rotation_table_limits_angles(self):
+        """One-way grain keeps every piece at 0 degrees."""
+        import rotation_table
+
+        pieces = [make_u(), make_rect(20, 8), make_rect(8, 20)]
+        table = rotation_table.build_rotation_table(pieces, grain="one_way")
+        result = self.nfp.nfp_nest_from_points(
+            pieces, 40, 0.5, seed=2, rotation_table=table
+        )
+        self.assertEqual(len(result.pieces), 3)
+        self.assertEqual({p.rotation for p in result.pieces}, {0})
+
+    def test_selectable_from_master_nest(self):
+        """master_nest runs the NFP nester when asked for it."""
+        result = master_nesting.master_nest(
+            sample_pieces(), timeout_seconds=30, parallel=False, algorithms=["nfp"]
+        )
+        self.assertTrue(result.success)
+        self.assertEqual(result.metadata["portfolio"]["winner"], "nfp")
+        self.assertEqual(len(result.pieces), len(sample_pieces()))
+        self.assertIn("nfp", master_nesting.anytime_algorithms())
+
+
+class TestNestingProfiler(unittest.TestCase):
+    """Phase timers and counters reported by the engines."""
+
+    def setUp(self):
+        import nesting_profiler
+
+        self.profiler = nesting_profiler
+
+    def test_hooks_are_noops_when_off(self):
+        """Without an active profiler the hooks record nothing."""
+        with self.profiler.profile_nesting("off") as profiler:
+            self.assertIsNone(profiler)
+            self.assertIsNone(self.profiler.active())
+            self.profiler.count("candidates", 5)
+            with self.profiler.phase("hybrid.compaction") as timed:
+                pass
+        self.assertIs(timed, self.profiler._NO_PHASE)
+        result = master_nesting.master_nest(
+            sample_pieces(), timeout_seconds=5, parallel=False, algorithms=["shelf"]
+        )
+        self.assertNotIn("profile", result.metadata)
+
+    def test_threads_keep_separate_profilers(self):
+        """Two threads profiling at once each get only their own phases."""
+        import threading
+
+        both_started = threading.Barrier(2)
+        reports = {}
+
+        def run(name):
+            with self.profiler.profile_nesting("timers") as profiler:
+                both_started.wait()
+                for _ in range(5):
+                    with self.profiler.phase(f"{name}.phase"):
+                        self.profiler.count(name)
+                        time.sleep(0.001)
+            reports[name] = profiler.report()
+
+        threads = [threading.Thread(target=run, args=(n,)) for n in ("a", "b")]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+
+        for name in ("a", "b"):
+            self.assertEqual(reports[name]["counters"], {name: 5})
+            self.assertEqual(list(reports[name]["phases"]), [f"{name}.phase"])
+            self.assertEqual(reports[name]["phases"][f"{name}.phase"]["calls"], 5)
+        self.assertIsNone(self.profiler.active())
+
+    def test_timers_collect_phases_and_counters(self):
+        """A profiled hybrid run reports its phases, layouts and tests."""
+        with self.profiler.profile_nesting("timers") as profiler:
+            result = master_nesting.master_nest(
+                sample_pieces(),
+                timeout_seconds=8,
+                parallel=False,
+                algorithms=["skyline", "hybrid"],
+            )
+        self.profiler.attach_profile(result, profiler)
+        self.assertIsNone(self.profiler.active())
+
+        report = result.metadata["profile"]
+        self.assertEqual(report["mode"], "timers")
+        self.assertIn("algorithm.skyline", report["phases"])
+        self.assertIn("hybrid.heuristics", report["phases"])
+        self.assertGreater(report["counters"]["layouts_evaluated"], 0)
+        self.assertGreater(report["counters"]["candidates"], 0)
+        self.assertGreater(report["counters"]["intersection_tests"], 0)
+        self.assertLessEqual(
+            report["phases"]["algorithm.hybrid"]["seconds"], report["wall_s"]
+        )
+
+    def test_merge_keeps_worker_reports(self):
+        """Worker reports add to the totals and stay available per algorithm."""
+        profiler = self.profiler.NestingProfiler("timers")
+        profiler.count("candidates", 3)
+        worker = {
+            "phases": {"nfp.build": {"seconds": 0.5, "calls": 4}},
+            "counters": {"candidates": 7, "nfp_computed": 4},
+        }
+        profiler.merge("nfp", worker)
+        profiler.merge("shelf", None)
+        report = profiler.report()
+        self.assertEqual(report["counters"], {"candidates": 10, "nfp_computed": 4})
+        self.assertEqual(report["phases"]["nfp.build"]["calls"], 4)
+        self.assertEqual(list(report["algorithms"]), ["nfp"])
+
+    def test_cprofile_capture_and_metrics(self):
+        """cprofile mode keeps the top functions and feeds the histograms."""
+        from observability import metrics
+
+        with self.profiler.profile_nesting("cprofile") as profiler:
+            result = master_nesting.master_nest(
+                sample_pieces(), timeout_seconds=5, parallel=False, algorithms=["shelf"]
+            )
+        self.profiler.attach_profile(result, profiler)
+        report = result.metadata["profile"]
+        self.assertIn("nest_bottom_left_fill", report["top"])
+        if metrics.PROMETHEUS_AVAILABLE:
+            from prometheus_client import REGISTRY
+
+            observed = REGISTRY.get_sample_value(
+                "sds_nesting_phase_seconds_count", {"phase": "algorithm.shelf"}
+            )
+            self.assertGreaterEqual(observed, 1)
+
+
+def layout_of(placed, fabric_width: float):
+    """NestingResult holding (points, (x, y)) placements as given."""
+    from nesting_engine import BoundingBox, NestedPiece, NestingResult
+
+    pieces = []
+    for piece_id, (points, position) in enumerate(placed):
+        width = max(p.x for p in points)
+        height = max(p.y for p in points)
+        pieces.append(
+            NestedPiece(
+                piece_id=piece_id,
+                original_points=points,
+                transformed_points=points,
+                bbox=BoundingBox(0, 0, width, height),
+                position=position,
+                rotation=0,
+            )
+        )
+    length = max(position[1] + max(p.y for p in points) for points, position in placed)
+    area = sum(polygon.area for polygon in placed_polygons_of(pieces))
+    utilization = area / (fabric_width * length) * 100
+    return NestingResult(pieces, fabric_width, length, utilization, True, "test")
+
+
+def placed_polygons_of(pieces):
+    from shapely.affinity import translate
+    from shapely.geometry import Polygon
+
+    return [
+        translate(
+            Polygon([(p.x, p.y) for p in piece.transformed_points]), *piece.position
+        )
+        for piece in pieces
+    ]
+
+
+class TestHoleFilling(unittest.TestCase):
+    """Small pieces moved into holes and concavities of a finished layout."""
+
+    def setUp(self):
+        import hole_filling
+
+        self.hf = hole_filling
+
+    def assert_separated(self, result, gap):
+        polygons = placed_polygons_of(result.pieces)
+        for a, b in combinations(polygons, 2):
+            self.assertGreaterEqual(a.distance(b), gap - 0.01)
+        for polygon in polygons:
+            minx, miny, maxx, _ = polygon.bounds
+            self.assertGreaterEqual(min(minx, miny), -0.01)
+            self.assertLessEqual(maxx, result.fabric_width + 0.01)
+
+    def test_pass_is_opt_in(self):
+        """nest_contours only fills holes when NESTING_FILL_HOLES is set."""
+        with patch.dict(os.environ):
+            os.environ.pop("NESTING_FILL_HOLES", None)
+            self.assertFalse(self.hf.hole_filling_enabled())
+            os.environ["NESTING_FILL_HOLES"] = "1"
+            self.assertTrue(self.hf.hole_filling_enabled())
+
+    def test_small_piece_drops_into_slot(self):
+        """A block on top of a U moves into its slot and the marker shrinks."""
+        result = layout_of([(make_u(), (0, 0)), (make_rect(8, 10), (0, 20.5))], 30)
+        utilization = result.utilization
+        result = self.hf.fill_holes(result, 0.5)
+
+        self.assertEqual(result.metadata["hole_filling"]["moved"], 1)
+        self.assertAlmostEqual(result.fabric_length, 20, places=2)
+        self.assertAlmostEqual(result.utilization, utilization * 30.5 / 20, places=3)
+        self.assert_separated(result, 0.5)
+        slot = placed_polygons_of(result.pieces)[1]
+        self.assertGreaterEqual(slot.bounds[0], 10.5 - 0.01)
+        self.assertLessEqual(slot.bounds[2], 19.5 + 0.01)
+
+    def test_rotation_table_allows_turning_into_hole(self):
+        """A piece too wide for the slot fits once it may turn 90 degrees."""
+        import rotation_table
+
+        placed = [(make_u(), (0, 0)), (make_rect(10, 8), (0, 20.5))]
+        kept = self.hf.fill_holes(layout_of(placed, 30), 0.5)
+        self.assertEqual(kept.metadata["hole_filling"]["moved"], 0)
+        self.assertAlmostEqual(kept.fabric_length, 28.5)
+
+        table = rotation_table.build_rotation_table(
+            [points for points, _ in placed], grain="any"
+        )
+        turned = self.hf.fill_holes(layout_of(placed, 30), 0.5, rotation_table=table)
+        self.assertEqual(turned.metadata["hole_filling"]["moved"], 1)
+        self.assertIn(turned.pieces[1].rotation, (90, 270))
+        self.assertAlmostEqual(turned.fabric_length, 20, places=2)
+        self.assert_separated(turned, 0.5)
+
+    def test_large_pieces_stay(self):
+        """Only pieces up to max_share of the largest one are moved."""
+        placed = [(make_u(), (0, 0)), (make_rect(8, 10), (0, 20.5))]
+        result = self.hf.fill_holes(layout_of(placed, 30), 0.5, max_share=0.05)
+        self.assertEqual(result.metadata["hole_filling"]["movable"], 0)
+        self.assertEqual(result.pieces[1].position, (0, 20.5))
+
+    def test_engine_results_place_pieces_by_position(self):
+        """Footprints (points + position) of engine results span fabric_length."""
+        from hybrid_nesting import hybrid_nest
+        from turbo_nesting import turbo_nest
+
+        for nest in (hybrid_nest, turbo_nest):
+            with self.subTest(engine=nest.__name__):
+                result = nest(sample_pieces(), fabric_width=100, timeout_seconds=2)
+                polygons = placed_polygons_of(result.pieces)
+                top = max(polygon.bounds[3] for polygon in polygons)
+                self.assertAlmostEqual(top, result.fabric_length, places=3)
+                self.assert_separated(result, 0)
+
+
+if __name__ == "__main__":
+    unittest.main(verbosity=2)
@@ -0,0 +1,211 @@
+#!/usr/bin/env python3
+"""
+Pattern Scaler Tests
+
+Tests for vectorized pattern scaling:
+1. scale_contours matches per-point scaling about each piece's centroid
+2. scale_batch scales many orders (uniform, per-piece, by region) in one pass
+3. SameDaySuitsAPI scales a batch against each template once
+
+Run with:
+    python tests/test_pattern_scaler.py
+"""
+
+import tempfile
+import unittest
+from pathlib import Path
+from unittest.mock import patch
+
+import numpy as np
+
+from pipeline_fixtures import PDS_DIR, use_src_core
+
+setUpModule, tearDownModule = use_src_core()
+
+
+def reference_scale(points, scale_x, scale_y):
+    """The original per-point loop."""
+    cx = sum(p[0] for p in points) / len(points)
+    cy = sum(p[1] for p in points) / len(points)
+    return [(cx + (x - cx) * scale_x, cy + (y - cy) * scale_y) for x, y in points]
+
+
+def pieces():
+    from contour_array import ContourArray
+
+    return [
+        ContourArray([(0, 0), (40, 0), (40, 60), (0, 60)], fill_color="#FF0000"),
+        ContourArray([(50, 10), (80, 10), (65, 40)], fill_color="#00FF00"),
+        ContourArray([(100, 0), (120, 0), (120, 100), (100, 100)], closed=False),
+    ]
+
+
+class TestScaleContours(unittest.TestCase):
+    """Tests for scale_points / scale_contours."""
+
+    def test_scale_points(self):
+        from pattern_scaler import scale_points
+
+        points = [(0, 0), (100, 0), (100, 50), (0, 50)]
+        np.testing.assert_allclose(
+            scale_points(points, 1.1, 0.9), reference_scale(points, 1.1, 0.9)
+        )
+        self.assertEqual(scale_points(points, 2, 2, center=(0, 0))[2], (200, 100))
+        self.assertEqual(scale_points([], 2, 2), [])
+
+    def test_matches_per_point_scaling(self):
+        from pattern_scaler import scale_contours
+        from production_pipeline import Contour, Point
+        from contour_array import ContourArray
+
+        arrays = pieces()
+        arrays[0].metadata["piece"] = "front"
+        legacy = [c.to_contour(Contour, Point) for c in arrays]
+
+        for contours in (arrays, legacy):
+            scaled = scale_contours(contours, 1.07, 0.95)
+            with self.subTest(kind=type(contours[0]).__name__):
+                self.assertIs(type(scaled[0]), type(contours[0]))
+                for original, result in zip(contours, scaled):
+                    points = [(p.x, p.y) for p in original.points]
+                    np.testing.assert_allclose(
+                        [(p.x, p.y) for p in result.points],
+                        reference_scale(points, 1.07, 0.95),
+                    )
+                    self.assertEqual(result.closed, original.closed)
+                    self.assertEqual(result.fill_color, original.fill_color)
+
+        self.assertEqual(scale_contours(arrays, 1.1, 1.1)[0].metadata["piece"], "front")
+        self.assertIsInstance(scale_contours(arrays, 1, 1)[0], ContourArray)
+
+
+class TestScaleBatch(unittest.TestCase):
+    """Tests for PackedContours / scale_batch."""
+
+    def setUp(self):
+        from pattern_scaler import PackedContours
+
+        self.packed = PackedContours.from_contours(pieces())
+
+    def test_batch_matches_single_orders(self):
+        from pattern_scaler import scale_batch, scale_contours
+
+        scales = [(1.0 + k / 100, 1.0 - k / 200) for k in range(20)] + [None]
+        batch = scale_batch(self.packed, scales)
+
+        self.assertEqual(len(batch), len(scales))
+        for scale, contours in zip(scales, batch):
+            expected = scale_contours(pieces(), *(scale or (1, 1)))
+            for result, reference in zip(contours, expected):
+                np.testing.assert_allclose(result.coords, reference.coords)
+
+    def test_per_piece_factors_and_matrices(self):
+        from pattern_scaler import scale_matrices, scale_packed, transform_packed
+
+        factors = np.array([[1.1, 1.0], [1.0, 1.0], [0.9, 1.2]])
+        per_piece = scale_packed(self.packed, [factors])[0]
+        self.assertEqual(per_piece.shape, self.packed.coords.shape)
+        np.testing.assert_allclose(per_piece[4:7], self.packed.coords[4:7])
+
+        centers = self.packed.centers()
+        matrices = scale_matrices(factors[:, 0], factors[:, 1], centers)
+        np.testing.assert_allclose(transform_packed(self.packed, matrices), per_piece)
+
+        # A batch of matrices (orders x pieces x 2 x 3)
+        batch = np.stack([matrices, scale_matrices(1.2, 1.2, centers)])
+        self.assertEqual(transform_packed(self.packed, batch).shape, (2, 11, 2))
+
+    def test_region_grading_along_piece(self):
+        from pattern_scaler import RegionScale, scale_batch
+
+        regions = RegionScale(
+            zones=("chest", "waist", "hip"),
+            positions=(0.0, 0.5, 1.0),
+            scale_x=(1.2, 1.0, 1.1),
+            scale_y=0.9,
+        )
+        graded = scale_batch(self.packed, [regions])[0][2]
+
+        # 20 x 100 rectangle: top edge at chest width, bottom at hip width
+        widths = graded.coords[[1, 2], 0] - graded.coords[[0, 3], 0]
+        np.testing.assert_allclose(widths, [24.0, 22.0])
+        self.assertAlmostEqual(graded.bounds[3] - graded.bounds[1], 90.0)
+        np.testing.assert_allclose(regions.factors_at([0.25, 0.75]), [1.1, 1.05])
+
+    def test_region_scale_from_measurements(self):
+        from pattern_scaler import GarmentType, calculate_pattern_scale
+
+        result = calculate_pattern_scale(
+            {"chest": 102, "waist": 81, "hip": 200},
+            GarmentType.TOP,
+            base_size="Large",
+            regions=True,
+        )
+        self.assertEqual(result.regions.zones, ("chest", "waist", "hip"))
+        self.assertAlmostEqual(result.regions.scale_x[0], 1.0)
+        self.assertAlmostEqual(result.regions.scale_x[1], 81 / 86)
+        self.assertEqual(result.regions.scale_x[2], 1.3)  # Clamped
+        self.assertIsNone(
+            calculate_pattern_scale({"chest": 102}, GarmentType.TOP).regions
+        )
+
+
+@unittest.skipUnless(PDS_DIR.exists(), "template PDS files not available")
+class TestBatchPreparation(unittest.TestCase):
+    """SameDaySuitsAPI scaling a batch of orders."""
+
+    def test_one_scaling_pass_per_template(self):
+        import samedaysuits_api
+        from samedaysuits_api import (
+            CustomerMeasurements,
+            FitType,
+            GarmentType,
+            Order,
+            SameDaySuitsAPI,
+        )
+
+        with tempfile.TemporaryDirectory() as tmp:
+            api = SameDaySuitsAPI(templates_dir=PDS_DIR, output_dir=Path(tmp))
+            orders = [
+                Order(
+                    order_id=f"ORD-{i}",
+                    customer_id="CUST-TEST",
+                    garment_type=garment_type,
+                    fit_type=FitType.REGULAR,
+                    measurements=CustomerMeasurements(
+                        chest_cm=90 + i, waist_cm=80, hip_cm=95 + i
+                    ),
+                )
+                for i, garment_type in enumerate(
+                    [GarmentType.TEE, GarmentType.TROUSERS] * 5
+                )
+            ]
+
+            with patch.object(
+                samedaysuits_api, "scale_batch", wraps=samedaysuits_api.scale_batch
+            ) as scale:
+                prepared = api._prepare_patterns(orders)
+
+            self.assertEqual(scale.call_count, 2)
+            self.assertEqual(
+                [len(call.args[1]) for call in scale.call_args_list], [5, 5]
+            )
+            for order, pattern in zip(orders, prepared):
+                single = api._prepare_pattern(order)
+                self.assertEqual(pattern.template_path, single.template_path)
+                self.assertEqual(pattern.scaling_applied, single.scaling_applied)
+                for a, b in zip(pattern.contours_cm, single.contours_cm):
+                    np.testing.assert_allclose(a.coords, b.coords)
+
+            # A missing template fails only its own orders
+            api.templates_dir = Path(tmp)
+            self.assertTrue(
+                all(
+                    isinstance(p, FileNotFoundError)
+                    for p in api._prepare_patterns(orders[:2])
+                )
+            )
+
+
+if __name__ == "__main__":
+    unittest.main(verbosity=2)
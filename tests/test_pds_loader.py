@@ -0,0 +1,220 @@
+#!/usr/bin/env python3
+"""
+PDS Loader Tests
+
+Tests for the memory-mapped, parse-once PDS template:
+1. XML byte range and pruned tree (pieces, sizes, SVG VIEW kept)
+2. Extractors give the same results from a template as from the XML string
+3. One parse per file version, re-parsed when the file changes
+
+Run with:
+    python tests/test_pds_loader.py
+"""
+
+import os
+import shutil
+import tempfile
+import unittest
+from pathlib import Path
+from unittest.mock import Mock, patch
+
+from pipeline_fixtures import PDS_DIR, use_src_core
+
+import pds_loader
+from pds_loader import load_pds_template, parse_pds, clear_template_cache
+
+setUpModule, tearDownModule = use_src_core()
+
+TEE = PDS_DIR / "Basic Tee_2D.PDS"
+
+# A small PDS: binary header, XML with unused elements, trailing binary
+SAMPLE_XML = b"""<?xml version="1.0"?>
+<STYLE>
+  <OPTITEX>21.0</OPTITEX>
+  <NAME>Sample</NAME>
+  <SIZES>2</SIZES>
+  <SIZES_TABLE>
+    <SIZE><NAME>S</NAME></SIZE>
+    <SIZE><NAME>M</NAME></SIZE>
+    <BASE_SIZE><NAME>S</NAME></BASE_SIZE>
+  </SIZES_TABLE>
+  <PIECE>
+    <NAME>Front</NAME>
+    <DESCRIPTION>unused</DESCRIPTION>
+    <INTERNALS><LINE>unused</LINE></INTERNALS>
+    <SIZE>
+      <NAME>S</NAME>
+      <POINTS>unused</POINTS>
+      <GEOM_INFO SIZE_X="40" SIZE_Y="60" AREA="0.2" PERIMETER="200" />
+    </SIZE>
+    <SIZE>
+      <NAME>M</NAME>
+      <GEOM_INFO SIZE_X="44" SIZE_Y="62" AREA="0.25" PERIMETER="210" />
+    </SIZE>
+  </PIECE>
+  <MARKER>
+    <WIDTH>150</WIDTH>
+    <VIEW FACTOR="0.07">
+      <svg viewBox="0 0 100 50">
+        <polygon points="0,0 40,0 40,50 0,50" fill="#FF0000" />
+        <polygon points="0,0 100,0 100,50" fill="#C0C0C0" />
+        <g><path d="M 1 1 L 5 5" /></g>
+      </svg>
+    </VIEW>
+  </MARKER>
+</STYLE>"""
+
+
+def write_pds(path: Path, xml: bytes = SAMPLE_XML):
+    path.write_bytes(b"\x00PDS\x01" * 100 + xml + b"\x00\xff" * 50)
+
+
+class TestParse(unittest.TestCase):
+    """Tests for parse_pds."""
+
+    def setUp(self):
+        self._tmp = tempfile.TemporaryDirectory()
+        self.path = Path(self._tmp.name) / "sample.PDS"
+        write_pds(self.path)
+
+    def tearDown(self):
+        self._tmp.cleanup()
+
+    def test_xml_range_and_pruned_tree(self):
+        template = parse_pds(self.path)
+
+        self.assertEqual(template.xml_start, 500)
+        self.assertEqual(template.xml_bytes, len(SAMPLE_XML))
+        self.assertEqual(template.xml_content().encode(), SAMPLE_XML)
+
+        root = template.root
+        self.assertEqual(
+            [child.tag for child in root],
+            ["NAME", "SIZES", "SIZES_TABLE", "PIECE", "MARKER"],
+        )
+        piece = template.pieces[0]
+        self.assertEqual([child.tag for child in piece], ["NAME", "SIZE", "SIZE"])
+        self.assertEqual([child.tag for child in piece[1]], ["NAME", "GEOM_INFO"])
+        # MARKER keeps only its VIEW, and the VIEW is kept whole
+        self.assertEqual([child.tag for child in root.find("MARKER")], ["VIEW"])
+        self.assertEqual(len(template.view[0]), 3)
+
+    def test_extractors_accept_template(self):
+        from production_pipeline import (
+            extract_xml_from_pds,
+            extract_piece_dimensions,
+            extract_svg_geometry,
+        )
+        from graded_size_extractor import extract_graded_info
+
+        template = parse_pds(self.path)
+        xml = extract_xml_from_pds(str(self.path))
+
+        self.assertEqual(
+            extract_piece_dimensions(template, "M"),
+            extract_piece_dimensions(xml, "M"),
+        )
+        contours, metadata = extract_svg_geometry(template)
+        self.assertEqual(len(contours), 1)  # background polygon skipped
+        self.assertEqual(metadata, extract_svg_geometry(xml)[1])
+
+        graded = extract_graded_info(template)
+        self.assertEqual(graded.filename, "sample.PDS")
+        self.assertEqual(graded.available_sizes, ["S", "M"])
+        self.assertEqual(graded.base_size, "S")
+        self.assertEqual(graded.pieces["Front"].sizes["M"].size_x, 44.0)
+
+    def test_missing_xml(self):
+        empty = Path(self._tmp.name) / "empty.PDS"
+        empty.write_bytes(b"")
+        with self.assertRaises(ValueError):
+            parse_pds(empty)
+
+        truncated = Path(self._tmp.name) / "truncated.PDS"
+        write_pds(truncated, SAMPLE_XML[:-10])
+        with self.assertRaises(ValueError):
+            parse_pds(truncated)
+
+
+class TestTemplateCache(unittest.TestCase):
+    """Tests for load_pds_template."""
+
+    def setUp(self):
+        clear_template_cache()
+        self._tmp = tempfile.TemporaryDirectory()
+        self.path = Path(self._tmp.name) / "sample.PDS"
+        write_pds(self.path)
+
+    def tearDown(self):
+        clear_template_cache()
+        self._tmp.cleanup()
+
+    def test_parsed_once_until_file_changes(self):
+        with patch.object(pds_loader, "parse_pds", wraps=parse_pds) as parse:
+            first = load_pds_template(self.path)
+            self.assertIs(load_pds_template(str(self.path)), first)
+            self.assertIs(load_pds_template(first), first)
+            self.assertEqual(parse.call_count, 1)
+
+            write_pds(self.path, SAMPLE_XML.replace(b"Front", b"Back"))
+            os.utime(self.path, ns=(first.mtime_ns + 10**9,) * 2)
+            second = load_pds_template(self.path)
+
+        self.assertEqual(parse.call_count, 2)
+        self.assertEqual(second.pieces[0].findtext("NAME"), "Back")
+
+    def test_cache_disabled(self):
+        with patch.dict(os.environ, {"PDS_TEMPLATE_CACHE_SIZE": "0"}):
+            self.assertIsNot(load_pds_template(self.path), load_pds_template(self.path))
+
+
+@unittest.skipUnless(TEE.exists(), "template PDS files not available")
+class TestRealTemplates(unittest.TestCase):
+    """The shared template against the original full-tree extraction."""
+
+    def test_templates_match_full_parse(self):
+        from production_pipeline import (
+            extract_xml_from_pds,
+            extract_piece_dimensions,
+            extract_svg_geometry,
+        )
+
+        for pds in sorted(PDS_DIR.glob("*.PDS")):
+            with self.subTest(pds=pds.name):
+                template = parse_pds(pds)
+                xml = extract_xml_from_pds(str(pds))
+
+                self.assertEqual(
+                    extract_piece_dimensions(template, "Small"),
+                    extract_piece_dimensions(xml, "Small"),
+                )
+                from_template, meta = extract_svg_geometry(template)
+                from_xml, xml_meta = extract_svg_geometry(xml)
+                self.assertEqual(meta, xml_meta)
+                self.assertEqual(
+                    [c.points for c in from_template], [c.points for c in from_xml]
+                )
+
+    def test_internal_lines_and_sizes_share_template(self):
+        from internal_lines import extract_all_layers
+        from direct_size_generator import generate_for_size
+
+        clear_template_cache()
+        with tempfile.TemporaryDirectory() as tmp:
+            copy = Path(tmp) / TEE.name
+            shutil.copy(TEE, copy)
+            with patch.object(pds_loader, "parse_pds", wraps=parse_pds) as parse:
+                layers = extract_all_layers(str(copy))
+                with patch("direct_size_generator.nest_contours") as nest, patch(
+                    "direct_size_generator.generate_hpgl"
+                ):
+                    nest.return_value = ([], Mock(success=False))
+                    generate_for_size(str(copy), "Large", Path(tmp))
+
+            self.assertEqual(parse.call_count, 1)
+            self.assertEqual(len(layers.cutting_contours), 7)
+        clear_template_cache()
+
+
+if __name__ == "__main__":
+    unittest.main(verbosity=2)
@@ -26,6 +26,7 @@ from datetime import datetime
 # Add src to path
 sys.path.insert(0, str(Path(__file__).parent.parent / "src"))
 sys.path.insert(0, str(Path(__file__).parent.parent / "src" / "core"))
+sys.path.insert(0, str(Path(__file__).parent.parent / "src" / "nesting"))
 
 from core.resilient_cutter_queue import (
     ResilientCutterQueue,
@@ -153,6 +154,44 @@ class TestJobArchive:
         jobs = archive.search_jobs(status=JobStatus.ERROR)
         assert len(jobs) == 1
 
+    def test_roll_id_column_added_to_old_archive(self, temp_dir, sample_plt):
+        """Test that archives from before roll tracking gain a roll_id column."""
+        import sqlite3
+
+        archive_dir = temp_dir / "archive"
+        archive_dir.mkdir()
+        conn = sqlite3.connect(archive_dir / "job_archive.db")
+        conn.execute(
+            "CREATE TABLE jobs (job_id TEXT PRIMARY KEY, order_id TEXT NOT NULL, "
+            "status TEXT NOT NULL, priority INTEGER NOT NULL, plt_file TEXT, "
+            "dxf_file TEXT, pds_file TEXT, measurements_json TEXT, "
+            "fabric_length_cm REAL, fabric_width_cm REAL, piece_count INTEGER, "
+            "pieces_json TEXT, created_at TEXT NOT NULL, queued_at TEXT, "
+            "started_at TEXT, completed_at TEXT, error_message TEXT, "
+            "retry_count INTEGER DEFAULT 0, checksum_sha256 TEXT, "
+            "is_reprint INTEGER DEFAULT 0, original_job_id TEXT, "
+            "archived_at TEXT DEFAULT CURRENT_TIMESTAMP)"
+        )
+        conn.commit()
+        conn.close()
+
+        archive = JobArchive(archive_dir)
+        job = CutterJob(
+            job_id="JOB-001",
+            order_id="ORD-001",
+            plt_file=str(sample_plt),
+            fabric_width_cm=140.0,
+            roll_id="REM-0007",
+        )
+        assert archive.archive_job(job) is True
+
+        retrieved = archive.get_job("JOB-001")
+        assert retrieved.roll_id == "REM-0007"
+        assert retrieved.fabric_width_cm == 140.0
+        assert [j.job_id for j in archive.search_jobs(roll_id="REM-0007")] == [
+            "JOB-001"
+        ]
+
 
 class TestResilientCutterQueue:
     """Tests for main ResilientCutterQueue."""
@@ -280,6 +319,61 @@ class TestResilientCutterQueue:
         status = queue.get_status()
         assert status["queue_depth"] == 1
 
+    def test_reprint_piece_from_plt_offsets(self, temp_dir):
+        """Test that a single piece is cut out of the PLT by its byte range."""
+        from hpgl_writer import write_hpgl
+
+        plt_path = temp_dir / "marker.plt"
+        output = write_hpgl(
+            [
+                [(0, 0), (40, 0), (40, 30), (0, 30)],
+                [(50, 0), (80, 0), (65, 25)],
+            ],
+            plt_path,
+            labels=["ORD-001 1/2", "ORD-001 2/2"],
+        )
+        pieces = [
+            {
+                "piece_id": f"ORD-001-P{n:03d}",
+                "piece_name": f"Piece {n}",
+                "piece_number": n,
+                "total_pieces": 2,
+                "plt_start_byte": start,
+                "plt_end_byte": end,
+                "width_cm": 40.0,
+                "height_cm": 30.0,
+            }
+            for n, (start, end) in enumerate(output.piece_offsets, 1)
+        ]
+
+        queue = ResilientCutterQueue(temp_dir / "queue")
+        queue.add_job("ORD-001", plt_path, pieces=pieces)
+
+        reprint = queue.reprint_piece("ORD-001-P002")
+        start, end = output.piece_offsets[1]
+        expected = b"IN;SP1;" + plt_path.read_bytes()[start:end] + b"SP0;IN;"
+        assert reprint.piece_count == 1
+        assert Path(reprint.plt_file).read_bytes() == expected
+        assert b"ORD-001 2/2" in expected and b"ORD-001 1/2" not in expected
+
+        # The piece now points into its own PLT; reprinting it again is stable
+        again = queue.reprint_piece("ORD-001-P002")
+        assert Path(again.plt_file).read_bytes() == expected
+
+    def test_roll_recorded_and_reprinted(self, temp_dir, sample_plt):
+        """Test that the job's roll is archived and kept on reprints."""
+        queue = ResilientCutterQueue(temp_dir / "queue")
+
+        job = queue.add_job(
+            "ORD-001", sample_plt, fabric_width_cm=120.0, roll_id="R-0001"
+        )
+        assert job.fabric_width_cm == 120.0
+
+        reprint = queue.reprint_job(job.job_id)
+        assert reprint.roll_id == "R-0001"
+        assert reprint.fabric_width_cm == 120.0
+        assert queue.archive.get_job(reprint.job_id).roll_id == "R-0001"
+
     def test_get_status(self, temp_dir, sample_plt):
         """Test getting queue status."""
         queue = ResilientCutterQueue(temp_dir / "queue")
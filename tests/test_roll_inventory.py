@@ -0,0 +1,235 @@
+#!/usr/bin/env python3
+"""
+Roll Inventory Tests
+
+Tests for multi-width / remnant nesting:
+1. Roll selection (lowest_waste, remnants_first) and too-short rolls
+2. One nesting per distinct width
+3. Inventory load / consume / save
+4. SameDaySuitsAPI.process_order against a roll inventory
+
+Run with:
+    python tests/test_roll_inventory.py
+"""
+
+import json
+import os
+import tempfile
+import unittest
+from pathlib import Path
+from types import SimpleNamespace
+from unittest.mock import patch
+
+from pipeline_fixtures import (
+    fake_prepare_patterns,
+    fast_nest,
+    make_order,
+    use_src_core,
+)
+from roll_inventory import Roll, RollInventory, nest_on_rolls, roll_waste
+
+setUpModule, tearDownModule = use_src_core(
+    {"NESTING_CACHE_ENABLED": "0", "ROLL_MIN_REMNANT_CM": "30"}
+)
+
+
+# Marker length and utilization per width for table_nest
+LAYOUTS = {150.0: (100.0, 80.0), 140.0: (110.0, 78.0), 120.0: (125.0, 85.0)}
+
+
+def table_nest(contours, fabric_width, **options):
+    """nest_contours stand-in returning LAYOUTS[fabric_width]."""
+    table_nest.widths.append(fabric_width)
+    length, utilization = LAYOUTS[fabric_width]
+    result = SimpleNamespace(
+        success=True, fabric_length=length, utilization=utilization, metadata={}
+    )
+    return [f"nested@{fabric_width}"], result
+
+
+table_nest.widths = []
+
+
+class TestRollSelection(unittest.TestCase):
+    """Tests for nest_on_rolls."""
+
+    def setUp(self):
+        table_nest.widths = []
+        self.rolls = [
+            Roll("FULL-150", "NAVY", 150.0, 5000.0),
+            Roll("FULL-150B", "NAVY", 150.0, 3000.0),
+            Roll("FULL-120", "NAVY", 120.0, 4000.0),
+            Roll("REM-140", "NAVY", 140.0, 115.0, remnant=True),
+            Roll("REM-150", "NAVY", 150.0, 90.0, remnant=True),
+        ]
+
+    def test_lowest_waste(self):
+        choice = nest_on_rolls([], self.rolls, table_nest, policy="lowest_waste")
+
+        # 120 cm: 120 x 125 x 15% = 2250 cm^2, less than 150 cm's 3000 cm^2
+        self.assertEqual(choice.roll.roll_id, "FULL-120")
+        self.assertEqual(choice.nested[0], ["nested@120.0"])
+        self.assertAlmostEqual(choice.option.waste_cm2, 2250.0)
+        self.assertEqual(sorted(table_nest.widths), [120.0, 140.0, 150.0])
+
+        summary = choice.to_dict()
+        self.assertEqual(summary["policy"], "lowest_waste")
+        too_short = [o for o in summary["options"] if not o["fits"]]
+        self.assertEqual([o["roll_id"] for o in too_short], ["REM-150"])
+
+    def test_remnants_first(self):
+        choice = nest_on_rolls([], self.rolls, table_nest, policy="remnants_first")
+
+        # REM-150 is too short for a 100 cm marker; REM-140 takes 110 of 115 cm
+        self.assertEqual(choice.roll.roll_id, "REM-140")
+        self.assertEqual(choice.width_cm, 140.0)
+
+    def test_scrapped_tail_counts_as_waste(self):
+        # 5 cm left on a roll cannot be used again
+        self.assertAlmostEqual(
+            roll_waste(140.0, 110.0, 78.0, 115.0), 140 * 110 * 0.22 + 140 * 5
+        )
+        self.assertAlmostEqual(roll_waste(140.0, 110.0, 78.0, 500.0), 140 * 110 * 0.22)
+
+    def test_no_roll_long_enough(self):
+        short = [Roll("REM-1", "NAVY", 150.0, 50.0, remnant=True)]
+        self.assertIsNone(nest_on_rolls([], short, table_nest))
+
+        with self.assertRaises(ValueError):
+            nest_on_rolls([], short, table_nest, policy="cheapest")
+
+
+class TestRollInventory(unittest.TestCase):
+    """Tests for RollInventory."""
+
+    def test_load_consume_save(self):
+        with tempfile.TemporaryDirectory() as tmp:
+            path = Path(tmp) / "rolls.json"
+            path.write_text(
+                json.dumps(
+                    {
+                        "rolls": [
+                            {
+                                "roll_id": "R1",
+                                "fabric_code": "NAVY",
+                                "width_cm": 150,
+                                "length_cm": 500,
+                            },
+                            {
+                                "roll_id": "R2",
+                                "fabric_code": "GREY",
+                                "width_cm": 140,
+                                "length_cm": 120,
+                                "remnant": True,
+                            },
+                            {
+                                "roll_id": "R3",
+                                "fabric_code": "NAVY",
+                                "width_cm": 180,
+                                "length_cm": 900,
+                            },
+                        ]
+                    }
+                )
+            )
+            inventory = RollInventory.load(path)
+
+            navy = inventory.candidates("NAVY", max_width_cm=157.48)
+            self.assertEqual([roll.roll_id for roll in navy], ["R1"])
+            self.assertEqual(len(inventory.candidates("")), 3)
+
+            inventory.consume("R1", 200.0)
+            inventory.consume("R2", 100.0)  # 20 cm left is scrapped
+            with self.assertRaises(ValueError):
+                inventory.consume("R1", 400.0)
+            inventory.save()
+
+            reloaded = RollInventory.load(path)
+            self.assertEqual(reloaded.get("R1").length_cm, 300.0)
+            self.assertEqual(reloaded.get("R2").length_cm, 0.0)
+            self.assertTrue(reloaded.get("R2").remnant)
+            self.assertEqual(reloaded.candidates("GREY"), [])
+
+
+@patch("samedaysuits_api.SameDaySuitsAPI._update_order_status")
+@patch("samedaysuits_api.nest_contours", fast_nest)
+@patch("samedaysuits_api.SameDaySuitsAPI._prepare_patterns", fake_prepare_patterns)
+class TestRollAwareAPI(unittest.TestCase):
+    """Tests for SameDaySuitsAPI with a roll inventory."""
+
+    def setUp(self):
+        from samedaysuits_api import SameDaySuitsAPI
+
+        self._tmp = tempfile.TemporaryDirectory()
+        self.inventory = RollInventory(
+            [
+                Roll("FULL-150", "NAVY", 150.0, 5000.0),
+                Roll("REM-100", "NAVY", 100.0, 400.0, remnant=True),
+                Roll("GREY-150", "GREY", 150.0, 5000.0),
+            ],
+            path=Path(self._tmp.name) / "rolls.json",
+        )
+        self.api = SameDaySuitsAPI(
+            output_dir=Path(self._tmp.name), roll_inventory=self.inventory
+        )
+
+    def tearDown(self):
+        self._tmp.cleanup()
+
+    def test_process_order_on_remnant(self, _status):
+        with patch.dict(os.environ, {"ROLL_SELECTION": "remnants_first"}):
+            result = self.api.process_order(
+                make_order("SDS-20260202-0001-A", fabric_code="NAVY")
+            )
+
+        self.assertTrue(result.success)
+        self.assertEqual(result.roll_id, "REM-100")
+        self.assertEqual(result.fabric_width_cm, 100.0)
+
+        metadata = json.loads(result.metadata_file.read_text())
+        roll = metadata["production"]["roll"]
+        self.assertEqual(roll["roll_id"], "REM-100")
+        self.assertEqual(roll["roll_length_cm"], 400.0)
+        self.assertEqual(metadata["production"]["fabric_width_cm"], 100.0)
+        self.assertEqual(
+            {o["roll_id"] for o in roll["options"]}, {"FULL-150", "REM-100"}
+        )
+
+        saved = json.loads(self.inventory.path.read_text())
+        left = {r["roll_id"]: r["length_cm"] for r in saved["rolls"]}
+        self.assertAlmostEqual(left["REM-100"], 400.0 - result.fabric_length_cm)
+        self.assertEqual(left["FULL-150"], 5000.0)
+
+    def test_order_width_skips_inventory(self, _status):
+        result = self.api.process_order(
+            make_order("SDS-20260202-0002-A", fabric_code="NAVY", fabric_width_cm=120.0)
+        )
+
+        self.assertTrue(result.success)
+        self.assertIsNone(result.roll_id)
+        self.assertEqual(result.fabric_width_cm, 120.0)
+        self.assertFalse(self.inventory.path.exists())
+
+    def test_shared_marker_takes_one_roll(self, _status):
+        orders = [
+            make_order("SDS-20260202-0001-A", fabric_code="GREY"),
+            make_order("SDS-20260202-0002-A", fabric_code="GREY"),
+        ]
+        results = self.api.process_marker_batch(orders)
+
+        self.assertEqual([r.roll_id for r in results], ["GREY-150", "GREY-150"])
+        summary = json.loads(
+            (
+                results[0].plt_file.parent / f"{results[0].batch_id}_marker.json"
+            ).read_text()
+        )
+        self.assertEqual(summary["roll"]["roll_id"], "GREY-150")
+        self.assertAlmostEqual(
+            self.inventory.get("GREY-150").length_cm,
+            5000.0 - summary["fabric_length_cm"],
+            places=1,
+        )
+
+
+if __name__ == "__main__":
+    unittest.main(verbosity=2)
@@ -358,6 +358,79 @@ class TestNestingWorker(unittest.TestCase):
                 self.assertIsNotNone(worker.worker_id)
                 self.assertTrue(worker.worker_id.startswith("worker-"))
 
+    def test_worker_shares_marker_for_same_fabric(self):
+        """Test same-fabric orders are nested together and completed each."""
+        with patch.dict(
+            sys.modules,
+            {
+                "samedaysuits_api": Mock(),
+            },
+        ):
+            from nesting_worker import NestingWorker
+
+            with patch.object(NestingWorker, "_load_production_modules"):
+                worker = NestingWorker("test-worker-batch")
+
+        worker.queue = Mock()
+        worker._cutter_queue = None
+        worker._Order = lambda **kwargs: Mock(**kwargs)
+        worker._GarmentType = Mock()
+        worker._FitType = Mock()
+        worker._CustomerMeasurements = Mock()
+        worker._api = Mock(fabric_width_cm=150.0)
+        worker._api.process_marker_batch = Mock(
+            side_effect=lambda orders: [
+                Mock(
+                    success=True,
+                    order_id=o.order_id,
+                    batch_id="MRK-TEST",
+                    plt_file=None,
+                    fabric_length_cm=50.0,
+                    fabric_utilization=80.0,
+                    piece_count=3,
+                    processing_time_ms=10.0,
+                )
+                for o in orders
+            ]
+        )
+        worker._process_order = Mock()
+
+        worker._process_batch(
+            [
+                {"order_id": "A", "fabric_code": "NAVY"},
+                {"order_id": "B", "fabric_code": "GREY"},
+                {"order_id": "C", "fabric_code": "NAVY"},
+            ]
+        )
+
+        batched = worker._api.process_marker_batch.call_args[0][0]
+        self.assertEqual([o.order_id for o in batched], ["A", "C"])
+        worker._process_order.assert_called_once()
+        self.assertEqual(worker.queue.complete.call_count, 2)
+        self.assertEqual(worker.queue.complete.call_args[0][1]["batch_id"], "MRK-TEST")
+
+    def test_worker_keeps_templates_resident(self):
+        """Test templates are reloaded once per refresh interval."""
+        with patch.dict(
+            sys.modules,
+            {
+                "samedaysuits_api": Mock(),
+            },
+        ):
+            from nesting_worker import NestingWorker
+
+            with patch.object(NestingWorker, "_load_production_modules"):
+                worker = NestingWorker("test-worker-templates")
+
+        worker._api = Mock()
+        worker._refresh_templates(force=True)
+        worker._refresh_templates()
+        worker._api.compile_templates.assert_called_once()
+
+        worker.template_refresh_seconds = 0
+        worker._refresh_templates()
+        self.assertEqual(worker._api.compile_templates.call_count, 2)
+
 
 class TestAsyncProcessingIntegration(unittest.TestCase):
     """Integration tests for async processing flow."""
@@ -0,0 +1,223 @@
+#!/usr/bin/env python3
+"""
+Template Store Tests
+
+Tests for precompiled PDS templates:
+1. Compiled contours, GEOM_INFO and size table match the XML extractors
+2. Artifacts are reused across stores and recompiled only when content changes
+3. Memory LRU, shared on-disk and Redis tiers, keyed by content hash
+4. extract_graded_info / SameDaySuitsAPI read compiled templates
+
+Run with:
+    python tests/test_template_store.py
+"""
+
+import os
+import shutil
+import tempfile
+import unittest
+from pathlib import Path
+from unittest.mock import patch
+
+from pipeline_fixtures import PDS_DIR, use_src_core
+
+setUpModule, tearDownModule = use_src_core()
+
+
+def outlines(contours):
+    return [[(p.x, p.y) for p in contour.points] for contour in contours]
+
+
+class FakeTemplateCache:
+    """The compiled-artifact half of TemplateCache, backed by a dict."""
+
+    def __init__(self):
+        self.artifacts = {}
+        self.is_available = True
+
+    def get_compiled(self, content_hash):
+        return self.artifacts.get(content_hash) if self.is_available else None
+
+    def set_compiled(self, content_hash, data, ttl=None):
+        if self.is_available:
+            self.artifacts[content_hash] = data
+
+
+@unittest.skipUnless(PDS_DIR.exists(), "template PDS files not available")
+class TestTemplateStore(unittest.TestCase):
+    """Tests for TemplateStore and CompiledTemplate."""
+
+    def setUp(self):
+        self._tmp = tempfile.TemporaryDirectory()
+        self.tmp = Path(self._tmp.name)
+        self.pds = self.tmp / "Basic Tee_2D.PDS"
+        shutil.copy(PDS_DIR / "Basic Tee_2D.PDS", self.pds)
+
+    def tearDown(self):
+        self._tmp.cleanup()
+
+    def test_compiled_matches_xml_extraction(self):
+        from template_store import TemplateStore
+        from pds_loader import parse_pds
+        from production_pipeline import (
+            extract_piece_dimensions,
+            extract_svg_geometry,
+            transform_to_cm,
+        )
+        from graded_size_extractor import extract_graded_info
+
+        for pds in sorted(PDS_DIR.glob("*.PDS")):
+            compiled = TemplateStore(self.tmp / "store").load(pds)
+            template = parse_pds(pds)
+            contours, metadata = extract_svg_geometry(template)
+
+            with self.subTest(pds=pds.name):
+                self.assertEqual(
+                    compiled.graded_pattern(), extract_graded_info(template)
+                )
+                self.assertEqual(compiled.metadata, metadata)
+                for base_size in ("Small", "Medium"):
+                    pieces = extract_piece_dimensions(template, base_size)
+                    self.assertEqual(compiled.piece_dimensions(base_size), pieces)
+                    expected = transform_to_cm(
+                        contours,
+                        metadata,
+                        sum(p["size_x"] for p in pieces.values()),
+                        max(p["size_y"] for p in pieces.values()),
+                    )
+                    self.assertEqual(
+                        outlines(compiled.contours_cm(base_size)), outlines(expected)
+                    )
+                self.assertEqual(
+                    [c.fill_color for c in compiled.contours_cm(as_arrays=True)],
+                    [c.fill_color for c in contours],
+                )
+
+    def test_artifact_reused_until_content_changes(self):
+        from template_store import TemplateStore
+
+        store_dir = self.tmp / "store"
+        first = TemplateStore(store_dir)
+        compiled = first.load(self.pds)
+        self.assertIs(first.load(self.pds), compiled)
+        self.assertTrue(first.artifact_path(self.pds).exists())
+
+        # A new process loads the artifact instead of parsing
+        second = TemplateStore(store_dir)
+        with patch("template_store.compile_template") as compile_:
+            reloaded = second.load(self.pds)
+        compile_.assert_not_called()
+        self.assertEqual(second.get_stats()["disk_hits"], 1)
+        self.assertEqual(reloaded.source_sha256, compiled.source_sha256)
+        self.assertEqual(
+            outlines(reloaded.contours_cm()), outlines(compiled.contours_cm())
+        )
+
+        # Touched but unchanged: the hash matches, nothing is recompiled
+        stat = self.pds.stat()
+        os.utime(self.pds, ns=(stat.st_atime_ns, stat.st_mtime_ns + 10**9))
+        with patch("template_store.compile_template") as compile_:
+            second.load(self.pds)
+        compile_.assert_not_called()
+
+        # Changed content is recompiled
+        data = self.pds.read_bytes().replace(
+            b"<NAME>Front</NAME>", b"<NAME>Fronx</NAME>"
+        )
+        self.pds.write_bytes(data)
+        changed = second.load(self.pds)
+        self.assertNotEqual(changed.source_sha256, compiled.source_sha256)
+        self.assertIn("Fronx", changed.graded_pattern().pieces)
+        self.assertEqual(second.get_stats()["compiles"], 1)
+
+    def test_memory_tier_is_lru_by_content(self):
+        from template_store import TemplateStore
+
+        store = TemplateStore(self.tmp / "store", max_memory_entries=1)
+        copy = self.tmp / "copy" / self.pds.name
+        copy.parent.mkdir()
+        shutil.copy(self.pds, copy)
+        renamed = self.tmp / "Renamed.PDS"
+        shutil.copy(self.pds, renamed)
+
+        # Copies of one file share an entry, reported under their own path
+        compiled = store.load(self.pds)
+        self.assertTrue(store.is_resident(copy))
+        self.assertEqual(store.load(renamed).name, "Renamed.PDS")
+        self.assertEqual(store.load(copy).source_sha256, compiled.source_sha256)
+        self.assertEqual(store.get_stats()["hits"], 2)
+
+        # A second template evicts the first from memory; disk still has it
+        other = self.tmp / "Other.PDS"
+        shutil.copy(PDS_DIR / "Skinny Trousers_2D.PDS", other)
+        store.load(other)
+        self.assertFalse(store.is_resident(self.pds))
+        with patch("template_store.compile_template") as compile_:
+            store.load(self.pds)
+        compile_.assert_not_called()
+
+        stats = store.get_stats()
+        self.assertEqual(stats["evictions"], 2)
+        self.assertEqual(stats["disk_hits"], 1)
+        self.assertEqual(stats["compiles"], 2)
+        self.assertEqual(stats["loaded"], 1)
+
+    def test_redis_tier_shared_between_stores(self):
+        from template_store import TemplateStore
+
+        redis = FakeTemplateCache()
+        first = TemplateStore(self.tmp / "first", redis_cache=redis)
+        compiled = first.load(self.pds)
+        self.assertEqual(list(redis.artifacts), [compiled.source_sha256])
+
+        # Another host: empty artifact directory, same Redis
+        second = TemplateStore(self.tmp / "second", redis_cache=redis)
+        with patch("template_store.compile_template") as compile_:
+            reloaded = second.load(self.pds)
+        compile_.assert_not_called()
+        self.assertEqual(second.get_stats()["redis_hits"], 1)
+        self.assertTrue(second.artifact_path(self.pds).exists())
+        self.assertEqual(
+            outlines(reloaded.contours_cm()), outlines(compiled.contours_cm())
+        )
+
+        # Redis down: the store compiles locally
+        redis.is_available = False
+        third = TemplateStore(self.tmp / "third", redis_cache=redis)
+        third.load(self.pds)
+        self.assertEqual(third.get_stats()["compiles"], 1)
+        self.assertFalse(third.get_stats()["redis_available"])
+
+    def test_extract_graded_info_uses_store(self):
+        import template_store
+        from graded_size_extractor import extract_graded_info
+
+        store = template_store.TemplateStore(self.tmp / "store")
+        with patch.object(template_store, "_template_store", store):
+            pattern = extract_graded_info(self.pds)
+            self.assertEqual(store.get_stats()["compiles"], 1)
+            self.assertEqual(pattern.filename, "Basic Tee_2D.PDS")
+
+            with patch.dict(os.environ, {"TEMPLATE_STORE_ENABLED": "0"}):
+                self.assertEqual(extract_graded_info(self.pds), pattern)
+            self.assertEqual(store.get_stats()["loaded"], 1)
+
+    def test_api_compiles_templates_at_startup(self):
+        import template_store
+        from samedaysuits_api import GarmentType, SameDaySuitsAPI
+
+        store = template_store.TemplateStore(self.tmp / "store")
+        with patch.object(template_store, "_template_store", store):
+            api = SameDaySuitsAPI(templates_dir=PDS_DIR, output_dir=self.tmp / "out")
+            self.assertEqual(
+                store.get_stats()["compiles"], len(list(PDS_DIR.glob("*.PDS")))
+            )
+
+            # Orders are served from memory
+            template = api.get_template(GarmentType.TEE)
+            self.assertIsNotNone(template)
+            self.assertEqual(store.get_stats()["hits"], 1)
+
+
+if __name__ == "__main__":
+    unittest.main(verbosity=2)